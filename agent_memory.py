@@ -16,6 +16,8 @@ import os
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from utils.fts import ensure_fts, search
+
 # Database path
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agent_memory.db')
 
@@ -130,6 +132,15 @@ class AgentMemory:
         cur.execute('CREATE INDEX IF NOT EXISTS idx_agent_conv_agent ON agent_conversations(agent_id)')
         cur.execute('CREATE INDEX IF NOT EXISTS idx_agent_conv_time ON agent_conversations(timestamp)')
         cur.execute('CREATE INDEX IF NOT EXISTS idx_oracle_time ON oracle_queries(timestamp)')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_agent_conv_agent_time ON agent_conversations(agent_id, timestamp)')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_insights_agent_time ON agent_insights(agent_id, timestamp)')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_oracle_agent_time ON oracle_queries(agent_id, timestamp)')
+
+        # Full-text indexes, kept in sync by triggers
+        ensure_fts(conn, 'agent_conversations', ['content'])
+        ensure_fts(conn, 'agent_insights', ['insight', 'category', 'tags'])
+        ensure_fts(conn, 'oracle_queries', ['query', 'response'])
+        ensure_fts(conn, 'shared_knowledge', ['fact', 'fact_type'])
 
         conn.commit()
         conn.close()
@@ -327,6 +338,108 @@ class AgentMemory:
             for row in rows
         ]
 
+    # ============ Full-text Search ============
+
+    def _search(self, table: str, text: str, columns: List[str], agent_id: str = None,
+                limit: int = 20, where: List[str] = None, params: List = None) -> List[tuple]:
+        # Filters go into the SQL so LIMIT only counts rows that pass them
+        where, params = list(where or []), list(params or [])
+        if agent_id:
+            where.append('t.agent_id = ?')
+            params.append(agent_id)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return search(conn, table, text, columns,
+                          where=' AND '.join(where) if where else None,
+                          params=params, limit=limit)
+        finally:
+            conn.close()
+
+    def search_insights(self, text: str, agent_id: str = None, limit: int = 20,
+                        category: str = None, min_confidence: float = 0.0) -> List[Dict]:
+        """Insights matching text, best BM25 match first"""
+        where, params = ['t.confidence >= ?'], [min_confidence]
+        if category:
+            where.append('t.category = ?')
+            params.append(category)
+        rows = self._search('agent_insights', text,
+                            ['id', 'agent_id', 'timestamp', 'category', 'insight',
+                             'confidence', 'verified', 'tags'], agent_id, limit, where, params)
+        return [
+            {
+                'id': row[0],
+                'agent_id': row[1],
+                'timestamp': row[2],
+                'category': row[3],
+                'insight': row[4],
+                'confidence': row[5],
+                'verified': bool(row[6]),
+                'tags': json.loads(row[7]) if row[7] else [],
+                'score': row[8]
+            }
+            for row in rows
+        ]
+
+    def search_oracle_history(self, text: str, agent_id: str = None,
+                              limit: int = 20) -> List[Dict]:
+        """Oracle queries/responses matching text, best BM25 match first"""
+        rows = self._search('oracle_queries', text,
+                            ['id', 'timestamp', 'agent_id', 'query', 'response',
+                             'response_length', 'model'], agent_id, limit)
+        return [
+            {
+                'id': row[0],
+                'timestamp': row[1],
+                'agent_id': row[2],
+                'query': row[3][:200] + '...' if len(row[3]) > 200 else row[3],
+                'response_preview': row[4][:500] + '...' if row[4] and len(row[4]) > 500 else row[4],
+                'response_length': row[5],
+                'model': row[6],
+                'score': row[7]
+            }
+            for row in rows
+        ]
+
+    def search_conversations(self, text: str, agent_id: str = None,
+                             limit: int = 20) -> List[Dict]:
+        """Agent conversation messages matching text, best BM25 match first"""
+        rows = self._search('agent_conversations', text,
+                            ['id', 'agent_id', 'timestamp', 'role', 'content'], agent_id, limit)
+        return [
+            {
+                'id': row[0],
+                'agent_id': row[1],
+                'timestamp': row[2],
+                'role': row[3],
+                'content': row[4],
+                'score': row[5]
+            }
+            for row in rows
+        ]
+
+    def search_shared_knowledge(self, text: str, limit: int = 20) -> List[Dict]:
+        """Shared facts matching text, best BM25 match first"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = search(conn, 'shared_knowledge', text,
+                          ['id', 'timestamp', 'fact_type', 'fact', 'discovered_by',
+                           'verified_by', 'confidence'], limit=limit)
+        finally:
+            conn.close()
+        return [
+            {
+                'id': row[0],
+                'timestamp': row[1],
+                'fact_type': row[2],
+                'fact': row[3],
+                'discovered_by': row[4],
+                'verified_by': row[5],
+                'confidence': row[6],
+                'score': row[7]
+            }
+            for row in rows
+        ]
+
     def verify_insight(self, insight_id: int, verifying_agent: str = 'maestro'):
         """Mark an insight as verified"""
         conn = sqlite3.connect(self.db_path)
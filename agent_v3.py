@@ -66,6 +66,9 @@ class LadderTools:
 
         If start/end not provided, uses the full consecutive range from database.
         """
+        # numpy comes in with the ladder engine; only load it for this tool
+        from utils.affine_ladder import AffineLadder, load_halfblocks
+
         try:
             # Get dynamic range if not specified
             db_min, db_consecutive_end, db_max = get_db_range()
@@ -74,92 +77,45 @@ class LadderTools:
             if end is None:
                 end = db_consecutive_end  # Use consecutive end (e.g., 70)
 
-            conn = sqlite3.connect(DB_PATH)
-            cur = conn.cursor()
-
-            # Load calibration
-            with open(CALIB_PATH) as f:
-                calib = json.load(f)
-
-            A = {int(k): int(v) for k, v in calib['A'].items()}
-            Cstar = {int(b): {int(l): v for l, v in lanes.items()}
-                     for b, lanes in calib['Cstar'].items()}
+            ladder = AffineLadder.from_calibration(CALIB_PATH)
+            A = {lane: int(a) for lane, a in enumerate(ladder.A)}
 
             # Get puzzle data
-            cur.execute("""
-                SELECT bits, lower(substr(actual_hex,3)) AS hex
-                FROM lcg_residuals
-                WHERE bits BETWEEN ? AND ?
-                ORDER BY bits
-            """, (start, end + 1))
-            rows = cur.fetchall()
-            conn.close()
-
-            if not rows:
+            data = load_halfblocks(DB_PATH, start, end + 1)
+            if not data:
                 return {'success': False, 'error': f'No puzzles in range {start}-{end}'}
 
-            # Parse hex to bytes
-            def hex_to_bytes(h):
-                h = h.rjust(64, '0')
-                return [int(h[i:i+2], 16) for i in range(0, 64, 2)]
-
-            data = {bits: hex_to_bytes(hex_str) for bits, hex_str in rows}
-
-            # Block function - use start as base
-            def blk(i):
-                return (i - start) // 32
+            # Predict every transition at once; lanes are the first 16 bytes
+            check = ladder.verify(data, start, min(end, max(data.keys())) - 1)
+            lanes = slice(0, 16)
+            valid = check.valid[:, lanes]
+            match = (check.y_hat[:, lanes] == check.y[:, lanes]) & valid
+            C = ladder.drifts(check.blocks, check.occ)[0][:, lanes]
 
-            # Verify each transition
             results = []
-            total_matches = 0
-            total_checks = 0
-
-            for i in range(start, min(end, max(data.keys()))):
-                if i not in data or (i+1) not in data:
-                    continue
-
-                x = data[i]  # Current puzzle
-                y = data[i+1]  # Next puzzle (actual)
-                b = blk(i)
-                occ = 0 if ((i - start) % 32) < 16 else 1
-
-                lane_results = []
-                for lane in range(16):
-                    if b not in Cstar or lane not in Cstar[b]:
-                        continue
-                    if occ >= len(Cstar[b][lane]):
-                        continue
-
-                    a = A[lane]
-                    c = Cstar[b][lane][occ]
-                    x_val = x[lane]
-                    y_actual = y[lane]
-                    y_predicted = (a * x_val + c) & 0xFF
-
-                    match = y_predicted == y_actual
-                    if match:
-                        total_matches += 1
-                    total_checks += 1
-
-                    lane_results.append({
-                        'lane': lane,
-                        'A': a,
-                        'C': c,
-                        'x': x_val,
-                        'y_predicted': y_predicted,
-                        'y_actual': y_actual,
-                        'match': match
-                    })
+            for t, i in enumerate(check.bits):
+                lane_results = [{
+                    'lane': lane,
+                    'A': A[lane],
+                    'C': int(C[t, lane]),
+                    'x': int(check.x[t, lane]),
+                    'y_predicted': int(check.y_hat[t, lane]),
+                    'y_actual': int(check.y[t, lane]),
+                    'match': bool(match[t, lane])
+                } for lane in range(16) if valid[t, lane]]
 
                 results.append({
-                    'from_puzzle': i,
-                    'to_puzzle': i + 1,
-                    'block': b,
-                    'occurrence': occ,
+                    'from_puzzle': int(i),
+                    'to_puzzle': int(i) + 1,
+                    'block': int(check.blocks[t]),
+                    'occurrence': int(check.occ[t]),
                     'lanes': lane_results,
                     'all_match': all(lr['match'] for lr in lane_results)
                 })
 
+            total_checks = int(valid.sum())
+            total_matches = int(match.sum())
+
             # Summarize mismatches for analysis
             mismatches = []
             for r in results:
@@ -989,8 +945,7 @@ class ChattieV3:
 
     def _classify_intent(self, message: str) -> str:
         """Use LLM to classify user intent - much more accurate than keyword matching"""
-        import aiohttp
-        import asyncio
+        from utils.llm_transport import get_transport
 
         # Concise prompt to minimize tokens
         intent_prompt = f"""Classify this message into ONE category:
@@ -1013,37 +968,27 @@ Reply with ONE word only:"""
         # Direct API call to avoid token management interference
         async def classify():
             try:
-                async with aiohttp.ClientSession() as session:
-                    payload = {
-                        "model": self.model_name,
-                        "prompt": intent_prompt,
-                        "options": {"temperature": 0.1, "num_predict": 10},
-                        "stream": False
-                    }
-                    base_url = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
-                    headers = {"Content-Type": "application/json"}
-                    api_key = os.getenv("OLLAMA_API_KEY")
-                    if api_key:
-                        headers["Authorization"] = f"Bearer {api_key}"
-
-                    async with session.post(
-                        f"{base_url}/api/generate",
-                        headers=headers,
-                        json=payload,
-                        timeout=aiohttp.ClientTimeout(total=30)
-                    ) as response:
-                        if response.status == 200:
-                            text = await response.text()
-                            try:
-                                result = json.loads(text)
-                                return result.get('response', '')
-                            except:
-                                return text
+                payload = {
+                    "model": self.model_name,
+                    "prompt": intent_prompt,
+                    "options": {"temperature": 0.1, "num_predict": 10},
+                    "stream": False
+                }
+                base_url = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
+                response = await get_transport().post(
+                    f"{base_url}/api/generate", payload,
+                    api_key=os.getenv("OLLAMA_API_KEY"), timeout=30
+                )
+                if response.status == 200:
+                    try:
+                        return response.json().get('response', '')
+                    except:
+                        return response.text
             except Exception as e:
                 return ''
 
         try:
-            intent_response = asyncio.run(classify())
+            intent_response = get_transport().run(classify())
         except:
             intent_response = ''
 
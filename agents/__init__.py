@@ -1,25 +1,35 @@
 """
 Agent package for autonomous Bitcoin puzzle solving system
+
+Submodules are imported on first attribute access, so `import agents.x`
+(or `from agents import BaseAgent`) does not also load pandas for the
+IntelligentAnalyzer.
 """
+import importlib
+
+_EXPORTS = {
+    'BaseAgent': '.base_agent',
+    'DiscoveryAgent': '.discovery_agent',
+    'MathAgent': '.math_agent',
+    'VerificationAgent': '.verification_agent',
+    'IntelligentAnalyzer': '.intelligent_analyzer',
+    'IntelligentMathematician': '.intelligent_mathematician',
+    'AutonomousOrchestrator': '.autonomous_orchestrator',
+    'ClaudeOrchestrator': '.orchestrator',
+    'ASolverAgent': '.asolver_agent',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
 
-from .base_agent import BaseAgent
-from .discovery_agent import DiscoveryAgent
-from .math_agent import MathAgent
-from .verification_agent import VerificationAgent
-from .intelligent_analyzer import IntelligentAnalyzer
-from .intelligent_mathematician import IntelligentMathematician
-from .autonomous_orchestrator import AutonomousOrchestrator
-from .orchestrator import ClaudeOrchestrator
-from .asolver_agent import ASolverAgent
 
-__all__ = [
-    'BaseAgent',
-    'DiscoveryAgent',
-    'MathAgent',
-    'VerificationAgent',
-    'IntelligentAnalyzer',
-    'IntelligentMathematician',
-    'AutonomousOrchestrator',
-    'ClaudeOrchestrator',
-    'ASolverAgent'
-]
+def __dir__():
+    return sorted(list(globals()) + __all__)
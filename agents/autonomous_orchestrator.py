@@ -9,7 +9,6 @@ import sys
 import json
 import asyncio
 import sqlite3
-import aiohttp
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 import yaml
@@ -23,6 +22,7 @@ from agents.math_agent import MathAgent
 from agents.verification_agent import VerificationAgent
 from agents.discovery_agent import DiscoveryAgent
 from agents.intelligent_mathematician import IntelligentMathematician
+from utils.llm_transport import get_transport
 
 class AutonomousOrchestrator:
     """Self-directed orchestrator for autonomous mathematical discovery"""
@@ -137,12 +137,6 @@ class AutonomousOrchestrator:
 
     async def call_mistral(self, prompt: str, system: str = None) -> str:
         """Call Mistral Large for autonomous reasoning"""
-        headers = {
-            "Content-Type": "application/json",
-        }
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
-
         messages = []
         if system:
             messages.append({"role": "system", "content": system})
@@ -159,24 +153,17 @@ class AutonomousOrchestrator:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/api/chat",
-                    headers=headers,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=300)
-                ) as response:
-                    if response.status == 200:
-                        # Handle both JSON and text/plain responses
-                        text_response = await response.text()
-                        try:
-                            result = json.loads(text_response)
-                            return result.get('message', {}).get('content', '')
-                        except json.JSONDecodeError:
-                            return text_response
-                    else:
-                        error = await response.text()
-                        return f"Mistral API error: {response.status} - {error}"
+            response = await get_transport().post(
+                f"{self.base_url}/api/chat", payload, api_key=self.api_key, timeout=300
+            )
+            if response.status == 200:
+                # Handle both JSON and text/plain responses
+                try:
+                    return response.json().get('message', {}).get('content', '')
+                except json.JSONDecodeError:
+                    return response.text
+            else:
+                return f"Mistral API error: {response.status} - {response.text}"
         except Exception as e:
             return f"Mistral API error: {str(e)}"
 
@@ -6,12 +6,13 @@ Handles communication with Ollama Cloud API
 import os
 import json
 import asyncio
-import aiohttp
 from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 import yaml
 
+from utils.llm_transport import get_transport
+
 class BaseAgent(ABC):
     """Base class for all ladder agents"""
 
@@ -39,12 +40,6 @@ class BaseAgent(ABC):
 
     async def _call_ollama(self, prompt: str, system_prompt: str = None) -> str:
         """Call Ollama Cloud API"""
-        headers = {
-            "Content-Type": "application/json",
-        }
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
-
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
@@ -61,30 +56,23 @@ class BaseAgent(ABC):
             "stream": False
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/api/chat",
-                headers=headers,
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=300)
-            ) as response:
-                if response.status == 200:
-                    # Handle both JSON and text/plain responses
-                    text_response = await response.text()
-                    try:
-                        result = json.loads(text_response)
-                        assistant_message = result.get('message', {}).get('content', '')
-                    except json.JSONDecodeError:
-                        assistant_message = text_response
-
-                    # Update history
-                    self.history.append({"role": "user", "content": prompt})
-                    self.history.append({"role": "assistant", "content": assistant_message})
-
-                    return assistant_message
-                else:
-                    error = await response.text()
-                    raise Exception(f"Ollama API error: {response.status} - {error}")
+        response = await get_transport().post(
+            f"{self.base_url}/api/chat", payload, api_key=self.api_key, timeout=300
+        )
+        if response.status == 200:
+            # Handle both JSON and text/plain responses
+            try:
+                assistant_message = response.json().get('message', {}).get('content', '')
+            except json.JSONDecodeError:
+                assistant_message = response.text
+
+            # Update history
+            self.history.append({"role": "user", "content": prompt})
+            self.history.append({"role": "assistant", "content": assistant_message})
+
+            return assistant_message
+        else:
+            raise Exception(f"Ollama API error: {response.status} - {response.text}")
 
     def get_system_prompt(self) -> str:
         """Get the system prompt for this agent"""
@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+"""
+Kangaroo Solver - Interval ECDLP for puzzles with an exposed public key
+
+Given a public key Q = k*G with k known to lie in [low, high), recovers k
+in O(sqrt(high - low)) group operations instead of a brute-force scan:
+
+  - Baby-step giant-step: deterministic, memory ~sqrt(W) points
+  - Parallel kangaroos (van Oorschot-Wiener): tame and wild herds hop
+    through the interval across a process pool; only distinguished points
+    (x with dp_bits low zero bits) are kept, in a shared SQLite table, so
+    memory stays small and the run can resume after a crash
+
+Every puzzle whose outgoing transaction revealed the public key (the 5-step
+puzzles 75, 80, 85, 90, ...) is a candidate: pass its pubkey and the range
+[2^(n-1), 2^n).
+
+Usage:
+    python3 agents/kangaroo_solver.py --pubkey 02abcd... --bits 75
+    python3 agents/kangaroo_solver.py --pubkey 03... --low 0x4000 --high 0x8000 --method bsgs
+"""
+import argparse
+import hashlib
+import math
+import multiprocessing as mp
+import os
+import queue
+import random
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.point_walk import walk_from
+from utils.secp256k1 import (P, N, Point, decode_point, encode_point, point_add as _affine_add,
+                             scalar_mult)
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "db" / "kangaroo.db"
+
+# Kangaroos per worker process; steps are batched across the herd so one
+# pow() inversion covers every kangaroo in the herd
+DEFAULT_HERD_SIZE = 256
+
+# BSGS is used by method='auto' while its baby-step table stays this small
+BSGS_MAX_BABY_STEPS = 1 << 20
+
+# Steps between worker reports (DPs, op counts) and herd snapshots
+STEPS_PER_REPORT = 64
+STATE_INTERVAL_SECONDS = 30.0
+
+# Kinds of kangaroo
+TAME = 0
+WILD = 1
+
+
+@dataclass
+class ECDLPResult:
+    """Result of an interval ECDLP solve"""
+    found: bool
+    private_key: Optional[int] = None
+    method: str = ""
+    operations: int = 0
+    expected_operations: float = 0.0
+    time_elapsed: float = 0.0
+    ops_per_second: float = 0.0
+    distinguished_points: int = 0
+
+
+def parse_pubkey(pubkey) -> Point:
+    """Accept a hex string, SEC1 bytes or an (x, y) tuple"""
+    if isinstance(pubkey, tuple):
+        return pubkey
+    if isinstance(pubkey, str):
+        pubkey = bytes.fromhex(pubkey.strip())
+    return decode_point(pubkey)
+
+
+def _negate(point: Point) -> Point:
+    return (point[0], (P - point[1]) % P)
+
+
+def _shift_target(target: Point, low: int) -> Optional[Point]:
+    """Q' = Q - low*G, so the unknown becomes k - low in [0, W)"""
+    if low % N == 0:
+        return target
+    return _affine_add(target, _negate(scalar_mult(low)))
+
+
+def _jump_count(mean_jump: float) -> int:
+    """Smallest m with mean of {2^0 .. 2^(m-1)} >= mean_jump"""
+    m = 1
+    while (2 ** m - 1) / m < mean_jump and m < 255:
+        m += 1
+    return m
+
+
+def _herd_step(xs: List[int], ys: List[int], dists: List[int], jump_points: List[Point],
+               jump_dists: List[int], dp_mask: int) -> List[int]:
+    """
+    Advance every kangaroo in the herd by one jump.
+
+    The jump is chosen from the kangaroo's x coordinate, so two kangaroos
+    that land on the same point follow the same path afterwards. The herd's
+    inversions are batched with Montgomery's trick. Returns the indices of
+    kangaroos that landed on a distinguished point.
+    """
+    n = len(xs)
+    m = len(jump_points)
+    idx = [0] * n
+    prefix = [0] * n
+    acc = 1
+    for i in range(n):
+        j = xs[i] % m
+        idx[i] = j
+        prefix[i] = acc
+        acc = acc * (jump_points[j][0] - xs[i]) % P
+
+    hits = []
+    if acc == 0:
+        # A kangaroo sits on +/- a jump point (tiny intervals only)
+        for i in range(n):
+            j = idx[i]
+            xs[i], ys[i] = _affine_add((xs[i], ys[i]), jump_points[j])
+            dists[i] += jump_dists[j]
+            if xs[i] & dp_mask == 0:
+                hits.append(i)
+        return hits
+
+    inv = pow(acc, -1, P)
+    for i in range(n - 1, -1, -1):
+        j = idx[i]
+        jx, jy = jump_points[j]
+        x = xs[i]
+        y = ys[i]
+        dx_inv = inv * prefix[i] % P
+        inv = inv * (jx - x) % P
+        lam = (jy - y) * dx_inv % P
+        x3 = (lam * lam - x - jx) % P
+        ys[i] = (lam * (x - x3) - y) % P
+        xs[i] = x3
+        dists[i] += jump_dists[j]
+        if x3 & dp_mask == 0:
+            hits.append(i)
+    return hits
+
+
+def _place(kind: int, dist: int, shifted: Point) -> Point:
+    """Position of a kangaroo: dist*G (tame) or Q' + dist*G (wild)"""
+    point = scalar_mult(dist) if dist % N else None
+    if kind == WILD:
+        point = _affine_add(shifted, point)
+    return point
+
+
+def _spawn(kind: int, width: int, rng: random.Random) -> int:
+    """Random starting distance: tame across the interval, wild near Q'"""
+    if kind == TAME:
+        return rng.randrange(1, max(2, width))
+    return rng.randrange(0, max(1, width // 2))
+
+
+def _kangaroo_worker(worker_id: int, herd: List[Tuple[int, int]], shifted: Point,
+                     width: int, jump_count: int, dp_bits: int, out_queue,
+                     control_queue, stop_event):
+    """
+    Worker process: hop a herd until stopped.
+
+    Reports on out_queue:
+        ('dps', worker_id, [(x, kind, dist, index), ...], ops)
+        ('state', worker_id, [(kind, dist), ...])
+        ('exit', worker_id)
+    Accepts kangaroo indices to respawn on control_queue (sent when the
+    parent sees two kangaroos of the same kind merge).
+    """
+    rng = random.Random(os.urandom(16))
+    jump_dists = [1 << i for i in range(jump_count)]
+    jump_points = [scalar_mult(d) for d in jump_dists]
+    dp_mask = (1 << dp_bits) - 1
+
+    kinds = [kind for kind, _ in herd]
+    dists = [dist for _, dist in herd]
+    xs, ys = [], []
+    for i, (kind, dist) in enumerate(herd):
+        point = _place(kind, dist, shifted)
+        while point is None:
+            dists[i] = _spawn(kind, width, rng)
+            point = _place(kind, dists[i], shifted)
+        xs.append(point[0])
+        ys.append(point[1])
+
+    last_state = time.time()
+    try:
+        while not stop_event.is_set():
+            dps = []
+            for _ in range(STEPS_PER_REPORT):
+                for i in _herd_step(xs, ys, dists, jump_points, jump_dists, dp_mask):
+                    dps.append((xs[i], kinds[i], dists[i], i))
+            out_queue.put(('dps', worker_id, dps, STEPS_PER_REPORT * len(xs)))
+
+            if time.time() - last_state >= STATE_INTERVAL_SECONDS:
+                out_queue.put(('state', worker_id, list(zip(kinds, dists))))
+                last_state = time.time()
+
+            while True:
+                try:
+                    i = control_queue.get_nowait()
+                except queue.Empty:
+                    break
+                dists[i] = _spawn(kinds[i], width, rng)
+                point = _place(kinds[i], dists[i], shifted)
+                if point is not None:
+                    xs[i], ys[i] = point
+    except KeyboardInterrupt:
+        pass
+    finally:
+        out_queue.put(('state', worker_id, list(zip(kinds, dists))))
+        out_queue.put(('exit', worker_id))
+
+
+class KangarooSolver:
+    """
+    Interval ECDLP engine (BSGS and parallel kangaroos)
+
+    Kangaroo runs are keyed by (pubkey, low, high) in the SQLite database:
+    the distinguished-point table and every kangaroo's travelled distance
+    are persisted, so re-running the same job resumes where it stopped.
+    """
+
+    def __init__(self, db_path: str = None, num_workers: int = None,
+                 herd_size: int = DEFAULT_HERD_SIZE):
+        self.db_path = str(db_path or DEFAULT_DB_PATH)
+        self.num_workers = num_workers or max(1, mp.cpu_count() - 1)
+        self.herd_size = herd_size
+        self._init_db()
+
+    def _init_db(self):
+        """Initialize job / distinguished point / herd tables"""
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('PRAGMA journal_mode=WAL')
+        c.execute('''CREATE TABLE IF NOT EXISTS kangaroo_jobs (
+            job_id TEXT PRIMARY KEY,
+            pubkey TEXT,
+            range_low TEXT,
+            range_high TEXT,
+            dp_bits INTEGER,
+            jump_count INTEGER,
+            operations INTEGER DEFAULT 0,
+            status TEXT DEFAULT 'running',
+            started_at TEXT,
+            updated_at TEXT,
+            found_key TEXT
+        )''')
+        c.execute('''CREATE TABLE IF NOT EXISTS kangaroo_dps (
+            job_id TEXT,
+            x TEXT,
+            kind INTEGER,
+            dist TEXT,
+            PRIMARY KEY (job_id, x)
+        )''')
+        c.execute('''CREATE TABLE IF NOT EXISTS kangaroo_herd (
+            job_id TEXT,
+            idx INTEGER,
+            kind INTEGER,
+            dist TEXT,
+            PRIMARY KEY (job_id, idx)
+        )''')
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def expected_operations(width: int, method: str, kangaroos: int = 0, dp_bits: int = 0) -> float:
+        """Expected group operations to solve an interval of this width"""
+        root = math.sqrt(max(1, width))
+        if method == 'bsgs':
+            # sqrt(W) baby steps plus on average half the giant steps
+            return 1.5 * root
+        # 2*sqrt(W) for tame/wild collision plus the distance a kangaroo
+        # travels after the collision before reaching a distinguished point
+        return 2 * root + kangaroos * (1 << dp_bits)
+
+    def solve(self, pubkey, low: int, high: int, method: str = 'auto', **kwargs) -> ECDLPResult:
+        """Solve Q = k*G for k in [low, high)"""
+        if method == 'auto':
+            method = 'bsgs' if math.isqrt(high - low) + 1 <= BSGS_MAX_BABY_STEPS else 'kangaroo'
+        if method == 'bsgs':
+            return self.solve_bsgs(pubkey, low, high)
+        return self.solve_kangaroo(pubkey, low, high, **kwargs)
+
+    def solve_bsgs(self, pubkey, low: int, high: int) -> ECDLPResult:
+        """Baby-step giant-step over [low, high)"""
+        start_time = time.time()
+        target = parse_pubkey(pubkey)
+        width = high - low
+        expected = self.expected_operations(width, 'bsgs')
+
+        shifted = _shift_target(target, low)
+        if shifted is None:
+            return ECDLPResult(found=True, private_key=low, method='bsgs',
+                               expected_operations=expected)
+
+        # Baby steps: x(j*G) -> j for j in [1, m]
+        m = math.isqrt(width) + 1
+        baby = {}
+        for j, point in enumerate(walk_from(scalar_mult(1), scalar_mult(1), m), 1):
+            baby.setdefault(point[0], j)
+        ops = m
+
+        # Giant steps: R_i = Q' - i*m*G; R_i = +/-j*G gives k' = i*m +/- j
+        found_key = None
+        for i, point in enumerate(walk_from(shifted, _negate(scalar_mult(m)), width // m + 2)):
+            ops += 1
+            if point is None:
+                continue
+            j = baby.get(point[0])
+            if j is None:
+                continue
+            for candidate in (i * m + j, i * m - j):
+                if 0 <= candidate < width and scalar_mult(low + candidate) == target:
+                    found_key = low + candidate
+                    break
+            if found_key is not None:
+                break
+
+        elapsed = time.time() - start_time
+        return ECDLPResult(
+            found=found_key is not None,
+            private_key=found_key,
+            method='bsgs',
+            operations=ops,
+            expected_operations=expected,
+            time_elapsed=elapsed,
+            ops_per_second=ops / elapsed if elapsed > 0 else 0
+        )
+
+    @staticmethod
+    def _job_id(target: Point, low: int, high: int) -> str:
+        return hashlib.sha256(encode_point(*target) + f"|{low}|{high}".encode()).hexdigest()[:16]
+
+    def _load_job(self, job_id: str):
+        """Return (job row, {x: (kind, dist)}, herd) for an existing job"""
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('''SELECT dp_bits, jump_count, operations, status, found_key
+                     FROM kangaroo_jobs WHERE job_id = ?''', (job_id,))
+        job = c.fetchone()
+        c.execute('SELECT x, kind, dist FROM kangaroo_dps WHERE job_id = ?', (job_id,))
+        dps = {int(x, 16): (kind, int(dist)) for x, kind, dist in c.fetchall()}
+        c.execute('SELECT kind, dist FROM kangaroo_herd WHERE job_id = ? ORDER BY idx', (job_id,))
+        herd = [(kind, int(dist)) for kind, dist in c.fetchall()]
+        conn.close()
+        return job, dps, herd
+
+    def _save_job(self, conn, job_id: str, operations: int, status: str,
+                  new_dps: List[Tuple[int, int, int]], herd: List[Tuple[int, int]] = None,
+                  found_key: int = None):
+        """Persist new DPs, op count and (optionally) the herd in one transaction"""
+        c = conn.cursor()
+        c.executemany('INSERT OR IGNORE INTO kangaroo_dps (job_id, x, kind, dist) VALUES (?, ?, ?, ?)',
+                      [(job_id, format(x, 'x'), kind, str(dist)) for x, kind, dist in new_dps])
+        if herd is not None:
+            c.execute('DELETE FROM kangaroo_herd WHERE job_id = ?', (job_id,))
+            c.executemany('INSERT INTO kangaroo_herd (job_id, idx, kind, dist) VALUES (?, ?, ?, ?)',
+                          [(job_id, i, kind, str(dist)) for i, (kind, dist) in enumerate(herd)])
+        c.execute('''UPDATE kangaroo_jobs SET operations = ?, status = ?, updated_at = ?,
+                     found_key = COALESCE(?, found_key) WHERE job_id = ?''',
+                  (operations, status, datetime.now().isoformat(),
+                   str(found_key) if found_key is not None else None, job_id))
+        conn.commit()
+
+    def solve_kangaroo(self, pubkey, low: int, high: int, dp_bits: int = None,
+                       max_operations: int = None, resume: bool = True,
+                       verbose: bool = True) -> ECDLPResult:
+        """
+        Parallel kangaroo search over [low, high).
+
+        Args:
+            pubkey: Target public key (hex, SEC1 bytes or point)
+            low, high: Interval containing the private key
+            dp_bits: Distinguished-point bits (default: derived from the
+                interval width and total herd size)
+            max_operations: Stop (resumably) after this many jumps
+            resume: Continue a stored job for the same pubkey and range
+        """
+        start_time = time.time()
+        target = parse_pubkey(pubkey)
+        width = high - low
+        root = math.sqrt(max(1, width))
+
+        shifted = _shift_target(target, low)
+        if shifted is None:
+            return ECDLPResult(found=True, private_key=low, method='kangaroo')
+
+        job_id = self._job_id(target, low, high)
+        job, dps, herd = self._load_job(job_id) if resume else (None, {}, [])
+
+        if job and job[3] == 'solved' and job[4]:
+            key = int(job[4])
+            return ECDLPResult(found=True, private_key=key, method='kangaroo', operations=job[2],
+                               distinguished_points=len(dps))
+
+        if job and herd:
+            dp_bits, jump_count, prior_ops = job[0], job[1], job[2]
+        else:
+            # Keep the herd well below sqrt(W) so start-up cost stays small
+            herd_size = max(4, min(self.herd_size, int(root) // (32 * self.num_workers)))
+            total = herd_size * self.num_workers
+            if dp_bits is None:
+                # Post-collision overhead (total * 2^dp) of at most sqrt(W)/8
+                dp_bits = max(0, int(math.log2(max(1.0, root / (8 * total)))))
+            jump_count = _jump_count(total * root / 4)
+            prior_ops = 0
+            dps = {}
+            rng = random.Random(os.urandom(16))
+            kinds = [TAME if i % 2 == 0 else WILD for i in range(total)]
+            herd = [(kind, _spawn(kind, width, rng)) for kind in kinds]
+
+        expected = self.expected_operations(width, 'kangaroo', len(herd), dp_bits)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''INSERT OR IGNORE INTO kangaroo_jobs
+                        (job_id, pubkey, range_low, range_high, dp_bits, jump_count, started_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                     (job_id, encode_point(*target).hex(), str(low), str(high), dp_bits,
+                      jump_count, datetime.now().isoformat()))
+        conn.execute('UPDATE kangaroo_jobs SET dp_bits = ?, jump_count = ? WHERE job_id = ?',
+                     (dp_bits, jump_count, job_id))
+        conn.commit()
+
+        if verbose:
+            print(f"\n{'='*60}")
+            print(f"KANGAROO: job {job_id}{' (resumed)' if prior_ops else ''}")
+            print(f"{'='*60}")
+            print(f"Range: [{low:,}, {high:,}) width 2^{math.log2(max(1, width)):.1f}")
+            print(f"Workers: {self.num_workers}, kangaroos: {len(herd)}")
+            print(f"DP bits: {dp_bits}, jumps: 2^0..2^{jump_count - 1}")
+            print(f"Expected operations: {expected:,.0f}")
+            print(f"{'='*60}\n")
+
+        # Split the herd across workers; offsets map worker indices back
+        parts = [herd[w::self.num_workers] for w in range(self.num_workers)]
+        out_queue = mp.Queue()
+        control_queues = [mp.Queue() for _ in range(self.num_workers)]
+        stop_event = mp.Event()
+        workers = [
+            mp.Process(target=_kangaroo_worker,
+                       args=(w, parts[w], shifted, width, jump_count, dp_bits,
+                             out_queue, control_queues[w], stop_event),
+                       daemon=True)
+            for w in range(self.num_workers)
+        ]
+        for worker in workers:
+            worker.start()
+
+        operations = prior_ops
+        run_ops = 0
+        found_key = None
+        pending_dps = []
+        snapshots: Dict[int, List[Tuple[int, int]]] = {w: parts[w] for w in range(self.num_workers)}
+        active = len(workers)
+        last_save = last_print = time.time()
+
+        def merged_herd():
+            merged = []
+            for i in range(max(len(p) for p in snapshots.values())):
+                for w in range(self.num_workers):
+                    if i < len(snapshots[w]):
+                        merged.append(snapshots[w][i])
+            return merged
+
+        try:
+            while active > 0:
+                try:
+                    message = out_queue.get(timeout=0.5)
+                except queue.Empty:
+                    if not any(w.is_alive() for w in workers):
+                        break
+                    continue
+
+                kind = message[0]
+                if kind == 'exit':
+                    active -= 1
+                    continue
+                if kind == 'state':
+                    snapshots[message[1]] = message[2]
+                    continue
+
+                _, worker_id, new_dps, ops = message
+                operations += ops
+                run_ops += ops
+
+                for x, dp_kind, dist, index in new_dps:
+                    previous = dps.get(x)
+                    if previous is None:
+                        dps[x] = (dp_kind, dist)
+                        pending_dps.append((x, dp_kind, dist))
+                        continue
+                    prev_kind, prev_dist = previous
+                    if prev_kind == dp_kind:
+                        if prev_dist != dist:
+                            # Two kangaroos of one kind merged: restart this one
+                            control_queues[worker_id].put(index)
+                        continue
+
+                    # Tame/wild collision: tame dist = +/-(k' + wild dist)
+                    tame_dist, wild_dist = (prev_dist, dist) if prev_kind == TAME else (dist, prev_dist)
+                    for k_shift in (tame_dist - wild_dist, -tame_dist - wild_dist):
+                        candidate = (low + k_shift) % N
+                        if scalar_mult(candidate) == target:
+                            found_key = candidate
+                            break
+                    if found_key is not None:
+                        break
+
+                if found_key is not None:
+                    stop_event.set()
+                    break
+
+                if max_operations is not None and run_ops >= max_operations:
+                    stop_event.set()
+
+                now = time.time()
+                if now - last_save >= STATE_INTERVAL_SECONDS:
+                    self._save_job(conn, job_id, operations, 'running', pending_dps, merged_herd())
+                    pending_dps = []
+                    last_save = now
+                if verbose and now - last_print >= 10:
+                    rate = run_ops / (now - start_time)
+                    print(f"  {operations:,} ops ({operations / expected:.2f}x expected), "
+                          f"{rate:,.0f} ops/s, {len(dps):,} DPs")
+                    last_print = now
+
+        except KeyboardInterrupt:
+            print("\nKangaroo run interrupted - state saved, re-run to resume")
+
+        finally:
+            stop_event.set()
+            # Collect final herd snapshots so the saved state is current
+            deadline = time.time() + 5
+            while active > 0 and time.time() < deadline:
+                try:
+                    message = out_queue.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if message[0] == 'exit':
+                    active -= 1
+                elif message[0] == 'state':
+                    snapshots[message[1]] = message[2]
+            for worker in workers:
+                worker.join(timeout=5)
+                if worker.is_alive():
+                    worker.terminate()
+
+            status = 'solved' if found_key is not None else 'running'
+            self._save_job(conn, job_id, operations, status, pending_dps, merged_herd(), found_key)
+            conn.close()
+
+        elapsed = time.time() - start_time
+        return ECDLPResult(
+            found=found_key is not None,
+            private_key=found_key,
+            method='kangaroo',
+            operations=operations,
+            expected_operations=expected,
+            time_elapsed=elapsed,
+            ops_per_second=run_ops / elapsed if elapsed > 0 else 0,
+            distinguished_points=len(dps)
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interval ECDLP solver (BSGS / kangaroo)")
+    parser.add_argument('--pubkey', required=True, help="Target public key (hex, compressed or not)")
+    parser.add_argument('--bits', type=int, help="Puzzle number n: range [2^(n-1), 2^n)")
+    parser.add_argument('--low', help="Range start (int or 0x hex)")
+    parser.add_argument('--high', help="Range end, exclusive (int or 0x hex)")
+    parser.add_argument('--method', choices=['auto', 'bsgs', 'kangaroo'], default='auto')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--dp-bits', type=int, default=None)
+    parser.add_argument('--max-ops', type=int, default=None)
+    parser.add_argument('--db', default=None)
+    args = parser.parse_args()
+
+    if args.bits:
+        low, high = 2 ** (args.bits - 1), 2 ** args.bits
+    elif args.low and args.high:
+        low, high = int(args.low, 0), int(args.high, 0)
+    else:
+        parser.error("give --bits or --low/--high")
+
+    solver = KangarooSolver(db_path=args.db, num_workers=args.workers)
+    kwargs = {}
+    if args.method != 'bsgs':
+        kwargs = {'dp_bits': args.dp_bits, 'max_operations': args.max_ops}
+    result = solver.solve(args.pubkey, low, high, method=args.method, **kwargs)
+
+    print(f"Method: {result.method}")
+    print(f"Found: {result.found}")
+    if result.found:
+        print(f"Private key: {result.private_key} ({hex(result.private_key)})")
+    print(f"Operations: {result.operations:,} (expected {result.expected_operations:,.0f})")
+    print(f"Time: {result.time_elapsed:.2f}s ({result.ops_per_second:,.0f} ops/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ import sqlite3
 import os
 from typing import Dict, List, Optional
 from .base_agent import BaseAgent
+from utils.affine_ladder import AffineLadder, load_halfblocks
 
 class MathAgent(BaseAgent):
     """Agent specialized in mathematical computation for the ladder"""
@@ -134,28 +135,25 @@ class MathAgent(BaseAgent):
             "mismatches": []
         }
 
-        for bits in range(start_bits, end_bits):
-            hex_current = self.get_puzzle_hex(bits)
-            hex_next = self.get_puzzle_hex(bits + 1)
+        if 'A' not in self.calibration or 'Cstar' not in self.calibration:
+            results["percentage"] = 0
+            return results
 
-            if not hex_current or not hex_next:
-                continue
-
-            # Get 16 bytes
-            current_bytes = bytes.fromhex(hex_current[2:34]) if hex_current.startswith('0x') else bytes.fromhex(hex_current[:32])
-            next_bytes = bytes.fromhex(hex_next[2:34]) if hex_next.startswith('0x') else bytes.fromhex(hex_next[:32])
-
-            # Compute expected next
-            expected = await self.compute_forward_step(current_bytes, block=0)
+        # All transitions start_bits..end_bits-1 in one vectorized pass
+        ladder = AffineLadder(self.calibration['A'], self.calibration['Cstar'])
+        data = load_halfblocks(self.db_path, start_bits, end_bits)
+        check = ladder.verify(data, start_bits, end_bits - 1)
+        bad = check.forward_mismatch.any(axis=1)
 
+        for t, bits in enumerate(check.bits):
             results["total"] += 1
-            if expected == next_bytes:
+            if not bad[t]:
                 results["correct"] += 1
             else:
                 results["mismatches"].append({
-                    "bits": bits,
-                    "expected": expected.hex(),
-                    "actual": next_bytes.hex()
+                    "bits": int(bits),
+                    "expected": check.y_hat[t].tobytes().hex(),
+                    "actual": check.y[t].tobytes().hex()
                 })
 
         results["percentage"] = (results["correct"] / results["total"] * 100) if results["total"] > 0 else 0
@@ -7,14 +7,14 @@ import os
 import json
 import asyncio
 import sqlite3
-import aiohttp
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import yaml
 
 from .math_agent import MathAgent
 from .verification_agent import VerificationAgent
 from .discovery_agent import DiscoveryAgent
+from utils.llm_transport import get_transport
 
 class ClaudeOrchestrator:
     """Central orchestrator using Ollama for planning and synthesis"""
@@ -90,12 +90,6 @@ class ClaudeOrchestrator:
 
     async def call_claude(self, prompt: str, system: str = None) -> str:
         """Call Ollama API for orchestration decisions"""
-        headers = {
-            "Content-Type": "application/json",
-        }
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
-
         messages = []
         if system:
             messages.append({"role": "system", "content": system})
@@ -112,24 +106,17 @@ class ClaudeOrchestrator:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/api/chat",
-                    headers=headers,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=300)
-                ) as response:
-                    if response.status == 200:
-                        # Handle both JSON and text/plain responses
-                        text_response = await response.text()
-                        try:
-                            result = json.loads(text_response)
-                            return result.get('message', {}).get('content', '')
-                        except json.JSONDecodeError:
-                            return text_response
-                    else:
-                        error = await response.text()
-                        return f"Ollama API error: {response.status} - {error}"
+            response = await get_transport().post(
+                f"{self.base_url}/api/chat", payload, api_key=self.api_key, timeout=300
+            )
+            if response.status == 200:
+                # Handle both JSON and text/plain responses
+                try:
+                    return response.json().get('message', {}).get('content', '')
+                except json.JSONDecodeError:
+                    return response.text
+            else:
+                return f"Ollama API error: {response.status} - {response.text}"
         except Exception as e:
             return f"Ollama API error: {str(e)}"
 
@@ -165,9 +152,10 @@ Each task should be a JSON object with:
 - agent: "math", "verification", or "discovery"
 - type: specific task type for that agent
 - params: any parameters needed
+- depends_on: (optional) list of 0-based indices of tasks that must finish first
 
 Output a JSON array of tasks in execution order.
-Consider dependencies between tasks.
+Tasks without depends_on run concurrently, so only list real dependencies.
 
 Available task types:
 - math: compute_drift, verify, forward_step, analyze
@@ -192,8 +180,13 @@ Return ONLY valid JSON."""
         # Fallback: simple task
         return [{"agent": "discovery", "type": "explore", "params": {}}]
 
-    async def dispatch_task(self, task: Dict) -> Dict:
-        """Dispatch a task to the appropriate agent"""
+    async def dispatch_task(self, task: Dict, log_rows: Optional[List] = None) -> Dict:
+        """
+        Dispatch a task to the appropriate agent.
+
+        The task row is written immediately, or appended to log_rows when
+        the caller batches writes (see execute_goal).
+        """
         agent_name = task.get("agent", "discovery")
         task_type = task.get("type", "explore")
         params = task.get("params", {})
@@ -216,7 +209,11 @@ Return ONLY valid JSON."""
         duration = (datetime.now() - start_time).total_seconds() * 1000
 
         # Log to database
-        self._log_task(task_type, agent_name, params, result, duration)
+        row = self._task_row(task_type, agent_name, params, result, duration)
+        if log_rows is None:
+            self._write_rows([row], [])
+        else:
+            log_rows.append(row)
 
         return {
             "task": task,
@@ -224,15 +221,9 @@ Return ONLY valid JSON."""
             "duration_ms": duration
         }
 
-    def _log_task(self, task_type: str, agent: str, input_data: Dict,
-                  output_data: Dict, duration: float):
-        """Log task to database"""
-        conn = sqlite3.connect(self.memory_db)
-        cur = conn.cursor()
-        cur.execute('''
-            INSERT INTO tasks (timestamp, task_type, agent, input, output, status, duration_ms)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
+    def _task_row(self, task_type: str, agent: str, input_data: Dict,
+                  output_data: Dict, duration: float) -> Tuple:
+        return (
             datetime.now().isoformat(),
             task_type,
             agent,
@@ -240,19 +231,11 @@ Return ONLY valid JSON."""
             json.dumps(output_data),
             'completed',
             int(duration)
-        ))
-        conn.commit()
-        conn.close()
+        )
 
-    def save_discovery(self, agent: str, category: str, title: str,
-                       content: str, confidence: float = 0.5, verified: bool = False):
-        """Save a discovery to database"""
-        conn = sqlite3.connect(self.memory_db)
-        cur = conn.cursor()
-        cur.execute('''
-            INSERT INTO discoveries (timestamp, agent, category, title, content, confidence, verified)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
+    def _discovery_row(self, agent: str, category: str, title: str,
+                       content: str, confidence: float = 0.5, verified: bool = False) -> Tuple:
+        return (
             datetime.now().isoformat(),
             agent,
             category,
@@ -260,9 +243,81 @@ Return ONLY valid JSON."""
             content,
             confidence,
             1 if verified else 0
-        ))
-        conn.commit()
-        conn.close()
+        )
+
+    def _write_rows(self, task_rows: List[Tuple], discovery_rows: List[Tuple]):
+        """Write task and discovery rows in a single transaction"""
+        if not task_rows and not discovery_rows:
+            return
+        conn = sqlite3.connect(self.memory_db)
+        try:
+            with conn:
+                conn.executemany('''
+                    INSERT INTO tasks (timestamp, task_type, agent, input, output, status, duration_ms)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', task_rows)
+                conn.executemany('''
+                    INSERT INTO discoveries (timestamp, agent, category, title, content, confidence, verified)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', discovery_rows)
+        finally:
+            conn.close()
+
+    def _log_task(self, task_type: str, agent: str, input_data: Dict,
+                  output_data: Dict, duration: float):
+        """Log task to database"""
+        self._write_rows([self._task_row(task_type, agent, input_data, output_data, duration)], [])
+
+    def save_discovery(self, agent: str, category: str, title: str,
+                       content: str, confidence: float = 0.5, verified: bool = False):
+        """Save a discovery to database"""
+        self._write_rows([], [self._discovery_row(agent, category, title, content,
+                                                  confidence, verified)])
+
+    def _task_dependencies(self, tasks: List[Dict]) -> List[List[int]]:
+        """
+        Predecessor indices of each planned task from its optional depends_on.
+
+        depends_on may hold task indices or the "id" of another task;
+        unknown and self references are dropped, and anything else (lists,
+        dicts, booleans from a malformed plan) is logged and skipped. If the
+        result has a cycle the plan falls back to strict sequential order.
+        """
+        ids = {t.get("id"): i for i, t in enumerate(tasks)
+               if isinstance(t.get("id"), (str, int)) and not isinstance(t.get("id"), bool)}
+        deps = []
+        for i, task in enumerate(tasks):
+            raw = task.get("depends_on") or []
+            if not isinstance(raw, list):
+                raw = [raw]
+            preds = set()
+            for ref in raw:
+                if not isinstance(ref, (str, int)) or isinstance(ref, bool):
+                    self.log(f"Task {i+1}: ignoring invalid depends_on entry {ref!r}", "WARNING")
+                    continue
+                j = ids.get(ref, ref)
+                if isinstance(j, int) and 0 <= j < len(tasks) and j != i:
+                    preds.add(j)
+            deps.append(sorted(preds))
+
+        # Kahn's algorithm: every task must be reachable in topological order
+        indegree = [len(p) for p in deps]
+        children = [[] for _ in tasks]
+        for i, preds in enumerate(deps):
+            for j in preds:
+                children[j].append(i)
+        ready = [i for i, d in enumerate(indegree) if d == 0]
+        seen = 0
+        while ready:
+            j = ready.pop()
+            seen += 1
+            for i in children[j]:
+                indegree[i] -= 1
+                if indegree[i] == 0:
+                    ready.append(i)
+        if seen != len(tasks):
+            return [[i - 1] if i else [] for i in range(len(tasks))]
+        return deps
 
     async def execute_goal(self, goal: str) -> Dict:
         """Execute a complete goal from planning to synthesis"""
@@ -270,25 +325,44 @@ Return ONLY valid JSON."""
 
         # Plan tasks
         tasks = await self.plan_task(goal)
-        self.log(f"Planned {len(tasks)} tasks")
-
-        # Execute tasks
-        results = []
-        for i, task in enumerate(tasks):
-            self.log(f"Executing task {i+1}/{len(tasks)}: {task.get('type')}")
-            result = await self.dispatch_task(task)
-            results.append(result)
+        deps = self._task_dependencies(tasks)
+        self.log(f"Planned {len(tasks)} tasks "
+                 f"({sum(1 for d in deps if not d)} without dependencies)")
+
+        # Run the dependency DAG, at most max_concurrent_agents tasks at once
+        limit = asyncio.Semaphore(self.config.get('daemon', {}).get('max_concurrent_agents', 3))
+        task_rows: List[Tuple] = []
+        discovery_rows: List[Tuple] = []
+        running: List[asyncio.Task] = []
+
+        async def run(i: int, task: Dict) -> Dict:
+            if deps[i]:
+                await asyncio.gather(*(running[j] for j in deps[i]))
+            async with limit:
+                self.log(f"Executing task {i+1}/{len(tasks)}: {task.get('type')}")
+                result = await self.dispatch_task(task, task_rows)
 
             # Check for discoveries in result
             if isinstance(result.get('result'), dict):
                 if result['result'].get('type') == 'discovery':
-                    self.save_discovery(
+                    discovery_rows.append(self._discovery_row(
                         agent=task.get('agent'),
                         category=result['result'].get('category', 'general'),
                         title=result['result'].get('title', 'Untitled'),
                         content=json.dumps(result['result']),
                         confidence=result['result'].get('confidence', 0.5)
-                    )
+                    ))
+            return result
+
+        for i, task in enumerate(tasks):
+            running.append(asyncio.ensure_future(run(i, task)))
+        try:
+            results = list(await asyncio.gather(*running))
+        finally:
+            for t in running:
+                t.cancel()
+            # One transaction for everything this goal produced
+            self._write_rows(task_rows, discovery_rows)
 
         # Synthesize results
         synthesis = await self.synthesize_results(goal, results)
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 """
 Bitcoin Puzzle Search Engine - High-Performance Key Discovery
-Uses coincurve for fast secp256k1 operations with multiprocessing
+Uses utils/secp256k1 (coincurve when installed) with multiprocessing
 """
+import bisect
 import hashlib
 import sqlite3
 import json
@@ -10,62 +11,21 @@ import os
 import time
 import multiprocessing as mp
 from multiprocessing import Process, Queue, Value, Manager
-from typing import Dict, List, Optional, Tuple, Callable
+from typing import Dict, Iterable, List, Optional, Tuple, Callable
 from datetime import datetime
 from dataclasses import dataclass
 from enum import Enum
 
-from coincurve import PrivateKey
+from utils.keystore import get_keystore
+from utils.point_walk import walk_points, N as SECP256K1_N
+from utils.secp256k1 import (address_to_hash160, hash160, hash160_to_address,
+                             privkey_to_pubkey_bytes as private_key_to_public_key,
+                             privkey_to_wif as private_key_to_wif)
 
-# Bitcoin address utilities
-def private_key_to_public_key(private_key: int, compressed: bool = True) -> bytes:
-    """Convert private key integer to public key bytes"""
-    pk_bytes = private_key.to_bytes(32, 'big')
-    return PrivateKey(pk_bytes).public_key.format(compressed=compressed)
 
 def public_key_to_address(public_key: bytes) -> str:
-    """Convert public key to Bitcoin address (P2PKH)"""
-    sha256_hash = hashlib.sha256(public_key).digest()
-    ripemd160 = hashlib.new('ripemd160')
-    ripemd160.update(sha256_hash)
-    hash160 = ripemd160.digest()
-
-    # Add version byte (0x00 for mainnet)
-    versioned = b'\x00' + hash160
-
-    # Double SHA256 for checksum
-    checksum = hashlib.sha256(hashlib.sha256(versioned).digest()).digest()[:4]
-
-    # Base58 encode
-    return base58_encode(versioned + checksum)
-
-def base58_encode(data: bytes) -> str:
-    """Base58 encoding for Bitcoin addresses"""
-    alphabet = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
-    n = int.from_bytes(data, 'big')
-    result = ''
-    while n > 0:
-        n, remainder = divmod(n, 58)
-        result = alphabet[remainder] + result
-
-    # Add leading '1's for leading zero bytes
-    for byte in data:
-        if byte == 0:
-            result = '1' + result
-        else:
-            break
-
-    return result
-
-def private_key_to_wif(private_key: int, compressed: bool = True) -> str:
-    """Convert private key to WIF format"""
-    pk_bytes = private_key.to_bytes(32, 'big')
-    if compressed:
-        extended = b'\x80' + pk_bytes + b'\x01'
-    else:
-        extended = b'\x80' + pk_bytes
-    checksum = hashlib.sha256(hashlib.sha256(extended).digest()).digest()[:4]
-    return base58_encode(extended + checksum)
+    """Convert public key bytes to a P2PKH Bitcoin address"""
+    return hash160_to_address(hash160(public_key))
 
 
 class SearchStrategy(Enum):
@@ -95,74 +55,107 @@ class SearchTask:
     end_key: int
     target_address: str
     task_id: int
+    target_hash160: Optional[bytes] = None
+    check_uncompressed: bool = False
+
+    def __post_init__(self):
+        # Decode once at task setup; the hot loop compares raw digests
+        if self.target_hash160 is None:
+            self.target_hash160 = address_to_hash160(self.target_address)
+
+
+# Dynamic chunk sizing for the process pool: each worker grows or shrinks
+# its next chunk so that one chunk takes roughly TARGET_CHUNK_SECONDS.
+MIN_CHUNK_KEYS = 1_000
+MAX_CHUNK_KEYS = 50_000_000
+TARGET_CHUNK_SECONDS = 2.0
+
+# How often (in keys) a worker polls the shared stop event
+STOP_POLL_INTERVAL = 4096
 
 
 class SearchWorker:
     """Worker process for parallel key search"""
 
-    def __init__(self, worker_id: int, result_queue: Queue, status_dict: dict):
+    def __init__(self, worker_id: int, result_queue: Queue, status_dict: dict, stop_event=None):
         self.worker_id = worker_id
         self.result_queue = result_queue
         self.status_dict = status_dict
+        self.stop_event = stop_event
         self.running = True
 
+    def _should_stop(self, keys_checked: int) -> bool:
+        """Check the local flag and, periodically, the shared stop event"""
+        if not self.running:
+            return True
+        if self.stop_event is not None and keys_checked % STOP_POLL_INTERVAL == 0:
+            return self.stop_event.is_set()
+        return False
+
     def search_range(self, task: SearchTask) -> SearchResult:
         """Search a range of keys for target address"""
         start_time = time.time()
         keys_checked = 0
-
-        for key in range(task.start_key, task.end_key + 1):
-            if not self.running:
+        target = task.target_hash160
+        check_uncompressed = task.check_uncompressed
+        sha256 = hashlib.sha256
+        new_hash = hashlib.new
+
+        # Walk P, P+G, P+2G, ... with one point addition per key
+        count = task.end_key - task.start_key + 1
+        key = task.start_key - 1
+
+        for x, y in walk_points(task.start_key, count):
+            key += 1
+            if self._should_stop(keys_checked):
                 break
 
-            try:
-                # Generate address from private key
-                pub_key = private_key_to_public_key(key, compressed=True)
-                address = public_key_to_address(pub_key)
-                keys_checked += 1
-
-                # Update status every 10000 keys
-                if keys_checked % 10000 == 0:
-                    self.status_dict[self.worker_id] = {
-                        'current_key': key,
-                        'keys_checked': keys_checked,
-                        'keys_per_sec': keys_checked / (time.time() - start_time + 0.001)
-                    }
-
-                # Check if we found it
-                if address == task.target_address:
-                    elapsed = time.time() - start_time
-                    return SearchResult(
-                        found=True,
-                        private_key=key,
-                        public_key=pub_key.hex(),
-                        address=address,
-                        wif=private_key_to_wif(key),
-                        keys_checked=keys_checked,
-                        time_elapsed=elapsed,
-                        keys_per_second=keys_checked / elapsed if elapsed > 0 else 0
-                    )
-
-                # Also check uncompressed address
-                pub_key_uncompressed = private_key_to_public_key(key, compressed=False)
-                address_uncompressed = public_key_to_address(pub_key_uncompressed)
-
-                if address_uncompressed == task.target_address:
-                    elapsed = time.time() - start_time
-                    return SearchResult(
-                        found=True,
-                        private_key=key,
-                        public_key=pub_key_uncompressed.hex(),
-                        address=address_uncompressed,
-                        wif=private_key_to_wif(key, compressed=False),
-                        keys_checked=keys_checked,
-                        time_elapsed=elapsed,
-                        keys_per_second=keys_checked / elapsed if elapsed > 0 else 0
-                    )
-
-            except Exception as e:
+            # hash160 of the compressed public key, compared as raw bytes
+            x_bytes = x.to_bytes(32, 'big')
+            pub_key = (b'\x03' if y & 1 else b'\x02') + x_bytes
+            keys_checked += 1
+
+            # Update status every 10000 keys
+            if keys_checked % 10000 == 0:
+                self.status_dict[self.worker_id] = {
+                    'current_key': key,
+                    'keys_checked': keys_checked,
+                    'keys_per_sec': keys_checked / (time.time() - start_time + 0.001)
+                }
+
+            # Check if we found it
+            if new_hash('ripemd160', sha256(pub_key).digest()).digest() == target:
+                elapsed = time.time() - start_time
+                return SearchResult(
+                    found=True,
+                    private_key=key,
+                    public_key=pub_key.hex(),
+                    address=public_key_to_address(pub_key),
+                    wif=private_key_to_wif(key),
+                    keys_checked=keys_checked,
+                    time_elapsed=elapsed,
+                    keys_per_second=keys_checked / elapsed if elapsed > 0 else 0
+                )
+
+            # Uncompressed keys are opt-in: every puzzle address is compressed
+            if not check_uncompressed:
                 continue
 
+            pub_key_uncompressed = b'\x04' + x_bytes + y.to_bytes(32, 'big')
+
+            if new_hash('ripemd160', sha256(pub_key_uncompressed).digest()).digest() == target:
+                elapsed = time.time() - start_time
+                return SearchResult(
+                    found=True,
+                    private_key=key,
+                    public_key=pub_key_uncompressed.hex(),
+                    address=public_key_to_address(pub_key_uncompressed),
+                    wif=private_key_to_wif(key, compressed=False),
+                    keys_checked=keys_checked,
+                    time_elapsed=elapsed,
+                    keys_per_second=keys_checked / elapsed if elapsed > 0 else 0
+                )
+
         elapsed = time.time() - start_time
         return SearchResult(
             found=False,
@@ -172,6 +165,271 @@ class SearchWorker:
         )
 
 
+class GapCursor:
+    """
+    Hands out chunks of the uncovered intervals from a shared cursor.
+
+    The cursor holds the next key to hand out; when it runs past the end of
+    one gap it moves to the start of the next. Near the end of the work the
+    chunk is capped to a fraction of what is left so the tail is spread over
+    all workers instead of one straggler.
+    """
+
+    def __init__(self, gaps: List[Tuple[int, int]], cursor, lock):
+        self.gaps = gaps
+        self.starts = [lo for lo, _ in gaps]
+        # suffix[i] = keys in gaps[i:]
+        self.suffix = [0] * (len(gaps) + 1)
+        for i in range(len(gaps) - 1, -1, -1):
+            self.suffix[i] = self.suffix[i + 1] + gaps[i][1] - gaps[i][0] + 1
+        self.cursor = cursor
+        self.lock = lock
+
+    def claim(self, chunk_size: int, num_workers: int) -> Optional[Tuple[int, int]]:
+        """Claim the next chunk [start, end], or None when all gaps are handed out"""
+        with self.lock:
+            start = self.cursor.value
+            i = bisect.bisect_right(self.starts, start) - 1
+            if i < 0 or start > self.gaps[i][1]:
+                i += 1
+                if i >= len(self.gaps):
+                    return None
+                start = self.gaps[i][0]
+            hi = self.gaps[i][1]
+            remaining = hi - start + 1 + self.suffix[i + 1]
+            size = min(chunk_size, max(MIN_CHUNK_KEYS, remaining // (2 * num_workers)))
+            end = min(start + size - 1, hi)
+            self.cursor.value = end + 1
+        return start, end
+
+
+def _search_worker_main(worker_id: int, target_address: str, target_hash160: bytes,
+                        check_uncompressed: bool, gap_cursor: GapCursor, num_workers: int,
+                        stop_event, result_queue: Queue, status_dict: dict):
+    """
+    Process-pool worker loop.
+
+    Pulls chunks from the shared gap cursor until the work is exhausted or
+    the stop event is set, and reports every chunk back on result_queue:
+        ('chunk', worker_id, start, end, keys_checked, elapsed)
+        ('found', worker_id, start, found_key, SearchResult)
+        ('exit', worker_id)
+    A chunk interrupted by the stop event is reported with end set to the
+    last key actually checked, so coverage never claims unchecked keys.
+    """
+    worker = SearchWorker(worker_id, result_queue, status_dict, stop_event)
+    chunk_size = MIN_CHUNK_KEYS
+    total_checked = 0
+    started = time.time()
+
+    try:
+        while not stop_event.is_set():
+            claimed = gap_cursor.claim(chunk_size, num_workers)
+            if claimed is None:
+                break
+            start, end = claimed
+
+            result = worker.search_range(SearchTask(
+                start_key=start,
+                end_key=end,
+                target_address=target_address,
+                task_id=worker_id,
+                target_hash160=target_hash160,
+                check_uncompressed=check_uncompressed
+            ))
+            total_checked += result.keys_checked
+
+            if result.found:
+                stop_event.set()
+                result_queue.put(('found', worker_id, start, result.private_key, result))
+                break
+
+            result_queue.put(('chunk', worker_id, start, start + result.keys_checked - 1,
+                              result.keys_checked, result.time_elapsed))
+            status_dict[worker_id] = {
+                'current_key': start + result.keys_checked - 1,
+                'keys_checked': total_checked,
+                'keys_per_sec': total_checked / (time.time() - started + 0.001),
+                'chunk_size': chunk_size
+            }
+
+            # Resize the next chunk from this worker's measured throughput
+            if result.keys_per_second > 0:
+                chunk_size = int(result.keys_per_second * TARGET_CHUNK_SECONDS)
+                chunk_size = max(MIN_CHUNK_KEYS, min(MAX_CHUNK_KEYS, chunk_size))
+    except KeyboardInterrupt:
+        stop_event.set()
+    finally:
+        result_queue.put(('exit', worker_id))
+
+
+class CoverageTracker:
+    """
+    Tracks completed chunks and the contiguous low-water mark.
+
+    Chunks finish out of order in the process pool; the low-water mark is
+    the first key not yet known to be searched, i.e. every key below it has
+    been checked. When searching several gaps, reaching the end of one gap
+    moves the mark to the start of the next.
+    """
+
+    def __init__(self, gaps: List[Tuple[int, int]]):
+        self.low_water = gaps[0][0] if gaps else 0
+        self.pending: Dict[int, int] = {}  # chunk start -> chunk end
+        self.jumps = {hi + 1: nxt[0] for (_, hi), nxt in zip(gaps, gaps[1:])}
+        self.keys_covered = 0
+
+    def add(self, start: int, end: int) -> int:
+        """Record [start, end] as searched and return the new low-water mark"""
+        if end < start:
+            return self.low_water
+        self.keys_covered += end - start + 1
+        self.pending[start] = end
+        while True:
+            if self.low_water in self.pending:
+                self.low_water = self.pending.pop(self.low_water) + 1
+            elif self.low_water in self.jumps:
+                self.low_water = self.jumps.pop(self.low_water)
+            else:
+                break
+        return self.low_water
+
+
+def merge_intervals(intervals: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merge overlapping or adjacent [lo, hi] intervals"""
+    merged: List[List[int]] = []
+    for lo, hi in sorted(intervals):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return [(lo, hi) for lo, hi in merged]
+
+
+def subtract_intervals(low: int, high: int,
+                       covered: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Gaps of [low, high] not covered by the merged, sorted intervals"""
+    gaps = []
+    position = low
+    for lo, hi in covered:
+        if hi < position:
+            continue
+        if lo > high:
+            break
+        if lo > position:
+            gaps.append((position, lo - 1))
+        position = max(position, hi + 1)
+    if position <= high:
+        gaps.append((position, high))
+    return gaps
+
+
+class ChunkLedger:
+    """
+    Gap-free journal of searched intervals for one puzzle.
+
+    Every finished (or partially finished) chunk is appended to the
+    search_chunks table with its worker and keys/sec. Writes are buffered
+    and committed in batches on a WAL-mode connection. A chunk that was
+    claimed but never reported is simply absent, so a crash loses nothing:
+    on restart the ledger is compacted (intervals merged) and the search
+    resumes exactly the uncovered gaps.
+    """
+
+    # Zero-padded hex keeps TEXT order equal to numeric order up to 2^192
+    KEY_DIGITS = 48
+
+    def __init__(self, db_path: str, puzzle_id: int, flush_every: int = 256,
+                 flush_seconds: float = 5.0):
+        self.puzzle_id = puzzle_id
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.buffer: List[Tuple] = []
+        self.last_flush = time.time()
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+
+    def _key(self, value: int) -> str:
+        return format(value, f'0{self.KEY_DIGITS}x')
+
+    def record(self, start: int, end: int, worker_id, keys_per_second: float = 0.0,
+               status: str = 'done'):
+        """Buffer [start, end] as searched; commits every flush_every chunks / flush_seconds"""
+        if end < start:
+            return
+        self.buffer.append((self.puzzle_id, self._key(start), self._key(end), status,
+                            str(worker_id), end - start + 1, keys_per_second,
+                            datetime.now().isoformat()))
+        if len(self.buffer) >= self.flush_every or time.time() - self.last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """Commit buffered chunks in one transaction"""
+        if self.buffer:
+            with self.conn:
+                self.conn.executemany(
+                    '''INSERT INTO search_chunks (puzzle_id, range_low, range_high, status,
+                       worker_id, keys_checked, keys_per_second, recorded_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', self.buffer)
+            self.buffer = []
+        self.last_flush = time.time()
+
+    def intervals(self) -> List[Tuple[int, int]]:
+        """Merged searched intervals, including anything still buffered"""
+        rows = self.conn.execute(
+            'SELECT range_low, range_high FROM search_chunks WHERE puzzle_id = ?',
+            (self.puzzle_id,)).fetchall()
+        pending = [(row[1], row[2]) for row in self.buffer]
+        return merge_intervals((int(lo, 16), int(hi, 16)) for lo, hi in rows + pending)
+
+    def compact(self) -> List[Tuple[int, int]]:
+        """Replace the journal rows with their merged intervals"""
+        self.flush()
+        rows = self.conn.execute(
+            '''SELECT range_low, range_high, keys_checked, keys_per_second
+               FROM search_chunks WHERE puzzle_id = ?''', (self.puzzle_id,)).fetchall()
+        merged = merge_intervals((int(lo, 16), int(hi, 16)) for lo, hi, _, _ in rows)
+        if len(merged) < len(rows):
+            now = datetime.now().isoformat()
+            with self.conn:
+                self.conn.execute('DELETE FROM search_chunks WHERE puzzle_id = ?', (self.puzzle_id,))
+                self.conn.executemany(
+                    '''INSERT INTO search_chunks (puzzle_id, range_low, range_high, status,
+                       worker_id, keys_checked, keys_per_second, recorded_at)
+                       VALUES (?, ?, ?, 'done', 'merged', ?, NULL, ?)''',
+                    [(self.puzzle_id, self._key(lo), self._key(hi), hi - lo + 1, now)
+                     for lo, hi in merged])
+        return merged
+
+    def uncovered(self, low: int, high: int) -> List[Tuple[int, int]]:
+        """Gaps of [low, high] not yet searched"""
+        return subtract_intervals(low, high, self.intervals())
+
+    def coverage(self, low: int, high: int) -> Tuple[int, float]:
+        """(keys searched, percent of [low, high] searched)"""
+        total = high - low + 1
+        gaps = self.uncovered(low, high)
+        covered = total - sum(hi - lo + 1 for lo, hi in gaps)
+        return covered, 100.0 * covered / total if total else 100.0
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def take_keys(gaps: List[Tuple[int, int]], max_keys: int) -> List[Tuple[int, int]]:
+    """First max_keys keys of the gaps"""
+    taken = []
+    for lo, hi in gaps:
+        if max_keys <= 0:
+            break
+        hi = min(hi, lo + max_keys - 1)
+        taken.append((lo, hi))
+        max_keys -= hi - lo + 1
+    return taken
+
+
 class BitcoinPuzzleSearchEngine:
     """
     High-performance Bitcoin puzzle search engine with multiprocessing
@@ -221,46 +479,36 @@ class BitcoinPuzzleSearchEngine:
             strategy TEXT,
             result TEXT
         )''')
+        c.execute('''CREATE TABLE IF NOT EXISTS search_chunks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            puzzle_id INTEGER,
+            range_low TEXT,
+            range_high TEXT,
+            status TEXT,
+            worker_id TEXT,
+            keys_checked INTEGER,
+            keys_per_second REAL,
+            recorded_at TEXT
+        )''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_search_chunks_puzzle
+                     ON search_chunks (puzzle_id, range_low)''')
         conn.commit()
         conn.close()
 
     def _load_known_puzzles(self) -> Dict:
-        """Load known puzzle data from CSV and database"""
+        """Load known puzzle addresses and keys from the KeyStore"""
         puzzles = {}
 
-        # Load from CSV file (primary source)
-        csv_path = "/home/solo/LA/data/btc_puzzle_1_160_full.csv"
+        # CSV, kh.db and puzzle config merged by the shared KeyStore
         try:
-            import csv
-            with open(csv_path, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    puzzle_num = int(row['puzzle'])
-                    key_hex = row.get('key_hex', '')
-                    key_decimal = int(key_hex, 16) if key_hex and key_hex != '' else None
-                    puzzles[puzzle_num] = {
-                        'address': row['address'].split('#')[0].strip(),  # Remove comments
-                        'known_key': key_decimal
-                    }
+            store = get_keystore()
+            for puzzle_num, address in store.addresses.items():
+                puzzles[puzzle_num] = {
+                    'address': address,
+                    'known_key': store.get(puzzle_num)
+                }
         except Exception as e:
-            print(f"Warning: Could not load CSV: {e}")
-
-        # Fallback to database
-        if not puzzles:
-            try:
-                conn = sqlite3.connect("/home/solo/LA/db/kh.db")
-                c = conn.cursor()
-                c.execute("SELECT id, address FROM puzzles WHERE address IS NOT NULL")
-                for row in c.fetchall():
-                    addr = row[1].split('#')[0].strip() if row[1] else None
-                    if addr:
-                        puzzles[row[0]] = {
-                            'address': addr,
-                            'known_key': None
-                        }
-                conn.close()
-            except:
-                pass
+            print(f"Warning: Could not load KeyStore: {e}")
 
         # Ensure puzzle 71 is present (next unsolved)
         if 71 not in puzzles:
@@ -278,7 +526,8 @@ class BitcoinPuzzleSearchEngine:
         return (low, high)
 
     def search_puzzle(self, puzzle_num: int, strategy: SearchStrategy = SearchStrategy.SEQUENTIAL,
-                      max_keys: int = None, checkpoint_interval: int = 1000000) -> SearchResult:
+                      max_keys: int = None, checkpoint_interval: int = 1000000,
+                      parallel: bool = None, check_uncompressed: bool = None) -> SearchResult:
         """
         Search for a puzzle solution
 
@@ -287,82 +536,371 @@ class BitcoinPuzzleSearchEngine:
             strategy: Search strategy to use
             max_keys: Maximum number of keys to check (None = unlimited)
             checkpoint_interval: How often to save progress
+            parallel: Run a process pool (default: when num_workers > 1)
+            check_uncompressed: Also test uncompressed keys (default: the
+                puzzle's 'check_uncompressed' flag, normally off since all
+                puzzle addresses are compressed)
         """
         if puzzle_num not in self.known_puzzles:
             return SearchResult(found=False, keys_checked=0)
 
         target_address = self.known_puzzles[puzzle_num]['address']
+        target_hash160 = address_to_hash160(target_address)
         range_low, range_high = self.get_puzzle_range(puzzle_num)
 
-        # Get starting position from database or start fresh
-        start_pos = self._get_search_position(puzzle_num) or range_low
+        if check_uncompressed is None:
+            check_uncompressed = self.known_puzzles[puzzle_num].get('check_uncompressed', False)
+
+        # Resume exactly the intervals the chunk ledger has not covered
+        ledger = self._open_ledger(puzzle_num, range_low)
+        gaps = ledger.uncovered(range_low, range_high)
+        covered, percent = ledger.coverage(range_low, range_high)
+        if max_keys:
+            gaps = take_keys(gaps, max_keys)
+
+        if parallel is None:
+            parallel = self.num_workers > 1
 
         print(f"\n{'='*60}")
         print(f"SEARCH ENGINE: Puzzle {puzzle_num}")
         print(f"{'='*60}")
-        print(f"Target: {target_address}")
+        print(f"Target: {target_address} (hash160 {target_hash160.hex()})")
         print(f"Range: [{range_low:,}, {range_high:,}]")
         print(f"Search space: {range_high - range_low + 1:,} keys")
-        print(f"Starting at: {start_pos:,}")
+        print(f"Coverage: {covered:,} keys ({percent:.6f}%)")
+        if gaps:
+            print(f"Resuming: {len(gaps)} gap(s) from {gaps[0][0]:,}")
         print(f"Workers: {self.num_workers}")
+        print(f"Mode: {'process pool' if parallel else 'sequential'}")
+        print(f"Uncompressed keys: {'checked' if check_uncompressed else 'skipped'}")
         print(f"Strategy: {strategy.value}")
         print(f"{'='*60}\n")
 
+        if not gaps:
+            ledger.close()
+            print("Range fully covered - nothing left to search")
+            return SearchResult(found=False, keys_checked=0)
+
         # Record session start
-        session_start = datetime.now()
-        self._record_session_start(puzzle_num, strategy)
-
-        # Divide work among workers
-        total_keys = min(max_keys, range_high - start_pos + 1) if max_keys else (range_high - start_pos + 1)
-        chunk_size = total_keys // self.num_workers
-
-        tasks = []
-        for i in range(self.num_workers):
-            chunk_start = start_pos + (i * chunk_size)
-            chunk_end = chunk_start + chunk_size - 1 if i < self.num_workers - 1 else min(start_pos + total_keys - 1, range_high)
-            tasks.append(SearchTask(
-                start_key=chunk_start,
-                end_key=chunk_end,
-                target_address=target_address,
-                task_id=i
-            ))
+        session_id = self._record_session_start(puzzle_num, strategy)
+
+        try:
+            if parallel:
+                total_result = self._search_parallel(puzzle_num, target_address, target_hash160,
+                                                     check_uncompressed, gaps, ledger,
+                                                     checkpoint_interval)
+            else:
+                total_result = self._search_sequential(puzzle_num, target_address, target_hash160,
+                                                       check_uncompressed, gaps, ledger)
+        finally:
+            ledger.flush()
+
+        covered, percent = ledger.coverage(range_low, range_high)
+        ledger.close()
+        print(f"Coverage: {covered:,} keys ({percent:.6f}% of puzzle {puzzle_num})")
+
+        # Calculate final stats
+        if total_result.time_elapsed > 0:
+            total_result.keys_per_second = total_result.keys_checked / total_result.time_elapsed
 
-        # Run search with workers
+        # Record session end
+        self._record_session_end(session_id, total_result)
+
+        return total_result
+
+    def _open_ledger(self, puzzle_num: int, range_low: int) -> ChunkLedger:
+        """Open and compact the chunk ledger, importing a legacy position if needed"""
+        ledger = ChunkLedger(self.db_path, puzzle_num)
+        merged = ledger.compact()
+        if not merged:
+            # Searches from before the ledger only stored current_position
+            position = self._get_search_position(puzzle_num)
+            if position and position > range_low:
+                ledger.record(range_low, position - 1, 'legacy')
+                ledger.flush()
+        return ledger
+
+    def get_coverage(self, puzzle_num: int) -> Dict:
+        """Coverage of a puzzle range from the chunk ledger"""
+        range_low, range_high = self.get_puzzle_range(puzzle_num)
+        ledger = ChunkLedger(self.db_path, puzzle_num)
+        covered, percent = ledger.coverage(range_low, range_high)
+        gaps = ledger.uncovered(range_low, range_high)
+        ledger.close()
+        return {
+            'puzzle': puzzle_num,
+            'keys_covered': covered,
+            'percent': percent,
+            'gaps': len(gaps),
+            'next_key': gaps[0][0] if gaps else None
+        }
+
+    def _search_sequential(self, puzzle_num: int, target_address: str, target_hash160: bytes,
+                           check_uncompressed: bool, gaps: List[Tuple[int, int]],
+                           ledger: ChunkLedger) -> SearchResult:
+        """Run the gaps in-process, one dynamically sized chunk at a time"""
         self.running.value = True
         total_result = SearchResult(found=False, keys_checked=0, time_elapsed=0)
+        worker = SearchWorker(0, self.result_queue, self.status_dict)
+        chunk_size = MIN_CHUNK_KEYS
 
         try:
-            # For now, run sequentially (can add multiprocessing later)
-            for task in tasks:
-                if not self.running.value:
-                    break
+            for lo, hi in gaps:
+                start = lo
+                while start <= hi and self.running.value:
+                    end = min(start + chunk_size - 1, hi)
+                    result = worker.search_range(SearchTask(
+                        start_key=start,
+                        end_key=end,
+                        target_address=target_address,
+                        task_id=0,
+                        target_hash160=target_hash160,
+                        check_uncompressed=check_uncompressed
+                    ))
+
+                    total_result.keys_checked += result.keys_checked
+                    total_result.time_elapsed += result.time_elapsed
+
+                    if result.found:
+                        ledger.record(start, result.private_key, 0, result.keys_per_second, 'found')
+                        result.keys_checked = total_result.keys_checked
+                        result.time_elapsed = total_result.time_elapsed
+                        self._record_solution(puzzle_num, result)
+                        return result
+
+                    ledger.record(start, start + result.keys_checked - 1, 0, result.keys_per_second)
+                    self._save_progress(puzzle_num, end + 1, total_result.keys_checked)
+                    start = end + 1
+
+                    if result.keys_per_second > 0:
+                        chunk_size = int(result.keys_per_second * TARGET_CHUNK_SECONDS)
+                        chunk_size = max(MIN_CHUNK_KEYS, min(MAX_CHUNK_KEYS, chunk_size))
 
-                worker = SearchWorker(task.task_id, self.result_queue, self.status_dict)
-                result = worker.search_range(task)
+        except KeyboardInterrupt:
+            print("\nSearch interrupted by user")
+            self.running.value = False
+
+        return total_result
+
+    def _search_parallel(self, puzzle_num: int, target_address: str, target_hash160: bytes,
+                         check_uncompressed: bool, gaps: List[Tuple[int, int]],
+                         ledger: ChunkLedger, checkpoint_interval: int) -> SearchResult:
+        """
+        Run the gaps across a pool of worker processes.
 
-                total_result.keys_checked += result.keys_checked
-                total_result.time_elapsed += result.time_elapsed
+        Workers pull dynamically sized chunks from a shared gap cursor and
+        report through result_queue / status_dict. The first hit sets the
+        shared stop event, which cancels every other worker. Every reported
+        chunk goes to the ledger; search_progress keeps the contiguous
+        low-water mark for status displays.
+        """
+        gap_cursor = GapCursor(gaps, self.manager.Value('cursor', gaps[0][0]), mp.Lock())
+        stop_event = mp.Event()
+        self.status_dict.clear()
+        self.running.value = True
 
-                if result.found:
-                    total_result = result
+        # Drop any messages left over from a previous interrupted search
+        while not self.result_queue.empty():
+            try:
+                self.result_queue.get_nowait()
+            except Exception:
+                break
+
+        self.workers = [
+            Process(target=_search_worker_main,
+                    args=(i, target_address, target_hash160, check_uncompressed, gap_cursor,
+                          self.num_workers, stop_event, self.result_queue, self.status_dict),
+                    daemon=True)
+            for i in range(self.num_workers)
+        ]
+
+        coverage = CoverageTracker(gaps)
+        last_checkpoint = 0
+        found_result: Optional[SearchResult] = None
+        active = len(self.workers)
+        start_time = time.time()
+
+        def handle(message) -> int:
+            """Apply one worker message; returns 1 if a worker exited"""
+            nonlocal found_result
+            kind = message[0]
+            if kind == 'exit':
+                return 1
+            if kind == 'chunk':
+                _, worker_id, chunk_start, chunk_end, keys, elapsed = message
+                coverage.add(chunk_start, chunk_end)
+                ledger.record(chunk_start, chunk_end, worker_id, keys / elapsed if elapsed > 0 else 0)
+            elif kind == 'found':
+                _, worker_id, chunk_start, found_key, result = message
+                coverage.add(chunk_start, found_key)
+                ledger.record(chunk_start, found_key, worker_id, result.keys_per_second, 'found')
+                if found_result is None:
+                    found_result = result
+                    ledger.flush()
                     self._record_solution(puzzle_num, result)
-                    break
+            return 0
 
-                # Checkpoint
-                self._save_progress(puzzle_num, task.end_key, total_result.keys_checked)
+        for worker in self.workers:
+            worker.start()
+
+        try:
+            while active > 0:
+                try:
+                    message = self.result_queue.get(timeout=0.5)
+                except Exception:
+                    # Guard against workers that died without reporting
+                    if not any(w.is_alive() for w in self.workers):
+                        break
+                    continue
+
+                active -= handle(message)
+                # After a hit the solved row must not be overwritten by progress
+                if found_result is None and \
+                        coverage.keys_covered - last_checkpoint >= checkpoint_interval:
+                    self._save_progress(puzzle_num, coverage.low_water, coverage.keys_covered)
+                    last_checkpoint = coverage.keys_covered
 
         except KeyboardInterrupt:
             print("\nSearch interrupted by user")
+            stop_event.set()
             self.running.value = False
+            # Collect the partial chunks reported by the cancelled workers
+            deadline = time.time() + 5
+            while active > 0 and time.time() < deadline:
+                try:
+                    active -= handle(self.result_queue.get(timeout=0.5))
+                except Exception:
+                    continue
+
+        finally:
+            stop_event.set()
+            for worker in self.workers:
+                worker.join(timeout=5)
+                if worker.is_alive():
+                    worker.terminate()
+            self.workers = []
+            ledger.flush()
 
-        # Calculate final stats
-        if total_result.time_elapsed > 0:
-            total_result.keys_per_second = total_result.keys_checked / total_result.time_elapsed
+        elapsed = time.time() - start_time
 
-        # Record session end
-        self._record_session_end(puzzle_num, total_result)
+        if found_result is None:
+            self._save_progress(puzzle_num, coverage.low_water, coverage.keys_covered)
+            return SearchResult(found=False, keys_checked=coverage.keys_covered,
+                                time_elapsed=elapsed)
 
-        return total_result
+        found_result.keys_checked = coverage.keys_covered
+        found_result.time_elapsed = elapsed
+        return found_result
+
+    def build_target_index(self, puzzles: Iterable[int] = None) -> Dict[bytes, int]:
+        """
+        Build the multi-target lookup: hash160 -> puzzle number.
+
+        Defaults to every puzzle without a known key. A dict gives O(1)
+        membership for one derived key against all targets at once.
+        """
+        if puzzles is None:
+            puzzles = [n for n, info in self.known_puzzles.items() if info.get('known_key') is None]
+
+        targets = {}
+        for n in puzzles:
+            info = self.known_puzzles.get(n)
+            if not info or not info.get('address'):
+                continue
+            try:
+                targets[address_to_hash160(info['address'])] = n
+            except ValueError as e:
+                print(f"Warning: skipping puzzle {n}: {e}")
+        return targets
+
+    def _multi_target_hit(self, puzzle_num: int, key: int, pub_key: bytes, compressed: bool,
+                          keys_checked: int, start_time: float) -> SearchResult:
+        """Build and record the result for a multi-target hit"""
+        elapsed = time.time() - start_time
+        result = SearchResult(
+            found=True,
+            private_key=key,
+            public_key=pub_key.hex(),
+            address=public_key_to_address(pub_key),
+            wif=private_key_to_wif(key, compressed=compressed),
+            keys_checked=keys_checked,
+            time_elapsed=elapsed,
+            keys_per_second=keys_checked / elapsed if elapsed > 0 else 0
+        )
+        self._record_solution(puzzle_num, result)
+        return result
+
+    def search_candidates(self, candidates: Iterable[int], targets: Dict[bytes, int] = None,
+                          check_uncompressed: bool = False,
+                          max_keys: int = None) -> Dict[int, SearchResult]:
+        """
+        Check arbitrary candidate keys against all targets at once.
+
+        Each candidate is derived once and looked up in the target index,
+        so formula-derived candidates for puzzles 71-160 can be swept
+        together instead of re-deriving keys per puzzle.
+
+        Returns:
+            {puzzle_num: SearchResult} for every target hit
+        """
+        targets = targets if targets is not None else self.build_target_index()
+        sha256 = hashlib.sha256
+        new_hash = hashlib.new
+        hits = {}
+        keys_checked = 0
+        start_time = time.time()
+
+        for key in candidates:
+            if max_keys is not None and keys_checked >= max_keys:
+                break
+            if not 0 < key < SECP256K1_N:
+                continue
+            keys_checked += 1
+
+            pub_key = private_key_to_public_key(key, compressed=True)
+            puzzle_num = targets.get(new_hash('ripemd160', sha256(pub_key).digest()).digest())
+            if puzzle_num is not None and puzzle_num not in hits:
+                hits[puzzle_num] = self._multi_target_hit(puzzle_num, key, pub_key, True,
+                                                          keys_checked, start_time)
+
+            if check_uncompressed:
+                pub_key = private_key_to_public_key(key, compressed=False)
+                puzzle_num = targets.get(new_hash('ripemd160', sha256(pub_key).digest()).digest())
+                if puzzle_num is not None and puzzle_num not in hits:
+                    hits[puzzle_num] = self._multi_target_hit(puzzle_num, key, pub_key, False,
+                                                              keys_checked, start_time)
+
+        elapsed = time.time() - start_time
+        print(f"Multi-target sweep: {keys_checked:,} candidates x {len(targets)} targets "
+              f"in {elapsed:.2f}s, {len(hits)} hit(s)")
+        return hits
+
+    def search_progression(self, start: int, count: int, stride: int = 1,
+                           targets: Dict[bytes, int] = None) -> Dict[int, SearchResult]:
+        """
+        Multi-target sweep of the progression start + i*stride, i < count.
+
+        Same as search_candidates but derives keys with the incremental
+        point walk, which suits candidates such as BASE - m*k[d].
+        """
+        targets = targets if targets is not None else self.build_target_index()
+        hits = {}
+        start_time = time.time()
+        keys_checked = 0
+
+        for i, (x, y) in enumerate(walk_points(start, count, stride)):
+            keys_checked = i + 1
+            pub_key = (b'\x03' if y & 1 else b'\x02') + x.to_bytes(32, 'big')
+            puzzle_num = targets.get(hashlib.new('ripemd160', hashlib.sha256(pub_key).digest()).digest())
+            if puzzle_num is not None and puzzle_num not in hits:
+                key = (start + i * stride) % SECP256K1_N
+                hits[puzzle_num] = self._multi_target_hit(puzzle_num, key, pub_key, True,
+                                                          keys_checked, start_time)
+
+        elapsed = time.time() - start_time
+        print(f"Multi-target walk: {keys_checked:,} keys x {len(targets)} targets "
+              f"in {elapsed:.2f}s, {len(hits)} hit(s)")
+        return hits
 
     def _get_search_position(self, puzzle_num: int) -> Optional[int]:
         """Get last search position from database"""
@@ -374,45 +912,58 @@ class BitcoinPuzzleSearchEngine:
         return int(row[0]) if row and row[0] else None
 
     def _save_progress(self, puzzle_num: int, position: int, keys_searched: int):
-        """Save search progress to database"""
+        """Save search progress to database (status and solution fields are left alone)"""
         conn = sqlite3.connect(self.db_path)
         c = conn.cursor()
-        c.execute('''INSERT OR REPLACE INTO search_progress
+        c.execute('''INSERT INTO search_progress
                      (puzzle_id, current_position, keys_searched, updated_at, status)
-                     VALUES (?, ?, ?, ?, ?)''',
-                  (puzzle_num, str(position), keys_searched, datetime.now().isoformat(), 'in_progress'))
+                     VALUES (?, ?, ?, ?, 'in_progress')
+                     ON CONFLICT(puzzle_id) DO UPDATE SET
+                         current_position = excluded.current_position,
+                         keys_searched = excluded.keys_searched,
+                         updated_at = excluded.updated_at''',
+                  (puzzle_num, str(position), keys_searched, datetime.now().isoformat()))
         conn.commit()
         conn.close()
 
-    def _record_session_start(self, puzzle_num: int, strategy: SearchStrategy):
-        """Record search session start"""
+    def _record_session_start(self, puzzle_num: int, strategy: SearchStrategy) -> int:
+        """Record search session start and return its id"""
         conn = sqlite3.connect(self.db_path)
         c = conn.cursor()
         c.execute('''INSERT INTO search_sessions (puzzle_id, start_time, strategy)
                      VALUES (?, ?, ?)''',
                   (puzzle_num, datetime.now().isoformat(), strategy.value))
+        session_id = c.lastrowid
         conn.commit()
         conn.close()
+        return session_id
 
-    def _record_session_end(self, puzzle_num: int, result: SearchResult):
+    def _record_session_end(self, session_id: int, result: SearchResult):
         """Record search session end"""
         conn = sqlite3.connect(self.db_path)
         c = conn.cursor()
         c.execute('''UPDATE search_sessions SET end_time = ?, keys_searched = ?,
                      keys_per_second = ?, result = ?
-                     WHERE puzzle_id = ? AND end_time IS NULL''',
+                     WHERE id = ?''',
                   (datetime.now().isoformat(), result.keys_checked,
-                   result.keys_per_second, 'found' if result.found else 'not_found', puzzle_num))
+                   result.keys_per_second, 'found' if result.found else 'not_found', session_id))
         conn.commit()
         conn.close()
 
     def _record_solution(self, puzzle_num: int, result: SearchResult):
-        """Record found solution"""
+        """Record found solution, creating the progress row if there is none yet"""
+        now = datetime.now().isoformat()
         conn = sqlite3.connect(self.db_path)
         c = conn.cursor()
-        c.execute('''UPDATE search_progress SET found_key = ?, found_at = ?, status = ?
-                     WHERE puzzle_id = ?''',
-                  (str(result.private_key), datetime.now().isoformat(), 'solved', puzzle_num))
+        c.execute('''INSERT INTO search_progress
+                     (puzzle_id, target_address, found_key, found_at, updated_at, status)
+                     VALUES (?, ?, ?, ?, ?, ?)
+                     ON CONFLICT(puzzle_id) DO UPDATE SET
+                         found_key = excluded.found_key,
+                         found_at = excluded.found_at,
+                         updated_at = excluded.updated_at,
+                         status = excluded.status''',
+                  (puzzle_num, result.address, str(result.private_key), now, now, 'solved'))
         conn.commit()
         conn.close()
 
@@ -457,21 +1008,28 @@ class BitcoinPuzzleSearchEngine:
         except:
             return False
 
-    def benchmark(self, duration_seconds: int = 10) -> Dict:
-        """Benchmark search speed"""
+    def benchmark(self, duration_seconds: int = 10, check_uncompressed: bool = False) -> Dict:
+        """Benchmark search speed of the worker hot loop"""
         print(f"Benchmarking for {duration_seconds} seconds...")
 
         # Use puzzle 20 range for benchmarking (small enough to be fast)
         range_low, range_high = self.get_puzzle_range(20)
 
+        # A target no key will hit, so every key runs the full compare path
+        worker = SearchWorker(0, self.result_queue, {})
         start_time = time.time()
         keys_checked = 0
 
         while time.time() - start_time < duration_seconds:
-            for key in range(range_low, min(range_low + 10000, range_high)):
-                pub_key = private_key_to_public_key(key, compressed=True)
-                address = public_key_to_address(pub_key)
-                keys_checked += 1
+            result = worker.search_range(SearchTask(
+                start_key=range_low,
+                end_key=min(range_low + 9999, range_high),
+                target_address='',
+                task_id=0,
+                target_hash160=bytes(20),
+                check_uncompressed=check_uncompressed
+            ))
+            keys_checked += result.keys_checked
 
         elapsed = time.time() - start_time
         keys_per_second = keys_checked / elapsed
@@ -480,6 +1038,7 @@ class BitcoinPuzzleSearchEngine:
             'duration_seconds': elapsed,
             'keys_checked': keys_checked,
             'keys_per_second': keys_per_second,
+            'check_uncompressed': check_uncompressed,
             'estimated_puzzle_71_time_years': (2**70) / keys_per_second / 86400 / 365
         }
 
@@ -503,7 +1062,7 @@ if __name__ == "__main__":
     # Verify a known puzzle (puzzle 20)
     print("--- Verification Test ---")
     known_key_20 = 863317
-    known_addr_20 = "1HBtApAFA9B2YZw3G2YKSMCtb3dVnjuNe2"
+    known_addr_20 = "1HsMJxNiV7TLxmoF6uJNkydxPFDog4NQum"
     verified = engine.verify_key(known_key_20, known_addr_20)
     print(f"Puzzle 20 key verification: {'PASS' if verified else 'FAIL'}")
 
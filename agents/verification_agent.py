@@ -5,11 +5,11 @@ Ensures all predictions are cryptographically correct before acceptance
 """
 import json
 from log_integration import get_system_logger, get_ai_logger, get_memory_logger
-import hashlib
 import sqlite3
 import os
 from typing import Dict, Optional, Tuple
 from .base_agent import BaseAgent
+from utils.secp256k1 import encode_point, hash160, hash160_to_address, scalar_mult
 
 # Bitcoin address generation imports
 try:
@@ -34,120 +34,22 @@ class VerificationAgent(BaseAgent):
     def privkey_to_pubkey(self, privkey_hex: str) -> Tuple[str, str]:
         """
         Convert private key to public key (uncompressed and compressed)
-        Pure Python implementation - no external dependencies
+        Shared secp256k1 module (pure Python, coincurve when installed)
         """
-        # secp256k1 parameters
-        P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
-        N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
-        Gx = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
-        Gy = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
-
-        def modinv(a, m):
-            """Modular inverse using extended Euclidean algorithm"""
-            if a < 0:
-                a = a % m
-            g, x, _ = extended_gcd(a, m)
-            if g != 1:
-                raise Exception('Modular inverse does not exist')
-            return x % m
-
-        def extended_gcd(a, b):
-            if a == 0:
-                return b, 0, 1
-            gcd, x1, y1 = extended_gcd(b % a, a)
-            x = y1 - (b // a) * x1
-            y = x1
-            return gcd, x, y
-
-        def point_add(p1, p2):
-            if p1 is None:
-                return p2
-            if p2 is None:
-                return p1
-            x1, y1 = p1
-            x2, y2 = p2
-            if x1 == x2 and y1 != y2:
-                return None
-            if x1 == x2:
-                m = (3 * x1 * x1) * modinv(2 * y1, P) % P
-            else:
-                m = (y2 - y1) * modinv(x2 - x1, P) % P
-            x3 = (m * m - x1 - x2) % P
-            y3 = (m * (x1 - x3) - y1) % P
-            return (x3, y3)
-
-        def scalar_mult(k, point):
-            result = None
-            addend = point
-            while k:
-                if k & 1:
-                    result = point_add(result, addend)
-                addend = point_add(addend, addend)
-                k >>= 1
-            return result
-
         # Parse private key
         privkey = int(privkey_hex.replace("0x", ""), 16)
 
         # Compute public key point
-        pub_point = scalar_mult(privkey, (Gx, Gy))
+        pub_point = scalar_mult(privkey)
         if pub_point is None:
             raise ValueError("Invalid private key")
 
         x, y = pub_point
-
-        # Uncompressed public key (04 + x + y)
-        pubkey_uncompressed = "04" + format(x, '064x') + format(y, '064x')
-
-        # Compressed public key (02/03 + x)
-        prefix = "02" if y % 2 == 0 else "03"
-        pubkey_compressed = prefix + format(x, '064x')
-
-        return pubkey_uncompressed, pubkey_compressed
+        return encode_point(x, y, compressed=False).hex(), encode_point(x, y).hex()
 
     def pubkey_to_address(self, pubkey_hex: str) -> str:
         """Convert public key to Bitcoin address (P2PKH)"""
-        # SHA256
-        sha256_hash = hashlib.sha256(bytes.fromhex(pubkey_hex)).digest()
-
-        # RIPEMD160
-        ripemd160 = hashlib.new('ripemd160')
-        ripemd160.update(sha256_hash)
-        pubkey_hash = ripemd160.digest()
-
-        # Add version byte (0x00 for mainnet)
-        versioned = b'\x00' + pubkey_hash
-
-        # Double SHA256 for checksum
-        checksum = hashlib.sha256(hashlib.sha256(versioned).digest()).digest()[:4]
-
-        # Base58Check encode
-        address_bytes = versioned + checksum
-        return self._base58_encode(address_bytes)
-
-    def _base58_encode(self, data: bytes) -> str:
-        """Base58 encode bytes"""
-        ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
-
-        # Count leading zeros
-        leading_zeros = 0
-        for byte in data:
-            if byte == 0:
-                leading_zeros += 1
-            else:
-                break
-
-        # Convert to integer
-        num = int.from_bytes(data, 'big')
-
-        # Convert to base58
-        result = ''
-        while num > 0:
-            num, remainder = divmod(num, 58)
-            result = ALPHABET[remainder] + result
-
-        # Add leading '1's for each leading zero byte
-        return '1' * leading_zeros + result
+        return hash160_to_address(hash160(bytes.fromhex(pubkey_hex)))
 
     def validate_private_key(self, privkey_hex: str, expected_bits: int) -> Dict:
         """
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: log-ingest throughput with and without the token-count cache
+
+Replays a synthetic log stream (repeating templates, as the daemon's logs
+do, plus an occasional large payload) through
+
+  1. token counting alone, and
+  2. LogManager.store_log_in_db into a temporary database (timed until
+     the background writer has flushed every record),
+
+once with the uncached per-record encode (the old behaviour) and once with
+the cached TokenManager.count_tokens.
+
+Usage:
+    python benchmark_log_ingest.py [--records 5000]
+"""
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+
+import token_manager
+from token_manager import get_token_manager
+
+TEMPLATES = [
+    "Starting goal: Explore the ladder patterns and find new insights",
+    "Executing task {i}/6: compute_drift",
+    "Token usage for chat_mistral-large-3:675b-cloud: {n} + 512 = {m} tokens",
+    "Verification: 1024/1024 bytes match (100.00%)",
+    "Planned 6 tasks (4 without dependencies)",
+    "Lane {l}: A={a} drift stable across blocks 0..1",
+]
+
+
+def make_records(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        if i % 500 == 499:
+            # Large agent transcript dumped into the log
+            msg = "Agent response:\n" + "y = A[l] * x + C[k][l][occ] (mod 256)\n" * 4000
+        else:
+            msg = rng.choice(TEMPLATES).format(i=rng.randint(1, 6), n=rng.randint(100, 120),
+                                               m=rng.randint(600, 640), l=rng.randint(0, 15),
+                                               a=rng.choice([1, 91, 169, 32]))
+        records.append(logging.LogRecord("bench", logging.INFO, __file__, i, msg, None, None))
+    return records
+
+
+class UncachedCounter:
+    """The old count_tokens: a full encode of every record"""
+
+    def __init__(self, manager):
+        self.encoding = manager.encoding
+
+    def count_tokens(self, text):
+        return len(self.encoding.encode(text))
+
+
+def reset_cache():
+    token_manager._count_cache = token_manager.TokenCountCache()
+
+
+def bench_counting(records, counter):
+    start = time.perf_counter()
+    for r in records:
+        counter.count_tokens(r.getMessage())
+    return time.perf_counter() - start
+
+
+def bench_ingest(records, counter):
+    from log_management import LogManager, LogConfig
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # LogManager's maintenance thread compresses/archives files in the cwd
+        os.chdir(tmp)
+        try:
+            lm = LogManager(LogConfig(), db_path=os.path.join(tmp, "logs.db"))
+            lm.token_manager = counter
+            start = time.perf_counter()
+            for r in records:
+                lm.store_log_in_db(r)
+            lm.flush()
+            elapsed = time.perf_counter() - start
+            lm.writer.close()
+        finally:
+            os.chdir(cwd)
+        return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=5000)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    records = make_records(args.records)
+    manager = get_token_manager()
+    print(f"{len(records)} records, encoding={manager.encoding_name}")
+
+    for name, bench in (("token counting", bench_counting), ("store_log_in_db", bench_ingest)):
+        reset_cache()
+        before = bench(records, UncachedCounter(manager))
+        reset_cache()
+        after = bench(records, manager)
+        print(f"{name:16s} before {len(records) / before:10.0f} rec/s   "
+              f"after {len(records) / after:10.0f} rec/s   ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
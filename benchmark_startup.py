@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: interpreter startup and import cost of the entry points
+
+Every measurement runs in a fresh interpreter (so nothing is already in
+sys.modules), repeated --runs times, and reports the median:
+
+  1. import time of the main modules (main, web_app, agent_v3, the RAG
+     store, ...), measured inside the child process, and
+  2. wall-clock time of cheap CLI commands (main.py --help, nas-status),
+     which should stay well under a second.
+
+With --top N, the N most expensive imports of each module (cumulative
+time from python -X importtime) are listed as well, to find what to
+defer next.
+
+Usage:
+    python benchmark_startup.py [--runs 5] [--top 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+MODULES = [
+    "main",
+    "web_app",
+    "agent_v3",
+    "ollama_integration",
+    "memory_system",
+    "agents",
+    "agents.orchestrator",
+    "rag.vector_store",
+    "utils.embeddings",
+]
+
+COMMANDS = [
+    ["main.py", "--help"],
+    ["main.py", "nas-status"],
+]
+
+
+def import_seconds(module: str) -> float:
+    code = ("import time; t = time.perf_counter(); "
+            f"import {module}; print(time.perf_counter() - t)")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                         text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def command_seconds(args) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + args, cwd=ROOT, stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def _importtime(code: str):
+    """(cumulative seconds, module name) for every import python -X importtime reports"""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                         cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1e6, name.strip()))
+    return rows
+
+
+def top_imports(module: str, n: int):
+    """(cumulative seconds, name) of the n slowest imports below module"""
+    # Interpreter startup (site, .pth hooks) is not the module's doing
+    startup = {name for _, name in _importtime("pass")}
+    rows = [(s, name) for s, name in _importtime(f"import {module}")
+            if name != module and name not in startup]
+    return sorted(rows, reverse=True)[:n]
+
+
+def median(fn, arg, runs: int) -> float:
+    return statistics.median(fn(arg) for _ in range(runs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"python {sys.version.split()[0]}, median of {args.runs} fresh interpreters\n")
+    print("import")
+    for module in MODULES:
+        try:
+            seconds = median(import_seconds, module, args.runs)
+        except subprocess.CalledProcessError as e:
+            print(f"  {module:24s} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"  {module:24s} {seconds * 1000:8.1f} ms")
+        for cumulative, name in top_imports(module, args.top):
+            print(f"      {cumulative * 1000:8.1f} ms  {name}")
+
+    print("\ncommand (wall clock, including interpreter start)")
+    for command in COMMANDS:
+        seconds = median(command_seconds, command, args.runs)
+        print(f"  {' '.join(command):24s} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
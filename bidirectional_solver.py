@@ -21,6 +21,10 @@ from typing import Dict, List, Tuple, Optional, Set
 from dataclasses import dataclass
 from itertools import product
 
+from utils.keystore import get_keystore
+from utils.recurrence import (backward_m_interval, exact_candidates,
+                              forward_m_interval, select)
+
 # Load known data
 with open('/home/rkh/ladder/data_for_csolver.json', 'r') as f:
     data = json.load(f)
@@ -28,26 +32,8 @@ with open('/home/rkh/ladder/data_for_csolver.json', 'r') as f:
 m_seq = data.get('m_seq', [])  # m[2] to m[70]
 d_seq = data.get('d_seq', [])  # d[2] to d[70]
 
-# All known k-values
-K_KNOWN: Dict[int, int] = {
-    1: 0x1, 2: 0x3, 3: 0x7, 4: 0x8, 5: 0x15, 6: 0x31, 7: 0x4c, 8: 0xe0,
-    9: 0x1d3, 10: 0x202, 11: 0x483, 12: 0xa7b, 13: 0x1460, 14: 0x2930, 15: 0x68f3,
-    16: 0xc936, 17: 0x1764f, 18: 0x3080d, 19: 0x5749f, 20: 0xd2c55,
-    21: 0x1ba534, 22: 0x2de40f, 23: 0x556e52, 24: 0xdc2a04, 25: 0x1fa5ee5,
-    26: 0x340326e, 27: 0x6ac3875, 28: 0xd916ce8, 29: 0x17e2551e, 30: 0x3d94cd64,
-    31: 0x7d4fe747, 32: 0xb862a62e, 33: 0x1a96ca8d8, 34: 0x34a65911d, 35: 0x4aed21170,
-    36: 0x9de820a7c, 37: 0x1757756a93, 38: 0x22382facd0, 39: 0x4b5f8303e9, 40: 0xe9ae4933d6,
-    41: 0x153869acc5b, 42: 0x2a221c58d8f, 43: 0x6bd3b27c591, 44: 0xe02b35a358f,
-    45: 0x122fca143c05, 46: 0x2ec18388d544, 47: 0x6cd610b53cba, 48: 0xade6d7ce3b9b,
-    49: 0x174176b015f4d, 50: 0x22bd43c2e9354, 51: 0x75070a1a009d4, 52: 0xefae164cb9e3c,
-    53: 0x180788e47e326c, 54: 0x236fb6d5ad1f43, 55: 0x6abe1f9b67e114, 56: 0x9d18b63ac4ffdf,
-    57: 0x1eb25c90795d61c, 58: 0x2c675b852189a21, 59: 0x7496cbb87cab44f, 60: 0xfc07a1825367bbe,
-    61: 0x13c96a3742f64906, 62: 0x363d541eb611abee, 63: 0x7cce5efdaccf6808, 64: 0xf7051f27b09112d4,
-    65: 0x1a838b13505b26867, 66: 0x2832ed74f2b5e35ee, 67: 0x730fc235c1942c1ae, 68: 0xbebb3940cd0fc1491,
-    69: 0x101d83275fb2bc7e0c, 70: 0x349b84b6431a6c4ef1,
-    75: 0x4c5ce114686a1336e07, 80: 0xea1a5c66dcc11b5ad180,
-    85: 0x11720c4f018d51b8cebba8, 90: 0x2ce00bb2136a445c71e85bf
-}
+# All known k-values (solved 1..70 plus the bridge anchors)
+K_KNOWN: Dict[int, int] = get_keystore().subset(list(range(1, 71)) + [75, 80, 85, 90])
 
 # Compute c[n] = k[n] / 2^n for known values
 C_KNOWN = {n: k / (2**n) for n, k in K_KNOWN.items()}
@@ -132,15 +118,7 @@ def find_valid_d_values(n: int, k_prev: int, k_n: int) -> List[Tuple[int, int]]:
     Find all (d, m) pairs that make the transition k[n-1] -> k[n] valid.
     Returns list of (d, m) tuples.
     """
-    valid_pairs = []
-    # Try all known d values
-    for d in K_KNOWN.keys():
-        if d >= n:  # d must be less than n
-            continue
-        m = compute_m_for_transition(n, k_prev, k_n, d)
-        if m is not None and m > 0:
-            valid_pairs.append((d, m))
-    return valid_pairs
+    return [(d, m) for d, m, _ in exact_candidates(K_KNOWN, n, k_prev, k_n)]
 
 
 def find_minimizing_d(n: int, k_prev: int, k_n: int) -> Optional[Tuple[int, int]]:
@@ -148,11 +126,7 @@ def find_minimizing_d(n: int, k_prev: int, k_n: int) -> Optional[Tuple[int, int]
     Find the d value that minimizes m for the transition.
     This is the d-minimization rule verified 67/69 times.
     """
-    valid_pairs = find_valid_d_values(n, k_prev, k_n)
-    if not valid_pairs:
-        return None
-    # Find minimum m
-    return min(valid_pairs, key=lambda x: x[1])
+    return select(exact_candidates(K_KNOWN, n, k_prev, k_n), 'min_abs_m')
 
 
 def enumerate_forward_candidates(n_start: int, n_end: int, k_start: int) -> Dict[int, Set[Candidate]]:
@@ -178,24 +152,19 @@ def enumerate_forward_candidates(n_start: int, n_end: int, k_start: int) -> Dict
                 k_d = K_KNOWN[d]
 
                 # For forward: k[n] = 2*k[n-1] + 2^n - m*k[d]
-                # We need k[n] in range [2^(n-1), 2^n)
-                # So: 2^(n-1) <= 2*k[n-1] + 2^n - m*k[d] < 2^n
-                # Rearranging for m:
-                # 2*k[n-1] + 2^n - 2^n < m*k[d] <= 2*k[n-1] + 2^n - 2^(n-1)
+                # We need k[n] in range [2^(n-1), 2^n), i.e.
                 # 2*k[n-1] < m*k[d] <= 2*k[n-1] + 2^(n-1)
-
-                base = 2 * prev_cand.k + (2**n)
-                m_min = max(1, (base - 2**n + 1) // k_d)
-                m_max = (base - 2**(n-1)) // k_d
+                # Every m in the closed-form interval is valid
+                m_min, m_max = forward_m_interval(n, prev_cand.k, k_d)
+                m_min = max(1, m_min)
 
                 # Limit search to reasonable m values
                 m_max = min(m_max, m_min + 1000)  # Cap at 1000 candidates per d
 
+                base = 2 * prev_cand.k + (2**n)
                 for m in range(m_min, m_max + 1):
                     k_n = base - m * k_d
-                    if is_valid_k_range(n, k_n):
-                        c_n = k_n / (2**n)
-                        candidates[n].add(Candidate(n, k_n, m, d, c_n))
+                    candidates[n].add(Candidate(n, k_n, m, d, k_n / (2**n)))
 
         current_layer[n] = candidates[n]
 
@@ -224,32 +193,20 @@ def enumerate_backward_candidates(n_start: int, n_end: int, k_end: int) -> Dict[
                 k_d = K_KNOWN[d_next]
 
                 # For backward: k[n] = (k[n+1] - 2^(n+1) + m[n+1]*k[d[n+1]]) / 2
-                # We need k[n] in range [2^(n-1), 2^n)
-                # And numerator must be even
-
-                # numerator = k[n+1] - 2^(n+1) + m*k[d]
-                # k[n] = numerator / 2
-                # 2^(n-1) <= numerator/2 < 2^n
-                # 2^n <= numerator < 2^(n+1)
-
-                base = next_cand.k - (2**(n+1))
-                # numerator = base + m*k[d]
-                # 2^n <= base + m*k[d] < 2^(n+1)
-                # (2^n - base) <= m*k[d] < (2^(n+1) - base)
-
-                m_min = max(1, (2**n - base + k_d - 1) // k_d)  # Ceiling
-                m_max = (2**(n+1) - base - 1) // k_d
+                # We need k[n] in range [2^(n-1), 2^n) and an even numerator:
+                # 2^n <= k[n+1] - 2^(n+1) + m*k[d] < 2^(n+1)
+                # The interval and the parity of m are closed-form
+                m_min, m_max, m_step = backward_m_interval(n, next_cand.k, k_d)
+                if m_min < 1:
+                    m_min += (1 - m_min + m_step - 1) // m_step * m_step
 
                 # Limit search
                 m_max = min(m_max, m_min + 1000)
 
-                for m_next in range(m_min, m_max + 1):
-                    numerator = base + m_next * k_d
-                    if numerator % 2 == 0:  # Must be even
-                        k_n = numerator // 2
-                        if is_valid_k_range(n, k_n):
-                            c_n = k_n / (2**n)
-                            candidates[n].add(Candidate(n, k_n, m_next, d_next, c_n))
+                base = next_cand.k - (2**(n+1))
+                for m_next in range(m_min, m_max + 1, m_step):
+                    k_n = (base + m_next * k_d) // 2
+                    candidates[n].add(Candidate(n, k_n, m_next, d_next, k_n / (2**n)))
 
         current_layer[n] = candidates[n]
 
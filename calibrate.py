@@ -13,6 +13,9 @@ import logging
 from typing import Optional, Dict, Any
 import yaml
 import json
+import csv
+
+from utils.affine_ladder import AffineLadder, load_halfblocks
 
 # Set up basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -266,10 +269,44 @@ def verify_calibration(config: CalibrationConfig) -> None:
     """Verify calibration accuracy"""
     logger.info("Verifying calibration...")
 
-    # This would call the existing verify_affine.py functionality
-    # For now, we'll just log the action
-    logger.warning("Calibration verification not yet implemented in unified tool")
-    logger.info("To verify calibration, run: python kh-assist/verify_affine.py")
+    db_path = config.get('database.path', 'db/kh.db')
+    output_dir = config.get('calibration.output_dir', 'out')
+    calib_file = os.path.join(output_dir, config.get('calibration.calib_file'))
+    low, high = config.get('calibration.range', [29, 70])
+
+    if not os.path.exists(calib_file):
+        logger.error(f"Calibration file not found: {calib_file}")
+        return
+
+    try:
+        ladder = AffineLadder.from_calibration(calib_file)
+        result = ladder.verify(load_halfblocks(db_path, low, high + 1), low, high)
+    except Exception as e:
+        logger.error(f"Error verifying calibration: {e}")
+        return
+
+    if result.total == 0:
+        logger.error(f"No half-blocks with known drifts in range {low}-{high}")
+        return
+
+    logger.info(f"Forward test: {result.forward_ok}/{result.total} = {result.forward_rate:.3%}")
+    logger.info(f"Reverse test: {result.reverse_ok}/{result.total} = {result.reverse_rate:.3%}")
+
+    mismatches = result.mismatches()
+    if mismatches:
+        mismatch_log = config.get('verification.mismatch_log', os.path.join(output_dir, 'ladder_mismatch_log.csv'))
+        os.makedirs(os.path.dirname(mismatch_log) or '.', exist_ok=True)
+        with open(mismatch_log, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["direction", "idx", "byte_pos", "predicted", "actual"])
+            writer.writerows(mismatches)
+        logger.info(f"Mismatches written to {mismatch_log}")
+
+    expected = float(config.get('verification.expected_success_rate', 100.0))
+    if min(result.forward_rate, result.reverse_rate) * 100 >= expected:
+        logger.info(f"Calibration verified (>= {expected}%)")
+    else:
+        logger.warning(f"Calibration below expected success rate of {expected}%")
 
 def full_calibration(config: CalibrationConfig) -> None:
     """Run complete calibration workflow"""
@@ -5,61 +5,9 @@ Uses the main recurrence: k[71] = 2*k[70] + 2^71 - m[71]*k[d[71]]
 """
 
 import json
-import hashlib
 import time
+from utils.secp256k1 import privkey_to_address
 
-# secp256k1 parameters
-P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
-Gx = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
-Gy = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
-
-def modinv(a, m):
-    if a < 0: a = a % m
-    g, x = extended_gcd(a, m)[:2]
-    return x % m
-
-def extended_gcd(a, b):
-    if a == 0: return b, 0, 1
-    gcd, x1, y1 = extended_gcd(b % a, a)
-    return gcd, y1 - (b // a) * x1, x1
-
-def point_add(p1, p2):
-    if p1 is None: return p2
-    if p2 is None: return p1
-    x1, y1, x2, y2 = p1[0], p1[1], p2[0], p2[1]
-    if x1 == x2 and y1 != y2: return None
-    if x1 == x2: m = (3 * x1 * x1) * modinv(2 * y1, P) % P
-    else: m = (y2 - y1) * modinv(x2 - x1, P) % P
-    x3 = (m * m - x1 - x2) % P
-    y3 = (m * (x1 - x3) - y1) % P
-    return (x3, y3)
-
-def point_multiply(k, point):
-    result, addend = None, point
-    while k:
-        if k & 1: result = point_add(result, addend)
-        addend = point_add(addend, addend)
-        k >>= 1
-    return result
-
-def privkey_to_address(privkey_int):
-    pubkey = point_multiply(privkey_int, (Gx, Gy))
-    x, y = pubkey
-    prefix = b'\x02' if y % 2 == 0 else b'\x03'
-    pubkey_compressed = prefix + x.to_bytes(32, 'big')
-    sha = hashlib.sha256(pubkey_compressed).digest()
-    h160 = hashlib.new('ripemd160', sha).digest()
-    versioned = b'\x00' + h160
-    checksum = hashlib.sha256(hashlib.sha256(versioned).digest()).digest()[:4]
-    alphabet = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
-    data = versioned + checksum
-    leading_zeros = len(data) - len(data.lstrip(b'\x00'))
-    num = int.from_bytes(data, 'big')
-    result = ''
-    while num > 0:
-        num, remainder = divmod(num, 58)
-        result = alphabet[remainder] + result
-    return '1' * leading_zeros + result
 
 # Load known data
 with open('data_for_csolver.json', 'r') as f:
@@ -13,58 +13,36 @@ import json
 from fractions import Fraction
 from sympy import pi, E, sqrt, log, Rational
 
+from utils.convergents import convergents, partial_quotients
+
 # Load m-values
 with open('/home/rkh/ladder/data_for_csolver.json', 'r') as f:
     data = json.load(f)
 M_SEQ = data['m_seq']
 
-def continued_fraction_convergents(x, n=30):
-    """Compute n convergents of continued fraction of x."""
-    convergents = []
-    cf = []
-
-    # Get continued fraction coefficients
-    val = float(x)
-    for _ in range(n):
-        a = int(val)
-        cf.append(a)
-        frac = val - a
-        if abs(frac) < 1e-15:
-            break
-        val = 1 / frac
-
-    # Compute convergents
-    h_prev, h_curr = 0, 1
-    k_prev, k_curr = 1, 0
-
-    for a in cf:
-        h_new = a * h_curr + h_prev
-        k_new = a * k_curr + k_prev
-        convergents.append((h_new, k_new))
-        h_prev, h_curr = h_curr, h_new
-        k_prev, k_curr = k_curr, k_new
-
-    return convergents, cf
+def continued_fraction_convergents(name, n=30):
+    """Compute n convergents of continued fraction of a utils.convergents constant."""
+    cf = partial_quotients(name, n)
+    return convergents(name, n), cf
 
 print("=" * 80)
 print("CONTINUED FRACTION MAPPING FOR M-VALUES")
 print("=" * 80)
 print()
 
-# Mathematical constants to test
-import math
+# Mathematical constants to test (names in utils.convergents.CONSTANTS)
 constants = {
-    'π': math.pi,
-    'e': math.e,
-    '√2': math.sqrt(2),
-    '√3': math.sqrt(3),
-    '√5': math.sqrt(5),
-    'φ': (1 + math.sqrt(5)) / 2,  # Golden ratio
-    'ln(2)': math.log(2),
-    '1/π': 1 / math.pi,
-    '1/e': 1 / math.e,
-    'π/4': math.pi / 4,
-    'e/π': math.e / math.pi,
+    'π': 'pi',
+    'e': 'e',
+    '√2': 'sqrt2',
+    '√3': 'sqrt3',
+    '√5': 'sqrt5',
+    'φ': 'phi',  # Golden ratio
+    'ln(2)': 'ln2',
+    '1/π': '1/pi',
+    '1/e': '1/e',
+    'π/4': 'pi/4',
+    'e/π': 'e/pi',
 }
 
 # Compute convergents for each constant
@@ -8,6 +8,8 @@ from fractions import Fraction
 from decimal import Decimal, getcontext
 import math
 
+from utils.convergents import CONSTANTS, partial_quotients
+
 # Set high precision
 getcontext().prec = 100
 
@@ -29,40 +31,10 @@ D_SEQUENCE = {
 }
 
 def continued_fraction_coefficients(constant_name, n_terms=50):
-    """Get continued fraction coefficients for various constants."""
-
-    if constant_name == 'pi':
-        # π = [3; 7, 15, 1, 292, 1, 1, 1, 2, 1, 3, 1, 14, 2, 1, 1, 2, 2, 2, 2, 1, 84, 2, 1, 1, 15, ...]
-        return [3, 7, 15, 1, 292, 1, 1, 1, 2, 1, 3, 1, 14, 2, 1, 1, 2, 2, 2, 2, 1, 84, 2, 1, 1, 15, 3, 13, 1, 4, 2, 6, 6, 99, 1, 2, 2, 6, 3, 5, 1, 1, 6, 8, 1, 7, 1, 2, 3, 7][:n_terms]
-
-    elif constant_name == 'e':
-        # e = [2; 1, 2, 1, 1, 4, 1, 1, 6, 1, 1, 8, ...] - pattern: [2; 1, 2k, 1] for k=1,2,3...
-        cf = [2, 1, 2]
-        for k in range(1, n_terms // 3 + 1):
-            cf.extend([1, 1, 2 * (k + 1)])
-        return cf[:n_terms]
-
-    elif constant_name == 'sqrt2':
-        # sqrt(2) = [1; 2, 2, 2, 2, ...]
-        return [1] + [2] * (n_terms - 1)
-
-    elif constant_name == 'sqrt3':
-        # sqrt(3) = [1; 1, 2, 1, 2, 1, 2, ...]
-        cf = [1]
-        for i in range(n_terms - 1):
-            cf.append(1 if i % 2 == 0 else 2)
-        return cf
-
-    elif constant_name == 'phi':
-        # φ (golden ratio) = [1; 1, 1, 1, 1, ...]
-        return [1] * n_terms
-
-    elif constant_name == 'ln2':
-        # ln(2) = [0; 1, 2, 3, 1, 6, 3, 1, 1, 2, 1, 1, 1, 1, 3, 10, ...]
-        return [0, 1, 2, 3, 1, 6, 3, 1, 1, 2, 1, 1, 1, 1, 3, 10, 1, 1, 1, 2, 1, 1, 1, 1, 3, 2, 3, 1, 13, 7, 4, 1, 1, 1, 7, 2, 4, 1, 1, 2, 1, 2, 1, 4, 3, 1, 1, 1, 1, 1][:n_terms]
-
-    else:
+    """Get continued fraction coefficients for various constants (exact, see utils.convergents)."""
+    if constant_name not in CONSTANTS:
         raise ValueError(f"Unknown constant: {constant_name}")
+    return partial_quotients(constant_name, n_terms)
 
 def compute_convergents(cf_coefficients):
     """Compute convergents (h_n, k_n) from continued fraction coefficients."""
@@ -104,30 +76,19 @@ def build_database():
 def find_m_matches(database):
     """Find which m values appear in convergent numerators/denominators."""
 
-    m_values = set(M_SEQUENCE.values())
-    matches = {}
-
-    for m_val in sorted(m_values):
-        matches[m_val] = []
-
-        for const_name, convergents in database.items():
-            for conv in convergents:
-                if conv['numerator'] == m_val:
-                    matches[m_val].append({
-                        'constant': const_name,
-                        'type': 'numerator',
-                        'index': conv['index'],
-                        'fraction': f"{conv['numerator']}/{conv['denominator']}"
-                    })
-                if conv['denominator'] == m_val:
-                    matches[m_val].append({
-                        'constant': const_name,
-                        'type': 'denominator',
-                        'index': conv['index'],
-                        'fraction': f"{conv['numerator']}/{conv['denominator']}"
-                    })
-
-    return matches
+    # value -> matches, so each m value is a single lookup
+    by_value = {}
+    for const_name, convergents in database.items():
+        for conv in convergents:
+            for kind in ('numerator', 'denominator'):
+                by_value.setdefault(conv[kind], []).append({
+                    'constant': const_name,
+                    'type': kind,
+                    'index': conv['index'],
+                    'fraction': f"{conv['numerator']}/{conv['denominator']}"
+                })
+
+    return {m_val: by_value.get(m_val, []) for m_val in sorted(set(M_SEQUENCE.values()))}
 
 def main():
     print("=" * 70)
@@ -10,13 +10,13 @@ Example:
   python distributed_factorization.py 36 45 factorization_36_45.json
 """
 
+import glob
 import sys
 import json
-import time
 from datetime import datetime
 
-# Use sympy for factorization
-from sympy import factorint, prime, primepi, isprime
+# Shared cache: values already factored on any box are not redone
+from utils.factorization import FactorizationService
 
 def load_m_sequence():
     """Load m-sequence from data file."""
@@ -25,74 +25,9 @@ def load_m_sequence():
     return data['m_seq']
 
 def factor_m_value(n, m_val, timeout_seconds=300):
-    """Factor a single m-value and return prime indices."""
-    start_time = time.time()
-    result = {
-        'n': n,
-        'm': m_val,
-        'bits': m_val.bit_length(),
-        'is_prime': False,
-        'factors': {},
-        'prime_indices': [],
-        'factored': False,
-        'time_seconds': 0
-    }
-
-    # Check if prime first (fast)
-    if isprime(m_val):
-        result['is_prime'] = True
-        result['factors'] = {str(m_val): 1}
-        try:
-            idx = primepi(m_val)
-            result['prime_indices'] = [idx]
-            result['prime_index'] = idx
-        except:
-            result['prime_indices'] = ['too_large']
-        result['factored'] = True
-        result['time_seconds'] = time.time() - start_time
-        return result
-
-    # Try factorization
-    try:
-        factors = factorint(m_val)  # No timeout parameter in sympy
-
-        result['factors'] = {str(int(p)): int(e) for p, e in factors.items()}
-        result['factored'] = True
-
-        # Get prime indices
-        indices = []
-        for p in sorted(factors.keys()):
-            try:
-                idx = int(primepi(p))
-                indices.append(idx)
-            except:
-                indices.append(f'pi({p})')
-
-        result['prime_indices'] = indices
-
-        # Also store factor details
-        result['factor_details'] = []
-        for p, e in sorted(factors.items()):
-            try:
-                idx = int(primepi(p))
-                result['factor_details'].append({
-                    'prime': int(p),
-                    'exponent': int(e),
-                    'index': idx
-                })
-            except:
-                result['factor_details'].append({
-                    'prime': int(p),
-                    'exponent': int(e),
-                    'index': 'large'
-                })
-
-    except Exception as e:
-        result['error'] = str(e)
-        result['factored'] = False
-
-    result['time_seconds'] = time.time() - start_time
-    return result
+    """Factor a single m-value and return prime indices (cached service)."""
+    svc = FactorizationService(timeout=timeout_seconds)
+    return svc.describe(m_val, svc.factor(m_val), n)
 
 def main():
     if len(sys.argv) < 4:
@@ -113,22 +48,19 @@ def main():
     # Load m-sequence
     m_seq = load_m_sequence()
 
-    results = []
-
-    for n in range(n_start, n_end + 1):
-        m_val = m_seq[n - 2]  # m[n] = m_seq[n-2]
-
-        print(f"\nProcessing n={n}, m={m_val} ({m_val.bit_length()} bits)...")
-
-        result = factor_m_value(n, m_val)
-        results.append(result)
+    # Cached values return immediately; the rest run in parallel
+    svc = FactorizationService()
+    svc.import_json(sorted(glob.glob('factorization_*.json')))
+    results = svc.factor_sequence({n: m_seq[n - 2] for n in range(n_start, n_end + 1)})  # m[n] = m_seq[n-2]
 
+    for result in results:
+        print(f"\nn={result['n']}, m={result['m']} ({result['bits']} bits)...")
         if result['factored']:
             print(f"  ✓ Factored in {result['time_seconds']:.2f}s")
             print(f"    Factors: {result['factors']}")
             print(f"    Prime indices: {result['prime_indices']}")
         else:
-            print(f"  ✗ Failed to factor: {result.get('error', 'unknown')}")
+            print(f"  ✗ Timed out, partial: {result['factors']} cofactors {result.get('cofactors')}")
 
     # Save results
     output = {
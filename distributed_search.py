@@ -8,6 +8,8 @@ import hashlib
 import sys
 import coincurve
 
+from utils.point_walk import walk_hash160
+
 # Load k-values
 conn = sqlite3.connect('/home/solo/LA/db/kh.db')
 cursor = conn.cursor()
@@ -32,24 +34,28 @@ def privkey_to_hash160(privkey):
 def search_d(d, start_m, end_m):
     """Search a range of m values for given d"""
     k_d = K[d]
-    checked = 0
 
-    for m in range(start_m, end_m):
-        k71 = BASE - m * k_d
+    # Clip [start_m, end_m) to the m values that put k71 inside its range
+    lo_m = max(start_m, -((MAX_K71 - BASE) // k_d))  # ceil((BASE - MAX_K71) / k_d)
+    hi_m = min(end_m - 1, (BASE - MIN_K71) // k_d)
+    if lo_m > hi_m:
+        return False
 
-        if MIN_K71 <= k71 <= MAX_K71:
-            checked += 1
-            if checked % 100000 == 0:
-                print(f"  d={d} checked {checked:,}...", flush=True)
+    # k71 = BASE - m*k_d is a progression with stride -k_d: walk it with
+    # one point addition per candidate instead of a scalar multiplication
+    for checked, h160 in walk_hash160(BASE - lo_m * k_d, hi_m - lo_m + 1, stride=-k_d):
+        if (checked + 1) % 100000 == 0:
+            print(f"  d={d} checked {checked + 1:,}...", flush=True)
 
-            h160 = privkey_to_hash160(k71)
-            if h160 == TARGET_HASH160:
-                print(f"\n{'='*60}")
-                print(f"FOUND! d={d}, m={m}")
-                print(f"k[71] = {k71}")
-                print(f"k[71] hex = {hex(k71)}")
-                print(f"{'='*60}")
-                return True
+        if h160 == TARGET_HASH160:
+            m = lo_m + checked
+            k71 = BASE - m * k_d
+            print(f"\n{'='*60}")
+            print(f"FOUND! d={d}, m={m}")
+            print(f"k[71] = {k71}")
+            print(f"k[71] hex = {hex(k71)}")
+            print(f"{'='*60}")
+            return True
 
     return False
 
@@ -14,7 +14,7 @@ Since offset[n] = k[n] - 9*k[n-3], and k[n] = 2*k[n-1] + adj[n],
 there's a relationship between adj values that we can exploit.
 """
 import sqlite3
-import hashlib
+from utils.secp256k1 import privkey_to_address
 
 # Load known k values
 conn = sqlite3.connect('/home/solo/ladder/db/kh.db')
@@ -248,59 +248,6 @@ print(f"  k[71] = {k71_s85:.4e}")
 print(f"  In range: {min_k71 <= k71_s85 <= max_k71}")
 print()
 
-# Generate address
-P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
-G = (0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
-     0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8)
-
-def modinv(a, m):
-    if a < 0: a = a % m
-    def extended_gcd(a, b):
-        if a == 0: return b, 0, 1
-        g, x, y = extended_gcd(b % a, a)
-        return g, y - (b // a) * x, x
-    g, x, _ = extended_gcd(a, m)
-    return x % m
-
-def point_add(p1, p2):
-    if p1 is None: return p2
-    if p2 is None: return p1
-    x1, y1 = p1
-    x2, y2 = p2
-    if x1 == x2:
-        if y1 != y2: return None
-        lam = (3 * x1 * x1) * modinv(2 * y1, P) % P
-    else:
-        lam = (y2 - y1) * modinv(x2 - x1, P) % P
-    x3 = (lam * lam - x1 - x2) % P
-    y3 = (lam * (x1 - x3) - y1) % P
-    return (x3, y3)
-
-def scalar_mult(k, point):
-    result = None
-    addend = point
-    while k:
-        if k & 1: result = point_add(result, addend)
-        addend = point_add(addend, addend)
-        k >>= 1
-    return result
-
-def privkey_to_address(privkey):
-    pubkey = scalar_mult(privkey, G)
-    x, y = pubkey
-    prefix = b'\x02' if y % 2 == 0 else b'\x03'
-    pubkey_bytes = prefix + x.to_bytes(32, 'big')
-    sha256 = hashlib.sha256(pubkey_bytes).digest()
-    ripemd160 = hashlib.new('ripemd160', sha256).digest()
-    versioned = b'\x00' + ripemd160
-    checksum = hashlib.sha256(hashlib.sha256(versioned).digest()).digest()[:4]
-    alphabet = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
-    n = int.from_bytes(versioned + checksum, 'big')
-    result = ''
-    while n > 0:
-        n, r = divmod(n, 58)
-        result = alphabet[r] + result
-    return result
 
 TARGET = "1PWo3JeB9jrGwfHDNpdGK54CRas7fsVzXU"
 
@@ -4,53 +4,13 @@ Deep EC Hypothesis Testing
 Test if adj_n relates to EC operations using actual key values
 """
 
-import sqlite3
 import hashlib
+import sqlite3
 
-# secp256k1 parameters
-P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
-N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
-GX = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
-GY = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
-
-def modinv(a, m):
-    if a < 0:
-        a = a % m
-    g, x, _ = extended_gcd(a, m)
-    return x % m
-
-def extended_gcd(a, b):
-    if a == 0:
-        return b, 0, 1
-    gcd, x1, y1 = extended_gcd(b % a, a)
-    return gcd, y1 - (b // a) * x1, x1
-
-def ec_add(x1, y1, x2, y2):
-    if x1 is None:
-        return x2, y2
-    if x2 is None:
-        return x1, y1
-    if x1 == x2:
-        if y1 != y2:
-            return None, None
-        if y1 == 0:
-            return None, None
-        lam = (3 * x1 * x1 * modinv(2 * y1, P)) % P
-    else:
-        lam = ((y2 - y1) * modinv(x2 - x1, P)) % P
-    x3 = (lam * lam - x1 - x2) % P
-    y3 = (lam * (x1 - x3) - y1) % P
-    return x3, y3
+from utils.secp256k1 import point_mul, Gx as GX, Gy as GY
 
 def ec_mul(k, gx, gy):
-    rx, ry = None, None
-    ax, ay = gx, gy
-    while k:
-        if k & 1:
-            rx, ry = ec_add(rx, ry, ax, ay)
-        ax, ay = ec_add(ax, ay, ax, ay)
-        k >>= 1
-    return rx, ry
+    return point_mul(k, (gx, gy)) or (None, None)
 
 def load_keys():
     conn = sqlite3.connect("db/kh.db")
@@ -11,72 +11,8 @@ Investigates:
 """
 
 import sqlite3
+from utils.secp256k1 import point_add, scalar_mult as get_public_point, P
 
-# secp256k1 parameters (from analyze_ec_compression.py)
-P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
-A = 0
-B = 7
-Gx = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
-Gy = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
-N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
-
-def modinv(a, m):
-    """Modular inverse using extended Euclidean algorithm."""
-    if a < 0:
-        a = a % m
-    g, x, _ = extended_gcd(a, m)
-    if g != 1:
-        raise ValueError("Modular inverse doesn't exist")
-    return x % m
-
-def extended_gcd(a, b):
-    if a == 0:
-        return b, 0, 1
-    gcd, x1, y1 = extended_gcd(b % a, a)
-    x = y1 - (b // a) * x1
-    y = x1
-    return gcd, x, y
-
-def point_add(p1, p2):
-    """Add two points on secp256k1."""
-    if p1 is None:
-        return p2
-    if p2 is None:
-        return p1
-
-    x1, y1 = p1
-    x2, y2 = p2
-
-    if x1 == x2 and y1 != y2:
-        return None  # Point at infinity
-
-    if x1 == x2:  # Point doubling
-        m = (3 * x1 * x1) * modinv(2 * y1, P) % P
-    else:
-        m = (y2 - y1) * modinv(x2 - x1, P) % P
-
-    x3 = (m * m - x1 - x2) % P
-    y3 = (m * (x1 - x3) - y1) % P
-
-    return (x3, y3)
-
-def scalar_mult(k, point):
-    """Multiply point by scalar k."""
-    result = None
-    addend = point
-
-    while k:
-        if k & 1:
-            result = point_add(result, addend)
-        addend = point_add(addend, addend)
-        k >>= 1
-
-    return result
-
-def get_public_point(k):
-    """Get public key point (x, y) for private key k."""
-    G = (Gx, Gy)
-    return scalar_mult(k, G)
 
 def main():
     # Load k values from database
@@ -3,8 +3,10 @@
 Factor m-values for n=36-70 and look for prime patterns
 """
 
+import glob
 import json
-from sympy import factorint, prime, primepi, isprime
+
+from utils.factorization import FactorizationService
 
 # Load data
 with open('data_for_csolver.json') as f:
@@ -27,35 +29,48 @@ print("=" * 80)
 
 results = []
 
+# Cached service: previously factored values and prime indices are reused
+svc = FactorizationService()
+svc.import_json(sorted(glob.glob('factorization_*.json')))
+entries = svc.factor_many([m(n) for n in range(36, 71)])
+
 for n in range(36, 71):
     m_val = m(n)
-    factors = factorint(m_val)
+    factors = entries[m_val]['factors']
+    # Composites left over when the per-value deadline ran out
+    cofactors = entries[m_val]['cofactors']
+    complete = entries[m_val]['complete']
 
     # Format factors nicely
-    factor_str = " × ".join([f"{p}^{e}" if e > 1 else str(p) for p, e in sorted(factors.items())])
+    factor_str = " × ".join([f"{p}^{e}" if e > 1 else str(p) for p, e in sorted(factors.items())]
+                            + [f"C{len(str(c))}({c})" for c in cofactors])
 
-    # Count prime factors (with multiplicity)
-    omega = sum(factors.values())  # with multiplicity
-    distinct = len(factors)  # distinct primes
+    # Count prime factors (with multiplicity); lower bounds if incomplete
+    omega = sum(factors.values()) + len(cofactors)  # with multiplicity
+    distinct = len(factors) + len(cofactors)  # distinct primes
 
     # Check if m_val itself is prime
-    is_m_prime = isprime(m_val)
+    is_m_prime = complete and factors == {m_val: 1}
 
     # Find which prime index m_val corresponds to if it's prime
     prime_idx = None
     if is_m_prime:
-        prime_idx = primepi(m_val)
+        prime_idx = svc.prime_index(m_val)
 
     # Get prime indices of factors
     factor_indices = []
     for p in sorted(factors.keys()):
-        idx = primepi(p)
+        idx = svc.prime_index(p)
         factor_indices.append(f"p[{idx}]={p}")
 
     print(f"\nm[{n}] = {m_val}")
     print(f"  Factors: {factor_str}")
     print(f"  Prime indices: {', '.join(factor_indices)}")
-    print(f"  Distinct primes: {distinct}, Omega: {omega}")
+    if complete:
+        print(f"  Distinct primes: {distinct}, Omega: {omega}")
+    else:
+        print(f"  Distinct primes: >= {distinct}, Omega: >= {omega}")
+        print(f"  ✗ Timed out, unfactored cofactors: {cofactors}")
     if is_m_prime:
         print(f"  *** m[{n}] is the {prime_idx}-th prime! ***")
 
@@ -63,7 +78,9 @@ for n in range(36, 71):
         'n': n,
         'm': m_val,
         'factors': factors,
-        'factor_indices': [primepi(p) for p in sorted(factors.keys())],
+        'cofactors': cofactors,
+        'complete': complete,
+        'factor_indices': [svc.prime_index(p) for p in sorted(factors.keys())],
         'is_prime': is_m_prime,
         'prime_index': prime_idx
     })
@@ -84,7 +101,13 @@ print("\n" + "=" * 80)
 print("FACTOR INDEX PATTERNS")
 print("=" * 80)
 
+incomplete = [r['n'] for r in results if not r['complete']]
+if incomplete:
+    print(f"Skipping incompletely factored m[n] for n = {incomplete}")
+
 for r in results:
+    if not r['complete']:
+        continue
     n = r['n']
     indices = r['factor_indices']
     factors = r['factors']
@@ -127,6 +150,7 @@ with open('factorization_36_70.json', 'w') as f:
     for r in results:
         r_copy = r.copy()
         r_copy['factors'] = {str(k): v for k, v in r['factors'].items()}
+        r_copy['cofactors'] = [str(c) for c in r['cofactors']]
         json_results.append(r_copy)
     json.dump(json_results, f, indent=2)
 
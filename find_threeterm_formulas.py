@@ -8,7 +8,8 @@ Try: offset[n] = a×k[i] + b×k[j] + c×k[m] + d
 """
 
 import sqlite3
-from itertools import combinations
+
+from utils.formula_search import FormulaSearch
 
 # Load k values
 conn = sqlite3.connect('db/kh.db')
@@ -28,41 +29,10 @@ print("FINDING THREE-TERM FORMULAS: offset = a×k[i] + b×k[j] + c×k[m] + d")
 print("=" * 80)
 
 def find_threeterm_formula(n, offset, max_coeff=30):
-    """Find a×k[i] + b×k[j] + c×k[m] + d formula."""
-    candidates = []
-
-    # Use k values from recent range (n-10 to n-2)
-    indices = list(range(max(1, n-12), n))
-
-    for i, j, m in combinations(indices, 3):
-        ki, kj, km = k[i], k[j], k[m]
-        if ki == 0 or kj == 0 or km == 0:
-            continue
-
-        # For small a, b, c, find d
-        for a in range(-max_coeff, max_coeff + 1):
-            if a == 0:
-                continue
-            for b in range(-max_coeff, max_coeff + 1):
-                if b == 0:
-                    continue
-                partial = a * ki + b * kj
-
-                # Estimate c
-                if km != 0:
-                    c_est = (offset - partial) // km
-                    for c in [c_est - 1, c_est, c_est + 1]:
-                        if c == 0:
-                            continue
-                        if abs(c) > max_coeff:
-                            continue
-                        d = offset - (a * ki + b * kj + c * km)
-                        if abs(d) < 2000:
-                            complexity = abs(a) + abs(b) + abs(c) + abs(d) / 100
-                            candidates.append((complexity, a, i, b, j, c, m, d))
-
-    candidates.sort(key=lambda x: x[0])
-    return candidates[:3] if candidates else []
+    """Find a×k[i] + b×k[j] + c×k[m] + d formula (indices in n-12..n-1, |d| < 2000)."""
+    search = FormulaSearch(k, max_coeff=max_coeff, max_remainder=1999, window=12)
+    return [(f.complexity, *(x for term in f.terms for x in term), f.remainder)
+            for f in search.best(n, offset, terms=(3,))]
 
 # Find formulas for n=32-40
 print("\n### THREE-TERM FORMULAS FOR n=32-40 ###\n")
@@ -8,7 +8,8 @@ Try: offset[n] = a×k[i] + b×k[j] + c
 """
 
 import sqlite3
-from itertools import combinations
+
+from utils.formula_search import FormulaSearch
 
 # Load k values
 conn = sqlite3.connect('db/kh.db')
@@ -28,30 +29,10 @@ print("FINDING TWO-TERM FORMULAS: offset = a×k[i] + b×k[j] + c")
 print("=" * 80)
 
 def find_twoterm_formula(n, offset, max_coeff=50):
-    """Find a×k[i] + b×k[j] + c formula."""
-    candidates = []
-
-    # Try all pairs of k values
-    for i, j in combinations(range(1, n), 2):
-        ki, kj = k[i], k[j]
-        if ki == 0 or kj == 0:
-            continue
-
-        # For small a, b, find c
-        for a in range(-max_coeff, max_coeff + 1):
-            if a == 0:
-                continue
-            for b in range(-max_coeff, max_coeff + 1):
-                if b == 0:
-                    continue
-                base = a * ki + b * kj
-                c = offset - base
-                if abs(c) < 500:  # Small remainder
-                    complexity = abs(a) + abs(b) + abs(c) / 100
-                    candidates.append((complexity, a, i, b, j, c))
-
-    candidates.sort(key=lambda x: x[0])
-    return candidates[:3] if candidates else []
+    """Find a×k[i] + b×k[j] + c formula (any earlier indices, |c| < 500)."""
+    search = FormulaSearch(k, max_coeff=max_coeff, max_remainder=499, window=None)
+    return [(f.complexity, *(x for term in f.terms for x in term), f.remainder)
+            for f in search.best(n, offset, terms=(2,))]
 
 # Find formulas for n=23-35
 print("\n### TWO-TERM FORMULAS FOR n=23-35 ###\n")
@@ -18,6 +18,9 @@ If states are stored at n=5,10,15,20,...,70,75,80,85,90, the creator could:
 - etc.
 
 This allows generating ANY multiple of 5 independently!
+
+For actual state recovery (LCG lattice attack, Berlekamp-Massey, MT19937
+seed search) see utils/prng_recovery.py.
 """
 
 import sqlite3
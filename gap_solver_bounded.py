@@ -5,15 +5,10 @@ Gap Solver with C-Interpolation Bounds
 Uses Phi's insight: Linear interpolation of c[n] gives TIGHT bounds on k[n].
 """
 
+from utils.keystore import get_keystore
+
 # Known k values
-K = {
-    1: 1, 2: 3, 3: 7, 4: 8, 5: 21, 6: 49, 7: 76, 8: 224,
-    70: 970436974005023690481,
-    75: 22538323240989823823367,
-    80: 1105520030589234487939456,
-    85: 21090315766411506144426920,
-    90: 868012190417726402719548863
-}
+K = get_keystore().subset([1, 2, 3, 4, 5, 6, 7, 8, 70, 75, 80, 85, 90])
 
 # Compute c values
 C = {n: k / (2**n) for n, k in K.items()}
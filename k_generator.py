@@ -11,10 +11,12 @@ Based on verified findings:
 - DUAL-LAYER: Both layers must agree
 """
 
-import sqlite3
 import math
 from fractions import Fraction
 
+from utils.keystore import get_keystore
+from utils.recurrence import RecurrenceEngine
+
 # Mathematical constants for reference
 PI = math.pi
 E = math.e
@@ -23,20 +25,10 @@ SQRT2 = math.sqrt(2)
 SQRT3 = math.sqrt(3)
 LN2 = math.log(2)
 
-# Load all 74 known keys from database
+# Load all known keys from the shared KeyStore
 def load_keys():
-    """Load all known keys from database"""
-    conn = sqlite3.connect('/home/solo/LA/db/kh.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT puzzle_id, priv_hex FROM keys WHERE puzzle_id IS NOT NULL ORDER BY puzzle_id")
-    rows = cursor.fetchall()
-    conn.close()
-
-    keys = {}
-    for puzzle_id, priv_hex in rows:
-        if priv_hex and puzzle_id is not None:
-            keys[int(puzzle_id)] = int(priv_hex, 16)
-    return keys
+    """Load all known keys (kh.db, CSV and puzzle config, merged)"""
+    return dict(get_keystore().keys)
 
 # Fibonacci and Lucas sequences
 def fib(n):
@@ -83,6 +75,9 @@ def compute_m_and_d(k, verbose=False):
     d = {}
     adj = {}
 
+    # Prefer smaller d values (simpler formula) among exact divisors with m > 0
+    choices = RecurrenceEngine(k).analyze(range(2, n_max + 1), rule='min_d')
+
     for n in range(2, n_max + 1):
         if n not in k or n-1 not in k:
             continue
@@ -90,26 +85,8 @@ def compute_m_and_d(k, verbose=False):
         # Compute adj[n] from recurrence
         adj[n] = k[n] - 2*k[n-1]
 
-        # Find d[n] and m[n] such that adj[n] = 2^n - m[n]*k[d[n]]
-        # So: m[n]*k[d[n]] = 2^n - adj[n]
-        target = 2**n - adj[n]
-
-        best_d = None
-        best_m = None
-
-        # Try all possible d values
-        for d_cand in range(1, n):
-            if d_cand not in k or k[d_cand] == 0:
-                continue
-            if target % k[d_cand] == 0:
-                m_cand = target // k[d_cand]
-                if m_cand > 0:
-                    # Prefer smaller d values (simpler formula)
-                    if best_d is None or d_cand < best_d:
-                        best_d = d_cand
-                        best_m = m_cand
-
-        if best_d is not None:
+        if n in choices:
+            best_d, best_m = choices[n]
             m[n] = best_m
             d[n] = best_d
             if verbose and n <= 20:
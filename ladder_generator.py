@@ -5,22 +5,14 @@ Ladder Generator: Reverse-engineer and implement the key generation algorithm
 Based on Wave 20 model consensus: d[n] is chosen to MINIMIZE |m[n]|.
 """
 
-import sqlite3
 from typing import Dict, Tuple
 
+from utils.keystore import get_keystore
+from utils.recurrence import RecurrenceEngine, exact_candidates, next_key, select
+
 def load_known_keys() -> Dict[int, int]:
-    """Load all known keys from the database."""
-    conn = sqlite3.connect('/home/rkh/ladder/db/kh.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT puzzle_id, priv_hex FROM keys WHERE puzzle_id IS NOT NULL ORDER BY puzzle_id")
-    keys = {}
-    for row in cursor.fetchall():
-        puzzle_id = row[0]
-        priv_hex = row[1]
-        if puzzle_id is not None:
-            keys[int(puzzle_id)] = int(priv_hex, 16)
-    conn.close()
-    return keys
+    """Load all known keys from the shared KeyStore."""
+    return dict(get_keystore().keys)
 
 
 def compute_d_minimizing_m(k: Dict[int, int], n: int) -> Tuple[int, int]:
@@ -35,23 +27,8 @@ def compute_d_minimizing_m(k: Dict[int, int], n: int) -> Tuple[int, int]:
     if n not in k or (n-1) not in k:
         return (-1, -1)
 
-    numerator = 2 * k[n-1] + (2**n) - k[n]
-    
-    best_d = -1
-    best_m = None
-
-    for d in range(1, n):
-        if d not in k:
-            continue
-        if k[d] == 0:
-            continue
-        if numerator % k[d] == 0:
-            m = numerator // k[d]
-            if best_m is None or abs(m) < abs(best_m):
-                best_d = d
-                best_m = m
-
-    return (best_d, best_m if best_m is not None else -1)
+    best = select(exact_candidates(k, n, positive_m=False), 'min_abs_m')
+    return best if best is not None else (-1, -1)
 
 
 def verify_recurrence(k: Dict[int, int], n: int, d: int, m: int) -> bool:
@@ -65,18 +42,8 @@ def verify_recurrence(k: Dict[int, int], n: int, d: int, m: int) -> bool:
 def analyze_all_keys(k: Dict[int, int]) -> Dict[int, Tuple[int, int, bool]]:
     """Analyze d[n] and m[n] for all known keys."""
     results = {}
-    puzzle_ids = sorted([p for p in k.keys() if p is not None])
-
-    for n in puzzle_ids:
-        if n < 2:
-            continue
-        if (n-1) not in k:
-            continue
-
-        d, m = compute_d_minimizing_m(k, n)
-        if d > 0:
-            valid = verify_recurrence(k, n, d, m)
-            results[n] = (d, m, valid)
+    for n, (d, m) in RecurrenceEngine(k).analyze(rule='min_abs_m', positive_m=False).items():
+        results[n] = (d, m, verify_recurrence(k, n, d, m))
 
     return results
 
@@ -95,42 +62,13 @@ def forward_generate(k_init: Dict[int, int], n_max: int) -> Dict[int, int]:
             print(f"  Cannot compute k[{n}]: k[{n-1}] unknown")
             break
 
-        # Try all possible d values and find valid (d, m, k[n]) tuples
-        candidates = []
-        base = 2 * k[n-1] + (2**n)
-
-        for d in range(1, n):
-            if d not in k or k[d] == 0:
-                continue
-
-            # k[n] = base - m*k[d]
-            # For valid range: 2^(n-1) <= k[n] < 2^n
-            # => 2^(n-1) <= base - m*k[d] < 2^n
-            # => base - 2^n < m*k[d] <= base - 2^(n-1)
-            
-            lower_bound = 2**(n-1)
-            upper_bound = 2**n - 1
-            
-            # m*k[d] must be in range (base - upper_bound, base - lower_bound]
-            min_product = base - upper_bound
-            max_product = base - lower_bound
-            
-            # Find integer m values
-            m_min = (min_product // k[d]) + 1
-            m_max = max_product // k[d]
-            
-            for m in range(max(1, m_min), m_max + 1):
-                k_n = base - m * k[d]
-                if lower_bound <= k_n <= upper_bound:
-                    candidates.append((d, m, k_n))
-
-        if not candidates:
+        # Closed-form m interval per d; pick smallest |m| (d-minimization)
+        step = next_key(k, n, rule='min_abs_m')
+        if step is None:
             print(f"  No valid candidates for k[{n}]")
             break
 
-        # Choose candidate with smallest |m| (d-minimization)
-        best = min(candidates, key=lambda x: abs(x[1]))
-        d, m, k_n = best
+        d, m, k_n = step
         k[n] = k_n
         # print(f"  k[{n}] = {k_n} (d={d}, m={m})")
 
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Log Archive - Streaming, seekable compression for log files
+
+Files are read in fixed-size, line-aligned chunks and each chunk is written
+as an independent gzip member (or zstd frame). The concatenation is still
+an ordinary .gz/.zst file that gzip -d / zstd -d read in one go, but a
+sidecar index (<file>.idx.json) records where every segment starts, how
+long it is, and the first/last log timestamp in it, so readers can seek to
+a segment and decompress only that segment.
+
+Nothing is ever held in memory beyond one chunk, regardless of file size.
+zstd is used when the optional zstandard package is installed.
+
+Usage:
+    from log_archive import compress_file, ArchiveReader
+
+    result = compress_file(Path("daemon.log"), codec="gzip")
+    reader = ArchiveReader(result.path)
+    for entry in reader.iter_entries(start_time="2025-12-19T18:00:00"):
+        ...
+"""
+import gzip
+import json
+import logging
+import re
+import zlib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024          # uncompressed bytes per segment
+INDEX_SUFFIX = ".idx.json"
+CODEC_SUFFIX = {"gzip": ".gz", "zstd": ".zst"}
+
+# "2025-12-19 18:52:21,021 - name - LEVEL - ..." (log_integration formats)
+LINE_RE = re.compile(
+    r'^\[?(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}:\d{2})(?:[,.]\d+)?\]?'
+    r'(?: - (?P<name>[^ ]+) - (?P<level>[A-Z]+) - (?P<message>.*))?'
+)
+
+
+@dataclass
+class Segment:
+    """One independently decompressible member of an archive"""
+    offset: int                   # compressed byte offset
+    length: int                   # compressed byte length
+    raw_offset: int               # uncompressed byte offset
+    raw_length: int
+    first_line: int
+    line_count: int
+    first_ts: Optional[str] = None
+    last_ts: Optional[str] = None
+
+
+@dataclass
+class CompressionResult:
+    path: Path
+    codec: str
+    original_size: int
+    compressed_size: int
+    segments: List[Segment] = field(default_factory=list)
+
+    @property
+    def ratio(self) -> float:
+        return self.compressed_size / self.original_size if self.original_size else 1.0
+
+
+def default_codec() -> str:
+    return "zstd" if ZSTD_AVAILABLE else "gzip"
+
+
+def _compress_member(data: bytes, codec: str, level: int) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    # mtime=0 keeps output reproducible for identical input
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _decompress_member(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data, 16 + zlib.MAX_WBITS)
+
+
+def _line_timestamp(line: bytes) -> Optional[str]:
+    m = LINE_RE.match(line[:64].decode('utf-8', errors='replace'))
+    return f"{m.group(1)}T{m.group(2)}" if m else None
+
+
+def _timestamps(chunk: bytes) -> tuple:
+    """(first, last) timestamp found in a chunk's lines"""
+    lines = chunk.splitlines()
+    first = next((ts for ts in map(_line_timestamp, lines[:50]) if ts), None)
+    last = next((ts for ts in map(_line_timestamp, reversed(lines[-50:])) if ts), None)
+    return first, last
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def compress_file(src: Path, dst: Optional[Path] = None, codec: Optional[str] = None,
+                  level: Optional[int] = None, chunk_size: int = CHUNK_SIZE) -> CompressionResult:
+    """
+    Stream src into a segmented archive and write its index next to it.
+
+    src is read chunk_size bytes at a time, extended to the next newline,
+    so no segment splits a log line.
+    """
+    codec = codec or default_codec()
+    if codec == "zstd" and not ZSTD_AVAILABLE:
+        raise RuntimeError("zstd codec requested but zstandard is not installed")
+    level = level if level is not None else (9 if codec == "gzip" else 10)
+    dst = dst or src.with_name(src.name + CODEC_SUFFIX[codec])
+
+    segments: List[Segment] = []
+    offset = raw_offset = line_no = 0
+    with open(src, 'rb') as f_in, open(dst, 'wb') as f_out:
+        while True:
+            chunk = f_in.read(chunk_size)
+            if not chunk:
+                break
+            if not chunk.endswith(b'\n'):
+                chunk += f_in.readline()
+            member = _compress_member(chunk, codec, level)
+            f_out.write(member)
+
+            lines = chunk.count(b'\n') + (0 if chunk.endswith(b'\n') else 1)
+            first_ts, last_ts = _timestamps(chunk)
+            segments.append(Segment(offset, len(member), raw_offset, len(chunk),
+                                    line_no, lines, first_ts, last_ts))
+            offset += len(member)
+            raw_offset += len(chunk)
+            line_no += lines
+
+    with open(index_path(dst), 'w') as f:
+        json.dump({"codec": codec, "source": src.name, "original_size": raw_offset,
+                   "segments": [asdict(s) for s in segments]}, f)
+    return CompressionResult(dst, codec, raw_offset, offset, segments)
+
+
+class ArchiveReader:
+    """Random access to a segmented archive through its index"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(index_path(self.path)) as f:
+            index = json.load(f)
+        self.codec = index["codec"]
+        self.source = index.get("source", self.path.name)
+        self.segments = [Segment(**s) for s in index["segments"]]
+
+    @staticmethod
+    def has_index(path: Path) -> bool:
+        return index_path(Path(path)).exists()
+
+    def read_segment(self, i: int) -> bytes:
+        seg = self.segments[i]
+        with open(self.path, 'rb') as f:
+            f.seek(seg.offset)
+            return _decompress_member(f.read(seg.length), self.codec)
+
+    def segments_between(self, start_time: Optional[str] = None,
+                         end_time: Optional[str] = None) -> List[int]:
+        """Segments that may hold lines in [start_time, end_time] (ISO strings)"""
+        keep = []
+        for i, seg in enumerate(self.segments):
+            if start_time and seg.last_ts and seg.last_ts < start_time[:19]:
+                continue
+            if end_time and seg.first_ts and seg.first_ts > end_time[:19]:
+                continue
+            keep.append(i)
+        return keep
+
+    def iter_lines(self, segments: Optional[List[int]] = None) -> Iterator[str]:
+        for i in (range(len(self.segments)) if segments is None else segments):
+            yield from self.read_segment(i).decode('utf-8', errors='replace').splitlines()
+
+    def iter_entries(self, start_time: Optional[str] = None, end_time: Optional[str] = None,
+                     level: Optional[str] = None,
+                     logger_name: Optional[str] = None) -> Iterator[Dict[str, str]]:
+        """Parsed log lines matching the filters, decompressing only candidate segments"""
+        for line in self.iter_lines(self.segments_between(start_time, end_time)):
+            m = LINE_RE.match(line)
+            if not m:
+                continue
+            ts = f"{m.group(1)}T{m.group(2)}"
+            if (start_time and ts < start_time[:19]) or (end_time and ts > end_time[:19]):
+                continue
+            if level and m.group('level') != level:
+                continue
+            if logger_name and logger_name not in (m.group('name') or ''):
+                continue
+            yield {
+                'timestamp': ts,
+                'level': m.group('level'),
+                'logger_name': m.group('name'),
+                'message': m.group('message') if m.group('message') is not None else line,
+                'source': str(self.path),
+            }
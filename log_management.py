@@ -5,7 +5,6 @@ Handles log compression, archiving, database storage, and token usage monitoring
 """
 
 import os
-import gzip
 import shutil
 import sqlite3
 import logging
@@ -18,8 +17,13 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from collections import defaultdict
 import hashlib
+import atexit
+import queue
 
 from token_manager import get_token_manager, TokenManager
+from utils.fts import ensure_fts, match_query
+from log_archive import ArchiveReader, CHUNK_SIZE, INDEX_SUFFIX, compress_file, index_path
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging for this module
 logger = logging.getLogger(__name__)
@@ -32,9 +36,127 @@ class LogConfig:
     compression_threshold_days: int = 1
     archive_threshold_days: int = 30
     db_batch_size: int = 1000
+    db_flush_interval_ms: int = 250
+    db_queue_size: int = 10000
     token_monitoring_enabled: bool = True
     max_tokens_per_hour: int = 100000
     compression_ratio_target: float = 0.1  # Target 90% compression
+    compression_codec: str = "gzip"  # or "zstd" (needs zstandard)
+    compression_workers: int = 4
+    compression_chunk_size: int = CHUNK_SIZE
+
+class LogWriter:
+    """
+    Background writer for system_logs rows.
+
+    Records are queued by the caller and written by one thread in a single
+    WAL-mode transaction per batch (db_batch_size rows or
+    db_flush_interval_ms, whichever comes first). Duplicates are dropped by
+    INSERT OR IGNORE on the UNIQUE log_hash column. When the queue is full
+    new rows are dropped and counted rather than blocking the caller.
+    """
+
+    _STOP = object()
+
+    def __init__(self, db_path: str, batch_size: int = 1000,
+                 flush_interval_ms: int = 250, queue_size: int = 10000):
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, row: tuple) -> bool:
+        """Queue one system_logs row; False if it was dropped"""
+        if self._closed:
+            self.dropped += 1
+            return False
+        try:
+            self.queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self, timeout: float = None):
+        """Block until everything queued so far is written"""
+        if self._thread.is_alive():
+            done = threading.Event()
+            try:
+                self.queue.put(done, timeout=timeout)
+            except queue.Full:
+                return
+            done.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Write what is queued and stop the thread"""
+        if self._closed:
+            return
+        self._closed = True
+        # A dead writer never drains the queue, so neither put nor join could return
+        if not self._thread.is_alive():
+            return
+        try:
+            self.queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            logger.error(f"Log writer did not drain its queue; dropping {self.queue.qsize()} rows")
+            return
+        self._thread.join()
+
+    def _write(self, conn: sqlite3.Connection, rows: List[tuple]):
+        try:
+            with conn:
+                conn.executemany('''
+                    INSERT OR IGNORE INTO system_logs (
+                        timestamp, level, logger_name, message, module, function,
+                        line_number, exception_info, extra_data, log_hash, token_count
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+            self.written += len(rows)
+            self.batches += 1
+        except Exception as e:
+            logger.error(f"Failed to store {len(rows)} logs in database: {e}")
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        stop = False
+        while not stop:
+            rows: List[tuple] = []
+            waiters: List[threading.Event] = []
+            item = self.queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is self._STOP:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    # flush() marker: write now, then release the caller
+                    waiters.append(item)
+                    break
+                rows.append(item)
+                if len(rows) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if rows:
+                self._write(conn, rows)
+            for event in waiters:
+                event.set()
+        conn.close()
+
 
 class LogManager:
     """Advanced log management system with compression, archiving, and database storage"""
@@ -47,6 +169,8 @@ class LogManager:
         self.token_usage_hourly = defaultdict(int)
         self.compression_stats = defaultdict(int)
         self._init_database()
+        self.writer = LogWriter(self.db_path, self.config.db_batch_size,
+                                self.config.db_flush_interval_ms, self.config.db_queue_size)
         self._start_background_tasks()
         
         logger.info(f"LogManager initialized with database: {self.db_path}")
@@ -56,6 +180,7 @@ class LogManager:
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         
         conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
         cur = conn.cursor()
         
         # Main logs table - stores important logs in database
@@ -130,6 +255,10 @@ class LogManager:
         cur.execute('CREATE INDEX IF NOT EXISTS idx_logs_logger ON system_logs(logger_name)')
         cur.execute('CREATE INDEX IF NOT EXISTS idx_token_usage_timestamp ON token_usage(timestamp)')
         cur.execute('CREATE INDEX IF NOT EXISTS idx_compression_stats_timestamp ON compression_stats(timestamp)')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_logs_level_logger_time ON system_logs(level, logger_name, timestamp)')
+        
+        # Full-text index over messages, kept in sync by triggers
+        ensure_fts(conn, 'system_logs', ['message', 'exception_info'])
         
         conn.commit()
         conn.close()
@@ -149,39 +278,32 @@ class LogManager:
         maintenance_thread.start()
     
     def store_log_in_db(self, record: logging.LogRecord, extra_data: Dict = None):
-        """Store important log entries in database for efficient querying"""
+        """
+        Store important log entries in database for efficient querying.
+
+        The row is built here and written by the background LogWriter; call
+        flush() to wait for it.
+        """
         try:
+            message = record.getMessage()
+
             # Calculate log hash for deduplication
-            log_content = f"{record.created}:{record.levelname}:{record.getMessage()}"
+            log_content = f"{record.created}:{record.levelname}:{message}"
             log_hash = hashlib.md5(log_content.encode()).hexdigest()
             
             # Count tokens in the log message
-            token_count = self.token_manager.count_tokens(record.getMessage())
-            
-            conn = sqlite3.connect(self.db_path)
-            cur = conn.cursor()
-            
-            # Check if log already exists
-            cur.execute('SELECT id FROM system_logs WHERE log_hash = ?', (log_hash,))
-            if cur.fetchone():
-                conn.close()
-                return
+            token_count = self.token_manager.count_tokens(message)
             
             # Extract exception info if present
             exception_info = None
             if record.exc_info:
                 exception_info = logging.Formatter().formatException(record.exc_info)
             
-            cur.execute('''
-                INSERT INTO system_logs (
-                    timestamp, level, logger_name, message, module, function,
-                    line_number, exception_info, extra_data, log_hash, token_count
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            self.writer.put((
                 datetime.fromtimestamp(record.created).isoformat(),
                 record.levelname,
                 record.name,
-                record.getMessage(),
+                message,
                 record.module,
                 record.funcName,
                 record.lineno,
@@ -191,15 +313,16 @@ class LogManager:
                 token_count
             ))
             
-            conn.commit()
-            conn.close()
-            
             # Update token usage tracking
             if self.config.token_monitoring_enabled:
                 self._track_token_usage('log_storage', token_count)
             
         except Exception as e:
             logger.error(f"Failed to store log in database: {e}")
+
+    def flush(self, timeout: float = None):
+        """Wait until queued log records are in the database"""
+        self.writer.flush(timeout)
     
     def track_token_usage(self, operation: str, prompt_tokens: int, 
                          response_tokens: int = 0, model_name: str = None,
@@ -264,44 +387,55 @@ class LogManager:
         try:
             log_dir = Path(".")
             current_time = datetime.now()
+            jobs = []
             
             for log_file in log_dir.glob("*.log"):
                 if log_file.is_file():
                     file_age = current_time - datetime.fromtimestamp(log_file.stat().st_mtime)
                     
                     if file_age.days >= days_old and not log_file.name.endswith('.gz'):
-                        self._compress_log_file(log_file)
+                        jobs.append((self._compress_log_file, log_file))
             
             # Also compress intelligence reports
             for report_file in log_dir.glob("intelligence_report_*.json"):
+                # The glob also matches the segment indexes of compressed reports
+                if report_file.name.endswith(INDEX_SUFFIX):
+                    continue
                 file_age = current_time - datetime.fromtimestamp(report_file.stat().st_mtime)
                 
                 if file_age.days >= days_old:
-                    self._compress_json_file(report_file)
+                    jobs.append((self._compress_json_file, report_file))
+            
+            # zlib/zstd release the GIL, so a small thread pool compresses in parallel
+            with ThreadPoolExecutor(max_workers=max(1, self.config.compression_workers)) as pool:
+                list(pool.map(lambda job: job[0](job[1]), jobs))
             
             logger.info(f"Completed compression of logs older than {days_old} days")
             
         except Exception as e:
             logger.error(f"Error during log compression: {e}")
     
+    def _compress_file(self, file_path: Path):
+        """Stream file_path into a segmented, indexed archive (see log_archive)"""
+        return compress_file(file_path, codec=self.config.compression_codec,
+                             chunk_size=self.config.compression_chunk_size)
+
+    @staticmethod
+    def _discard_archive(compressed_path: Path):
+        compressed_path.unlink()
+        index_path(compressed_path).unlink(missing_ok=True)
+
     def _compress_log_file(self, file_path: Path):
         """Compress a single log file"""
         try:
-            original_size = file_path.stat().st_size
-            
-            # Create compressed version
-            compressed_path = file_path.with_suffix(file_path.suffix + '.gz')
-            
-            with open(file_path, 'rb') as f_in:
-                with gzip.open(compressed_path, 'wb', compresslevel=9) as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            
-            compressed_size = compressed_path.stat().st_size
-            compression_ratio = compressed_size / original_size
+            result = self._compress_file(file_path)
+            original_size = result.original_size
+            compressed_size = result.compressed_size
+            compression_ratio = result.ratio
             
             # Store compression statistics
             self._store_compression_stats(str(file_path), original_size, 
-                                         compressed_size, compression_ratio, 'gzip')
+                                         compressed_size, compression_ratio, result.codec)
             
             # Remove original file if compression was successful
             if compression_ratio < 0.5:  # At least 50% compression
@@ -309,36 +443,29 @@ class LogManager:
                 logger.info(f"Compressed {file_path.name}: {original_size} -> {compressed_size} bytes "
                           f"({compression_ratio:.1%} ratio)")
             else:
-                compressed_path.unlink()  # Remove compressed version if not effective
+                self._discard_archive(result.path)  # Remove compressed version if not effective
                 logger.warning(f"Compression not effective for {file_path.name}, keeping original")
             
         except Exception as e:
             logger.error(f"Failed to compress {file_path}: {e}")
     
     def _compress_json_file(self, file_path: Path):
-        """Compress JSON intelligence reports"""
+        """Compress JSON intelligence reports (streamed as-is, never loaded whole)"""
         try:
-            # Read and re-serialize JSON for better compression
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            
-            # Create compressed version
-            compressed_path = file_path.with_suffix(file_path.suffix + '.gz')
-            
-            with gzip.open(compressed_path, 'wt', compresslevel=9) as f:
-                json.dump(data, f, separators=(',', ':'), sort_keys=True)
-            
-            original_size = file_path.stat().st_size
-            compressed_size = compressed_path.stat().st_size
-            compression_ratio = compressed_size / original_size
+            result = self._compress_file(file_path)
+            original_size = result.original_size
+            compressed_size = result.compressed_size
+            compression_ratio = result.ratio
             
             self._store_compression_stats(str(file_path), original_size, 
-                                         compressed_size, compression_ratio, 'json_gzip')
+                                         compressed_size, compression_ratio, f'json_{result.codec}')
             
             # Remove original if compression was successful
             if compression_ratio < 0.3:  # JSON can compress very well
                 file_path.unlink()
                 logger.info(f"Compressed JSON {file_path.name}: {original_size} -> {compressed_size} bytes")
+            else:
+                self._discard_archive(result.path)
             
         except Exception as e:
             logger.error(f"Failed to compress JSON file {file_path}: {e}")
@@ -394,13 +521,15 @@ class LogManager:
             log_dir = Path(".")
             archived_count = 0
             
-            for log_file in log_dir.glob("*.log.gz"):
+            for log_file in self._compressed_logs(log_dir):
                 file_age = current_time - datetime.fromtimestamp(log_file.stat().st_mtime)
                 
                 if file_age.days >= days_old:
-                    # Move to archive directory
+                    # Move to archive directory (with its segment index)
                     archive_path = archive_subdir / log_file.name
                     shutil.move(str(log_file), str(archive_path))
+                    if index_path(log_file).exists():
+                        shutil.move(str(index_path(log_file)), str(index_path(archive_path)))
                     archived_count += 1
                     
                     # Update database records
@@ -410,8 +539,8 @@ class LogManager:
             archive_metadata = {
                 'archive_date': archive_date,
                 'archived_files': archived_count,
-                'total_size_mb': sum(f.stat().st_size for f in archive_subdir.glob("*.gz")) / (1024 * 1024),
-                'compression_method': 'gzip',
+                'total_size_mb': sum(f.stat().st_size for f in self._compressed_logs(archive_subdir)) / (1024 * 1024),
+                'compression_method': self.config.compression_codec,
                 'retention_policy': f"Keep for {days_old} days before archiving"
             }
             
@@ -423,6 +552,11 @@ class LogManager:
         except Exception as e:
             logger.error(f"Error during log archiving: {e}")
     
+    @staticmethod
+    def _compressed_logs(directory: Path) -> List[Path]:
+        """*.log.gz and *.log.zst files in directory"""
+        return sorted(list(directory.glob("*.log.gz")) + list(directory.glob("*.log.zst")))
+
     def _mark_as_archived(self, file_path: str):
         """Mark logs as archived in database"""
         try:
@@ -454,11 +588,12 @@ class LogManager:
             removed_count = 0
             
             # Clean up old compressed logs
-            for log_file in Path(".").glob("*.log.gz"):
+            for log_file in self._compressed_logs(Path(".")):
                 file_age = current_time - datetime.fromtimestamp(log_file.stat().st_mtime)
                 
                 if file_age.days >= days_old:
                     log_file.unlink()
+                    index_path(log_file).unlink(missing_ok=True)
                     removed_count += 1
             
             # Clean up old archives
@@ -615,37 +750,59 @@ class LogManager:
     
     def query_logs(self, level: str = None, logger_name: str = None, 
                   start_time: str = None, end_time: str = None,
-                  limit: int = 100) -> List[Dict[str, Any]]:
-        """Query logs from database"""
+                  limit: int = 100, include_archived: bool = False,
+                  text: str = None) -> List[Dict[str, Any]]:
+        """
+        Query logs from database.
+
+        With text, only messages matching it (FTS5) are returned, best BM25
+        match first. With include_archived, compressed log files that have a
+        segment index fill the remaining rows; only segments overlapping the
+        time range are decompressed.
+        """
+        self.flush()
         try:
             conn = sqlite3.connect(self.db_path)
             cur = conn.cursor()
             
-            query = '''
-                SELECT timestamp, level, logger_name, message, module, 
-                       function, line_number, exception_info, extra_data
-                FROM system_logs
-                WHERE 1=1
+            columns = '''
+                SELECT t.timestamp, t.level, t.logger_name, t.message, t.module,
+                       t.function, t.line_number, t.exception_info, t.extra_data
             '''
-            params = []
+            match = match_query(text) if text else None
+            if match:
+                query = columns + '''
+                    FROM system_logs_fts JOIN system_logs t ON t.id = system_logs_fts.rowid
+                    WHERE system_logs_fts MATCH ?
+                '''
+                params = [match]
+            else:
+                query = columns + '''
+                    FROM system_logs t
+                    WHERE 1=1
+                '''
+                params = []
             
             if level:
-                query += ' AND level = ?'
+                query += ' AND t.level = ?'
                 params.append(level)
             
             if logger_name:
-                query += ' AND logger_name LIKE ?'
+                query += ' AND t.logger_name LIKE ?'
                 params.append(f'%{logger_name}%')
             
             if start_time:
-                query += ' AND timestamp >= ?'
+                query += ' AND t.timestamp >= ?'
                 params.append(start_time)
             
             if end_time:
-                query += ' AND timestamp <= ?'
+                query += ' AND t.timestamp <= ?'
                 params.append(end_time)
             
-            query += ' ORDER BY timestamp DESC LIMIT ?'
+            if match:
+                query += ' ORDER BY bm25(system_logs_fts) LIMIT ?'
+            else:
+                query += ' ORDER BY t.timestamp DESC LIMIT ?'
             params.append(limit)
             
             cur.execute(query, params)
@@ -667,12 +824,43 @@ class LogManager:
                     'extra_data': json.loads(row[8]) if row[8] else None
                 })
             
+            if include_archived and len(logs) < limit:
+                logs.extend(self.query_archived_logs(level, logger_name, start_time,
+                                                     end_time, limit - len(logs), text))
+            
             return logs
             
         except Exception as e:
             logger.error(f"Failed to query logs: {e}")
             return []
 
+    def query_archived_logs(self, level: str = None, logger_name: str = None,
+                            start_time: str = None, end_time: str = None,
+                            limit: int = 100, text: str = None) -> List[Dict[str, Any]]:
+        """Matching lines from indexed archives, newest files first"""
+        terms = [t.lower() for t in text.split()] if text else []
+        paths = self._compressed_logs(Path("."))
+        archive_dir = Path("archives")
+        if archive_dir.exists():
+            for subdir in archive_dir.glob("logs_archive_*"):
+                paths.extend(self._compressed_logs(subdir))
+        paths = [p for p in paths if ArchiveReader.has_index(p)]
+        paths.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+
+        results = []
+        for path in paths:
+            try:
+                reader = ArchiveReader(path)
+                for entry in reader.iter_entries(start_time, end_time, level, logger_name):
+                    if terms and not all(t in entry['message'].lower() for t in terms):
+                        continue
+                    results.append(entry)
+                    if len(results) >= limit:
+                        return results
+            except Exception as e:
+                logger.error(f"Failed to read archive {path}: {e}")
+        return results
+
 # Global log manager instance
 _log_manager = None
 
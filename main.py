@@ -55,11 +55,15 @@ async def run_single_goal(goal: str):
 
 def run_rag_index():
     """Index all data for RAG"""
-    from vector_store import VectorStore
+    from vector_store import VectorStore, DEFAULT_FILE_PATTERNS
     base_dir = os.path.dirname(os.path.abspath(__file__))
 
     store = VectorStore(os.path.join(base_dir, "rag/vectors"))
 
+    # Index findings, task files and responses (only new/changed files)
+    stats = store.index_paths(DEFAULT_FILE_PATTERNS, base_dir)
+    print(f"Indexed files: {stats['updated']} new/changed, {stats['unchanged']} unchanged")
+
     # Index training data
     training_path = os.path.join(base_dir, "data/training_data.json")
     if os.path.exists(training_path):
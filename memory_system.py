@@ -10,6 +10,8 @@ import os
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from utils.fts import ensure_fts, search
+
 class MemorySystem:
     def __init__(self, db_path='memory.db'):
         self.db_path = db_path
@@ -89,6 +91,13 @@ class MemorySystem:
             CREATE INDEX IF NOT EXISTS idx_intelligence_reports_timestamp
             ON intelligence_reports(timestamp)
         ''')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_discoveries_category ON discoveries(category, verified)')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_learnings_topic ON learnings(topic, confidence)')
+
+        # Full-text indexes, kept in sync by triggers
+        ensure_fts(conn, 'discoveries', ['title', 'content', 'tags'])
+        ensure_fts(conn, 'learnings', ['topic', 'insight'])
+        ensure_fts(conn, 'conversations', ['content'])
 
         conn.commit()
         conn.close()
@@ -325,6 +334,47 @@ class MemorySystem:
 
         return learnings
 
+    def search_discoveries(self, text: str, verified_only: bool = False,
+                           limit: int = 20) -> List[Dict]:
+        """Discoveries matching text, best BM25 match first"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = search(conn, 'discoveries', text,
+                          ['timestamp', 'category', 'title', 'content', 'tags', 'verified'],
+                          where='t.verified = 1' if verified_only else None, limit=limit)
+        finally:
+            conn.close()
+
+        return [{
+            'timestamp': row[0],
+            'category': row[1],
+            'title': row[2],
+            'content': row[3],
+            'tags': json.loads(row[4]) if row[4] else [],
+            'verified': bool(row[5]),
+            'score': row[6]
+        } for row in rows]
+
+    def search_learnings(self, text: str, min_confidence: float = 0.0,
+                         limit: int = 20) -> List[Dict]:
+        """Learnings matching text, best BM25 match first"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = search(conn, 'learnings', text,
+                          ['timestamp', 'topic', 'insight', 'confidence', 'source'],
+                          where='t.confidence >= ?', params=[min_confidence], limit=limit)
+        finally:
+            conn.close()
+
+        return [{
+            'timestamp': row[0],
+            'topic': row[1],
+            'insight': row[2],
+            'confidence': row[3],
+            'source': row[4],
+            'score': row[5]
+        } for row in rows]
+
     def build_context_summary(self) -> str:
         """Build a context summary for the AI model"""
         # Get recent progress
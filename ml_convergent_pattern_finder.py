@@ -14,6 +14,8 @@ need to find the input formula.
 import numpy as np
 from itertools import combinations, product
 
+from utils.convergents import partial_quotients
+
 # m-sequence
 m_seq = {
     2: 3, 3: 7, 4: 22, 5: 27, 6: 57, 7: 150, 8: 184, 9: 493,
@@ -22,20 +24,13 @@ m_seq = {
 }
 
 def continued_fraction_pi(max_terms=40):
-    cf = [3, 7, 15, 1, 292, 1, 1, 1, 2, 1, 3, 1, 14, 2, 1, 1, 2, 2, 2, 2,
-          1, 84, 2, 1, 1, 15, 3, 13, 1, 4, 2, 6, 6, 1, 1, 1, 8, 1, 1, 3]
-    return cf[:max_terms]
+    return partial_quotients('pi', max_terms)
 
 def continued_fraction_e(max_terms=50):
-    cf = [2]
-    for k in range(1, max_terms):
-        cf.extend([1, 2*k, 1])
-        if len(cf) >= max_terms:
-            break
-    return cf[:max_terms]
+    return partial_quotients('e', max_terms)
 
 def continued_fraction_phi(max_terms=50):
-    return [1] * max_terms
+    return partial_quotients('phi', max_terms)
 
 def convergents_from_cf(cf):
     convergents = []
@@ -5,14 +5,13 @@ Provides unified interface for calling Ollama models with model selection and to
 """
 import os
 import json
-import aiohttp
-import asyncio
 from typing import Dict, Optional, List
 from datetime import datetime
 import logging
 
 # Import token manager
 from token_manager import get_token_manager, TokenManager
+from utils.llm_transport import get_transport
 
 logger = logging.getLogger(__name__)
 
@@ -27,23 +26,14 @@ class OllamaClient:
     async def list_models(self) -> List[Dict]:
         """List available models from Ollama"""
         try:
-            async with aiohttp.ClientSession() as session:
-                headers = {}
-                if self.api_key:
-                    headers["Authorization"] = f"Bearer {self.api_key}"
-                
-                async with session.get(
-                    f"{self.base_url}/api/tags",
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data.get('models', [])
-                    else:
-                        error_text = await response.text()
-                        print(f"Error listing models: {response.status} - {error_text}")
-                        return []
+            response = await get_transport().get(
+                f"{self.base_url}/api/tags", api_key=self.api_key, timeout=30
+            )
+            if response.status == 200:
+                return response.json().get('models', [])
+            else:
+                print(f"Error listing models: {response.status} - {response.text}")
+                return []
         except Exception as e:
             print(f"Error connecting to Ollama: {e}")
             return []
@@ -70,45 +60,35 @@ class OllamaClient:
                     logger.warning(f"System prompt too large: {system_tokens} tokens")
                     system = token_manager.optimize_prompt(system, max_tokens=max_tokens * 0.15)
             
-            async with aiohttp.ClientSession() as session:
-                headers = {"Content-Type": "application/json"}
-                if self.api_key:
-                    headers["Authorization"] = f"Bearer {self.api_key}"
-                
-                payload = {
-                    "model": model,
-                    "prompt": prompt,
-                    "system": system,
-                    "options": {
-                        "temperature": temperature,
-                        "num_predict": max_tokens
-                    },
-                    "stream": False
-                }
-                
-                async with session.post(
-                    f"{self.base_url}/api/generate",
-                    headers=headers,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=self.timeout)
-                ) as response:
-                    if response.status == 200:
-                        text_response = await response.text()
-                        try:
-                            result = json.loads(text_response)
-                            response_text = result.get('response', '')
-                            
-                            # Monitor token usage
-                            usage_info = token_manager.monitor_token_usage(
-                                prompt, response_text, f"generate_{model}"
-                            )
-                            
-                            return response_text
-                        except json.JSONDecodeError:
-                            return text_response
-                    else:
-                        error_text = await response.text()
-                        return f"Error: {response.status} - {error_text}"
+            payload = {
+                "model": model,
+                "prompt": prompt,
+                "system": system,
+                "options": {
+                    "temperature": temperature,
+                    "num_predict": max_tokens
+                },
+                "stream": False
+            }
+
+            response = await get_transport().post(
+                f"{self.base_url}/api/generate", payload,
+                api_key=self.api_key, timeout=self.timeout
+            )
+            if response.status == 200:
+                try:
+                    response_text = response.json().get('response', '')
+
+                    # Monitor token usage
+                    usage_info = token_manager.monitor_token_usage(
+                        prompt, response_text, f"generate_{model}"
+                    )
+
+                    return response_text
+                except json.JSONDecodeError:
+                    return response.text
+            else:
+                return f"Error: {response.status} - {response.text}"
         except Exception as e:
             logger.error(f"Error generating response: {str(e)}")
             return f"Error generating response: {str(e)}"
@@ -128,46 +108,36 @@ class OllamaClient:
                 optimized_tokens = token_manager.count_tokens_in_messages(messages)
                 logger.info(f"Optimized messages from {original_tokens} to {optimized_tokens} tokens")
             
-            async with aiohttp.ClientSession() as session:
-                headers = {"Content-Type": "application/json"}
-                if self.api_key:
-                    headers["Authorization"] = f"Bearer {self.api_key}"
-                
-                payload = {
-                    "model": model,
-                    "messages": messages,
-                    "temperature": temperature,
-                    "max_tokens": max_tokens,
-                    "stream": False
-                }
-                
-                async with session.post(
-                    f"{self.base_url}/api/chat",
-                    headers=headers,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=self.timeout)
-                ) as response:
-                    if response.status == 200:
-                        # Handle both JSON and text/plain responses (Ollama sometimes returns text/plain)
-                        text_response = await response.text()
-                        try:
-                            result = json.loads(text_response)
-                            response_text = result.get('message', {}).get('content', '')
-                        except json.JSONDecodeError:
-                            # If not valid JSON, use raw text
-                            response_text = text_response
-
-                        # Monitor token usage
-                        # Reconstruct full prompt from messages for monitoring
-                        full_prompt = '\n'.join([msg.get('content', '') for msg in messages])
-                        usage_info = token_manager.monitor_token_usage(
-                            full_prompt, response_text, f"chat_{model}"
-                        )
-
-                        return response_text
-                    else:
-                        error_text = await response.text()
-                        return f"Error: {response.status} - {error_text}"
+            payload = {
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "stream": False
+            }
+
+            response = await get_transport().post(
+                f"{self.base_url}/api/chat", payload,
+                api_key=self.api_key, timeout=self.timeout
+            )
+            if response.status == 200:
+                # Handle both JSON and text/plain responses (Ollama sometimes returns text/plain)
+                try:
+                    response_text = response.json().get('message', {}).get('content', '')
+                except json.JSONDecodeError:
+                    # If not valid JSON, use raw text
+                    response_text = response.text
+
+                # Monitor token usage
+                # Reconstruct full prompt from messages for monitoring
+                full_prompt = '\n'.join([msg.get('content', '') for msg in messages])
+                usage_info = token_manager.monitor_token_usage(
+                    full_prompt, response_text, f"chat_{model}"
+                )
+
+                return response_text
+            else:
+                return f"Error: {response.status} - {response.text}"
         except Exception as e:
             logger.error(f"Error in chat: {str(e)}")
             return f"Error in chat: {str(e)}"
@@ -203,10 +173,11 @@ async def chat_with_ollama(model: str, messages: List[Dict],
     return await client.chat(model, messages, max_tokens, temperature)
 
 # Synchronous wrappers for Flask compatibility
+# (transport.run closes the pooled session before asyncio.run's loop ends)
 def list_ollama_models_sync() -> List[Dict]:
     """Synchronous wrapper to list Ollama models"""
     try:
-        return asyncio.run(list_ollama_models())
+        return get_transport().run(list_ollama_models())
     except Exception as e:
         print(f"Error listing Ollama models: {e}")
         return []
@@ -215,7 +186,7 @@ def generate_with_ollama_sync(model: str, prompt: str, system: str = None,
                              max_tokens: int = 2048, temperature: float = 0.7) -> str:
     """Synchronous wrapper to generate with Ollama"""
     try:
-        return asyncio.run(generate_with_ollama(model, prompt, system, max_tokens, temperature))
+        return get_transport().run(generate_with_ollama(model, prompt, system, max_tokens, temperature))
     except Exception as e:
         return f"Error generating with Ollama: {str(e)}"
 
@@ -223,7 +194,7 @@ def chat_with_ollama_sync(model: str, messages: List[Dict],
                          max_tokens: int = 2048, temperature: float = 0.7) -> str:
     """Synchronous wrapper to chat with Ollama"""
     try:
-        return asyncio.run(chat_with_ollama(model, messages, max_tokens, temperature))
+        return get_transport().run(chat_with_ollama(model, messages, max_tokens, temperature))
     except Exception as e:
         return f"Error chatting with Ollama: {str(e)}"
 
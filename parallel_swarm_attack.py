@@ -18,6 +18,7 @@ import time
 from datetime import datetime
 import os
 import json
+from utils.llm_cache import ollama_run
 
 # Create output directory
 os.makedirs('/home/rkh/ladder/swarm_outputs', exist_ok=True)
@@ -222,12 +223,7 @@ def run_task(name, config):
 
     try:
         start = time.time()
-        result = subprocess.run(
-            ['ollama', 'run', model, prompt],
-            capture_output=True,
-            text=True,
-            timeout=timeout
-        )
+        result = ollama_run(model, prompt, timeout=timeout)
         elapsed = time.time() - start
 
         with open(output_file, 'w') as f:
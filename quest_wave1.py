@@ -17,6 +17,7 @@ from datetime import datetime
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
+from utils.llm_cache import ollama_run
 
 OUTPUT_DIR = Path("swarm_outputs/quest_wave1")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -271,12 +272,7 @@ def query_model(name, model, prompt, timeout=3600):
     start_time = time.time()
 
     try:
-        result = subprocess.run(
-            ["ollama", "run", model, prompt],
-            capture_output=True,
-            text=True,
-            timeout=timeout
-        )
+        result = ollama_run(model, prompt, timeout=timeout)
 
         response = result.stdout.strip()
         elapsed = time.time() - start_time
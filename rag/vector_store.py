@@ -2,159 +2,445 @@
 """
 Vector Store - RAG layer for semantic search over ladder knowledge
 Uses sentence-transformers for embeddings and FAISS for vector search
+
+Neither is imported until first needed: the model is resolved on the first
+embed() through utils/embeddings.py (the shared embedding worker if it is
+running, else a model loaded in this process), and FAISS on the first
+search().
+
+Storage (under store_path) is append-only, so indexing survives restarts
+and only ever embeds content it has not seen before:
+
+    documents.jsonl   one document per line (id, content, metadata,
+                      timestamp, hash = sha256 of the content,
+                      embedder = model name, or "random" for fallback
+                      vectors)
+    embeddings.f32    raw float32 matrix, row i = document i, read through
+                      np.memmap instead of being loaded into memory
+    files.json        absolute path -> (mtime, size, document ids) for
+                      index_paths()
+    ann.faiss         IVF/HNSW index, only once the store outgrows
+                      ann_threshold (a flat index is rebuilt from the
+                      memmap on demand, which is cheaper than storing it)
+
+Documents are embedded in batches (model.encode(list, batch_size=...)) and
+deduplicated by content hash. When an indexed file changes, its new chunks
+are appended and the old ones are left out of search results. Content that
+was stored with fallback vectors (no model available) or by another model
+is embedded again once the model is available, the same way.
+
+A store written by the previous format (index.faiss/.npy + documents.pkl)
+is converted on first load, with its vectors normalised to unit length.
 """
 import os
+import re
+import sys
 import json
+import glob
+import importlib.util
 import sqlite3
 import pickle
-from typing import Dict, List, Optional, Tuple
+import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 
-try:
-    from sentence_transformers import SentenceTransformer
-    import numpy as np
-    EMBEDDINGS_AVAILABLE = True
-except ImportError:
-    EMBEDDINGS_AVAILABLE = False
-    print("Warning: sentence-transformers not installed. Run: pip install sentence-transformers")
-
-try:
+import numpy as np
+
+# utils/ lives in the repo root; rag/ is usually on sys.path by itself
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+# Checked without importing: sentence-transformers (torch) and faiss are only
+# loaded on the first embed() / search(), so importing this module is cheap
+EMBEDDINGS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+FAISS_AVAILABLE = importlib.util.find_spec("faiss") is not None
+# Without faiss: simple numpy search
+
+DOCS_FILE = "documents.jsonl"
+EMBEDDINGS_FILE = "embeddings.f32"
+FILES_MANIFEST = "files.json"
+ANN_INDEX_FILE = "ann.faiss"
+
+BATCH_SIZE = 64
+ANN_THRESHOLD = 50_000            # documents before switching flat -> IVF/HNSW
+CHUNK_CHARS = 2000                # MiniLM only sees ~256 tokens per chunk anyway
+SEARCH_BLOCK = 65_536             # memmap rows per numpy distance block
+FALLBACK_EMBEDDER = "random"      # documents.jsonl embedder of content-seeded vectors
+
+# Terminal control sequences captured in saved `ollama run` output
+ANSI_RE = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]')
+
+# Markdown findings, task files and model responses in the repo root and subdirs
+DEFAULT_FILE_PATTERNS = [
+    "*.md",
+    "findings/**/*.md",
+    "docs/**/*.md",
+    "experiments/**/*.md",
+    "*TASK*.txt",
+    "response_*.txt",
+    "*_response.txt",
+    "result_*.txt",
+    "swarm_outputs/**/*.txt",
+    "swarm_outputs/**/*.md",
+    "quest_outputs/**/*.txt",
+]
+
+
+def _faiss():
     import faiss
-    FAISS_AVAILABLE = True
-except ImportError:
-    FAISS_AVAILABLE = False
-    # Fallback to simple numpy search
+    return faiss
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8', errors='replace')).hexdigest()
+
+
+def chunk_text(text: str, max_chars: int = CHUNK_CHARS) -> List[str]:
+    """Split text on blank lines into chunks of at most ~max_chars"""
+    chunks, current, size = [], [], 0
+    for para in text.split("\n\n"):
+        para = para.strip()
+        if not para:
+            continue
+        while len(para) > max_chars:
+            # A single oversized paragraph (a table, a log dump) is cut hard
+            if current:
+                chunks.append("\n\n".join(current))
+                current, size = [], 0
+            chunks.append(para[:max_chars])
+            para = para[max_chars:]
+        if size + len(para) > max_chars and current:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(para)
+        size += len(para) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
 
 class VectorStore:
     """Vector store for RAG over ladder knowledge"""
 
-    def __init__(self, store_path: str = "rag/vectors", model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, store_path: str = "rag/vectors", model_name: str = "all-MiniLM-L6-v2",
+                 index_type: str = "flat", ann_threshold: int = ANN_THRESHOLD,
+                 batch_size: int = BATCH_SIZE):
+        """
+        index_type: "flat" (exact), "ivf" or "hnsw". The approximate index
+        is only used once the store holds ann_threshold documents and FAISS
+        is installed; below that, or without FAISS, search is exact.
+        """
+        if index_type not in ("flat", "ivf", "hnsw"):
+            raise ValueError(f"index_type must be flat, ivf or hnsw, not {index_type!r}")
         self.store_path = store_path
         self.model_name = model_name
+        self.index_type = index_type
+        self.ann_threshold = ann_threshold
+        self.batch_size = batch_size
         self.embedding_dim = 384  # MiniLM dimension
 
         # Create store directory
         os.makedirs(store_path, exist_ok=True)
 
-        # Initialize embedding model
-        if EMBEDDINGS_AVAILABLE:
-            self.model = SentenceTransformer(model_name)
-        else:
-            self.model = None
+        # The embedding model is resolved on first embed(): the shared
+        # worker (utils/embeddings.py) if it is running, else a local model
+        self._embedder = None
+        self._embedder_resolved = False
+
+        self.docs_path = os.path.join(store_path, DOCS_FILE)
+        self.embeddings_path = os.path.join(store_path, EMBEDDINGS_FILE)
+        self.files_path = os.path.join(store_path, FILES_MANIFEST)
+        self.ann_path = os.path.join(store_path, ANN_INDEX_FILE)
 
         # Initialize or load index
-        self.index = None
+        self.index = None                 # FAISS index over the memmap, built lazily
         self.documents: List[Dict] = []
+        self.hashes: Dict[str, int] = {}  # content hash -> document id
+        self.files: Dict[str, Dict] = {}
+        self._stale: set = set()          # ids of replaced chunks and re-embedded content
+        self._matrix = None
         self._load_or_create_index()
 
-    def _load_or_create_index(self):
-        """Load existing index or create new one"""
-        index_path = os.path.join(self.store_path, "index.faiss")
-        docs_path = os.path.join(self.store_path, "documents.pkl")
-
-        if os.path.exists(index_path) and os.path.exists(docs_path):
-            # Load existing
-            if FAISS_AVAILABLE:
-                self.index = faiss.read_index(index_path)
-            else:
-                self.index = np.load(index_path.replace('.faiss', '.npy'))
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
 
-            with open(docs_path, 'rb') as f:
-                self.documents = pickle.load(f)
+    def _load_or_create_index(self):
+        """Load the append-only store (converting a legacy pickle store once)"""
+        if not os.path.exists(self.docs_path) and \
+                os.path.exists(os.path.join(self.store_path, "documents.pkl")):
+            self._migrate_legacy()
+
+        if os.path.exists(self.docs_path):
+            with open(self.docs_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        doc = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # torn final line from an interrupted append
+                    self.documents.append(doc)
+
+        # A crash between the two appends leaves one file longer than the
+        # other; both are cut back to the rows they have in common.
+        rows = self._embedding_rows()
+        count = min(len(self.documents), rows)
+        if count < len(self.documents):
+            del self.documents[count:]
+            self._rewrite_documents()
+        if count < rows:
+            with open(self.embeddings_path, 'r+b') as f:
+                f.truncate(count * self.embedding_dim * 4)
+
+        self.hashes = {doc["hash"]: doc["id"] for doc in self.documents}
+        if os.path.exists(self.files_path):
+            with open(self.files_path) as f:
+                self.files = json.load(f)
+        self._refresh_stale()
+
+    def _embedding_rows(self) -> int:
+        if not os.path.exists(self.embeddings_path):
+            return 0
+        size = os.path.getsize(self.embeddings_path)
+        if size % (self.embedding_dim * 4):
+            raise ValueError(f"{self.embeddings_path} does not hold {self.embedding_dim}-d "
+                             f"float32 rows (was it built with a different model?)")
+        return size // (self.embedding_dim * 4)
+
+    def _rewrite_documents(self):
+        tmp = self.docs_path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for doc in self.documents:
+                f.write(json.dumps(doc, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.docs_path)
+
+    def _migrate_legacy(self):
+        """Convert index.faiss|index.npy + documents.pkl into the append-only files"""
+        with open(os.path.join(self.store_path, "documents.pkl"), 'rb') as f:
+            legacy = pickle.load(f)
+        vectors = None
+        npy_path = os.path.join(self.store_path, "index.npy")
+        faiss_path = os.path.join(self.store_path, "index.faiss")
+        if os.path.exists(npy_path):
+            vectors = np.load(npy_path)
+        elif FAISS_AVAILABLE and os.path.exists(faiss_path):
+            index = _faiss().read_index(faiss_path)
+            vectors = index.reconstruct_n(0, index.ntotal)
+
+        if vectors is not None and vectors.shape == (len(legacy), self.embedding_dim):
+            vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+            # The old store kept raw model output; new rows are unit length
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.where(norms > 0, norms, 1)
         else:
-            # Create new
-            if FAISS_AVAILABLE:
-                self.index = faiss.IndexFlatL2(self.embedding_dim)
+            vectors = self._embed_batch([doc["content"] for doc in legacy])
+
+        for i, doc in enumerate(legacy):
+            doc["id"] = i
+            doc["hash"] = content_hash(doc["content"])
+        with open(self.embeddings_path, 'wb') as f:
+            f.write(vectors.tobytes())
+        self.documents = legacy
+        self._rewrite_documents()
+        self.documents = []
+        print(f"Converted {len(legacy)} documents from the legacy vector store")
+
+    def _append(self, docs: List[Dict], vectors: np.ndarray):
+        """Append rows to both files (embeddings first, so docs never outrun them)"""
+        with open(self.embeddings_path, 'ab') as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.docs_path, 'a', encoding='utf-8') as f:
+            for doc in docs:
+                f.write(json.dumps(doc, ensure_ascii=False) + "\n")
+        self._matrix = None
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """Read-only (n, dim) float32 memmap over embeddings.f32"""
+        n = len(self.documents)
+        if self._matrix is None or len(self._matrix) != n:
+            if n == 0:
+                self._matrix = np.zeros((0, self.embedding_dim), dtype=np.float32)
             else:
-                self.index = np.zeros((0, self.embedding_dim))
-            self.documents = []
+                self._matrix = np.memmap(self.embeddings_path, dtype=np.float32, mode='r',
+                                         shape=(n, self.embedding_dim))
+        return self._matrix
 
     def _save_index(self):
-        """Save index to disk"""
-        index_path = os.path.join(self.store_path, "index.faiss")
-        docs_path = os.path.join(self.store_path, "documents.pkl")
-
-        if FAISS_AVAILABLE:
-            faiss.write_index(self.index, index_path)
-        else:
-            np.save(index_path.replace('.faiss', '.npy'), self.index)
-
-        with open(docs_path, 'wb') as f:
-            pickle.dump(self.documents, f)
+        """Persist what is not already on disk: the file manifest and any ANN index"""
+        tmp = self.files_path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.files, f)
+        os.replace(tmp, self.files_path)
+
+        if FAISS_AVAILABLE and self._use_ann():
+            self._ensure_index()
+            _faiss().write_index(self.index, self.ann_path)
+
+    # ------------------------------------------------------------------
+    # Embedding and indexing
+    # ------------------------------------------------------------------
+
+    @property
+    def embedder(self):
+        if not self._embedder_resolved:
+            from utils.embeddings import get_embedder
+            self._embedder = get_embedder(self.model_name)
+            self._embedder_resolved = True
+            if self._embedder is None:
+                print("Warning: sentence-transformers not installed. Run: pip install sentence-transformers")
+        return self._embedder
+
+    def _needs_reembed(self, doc_id: int) -> bool:
+        """Stored with fallback vectors or another model, and a model is available now"""
+        embedder = self.documents[doc_id].get("embedder")
+        return embedder not in (None, self.model_name) and self.embedder is not None
 
     def embed(self, text: str) -> np.ndarray:
         """Embed text to vector"""
-        if not self.model:
-            # Fallback: random embedding (not useful, just for structure)
-            return np.random.randn(self.embedding_dim).astype('float32')
-        return self.model.encode(text, convert_to_numpy=True).astype('float32')
-
-    def add_document(self, content: str, metadata: Dict = None):
+        return self._embed_batch([text])[0]
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """(len(texts), dim) float32, unit-normalised"""
+        if not texts:
+            return np.zeros((0, self.embedding_dim), dtype=np.float32)
+        if self.embedder is None:
+            # Fallback: random embedding (not useful, just for structure),
+            # seeded by the content so re-runs produce the same vectors
+            vectors = np.stack([
+                np.random.default_rng(int(content_hash(t)[:16], 16))
+                .standard_normal(self.embedding_dim) for t in texts
+            ]).astype(np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+            return vectors
+        vectors = self.embedder.encode(texts, batch_size=self.batch_size)
+        if vectors.shape[1] != self.embedding_dim:
+            if self.documents:
+                raise ValueError(f"{self.model_name} produces {vectors.shape[1]}-d embeddings, "
+                                 f"but {self.store_path} holds {self.embedding_dim}-d ones")
+            self.embedding_dim = vectors.shape[1]
+        return vectors
+
+    def add_document(self, content: str, metadata: Dict = None) -> int:
         """Add a document to the store"""
-        embedding = self.embed(content)
-
-        # Add to index
-        if FAISS_AVAILABLE:
-            self.index.add(embedding.reshape(1, -1))
-        else:
-            self.index = np.vstack([self.index, embedding]) if len(self.index) > 0 else embedding.reshape(1, -1)
-
-        # Store document
-        doc = {
-            "id": len(self.documents),
-            "content": content,
-            "metadata": metadata or {},
-            "timestamp": datetime.now().isoformat()
-        }
-        self.documents.append(doc)
-
-        return doc["id"]
-
-    def add_documents(self, documents: List[Dict]):
-        """Add multiple documents (batch)"""
+        return self.add_documents([{"content": content, "metadata": metadata}])[0]
+
+    def add_documents(self, documents: List[Dict]) -> List[int]:
+        """
+        Add multiple documents (batch), returning their ids.
+
+        Content already in the store is not embedded again; its existing id
+        is returned instead, unless it was stored with fallback vectors and
+        a model is available now.
+        """
+        ids: List[int] = []
+        new_docs: List[Dict] = []
+        pending: Dict[str, int] = {}
+        now = datetime.now().isoformat()
         for doc in documents:
             content = doc.get("content", "")
-            metadata = doc.get("metadata", {})
-            self.add_document(content, metadata)
-
+            h = content_hash(content)
+            if h in self.hashes and not self._needs_reembed(self.hashes[h]):
+                ids.append(self.hashes[h])
+            elif h in pending:
+                ids.append(pending[h])
+            else:
+                doc_id = len(self.documents) + len(new_docs)
+                pending[h] = doc_id
+                ids.append(doc_id)
+                new_docs.append({
+                    "id": doc_id,
+                    "content": content,
+                    "metadata": doc.get("metadata") or {},
+                    "timestamp": now,
+                    "hash": h,
+                })
+
+        for start in range(0, len(new_docs), self.batch_size * 16):
+            batch = new_docs[start:start + self.batch_size * 16]
+            vectors = self._embed_batch([d["content"] for d in batch])
+            embedder = self.model_name if self.embedder is not None else FALLBACK_EMBEDDER
+            for d in batch:
+                d["embedder"] = embedder
+            self._append(batch, vectors)
+            self.documents.extend(batch)
+            for d in batch:
+                if d["hash"] in self.hashes:
+                    self._stale.add(self.hashes[d["hash"]])
+                self.hashes[d["hash"]] = d["id"]
+
+        return ids
+
+    def _refresh_stale(self):
+        """Chunks of indexed files that a newer version of the file replaced,
+        and documents whose content was embedded again under a newer id"""
+        live = {i for entry in self.files.values() for i in entry["ids"]}
+        self._stale = {doc["id"] for doc in self.documents
+                       if (doc["metadata"].get("path") and doc["id"] not in live)
+                       or self.hashes.get(doc["hash"]) != doc["id"]}
+
+    def index_paths(self, patterns: Iterable[str] = DEFAULT_FILE_PATTERNS,
+                    base_dir: str = ".", chunk_chars: int = CHUNK_CHARS) -> Dict[str, int]:
+        """
+        Index text files matching glob patterns (relative to base_dir).
+
+        Files whose mtime and size match the manifest are skipped without
+        being read; changed files are re-chunked and only new chunks embedded.
+        """
+        stats = {"files": 0, "unchanged": 0, "updated": 0, "removed": 0, "chunks_added": 0}
+        seen = set()
+        before = len(self.documents)
+        for pattern in patterns:
+            for path in sorted(glob.glob(os.path.join(base_dir, pattern), recursive=True)):
+                key = os.path.abspath(path)
+                if key in seen or not os.path.isfile(path):
+                    continue
+                seen.add(key)
+                stats["files"] += 1
+                st = os.stat(path)
+                entry = self.files.get(key)
+                if entry and entry["mtime"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                    stats["unchanged"] += 1
+                    continue
+
+                with open(path, encoding='utf-8', errors='replace') as f:
+                    chunks = chunk_text(ANSI_RE.sub('', f.read()), chunk_chars)
+                ids = self.add_documents([
+                    {"content": chunk, "metadata": {"type": "file", "chunk": i,
+                                                    "path": os.path.relpath(path, base_dir)}}
+                    for i, chunk in enumerate(chunks)
+                ])
+                self.files[key] = {"mtime": st.st_mtime_ns, "size": st.st_size, "ids": ids}
+                stats["updated"] += 1
+
+        for key in [p for p in self.files if p not in seen and not os.path.exists(p)]:
+            del self.files[key]
+            stats["removed"] += 1
+
+        stats["chunks_added"] = len(self.documents) - before
+        self._refresh_stale()
         self._save_index()
-
-    def search(self, query: str, top_k: int = 5) -> List[Tuple[Dict, float]]:
-        """Search for similar documents"""
-        if len(self.documents) == 0:
-            return []
-
-        query_embedding = self.embed(query).reshape(1, -1)
-
-        if FAISS_AVAILABLE:
-            distances, indices = self.index.search(query_embedding, min(top_k, len(self.documents)))
-            results = []
-            for i, idx in enumerate(indices[0]):
-                if idx >= 0 and idx < len(self.documents):
-                    results.append((self.documents[idx], float(distances[0][i])))
-            return results
-        else:
-            # Simple numpy search
-            distances = np.linalg.norm(self.index - query_embedding, axis=1)
-            indices = np.argsort(distances)[:top_k]
-            return [(self.documents[i], float(distances[i])) for i in indices]
+        return stats
 
     def index_training_data(self, training_data_path: str):
         """Index training data JSON file"""
         with open(training_data_path) as f:
             data = json.load(f)
 
+        docs = []
         for item in data:
             content = f"Q: {item['instruction']}\n"
             if item.get('input'):
                 content += f"Context: {item['input']}\n"
             content += f"A: {item['output']}"
-
-            self.add_document(content, {
+            docs.append({"content": content, "metadata": {
                 "type": "training_example",
                 "instruction": item['instruction']
-            })
+            }})
 
+        self.add_documents(docs)
         self._save_index()
         print(f"Indexed {len(data)} training examples")
 
@@ -162,29 +448,113 @@ class VectorStore:
         """Index memory database (conversations, discoveries, learnings)"""
         conn = sqlite3.connect(memory_db_path)
         cur = conn.cursor()
+        docs = []
 
         # Index discoveries
         cur.execute("SELECT category, title, content FROM discoveries")
         for row in cur.fetchall():
             content = f"Discovery [{row[0]}]: {row[1]}\n{row[2]}"
-            self.add_document(content, {"type": "discovery", "category": row[0]})
+            docs.append({"content": content, "metadata": {"type": "discovery", "category": row[0]}})
 
         # Index learnings
         cur.execute("SELECT topic, insight, confidence FROM learnings")
         for row in cur.fetchall():
             content = f"Learning [{row[0]}] (confidence: {row[2]:.0%}): {row[1]}"
-            self.add_document(content, {"type": "learning", "topic": row[0]})
+            docs.append({"content": content, "metadata": {"type": "learning", "topic": row[0]}})
 
         # Index high-importance progress events
         cur.execute("SELECT event_type, description FROM project_progress WHERE importance >= 7")
         for row in cur.fetchall():
             content = f"Progress [{row[0]}]: {row[1]}"
-            self.add_document(content, {"type": "progress", "event_type": row[0]})
+            docs.append({"content": content, "metadata": {"type": "progress", "event_type": row[0]}})
 
         conn.close()
+        self.add_documents(docs)
         self._save_index()
         print(f"Indexed {len(self.documents)} total documents from memory")
 
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _use_ann(self) -> bool:
+        return self.index_type != "flat" and len(self.documents) >= self.ann_threshold
+
+    def _build_ann(self, matrix: np.ndarray):
+        faiss = _faiss()
+        n, dim = matrix.shape
+        if self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(dim, 32)
+            index.hnsw.efSearch = 64
+        else:
+            nlist = max(1, int(4 * np.sqrt(n)))
+            index = faiss.IndexIVFFlat(faiss.IndexFlatL2(dim), nlist)
+            sample = np.random.default_rng(0).choice(n, size=min(n, nlist * 64), replace=False)
+            index.train(np.ascontiguousarray(matrix[np.sort(sample)]))
+            index.nprobe = min(nlist, 16)
+        return index
+
+    def _ensure_index(self):
+        """Bring the FAISS index up to date with the memmap (FAISS only)"""
+        faiss = _faiss()
+        matrix = self.embeddings
+        want_ann = self._use_ann()
+        is_ann = self.index is not None and not isinstance(self.index, faiss.IndexFlatL2)
+        if self.index is not None and is_ann != want_ann:
+            self.index = None
+        if self.index is None:
+            if want_ann and os.path.exists(self.ann_path):
+                self.index = faiss.read_index(self.ann_path)
+                if self.index.ntotal > len(matrix):
+                    self.index = None
+            if self.index is None:
+                self.index = self._build_ann(matrix) if want_ann \
+                    else faiss.IndexFlatL2(self.embedding_dim)
+        for start in range(self.index.ntotal, len(matrix), SEARCH_BLOCK):
+            self.index.add(np.ascontiguousarray(matrix[start:start + SEARCH_BLOCK]))
+
+    def _numpy_search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact L2 top-k over the memmap, one block of rows at a time"""
+        q = query.reshape(-1)
+        best_d = np.empty(0, dtype=np.float32)
+        best_i = np.empty(0, dtype=np.int64)
+        matrix = self.embeddings
+        for start in range(0, len(matrix), SEARCH_BLOCK):
+            block = np.asarray(matrix[start:start + SEARCH_BLOCK])
+            d = np.sqrt(np.maximum(
+                (block * block).sum(axis=1) - 2 * block @ q + q @ q, 0))
+            best_d = np.concatenate([best_d, d])
+            best_i = np.concatenate([best_i, np.arange(start, start + len(block))])
+            if len(best_d) > k:
+                keep = np.argpartition(best_d, k)[:k]
+                best_d, best_i = best_d[keep], best_i[keep]
+        order = np.argsort(best_d)
+        return best_d[order], best_i[order]
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[Dict, float]]:
+        """Search for similar documents"""
+        if len(self.documents) == 0:
+            return []
+
+        query_embedding = self.embed(query).reshape(1, -1)
+        k = min(top_k + len(self._stale), len(self.documents))
+
+        if FAISS_AVAILABLE:
+            self._ensure_index()
+            distances, indices = self.index.search(query_embedding, k)
+            # IndexFlatL2 and friends return squared distances
+            hits = zip(np.sqrt(np.maximum(distances[0], 0)), indices[0])
+        else:
+            hits = zip(*self._numpy_search(query_embedding, k))
+
+        results = []
+        for distance, idx in hits:
+            if 0 <= idx < len(self.documents) and idx not in self._stale:
+                results.append((self.documents[idx], float(distance)))
+            if len(results) == top_k:
+                break
+        return results
+
     def get_context(self, query: str, max_tokens: int = 2000) -> str:
         """Get relevant context for a query"""
         results = self.search(query, top_k=5)
@@ -237,8 +607,6 @@ ANSWER:"""
 
 # Standalone execution
 if __name__ == "__main__":
-    import sys
-
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     store_path = os.path.join(base_dir, "rag/vectors")
 
@@ -257,6 +625,15 @@ if __name__ == "__main__":
 
         print(f"Total documents indexed: {len(store.documents)}")
 
+    elif len(sys.argv) > 1 and sys.argv[1] == "index-files":
+        # Markdown findings, task files and model responses (incremental)
+        patterns = sys.argv[2:] or DEFAULT_FILE_PATTERNS
+        stats = store.index_paths(patterns, base_dir)
+        print(f"{stats['files']} files: {stats['updated']} (re)indexed, "
+              f"{stats['unchanged']} unchanged, {stats['removed']} removed, "
+              f"{stats['chunks_added']} new chunks")
+        print(f"Total documents indexed: {len(store.documents)}")
+
     elif len(sys.argv) > 1 and sys.argv[1] == "search":
         query = " ".join(sys.argv[2:]) if len(sys.argv) > 2 else "drift constant"
         results = store.search(query)
@@ -268,4 +645,5 @@ if __name__ == "__main__":
     else:
         print("Usage:")
         print("  python vector_store.py index    - Index all training data")
+        print("  python vector_store.py index-files [glob ...]  - Index findings/tasks/responses")
         print("  python vector_store.py search <query>  - Search for documents")
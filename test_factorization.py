@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Check the factorization service's per-value deadline
+
+factor_value() must give up on a value it cannot split and return a
+partial result close to its timeout, so one hard m[n] never blocks a
+pool worker.
+
+Usage:
+    python3 -m pytest test_factorization.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.factorization import factor_value
+
+# 23- and 37-digit primes: out of reach for rho and the early ECM rounds
+P23 = 10000000000000000000009
+Q24 = 300000000000000000000037
+P36 = 100000000000000000000000000000000069
+Q37 = 3000000000000000000000000000000000059
+
+TIMEOUT = 3.0
+MARGIN = 1.0
+
+
+def test_factor_value_respects_timeout_on_hard_semiprimes():
+    """A 46- and a 72-digit semiprime come back as partial results in time."""
+    for n in (P23 * Q24, P36 * Q37):
+        t0 = time.monotonic()
+        factors, cofactors, _ = factor_value(n, timeout=TIMEOUT)
+        elapsed = time.monotonic() - t0
+        assert elapsed < TIMEOUT + MARGIN, f"{len(str(n))} digits took {elapsed:.1f}s"
+        assert factors == {} and cofactors == [n]
+
+
+def test_factor_value_completes_easy_values():
+    """Small factors are still found well within the deadline."""
+    n = 1000000007 * 1000000000039 * 10000000000037 * 2 ** 5
+    factors, cofactors, _ = factor_value(n, timeout=TIMEOUT)
+    assert cofactors == []
+    assert factors == {2: 5, 1000000007: 1, 1000000000039: 1, 10000000000037: 1}
+
+
+if __name__ == "__main__":
+    test_factor_value_respects_timeout_on_hard_semiprimes()
+    test_factor_value_completes_easy_values()
+    print("ALL PASS")
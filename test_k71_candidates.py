@@ -10,7 +10,7 @@ Test k[71] candidates by:
 Target address: 1PWo3JeB9jrGwfHDNpdGK54CRas7fsVzXU
 """
 import json
-import hashlib
+from utils.secp256k1 import privkey_to_address
 
 # Load known k values
 with open('data_for_csolver.json', 'r') as f:
@@ -24,71 +24,6 @@ d_seq = data['d_seq']
 k70 = k_seq[68]
 print(f"k[70] = {k70}")
 
-# secp256k1 parameters
-P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
-G = (0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
-     0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8)
-
-def modinv(a, m):
-    if a < 0:
-        a = a % m
-    g, x, _ = extended_gcd(a, m)
-    if g != 1:
-        raise ValueError("No modular inverse")
-    return x % m
-
-def extended_gcd(a, b):
-    if a == 0:
-        return b, 0, 1
-    g, x, y = extended_gcd(b % a, a)
-    return g, y - (b // a) * x, x
-
-def point_add(p1, p2):
-    if p1 is None:
-        return p2
-    if p2 is None:
-        return p1
-    x1, y1 = p1
-    x2, y2 = p2
-    if x1 == x2:
-        if y1 != y2:
-            return None
-        lam = (3 * x1 * x1) * modinv(2 * y1, P) % P
-    else:
-        lam = (y2 - y1) * modinv(x2 - x1, P) % P
-    x3 = (lam * lam - x1 - x2) % P
-    y3 = (lam * (x1 - x3) - y1) % P
-    return (x3, y3)
-
-def scalar_mult(k, point):
-    result = None
-    addend = point
-    while k:
-        if k & 1:
-            result = point_add(result, addend)
-        addend = point_add(addend, addend)
-        k >>= 1
-    return result
-
-def privkey_to_address(privkey, compressed=True):
-    pubkey = scalar_mult(privkey, G)
-    x, y = pubkey
-    if compressed:
-        prefix = b'\x02' if y % 2 == 0 else b'\x03'
-        pubkey_bytes = prefix + x.to_bytes(32, 'big')
-    else:
-        pubkey_bytes = b'\x04' + x.to_bytes(32, 'big') + y.to_bytes(32, 'big')
-    sha256 = hashlib.sha256(pubkey_bytes).digest()
-    ripemd160 = hashlib.new('ripemd160', sha256).digest()
-    versioned = b'\x00' + ripemd160
-    checksum = hashlib.sha256(hashlib.sha256(versioned).digest()).digest()[:4]
-    alphabet = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
-    n = int.from_bytes(versioned + checksum, 'big')
-    result = ''
-    while n > 0:
-        n, r = divmod(n, 58)
-        result = alphabet[r] + result
-    return result
 
 # Target address
 TARGET = "1PWo3JeB9jrGwfHDNpdGK54CRas7fsVzXU"
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Verify the interval ECDLP solver against solved puzzles
+
+For each known key k[n], derive its public key, hand only the pubkey and
+the range [2^(n-1), 2^n) to the solver and check it recovers k[n].
+Reports expected vs. actual group operations.
+
+Usage:
+    python3 test_kangaroo_solver.py                  # n = 20..40
+    python3 test_kangaroo_solver.py --max-bits 50    # full 20..50 check
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from agents.kangaroo_solver import KangarooSolver
+from utils.keystore import load_known_keys
+from utils.secp256k1 import scalar_mult, encode_point
+
+
+def run_recovery(solver, method, bits):
+    """Recover k[n] for every n in bits; return list of (n, result, ok)."""
+    keys = load_known_keys()
+    rows = []
+    for n in bits:
+        pubkey = encode_point(*scalar_mult(keys[n])).hex()
+        result = solver.solve(pubkey, 2 ** (n - 1), 2 ** n, method=method, **(
+            {'verbose': False} if method == 'kangaroo' else {}))
+        ok = result.found and result.private_key == keys[n]
+        rows.append((n, result, ok))
+        print(f"  n={n:2d} {method:8s} {'PASS' if ok else 'FAIL'}  "
+              f"ops={result.operations:>12,}  expected={result.expected_operations:>12,.0f}  "
+              f"ratio={result.operations / max(1.0, result.expected_operations):.2f}  "
+              f"{result.time_elapsed:7.2f}s")
+    return rows
+
+
+def test_bsgs_recovers_known_keys():
+    """BSGS recovers k[20..30] from their public keys."""
+    with tempfile.TemporaryDirectory() as tmp:
+        solver = KangarooSolver(db_path=os.path.join(tmp, "kangaroo.db"), num_workers=1)
+        rows = run_recovery(solver, 'bsgs', range(20, 31))
+    assert all(ok for _, _, ok in rows)
+
+
+def test_kangaroo_recovers_known_keys():
+    """Kangaroos recover k[20..30] from their public keys."""
+    with tempfile.TemporaryDirectory() as tmp:
+        solver = KangarooSolver(db_path=os.path.join(tmp, "kangaroo.db"), num_workers=2)
+        rows = run_recovery(solver, 'kangaroo', range(20, 31))
+    assert all(ok for _, _, ok in rows)
+
+
+def test_kangaroo_resumes_from_saved_state():
+    """A run stopped by max_operations resumes and still finds the key."""
+    keys = load_known_keys()
+    pubkey = encode_point(*scalar_mult(keys[32])).hex()
+    with tempfile.TemporaryDirectory() as tmp:
+        solver = KangarooSolver(db_path=os.path.join(tmp, "kangaroo.db"), num_workers=1)
+        first = solver.solve_kangaroo(pubkey, 2 ** 31, 2 ** 32, max_operations=20_000, verbose=False)
+        second = solver.solve_kangaroo(pubkey, 2 ** 31, 2 ** 32, verbose=False)
+    assert not first.found or first.private_key == keys[32]
+    assert second.found and second.private_key == keys[32]
+    assert second.operations >= first.operations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recover known keys from their pubkeys")
+    parser.add_argument('--min-bits', type=int, default=20)
+    parser.add_argument('--max-bits', type=int, default=40)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--method', choices=['bsgs', 'kangaroo', 'both'], default='both')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"INTERVAL ECDLP VERIFICATION: k[{args.min_bits}..{args.max_bits}]")
+    print("=" * 80)
+
+    methods = ['bsgs', 'kangaroo'] if args.method == 'both' else [args.method]
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        solver = KangarooSolver(db_path=os.path.join(tmp, "kangaroo.db"), num_workers=args.workers)
+        for method in methods:
+            # BSGS memory grows with sqrt(W); keep it to the smaller puzzles
+            top = min(args.max_bits, 40) if method == 'bsgs' else args.max_bits
+            print(f"\n--- {method} ---")
+            rows = run_recovery(solver, method, range(args.min_bits, top + 1))
+            failures += sum(1 for _, _, ok in rows if not ok)
+
+    print("\n" + "=" * 80)
+    print("ALL PASS" if failures == 0 else f"{failures} FAILURE(S)")
+    print("=" * 80)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,13 +11,18 @@ import json
 import gzip
 import shutil
 import logging
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timedelta
 
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from log_management import get_log_manager, LogConfig, DatabaseLogHandler
+from log_management import get_log_manager, LogConfig, DatabaseLogHandler, LogManager, LogWriter
+from log_archive import INDEX_SUFFIX
 from log_integration import create_integrated_logger, get_system_logger, get_ai_logger
 from token_manager import get_token_manager
 
@@ -323,6 +328,151 @@ def test_performance_and_stress():
     
     return duration
 
+class QuietLogManager(LogManager):
+    """LogManager without the hourly maintenance thread, for isolated tests"""
+
+    def _start_background_tasks(self):
+        pass
+
+
+@contextmanager
+def isolated_log_manager(**config):
+    """A QuietLogManager with its own database, run from a scratch directory"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            manager = QuietLogManager(LogConfig(**config), db_path=os.path.join(tmp, "db", "logs.db"))
+            yield manager
+            manager.writer.close()
+        finally:
+            os.chdir(cwd)
+
+
+def _age(path, days):
+    old = time.time() - days * 86400
+    os.utime(path, (old, old))
+
+
+def test_maintenance_skips_report_indexes():
+    """Repeated maintenance leaves a compressed report and its segment index alone."""
+    with isolated_log_manager() as manager:
+        report = Path("intelligence_report_20251205_120000.json")
+        report.write_text(json.dumps([{"n": i, "analysis": "complete"} for i in range(2000)]))
+        _age(report, 2)
+
+        manager._perform_maintenance()
+        archive = Path(report.name + ".gz")
+        index = Path(archive.name + INDEX_SUFFIX)
+        assert archive.exists() and index.exists() and not report.exists()
+
+        # A day later the index matches the report glob by age as well
+        _age(index, 2)
+        manager._perform_maintenance()
+        assert index.exists()
+        assert not list(Path(".").glob("*" + INDEX_SUFFIX + ".gz*"))
+
+        conn = sqlite3.connect(manager.db_path)
+        rows = conn.execute("SELECT file_path FROM compression_stats").fetchall()
+        conn.close()
+        assert rows == [(str(report),)]
+
+
+def _record(message, level=logging.ERROR):
+    return logging.LogRecord(name="writer_test", level=level, pathname=__file__,
+                             lineno=1, msg=message, args=(), exc_info=None)
+
+
+def _row_count(db_path):
+    conn = sqlite3.connect(db_path)
+    count = conn.execute("SELECT COUNT(*) FROM system_logs").fetchone()[0]
+    conn.close()
+    return count
+
+
+def test_writer_flush_makes_rows_queryable():
+    """Rows wait for the batch interval; flush() writes them for query_logs."""
+    with isolated_log_manager(db_flush_interval_ms=60_000) as manager:
+        for i in range(5):
+            manager.store_log_in_db(_record(f"writer flush test {i}"))
+        assert _row_count(manager.db_path) == 0
+        manager.flush()
+        assert _row_count(manager.db_path) == 5
+        messages = {log['message'] for log in manager.query_logs(logger_name="writer_test")}
+        assert messages == {f"writer flush test {i}" for i in range(5)}
+
+
+def test_writer_ignores_duplicate_log_hash():
+    """The same record stored twice ends up as one row."""
+    with isolated_log_manager() as manager:
+        record = _record("duplicate writer test")
+        manager.store_log_in_db(record)
+        manager.store_log_in_db(record)
+        manager.flush()
+        assert _row_count(manager.db_path) == 1
+
+
+class StalledLogWriter(LogWriter):
+    """LogWriter whose thread only starts draining once release is set"""
+
+    def __init__(self, *args, **kwargs):
+        self.release = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    def _run(self):
+        self.release.wait()
+        super()._run()
+
+
+def test_writer_drops_and_counts_rows_when_full():
+    """put() never blocks: rows beyond the queue size are dropped and counted."""
+    with isolated_log_manager() as manager:
+        writer = StalledLogWriter(manager.db_path, queue_size=3)
+        rows = [(datetime.now().isoformat(), "ERROR", "writer_test", f"full queue {i}",
+                 "test", "test", 1, None, None, f"hash-{i}", 3) for i in range(5)]
+        accepted = [writer.put(row) for row in rows]
+        assert accepted == [True, True, True, False, False]
+        assert writer.dropped == 2
+
+        writer.release.set()
+        writer.flush(timeout=10)
+        writer.close()
+        assert writer.written == 3
+        assert _row_count(manager.db_path) == 3
+
+
+class DeadLogWriter(LogWriter):
+    """LogWriter whose thread exits without ever draining the queue"""
+
+    def _run(self):
+        pass
+
+
+def _rows(count, label):
+    return [(datetime.now().isoformat(), "ERROR", "writer_test", f"{label} {i}",
+             "test", "test", 1, None, None, f"{label}-{i}", 3) for i in range(count)]
+
+
+def test_writer_close_does_not_hang_on_dead_or_stuck_thread():
+    """close() returns promptly when the thread died, or stalls, with a full queue."""
+    with isolated_log_manager() as manager:
+        dead = DeadLogWriter(manager.db_path, queue_size=2)
+        dead._thread.join()
+        assert all(dead.put(row) for row in _rows(2, "dead"))
+        start = time.monotonic()
+        dead.close(timeout=0.5)
+        assert time.monotonic() - start < 1.0
+
+        stuck = StalledLogWriter(manager.db_path, queue_size=2)
+        assert all(stuck.put(row) for row in _rows(2, "stuck"))
+        start = time.monotonic()
+        stuck.close(timeout=0.5)
+        assert time.monotonic() - start < 1.5
+        # Let the thread drain and exit so it does not outlive the temp dir
+        stuck.release.set()
+        stuck.queue.put(stuck._STOP)
+        stuck._thread.join(timeout=10)
+
 def cleanup_test_files():
     """Clean up test files"""
     print("🧹 Cleaning up test files...")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Check the search engine's coverage bookkeeping
+
+merge_intervals / subtract_intervals decide which keys are resumed,
+CoverageTracker advances the low-water mark as chunks finish out of
+order, and ChunkLedger journals searched chunks so a restart resumes
+exactly the uncovered gaps.
+
+Usage:
+    python3 -m pytest test_search_engine.py
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from agents.search_engine import (BitcoinPuzzleSearchEngine, ChunkLedger, CoverageTracker,
+                                  SearchResult, merge_intervals, subtract_intervals)
+from utils.secp256k1 import hash160, privkey_to_pubkey_bytes
+
+# Never flush on size or time unless the test asks for it
+NO_AUTO_FLUSH = dict(flush_every=10 ** 9, flush_seconds=float('inf'))
+
+
+def _engine(tmp: str) -> BitcoinPuzzleSearchEngine:
+    """An engine on a fresh db in tmp, without starting workers or the KeyStore"""
+    engine = object.__new__(BitcoinPuzzleSearchEngine)
+    engine.db_path = os.path.join(tmp, "search_engine.db")
+    engine._init_db()
+    return engine
+
+
+def _ledger_db(tmp: str) -> str:
+    """Create the engine's schema in tmp"""
+    return _engine(tmp).db_path
+
+
+def _progress_rows(db_path: str):
+    """(puzzle_id, current_position, found_key, status) for every search_progress row"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('''SELECT puzzle_id, current_position, found_key, status
+                           FROM search_progress ORDER BY puzzle_id''').fetchall()
+    conn.close()
+    return rows
+
+
+def test_merge_overlapping_and_adjacent_intervals():
+    """Overlapping and touching intervals merge; a one-key gap keeps them apart."""
+    assert merge_intervals([]) == []
+    assert merge_intervals([(10, 20), (15, 30)]) == [(10, 30)]
+    assert merge_intervals([(10, 20), (21, 30)]) == [(10, 30)]
+    assert merge_intervals([(10, 20), (22, 30)]) == [(10, 20), (22, 30)]
+    # Unsorted input, a contained interval and a chain of adjacent ones
+    assert merge_intervals([(40, 41), (0, 9), (3, 4), (10, 10), (11, 15), (42, 50)]) == \
+        [(0, 15), (40, 50)]
+
+
+def test_subtract_intervals_at_the_edges():
+    """Coverage touching, overhanging or missing the range edges leaves the right gaps."""
+    assert subtract_intervals(0, 99, []) == [(0, 99)]
+    assert subtract_intervals(0, 99, [(0, 99)]) == []
+    # Covered exactly at the low and high edge
+    assert subtract_intervals(0, 99, [(0, 9), (90, 99)]) == [(10, 89)]
+    # Overhanging both edges
+    assert subtract_intervals(10, 89, [(0, 19), (80, 120)]) == [(20, 79)]
+    # Entirely outside the range
+    assert subtract_intervals(10, 89, [(0, 9), (90, 99)]) == [(10, 89)]
+    # Single-key gaps at both edges and in the middle
+    assert subtract_intervals(0, 99, [(1, 49), (51, 98)]) == [(0, 0), (50, 50), (99, 99)]
+
+
+def test_coverage_tracker_low_water_across_gaps():
+    """Out-of-order chunks only move the mark once contiguous, and it jumps between gaps."""
+    tracker = CoverageTracker([(100, 199), (300, 399), (500, 599)])
+    assert tracker.low_water == 100
+    assert tracker.add(150, 199) == 100
+    assert tracker.add(100, 149) == 300          # end of first gap jumps to the next
+    assert tracker.add(350, 399) == 300
+    assert tracker.add(500, 549) == 300          # later gap finished early is held
+    assert tracker.add(300, 349) == 550          # two jumps resolve in one add
+    assert tracker.add(550, 599) == 600
+    assert tracker.keys_covered == 300
+    # An empty chunk changes nothing
+    assert tracker.add(10, 9) == 600 and tracker.keys_covered == 300
+
+
+def test_ledger_reopen_after_partial_flush():
+    """Only flushed chunks survive a crash; a reopened ledger resumes the rest."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = _ledger_db(tmp)
+        ledger = ChunkLedger(db_path, 71, **NO_AUTO_FLUSH)
+        ledger.record(0, 99, 0)
+        ledger.record(200, 299, 1)
+        ledger.flush()
+        ledger.record(100, 199, 2)
+        # Buffered chunks already count for this process
+        assert ledger.intervals() == [(0, 299)]
+        # Crash: the connection goes away without flushing the buffer
+        ledger.conn.close()
+
+        ledger = ChunkLedger(db_path, 71, **NO_AUTO_FLUSH)
+        assert ledger.intervals() == [(0, 99), (200, 299)]
+        assert ledger.uncovered(0, 399) == [(100, 199), (300, 399)]
+        assert ledger.coverage(0, 399) == (200, 50.0)
+        # Other puzzles share the table but not the journal
+        other = ChunkLedger(db_path, 72)
+        assert other.intervals() == []
+        other.close()
+
+        ledger.record(100, 199, 2)
+        ledger.close()
+        ledger = ChunkLedger(db_path, 71, **NO_AUTO_FLUSH)
+        assert ledger.compact() == [(0, 299)]
+        rows = ledger.conn.execute(
+            'SELECT COUNT(*) FROM search_chunks WHERE puzzle_id = 71').fetchone()[0]
+        assert rows == 1
+        assert ledger.uncovered(0, 399) == [(300, 399)]
+        ledger.close()
+
+
+def test_progress_never_overwrites_a_solution():
+    """A solution is stored without a progress row, and later checkpoints keep it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = _engine(tmp)
+        result = SearchResult(found=True, private_key=300, address="1Test", keys_checked=100,
+                              time_elapsed=1.0)
+        # Hit before the first checkpoint: no row exists yet
+        engine._record_solution(71, result)
+        assert _progress_rows(engine.db_path) == [(71, None, '300', 'solved')]
+
+        engine._save_progress(72, 200, 100)
+        engine._record_solution(72, result)
+        engine._save_progress(72, 400, 300)
+        assert _progress_rows(engine.db_path)[1] == (72, '400', '300', 'solved')
+
+
+def test_multi_target_hit_is_persisted_without_progress_row():
+    """A sweep hit on a puzzle that was never searched still lands in search_progress."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = _engine(tmp)
+        key = 0x1234567
+        targets = {hash160(privkey_to_pubkey_bytes(key, compressed=True)): 130}
+        hits = engine.search_candidates(range(key - 50, key + 50), targets=targets)
+        assert list(hits) == [130] and hits[130].private_key == key
+        assert _progress_rows(engine.db_path) == [(130, None, str(key), 'solved')]
+
+
+if __name__ == "__main__":
+    test_merge_overlapping_and_adjacent_intervals()
+    test_subtract_intervals_at_the_edges()
+    test_coverage_tracker_low_water_across_gaps()
+    test_ledger_reopen_after_partial_flush()
+    test_progress_never_overwrites_a_solution()
+    test_multi_target_hit_is_persisted_without_progress_row()
+    print("ALL PASS")
@@ -2,10 +2,19 @@
 """
 Token Management System for Autonomous Agents
 Handles token limits, prompt optimization, and intelligent data chunking
+
+Tokenizers are loaded once per encoding and shared by every TokenManager;
+get_token_manager() returns one manager per (model, max_tokens). Exact
+counts are memoized in an LRU keyed by (len, hash) of the text, and texts
+above LARGE_TEXT_BYTES are estimated from a per-model bytes-per-token
+ratio calibrated on the exact counts seen so far.
 """
 import json
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -36,6 +45,88 @@ class TokenBudget:
     response_buffer = 1000
     safety_margin = 500
 
+class SimpleEncoding:
+    """UTF-8 byte 'tokenizer' used when tiktoken is unavailable"""
+    name = "utf-8-bytes"
+
+    def encode(self, text):
+        return list(text.encode('utf-8'))
+
+    def decode(self, tokens):
+        return bytes(tokens).decode('utf-8', errors='ignore')
+
+    def count(self, text):
+        return len(text.encode('utf-8'))
+
+
+# Tokenizer registry: loading a tiktoken encoding is expensive, do it once
+_encodings: Dict[str, Any] = {}
+_encodings_lock = threading.Lock()
+
+
+def _encoding_name(model_name: str) -> str:
+    if not TIKTOKEN_AVAILABLE:
+        return SimpleEncoding.name
+    if 'gpt' in model_name.lower():
+        try:
+            return tiktoken.encoding_name_for_model(model_name)
+        except Exception:
+            pass
+    return "cl100k_base"
+
+
+def get_encoding(model_name: str):
+    """Shared tokenizer for model_name (tiktoken, or UTF-8 bytes as fallback)"""
+    name = _encoding_name(model_name)
+    with _encodings_lock:
+        if name not in _encodings:
+            if name == SimpleEncoding.name:
+                _encodings[name] = SimpleEncoding()
+            else:
+                try:
+                    _encodings[name] = tiktoken.get_encoding(name)
+                except Exception as e:
+                    logger.warning(f"Error getting tiktoken encoding: {e}")
+                    _encodings[name] = SimpleEncoding()
+        return _encodings[name]
+
+
+class TokenCountCache:
+    """Thread-safe LRU of token counts keyed by (encoding, len, hash(text))"""
+
+    def __init__(self, maxsize: int = 8192):
+        self.maxsize = maxsize
+        self._counts: "OrderedDict[Tuple[str, int, int], int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key: Tuple[str, int, int]) -> Optional[int]:
+        with self._lock:
+            count = self._counts.get(key)
+            if count is None:
+                self.misses += 1
+                return None
+            self._counts.move_to_end(key)
+            self.hits += 1
+            return count
+
+    def put(self, key: Tuple[str, int, int], count: int):
+        with self._lock:
+            self._counts[key] = count
+            self._counts.move_to_end(key)
+            if len(self._counts) > self.maxsize:
+                self._counts.popitem(last=False)
+
+
+# Shared by every TokenManager; the key includes the encoding name
+_count_cache = TokenCountCache()
+
+# Texts larger than this are estimated instead of encoded (see count_tokens)
+LARGE_TEXT_BYTES = 64 * 1024
+# Texts smaller than this are too noisy to calibrate bytes-per-token on
+CALIBRATION_MIN_BYTES = 256
+
+
 class TokenManager:
     """Manages token limits and optimizes prompts for AI models"""
     
@@ -43,7 +134,12 @@ class TokenManager:
         self.model_name = model_name
         self.max_tokens = max_tokens or self._get_model_limit(model_name)
         self.encoding = self._get_encoding(model_name)
+        self.encoding_name = getattr(self.encoding, 'name', _encoding_name(model_name))
         self.token_budget = TokenBudget()
+
+        # Running bytes/tokens of exact counts, for count_tokens_approx
+        self._calib_bytes = 0
+        self._calib_tokens = 0
         
         logger.info(f"TokenManager initialized for {model_name} with {self.max_tokens} max tokens")
     
@@ -66,40 +162,61 @@ class TokenManager:
         return TokenLimits.gpt_4  # Default fallback
     
     def _get_encoding(self, model_name: str):
-        """Get appropriate tokenizer encoding"""
-        if not TIKTOKEN_AVAILABLE:
-            # Fallback to simple character counting
-            class SimpleEncoding:
-                def encode(self, text):
-                    return list(text.encode('utf-8'))
-                def decode(self, tokens):
-                    return bytes(tokens).decode('utf-8', errors='ignore')
-            return SimpleEncoding()
-        
-        try:
-            # Try to use tiktoken for OpenAI models
-            if 'gpt' in model_name.lower():
-                return tiktoken.encoding_for_model(model_name)
-            else:
-                # Fallback to cl100k_base for most models
-                return tiktoken.get_encoding("cl100k_base")
-        except Exception as e:
-            logger.warning(f"Error getting tiktoken encoding: {e}")
-            # Final fallback
-            class SimpleEncoding:
-                def encode(self, text):
-                    return list(text.encode('utf-8'))
-                def decode(self, tokens):
-                    return bytes(tokens).decode('utf-8', errors='ignore')
-            return SimpleEncoding()
-    
-    def count_tokens(self, text: str) -> int:
-        """Count tokens in text"""
+        """Get appropriate tokenizer encoding (shared registry)"""
+        return get_encoding(model_name)
+
+    def _count_exact(self, text: str) -> int:
+        """Uncached token count"""
         try:
+            if isinstance(self.encoding, SimpleEncoding):
+                return self.encoding.count(text)
             return len(self.encoding.encode(text))
         except:
             # Fallback estimation: ~4 characters per token
             return len(text) // 4
+
+    @property
+    def bytes_per_token(self) -> float:
+        """Calibrated UTF-8 bytes per token for this model (4.0 until calibrated)"""
+        if isinstance(self.encoding, SimpleEncoding):
+            return 1.0
+        if self._calib_tokens:
+            return self._calib_bytes / self._calib_tokens
+        return 4.0
+
+    def count_tokens_approx(self, text: str) -> int:
+        """Estimate tokens from the UTF-8 length and the calibrated ratio"""
+        return math.ceil(len(text.encode('utf-8')) / self.bytes_per_token)
+
+    def count_tokens_stream(self, chunks: Iterable[str]) -> int:
+        """Token count of a streamed text, chunk by chunk (boundary merges ignored)"""
+        return sum(self.count_tokens(chunk) for chunk in chunks)
+    
+    def count_tokens(self, text: str, exact: bool = False) -> int:
+        """
+        Count tokens in text.
+
+        Counts are memoized; texts over LARGE_TEXT_BYTES of UTF-8 are
+        estimated like count_tokens_approx unless exact=True.
+        """
+        if not text:
+            return 0
+        if isinstance(self.encoding, SimpleEncoding):
+            # Byte counting is cheaper than a cache lookup
+            return self.encoding.count(text)
+        size = len(text.encode('utf-8'))
+        if not exact and size > LARGE_TEXT_BYTES:
+            return math.ceil(size / self.bytes_per_token)
+
+        key = (self.encoding_name, len(text), hash(text))
+        count = _count_cache.get(key)
+        if count is None:
+            count = self._count_exact(text)
+            _count_cache.put(key, count)
+            if count and size >= CALIBRATION_MIN_BYTES:
+                self._calib_bytes += size
+                self._calib_tokens += count
+        return count
     
     def count_tokens_in_messages(self, messages: List[Dict[str, str]]) -> int:
         """Count tokens in a list of messages"""
@@ -393,15 +510,20 @@ class TokenManager:
         
         return suggestions
 
-# Global token manager instance
-_token_manager = None
+# Token managers by (model, max_tokens)
+_token_managers: Dict[Tuple[str, Optional[int]], TokenManager] = {}
+_token_managers_lock = threading.Lock()
 
 def get_token_manager(model_name: str = "mistral-large", max_tokens: int = None) -> TokenManager:
-    """Get or create global token manager"""
-    global _token_manager
-    if _token_manager is None:
-        _token_manager = TokenManager(model_name, max_tokens)
-    return _token_manager
+    """Get or create the shared token manager for model_name"""
+    key = (model_name, max_tokens)
+    manager = _token_managers.get(key)
+    if manager is None:
+        with _token_managers_lock:
+            manager = _token_managers.get(key)
+            if manager is None:
+                manager = _token_managers[key] = TokenManager(model_name, max_tokens)
+    return manager
 
 if __name__ == "__main__":
     # Test the token manager
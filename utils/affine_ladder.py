@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Affine Ladder - Vectorized 16-lane affine model engine
+
+Each 32-byte half-block x[i] steps to x[i+1] byte-wise as
+
+    y[pos] = A[lane] * x[pos] + C*[block][lane][occ]   (mod 256),  lane = pos % 16
+
+with block = (i - base) // 32 and occ = 0/1 for the first/second 16
+steps of the block. AffineLadder holds A and C* as uint8 arrays and a
+precomputed (16, 256) reverse table per lane, so forward and reverse
+predictions for every transition in a range are one NumPy expression
+over a (transitions x 32) uint8 matrix; uint8 arithmetic wraps mod 256
+for free.
+
+Usage:
+    from utils.affine_ladder import AffineLadder, load_halfblocks
+
+    ladder = AffineLadder.from_calibration("kh-assist/out/ladder_calib_29_70_full.json")
+    result = ladder.verify(load_halfblocks("kh-assist/db/kh.db", 29, 71), 29, 70)
+    print(result.forward_rate, result.reverse_rate)
+    for direction, i, pos, predicted, actual in result.mismatches():
+        ...
+"""
+import json
+import math
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+LANES = 16
+HALF_BLOCK_BYTES = 32
+BLOCK_STEPS = 32
+
+HalfBlocks = Dict[int, np.ndarray]
+
+
+def hex_to_bytes(h: str) -> np.ndarray:
+    """64-hex-digit half-block -> (32,) uint8 (left-padded with zeros)"""
+    return np.frombuffer(bytes.fromhex(h.rjust(64, '0')), dtype=np.uint8)
+
+
+def load_halfblocks(db_path: str, low: int, high: int) -> HalfBlocks:
+    """{bits: (32,) uint8} from lcg_residuals for bits in [low, high]"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT bits, lower(substr(actual_hex, 3)) AS hex
+        FROM   lcg_residuals
+        WHERE  bits BETWEEN ? AND ?
+        ORDER BY bits
+    """, (low, high)).fetchall()
+    conn.close()
+    return {bits: hex_to_bytes(h) for bits, h in rows}
+
+
+def consecutive_range(db_path: str) -> Tuple[int, int]:
+    """First run of consecutive bits in lcg_residuals (1, 70 if empty)"""
+    conn = sqlite3.connect(db_path)
+    bits = [row[0] for row in conn.execute("SELECT bits FROM lcg_residuals ORDER BY bits")]
+    conn.close()
+    if not bits:
+        return 1, 70
+    end = bits[0]
+    for prev, b in zip(bits, bits[1:]):
+        if b != prev + 1:
+            break
+        end = b
+    return bits[0], end
+
+
+def _reverse_table(a: int) -> np.ndarray:
+    """
+    x for every rhs = (y - c) mod 256 given multiplier a.
+
+    Invertible a uses a^-1. For even a (gcd g) the solution is only
+    defined mod 256/g; like verify_affine, take the candidate <= 0x7F.
+    """
+    rhs = np.arange(256, dtype=np.int64)
+    g = math.gcd(a, 256)
+    if g == 1:
+        return (pow(a, -1, 256) * rhs & 0xFF).astype(np.uint8)
+    mod = 256 // g
+    inv = pow(a // g, -1, mod) if mod > 1 else 0
+    base = inv * ((rhs // g) % mod) % mod
+    return np.where(base <= 0x7F, base, (base + mod) & 0xFF).astype(np.uint8)
+
+
+@dataclass
+class LadderVerification:
+    """Forward/reverse predictions and mismatch masks for a range of transitions"""
+    bits: np.ndarray            # (T,) source bits i of each transition i -> i+1
+    x: np.ndarray               # (T, 32) actual x[i]
+    y: np.ndarray               # (T, 32) actual x[i+1]
+    y_hat: np.ndarray           # (T, 32) forward prediction
+    x_hat: np.ndarray           # (T, 32) reverse prediction
+    valid: np.ndarray           # (T, 32) C* known for this byte
+    blocks: np.ndarray          # (T,)
+    occ: np.ndarray             # (T,)
+
+    @property
+    def forward_mismatch(self) -> np.ndarray:
+        return (self.y_hat != self.y) & self.valid
+
+    @property
+    def reverse_mismatch(self) -> np.ndarray:
+        return (self.x_hat != self.x) & self.valid
+
+    @property
+    def total(self) -> int:
+        return int(self.valid.sum())
+
+    @property
+    def forward_ok(self) -> int:
+        return self.total - int(self.forward_mismatch.sum())
+
+    @property
+    def reverse_ok(self) -> int:
+        return self.total - int(self.reverse_mismatch.sum())
+
+    @property
+    def forward_rate(self) -> float:
+        return self.forward_ok / self.total if self.total else 0.0
+
+    @property
+    def reverse_rate(self) -> float:
+        return self.reverse_ok / self.total if self.total else 0.0
+
+    def mismatches(self) -> List[Tuple[str, int, int, int, int]]:
+        """(direction, bits, byte_pos, predicted, actual) rows, as in ladder_mismatch_log.csv"""
+        rows = []
+        fwd, rev = self.forward_mismatch, self.reverse_mismatch
+        for t, pos in zip(*np.nonzero(fwd | rev)):
+            i = int(self.bits[t])
+            if fwd[t, pos]:
+                rows.append(("fwd", i, int(pos), int(self.y_hat[t, pos]), int(self.y[t, pos])))
+            if rev[t, pos]:
+                rows.append(("rev", i, int(pos), int(self.x_hat[t, pos]), int(self.x[t, pos])))
+        return rows
+
+
+class AffineLadder:
+    """A and C* as uint8 arrays with precomputed lane inverse tables"""
+
+    def __init__(self, A: Union[Mapping, Sequence[int]],
+                 Cstar: Mapping[Union[int, str], Mapping[Union[int, str], Sequence[int]]]):
+        if isinstance(A, Mapping):
+            A = [int(A.get(lane, A.get(str(lane), 0))) for lane in range(LANES)]
+        self.A = np.array([a & 0xFF for a in A], dtype=np.uint8)
+
+        blocks = sorted(int(b) for b in Cstar)
+        n_blocks = blocks[-1] + 1 if blocks else 0
+        self.C = np.zeros((n_blocks, LANES, 2), dtype=np.uint8)
+        self.C_known = np.zeros((n_blocks, LANES, 2), dtype=bool)
+        for b, lanes in Cstar.items():
+            for lane, values in lanes.items():
+                for occ, c in enumerate(list(values)[:2]):
+                    if c is None:
+                        continue
+                    self.C[int(b), int(lane), occ] = int(c) & 0xFF
+                    self.C_known[int(b), int(lane), occ] = True
+
+        self.reverse_table = np.stack([_reverse_table(int(a)) for a in self.A])
+        self._lane_of_pos = np.arange(HALF_BLOCK_BYTES) % LANES
+
+    @classmethod
+    def from_calibration(cls, path: str) -> "AffineLadder":
+        """Load A and C* from a ladder_calib_*.json file"""
+        with open(path) as f:
+            calib = json.load(f)
+        return cls(calib["A"], calib["Cstar"])
+
+    # ------------------------------------------------------------------
+
+    def schedule(self, bits: np.ndarray, base: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(block, occurrence) of each transition, counted from base"""
+        step = np.asarray(bits) - base
+        return step // BLOCK_STEPS, (step % BLOCK_STEPS >= BLOCK_STEPS // 2).astype(np.intp)
+
+    def drifts(self, blocks: np.ndarray, occ: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(T, 32) C* values per byte and the mask of bytes whose C* is known"""
+        in_range = (blocks >= 0) & (blocks < len(self.C))
+        b = np.where(in_range, blocks, 0)[:, None]
+        o = occ[:, None]
+        lanes = self._lane_of_pos[None, :]
+        return self.C[b, lanes, o], self.C_known[b, lanes, o] & in_range[:, None]
+
+    def forward(self, X: np.ndarray, blocks: np.ndarray, occ: np.ndarray) -> np.ndarray:
+        """y = A*x + C* (mod 256) for a (T, 32) uint8 matrix"""
+        C, _ = self.drifts(blocks, occ)
+        return self.A[self._lane_of_pos] * X + C
+
+    def reverse(self, Y: np.ndarray, blocks: np.ndarray, occ: np.ndarray) -> np.ndarray:
+        """x from y via the lane inverse tables for a (T, 32) uint8 matrix"""
+        C, _ = self.drifts(blocks, occ)
+        return self.reverse_table[self._lane_of_pos, Y - C]
+
+    def verify(self, halfblocks: HalfBlocks, low: int, high: int,
+               base: Optional[int] = None) -> LadderVerification:
+        """
+        Check every transition i -> i+1 for i in [low, high] present in halfblocks.
+
+        Blocks and occurrences are counted from base (default low).
+        """
+        base = low if base is None else base
+        bits = np.array([i for i in range(low, high + 1)
+                         if i in halfblocks and (i + 1) in halfblocks], dtype=np.intp)
+        if len(bits):
+            X = np.stack([halfblocks[i] for i in bits]).astype(np.uint8)
+            Y = np.stack([halfblocks[i + 1] for i in bits]).astype(np.uint8)
+        else:
+            X = Y = np.zeros((0, HALF_BLOCK_BYTES), dtype=np.uint8)
+
+        blocks, occ = self.schedule(bits, base)
+        _, valid = self.drifts(blocks, occ)
+        return LadderVerification(
+            bits=bits, x=X, y=Y,
+            y_hat=self.forward(X, blocks, occ),
+            x_hat=self.reverse(Y, blocks, occ),
+            valid=valid, blocks=blocks, occ=occ
+        )
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Convergents - Exact continued fractions and a convergent index for constants
+
+The convergent scripts (continued_fraction_map.py, convergent_database.py,
+convergent_combination_builder.py, ml_convergent_pattern_finder.py) either
+expand a float, which goes wrong after ~15 terms, or carry hand-typed
+partial quotient lists. This module computes them properly:
+
+- every constant in CONSTANTS (an mpmath expression) is evaluated at
+  increasing precision, and the partial quotients are taken from exact
+  integer Euclid on two rationals bracketing the value; only the common
+  prefix is kept, so every term is proven, thousands of them;
+- the terms are cached in db/convergents_cache.json, per constant and
+  expression, and only recomputed when a constant changes or more terms
+  are asked for;
+- every numerator, denominator, semiconvergent and simple combination
+  (COMBINATIONS) is indexed by hash(value) -> [(constant, index, part)],
+  so matching m, d or adj values is one dict lookup per value.
+
+Usage:
+    from utils.convergents import get_index, partial_quotients
+
+    cf = partial_quotients('pi', 40)           # [3, 7, 15, 1, 292, ...]
+    index = get_index()
+    index.lookup(22)                           # [('pi', 1, 'num'), ...]
+    index.convergents('e', 10)                 # [(2, 1), (3, 1), (8, 3), ...]
+
+    python3 -m utils.convergents [--terms 2000] [--constants pi e phi]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+try:
+    import mpmath
+    HAS_MPMATH = True
+except ImportError:
+    HAS_MPMATH = False
+
+CACHE_PATH = ROOT / "db" / "convergents_cache.json"
+# Bump when the cache layout changes
+CACHE_VERSION = 1
+DEFAULT_TERMS = 2000
+# Semiconvergents indexed per partial quotient; e alone has a[i] up to
+# 2i/3, so without a cap they would dominate the index
+MAX_SEMICONVERGENTS = 100
+
+# name -> mpmath expression
+CONSTANTS: Dict[str, str] = {
+    'pi': 'pi',
+    'e': 'e',
+    'phi': '(1 + sqrt(5)) / 2',
+    'sqrt2': 'sqrt(2)',
+    'sqrt3': 'sqrt(3)',
+    'sqrt5': 'sqrt(5)',
+    'ln2': 'log(2)',
+    '1/pi': '1 / pi',
+    '1/e': '1 / e',
+    'pi/4': 'pi / 4',
+    'e/pi': 'e / pi',
+    'gamma': 'euler',
+    'zeta3': 'zeta(3)',
+    'catalan': 'catalan',
+}
+
+# part -> f(p[i], q[i], p[i-1], q[i-1])
+COMBINATIONS: Dict[str, Callable[[int, int, int, int], int]] = {
+    'num+den': lambda p, q, pp, qp: p + q,
+    'num-den': lambda p, q, pp, qp: p - q,
+    '2num+den': lambda p, q, pp, qp: 2 * p + q,
+    'num+2den': lambda p, q, pp, qp: p + 2 * q,
+    '3num+den': lambda p, q, pp, qp: 3 * p + q,
+    'num+3den': lambda p, q, pp, qp: p + 3 * q,
+    'num*den': lambda p, q, pp, qp: p * q,
+    'num+num[i-1]': lambda p, q, pp, qp: p + pp,
+    'num-num[i-1]': lambda p, q, pp, qp: p - pp,
+    'den+den[i-1]': lambda p, q, pp, qp: q + qp,
+    'den-den[i-1]': lambda p, q, pp, qp: q - qp,
+}
+
+Hit = Tuple[str, int, str]
+
+
+# ---------------------------------------------------------------------------
+# Exact continued fractions
+# ---------------------------------------------------------------------------
+
+def rational_cf(num: int, den: int, limit: int) -> List[int]:
+    """Partial quotients of num/den (den > 0), at most `limit` of them"""
+    terms = []
+    while den and len(terms) < limit:
+        a, r = divmod(num, den)
+        terms.append(a)
+        num, den = den, r
+    return terms
+
+
+def continued_fraction(expr: str, terms: int) -> List[int]:
+    """First `terms` partial quotients of an mpmath expression, exactly
+
+    x is squeezed between (m - 2)/2^bits and (m + 2)/2^bits; both
+    rationals are expanded exactly and their common prefix, minus the
+    last shared term, is the start of x's expansion. About 3.4 bits are
+    needed per term (Levy's constant), doubling until that is enough.
+    A rational value never gets a proven full expansion; only the
+    prefix that is certain is returned.
+    """
+    if not HAS_MPMATH:
+        raise ImportError("mpmath is required to expand constants (pip install mpmath)")
+    bits = 4 * terms + 64
+    while True:
+        with mpmath.workprec(bits + 32):
+            x = eval(expr, {'__builtins__': {}}, vars(mpmath))
+            m = int(mpmath.floor(mpmath.ldexp(x, bits)))
+        lo = rational_cf(m - 2, 1 << bits, terms + 2)
+        hi = rational_cf(m + 2, 1 << bits, terms + 2)
+        common = 0
+        while common < min(len(lo), len(hi)) and lo[common] == hi[common]:
+            common += 1
+        if common > terms:
+            return lo[:terms]
+        if bits > 64 * terms + 4096:
+            return lo[:max(common - 1, 0)]
+        bits *= 2
+
+
+def convergents_of(cf: Iterable[int]) -> List[Tuple[int, int]]:
+    """(p[i], q[i]) for every prefix of cf"""
+    result = []
+    p_prev, p = 1, 0
+    q_prev, q = 0, 1
+    for a in cf:
+        p_prev, p = a * p_prev + p, p_prev
+        q_prev, q = a * q_prev + q, q_prev
+        result.append((p_prev, q_prev))
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _semi_parts(t: int) -> Tuple[str, str]:
+    # Shared label strings, the index holds hundreds of thousands of them
+    return f'semi{t}_num', f'semi{t}_den'
+
+
+class ConvergentIndex:
+    """Convergents of a constant library, indexed by every integer they produce"""
+
+    def __init__(self, constants: Optional[Dict[str, str]] = None, terms: int = DEFAULT_TERMS,
+                 max_semiconvergents: int = MAX_SEMICONVERGENTS,
+                 cache_path: Optional[Path] = CACHE_PATH):
+        self.constants = dict(CONSTANTS if constants is None else constants)
+        self.max_semiconvergents = max_semiconvergents
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.cf: Dict[str, List[int]] = {}
+        self._convergents: Dict[str, List[Tuple[int, int]]] = {}
+        self._index: Optional[Dict[int, List[Hit]]] = None
+        self._load_cache()
+        self.extend(terms)
+
+    def extend(self, terms: int, names: Optional[Iterable[str]] = None):
+        """Make sure every constant has at least `terms` partial quotients"""
+        changed = False
+        for name in names or self.constants:
+            if len(self.cf.get(name, ())) < terms:
+                self.cf[name] = continued_fraction(self.constants[name], terms)
+                self._convergents.pop(name, None)
+                changed = True
+        if changed:
+            self._index = None
+            self._save_cache()
+
+    def _load_cache(self):
+        """Reuse cached terms of constants whose expression is unchanged"""
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cache.get("version") != CACHE_VERSION:
+            return
+        for name, entry in cache.get("constants", {}).items():
+            if self.constants.get(name) == entry["expr"]:
+                self.cf[name] = entry["terms"]
+
+    def _save_cache(self):
+        """Merge our terms into the cache, keeping constants other indexes use"""
+        if self.cache_path is None:
+            return
+        cache = {"version": CACHE_VERSION, "constants": {}}
+        try:
+            with open(self.cache_path) as f:
+                old = json.load(f)
+            if old.get("version") == CACHE_VERSION:
+                cache["constants"] = old["constants"]
+        except (OSError, ValueError, KeyError):
+            pass
+        for name, terms in self.cf.items():
+            entry = cache["constants"].get(name)
+            if entry and entry["expr"] == self.constants[name] and len(entry["terms"]) >= len(terms):
+                continue
+            cache["constants"][name] = {"expr": self.constants[name], "terms": terms}
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump(cache, f)
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            pass
+
+    # -- access -------------------------------------------------------------
+
+    def terms(self, name: str, n: Optional[int] = None) -> List[int]:
+        if name not in self.constants:
+            raise KeyError(f"unknown constant {name!r} (known: {', '.join(self.constants)})")
+        if n is not None or name not in self.cf:
+            self.extend(DEFAULT_TERMS if n is None else n, [name])
+        return self.cf[name][:n]
+
+    def convergents(self, name: str, n: Optional[int] = None) -> List[Tuple[int, int]]:
+        cf = self.terms(name, n)
+        if len(self._convergents.get(name, ())) < len(cf):
+            self._convergents[name] = convergents_of(self.cf[name])
+        return self._convergents[name][:len(cf)]
+
+    def _pair(self, name: str, i: int) -> Tuple[int, int]:
+        """(p[i], q[i]) with p[-1]/q[-1] = 1/0 and p[-2]/q[-2] = 0/1"""
+        if i >= 0:
+            return self.convergents(name)[i]
+        return (1, 0) if i == -1 else (0, 1)
+
+    def value(self, name: str, i: int, part: str) -> int:
+        """The integer a (constant, index, part) entry stands for"""
+        negate = part.startswith('-(')
+        if negate:
+            part = part[2:-1]
+        p, q = self._pair(name, i)
+        if part in ('num', 'den'):
+            result = p if part == 'num' else q
+        elif part.startswith('semi'):
+            t, which = part[4:].split('_')
+            pp, qp = self._pair(name, i - 1)
+            p2, q2 = self._pair(name, i - 2)
+            result = int(t) * pp + p2 if which == 'num' else int(t) * qp + q2
+        else:
+            result = COMBINATIONS[part](p, q, *self._pair(name, i - 1))
+        return -result if negate else result
+
+    # -- index --------------------------------------------------------------
+
+    def _entries(self, name: str):
+        """(value, index, part) for everything derived from one constant"""
+        cf = self.cf[name]
+        convs = self.convergents(name)
+        for i, (p, q) in enumerate(convs):
+            pp, qp = self._pair(name, i - 1)
+            yield p, i, 'num'
+            yield q, i, 'den'
+            if i >= 1:
+                p2, q2 = self._pair(name, i - 2)
+                for t in range(1, min(cf[i], self.max_semiconvergents + 1)):
+                    num_part, den_part = _semi_parts(t)
+                    yield t * pp + p2, i, num_part
+                    yield t * qp + q2, i, den_part
+            for part, fn in COMBINATIONS.items():
+                yield fn(p, q, pp, qp), i, part
+
+    @property
+    def index(self) -> Dict[int, List[Hit]]:
+        """hash(value) -> [(constant, index, part)], built on first use"""
+        if self._index is None:
+            index: Dict[int, List[Hit]] = {}
+            for name in self.cf:
+                for value, i, part in self._entries(name):
+                    index.setdefault(hash(value), []).append((name, i, part))
+            self._index = index
+        return self._index
+
+    def lookup(self, value: int) -> List[Hit]:
+        """Every (constant, index, part) equal to value; '-(part)' for -value"""
+        hits = [h for h in self.index.get(hash(value), ()) if self.value(*h) == value]
+        if value:
+            hits += [(c, i, f'-({part})') for c, i, part in self.index.get(hash(-value), ())
+                     if self.value(c, i, part) == -value]
+        return hits
+
+    def match(self, values: Dict[int, int]) -> Dict[int, List[Hit]]:
+        """lookup() for every entry of a sequence, e.g. KeyStore.m"""
+        return {n: self.lookup(v) for n, v in values.items()}
+
+
+_INDEX: Optional[ConvergentIndex] = None
+
+
+def get_index(terms: int = DEFAULT_TERMS) -> ConvergentIndex:
+    """Process-wide index over CONSTANTS"""
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = ConvergentIndex(terms=terms)
+    else:
+        _INDEX.extend(terms)
+    return _INDEX
+
+
+def partial_quotients(name: str, n: int) -> List[int]:
+    """First n partial quotients of a CONSTANTS entry"""
+    return get_index(terms=0).terms(name, n)
+
+
+def convergents(name: str, n: int) -> List[Tuple[int, int]]:
+    """First n convergents (p, q) of a CONSTANTS entry"""
+    return get_index(terms=0).convergents(name, n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Match m, d and adj values against "
+                                                 "the convergents of CONSTANTS")
+    parser.add_argument('--terms', type=int, default=DEFAULT_TERMS)
+    parser.add_argument('--constants', nargs='+', metavar='NAME',
+                        help=f"subset of: {' '.join(CONSTANTS)}")
+    parser.add_argument('--min-value', type=int, default=10,
+                        help="skip |values| below this (they match everything)")
+    parser.add_argument('--show', type=int, default=4, help="hits printed per value")
+    args = parser.parse_args()
+    unknown = set(args.constants or ()) - set(CONSTANTS)
+    if unknown:
+        parser.error(f"unknown constants: {', '.join(sorted(unknown))}")
+    constants = {name: CONSTANTS[name] for name in args.constants} if args.constants else None
+
+    from utils.keystore import get_keystore
+    ks = get_keystore()
+
+    t0 = time.time()
+    index = ConvergentIndex(constants, terms=args.terms)
+    t1 = time.time()
+    entries = sum(len(hits) for hits in index.index.values())
+    print(f"{len(index.constants)} constants x {args.terms} terms in {t1 - t0:.1f}s, "
+          f"{entries} index entries in {time.time() - t1:.1f}s")
+
+    for label, seq in (('m', ks.m), ('d', ks.d), ('adj', ks.adj)):
+        values = {n: v for n, v in seq.items() if abs(v) >= args.min_value}
+        t0 = time.time()
+        matches = index.match(values)
+        elapsed = time.time() - t0
+        found = {n: hits for n, hits in matches.items() if hits}
+        print(f"\n{label}: {len(found)}/{len(values)} values with |v| >= {args.min_value} "
+              f"match ({elapsed * 1000:.1f} ms)")
+        for n in sorted(found):
+            hits = sorted(found[n], key=lambda h: (h[1], len(h[2])))
+            shown = ', '.join(f"{c}[{i}].{part}" for c, i, part in hits[:args.show])
+            more = f" (+{len(hits) - args.show})" if len(hits) > args.show else ""
+            print(f"  {label}[{n}] = {values[n]}: {shown}{more}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Embeddings - Lazily loaded sentence embeddings, optionally from a shared worker
+
+Loading a SentenceTransformer (and torch underneath it) takes seconds, so
+nothing here imports it until the first encode() call. Processes that embed
+often (the RAG store, the semantic LLM cache, the web app) can instead share
+one persistent worker that keeps the model loaded and serves it over a Unix
+socket:
+
+    python -m utils.embeddings serve            # db/embed.sock
+    LADDER_EMBED_SOCKET=/run/embed.sock python -m utils.embeddings serve
+
+get_embedder() returns a client for the worker when its socket answers, a
+local lazy model otherwise, and None if sentence-transformers is not
+installed at all. Both return unit-normalised float32 rows.
+
+Wire format (both directions): 4-byte big-endian length + JSON header; a
+successful encode reply is followed by rows * dim * 4 bytes of float32.
+
+Usage:
+    from utils.embeddings import get_embedder
+
+    embedder = get_embedder("all-MiniLM-L6-v2")
+    if embedder is not None:
+        vectors = embedder.encode(["drift constant", "lane 7"])
+"""
+import importlib.util
+import json
+import logging
+import os
+import socket
+import socketserver
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+SOCKET_PATH = os.getenv("LADDER_EMBED_SOCKET", str(ROOT / "db" / "embed.sock"))
+BATCH_SIZE = 64
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+_embedders: Dict[str, "LocalEmbedder"] = {}
+_embedders_lock = threading.Lock()
+
+
+def sentence_transformers_installed() -> bool:
+    """True if sentence-transformers can be imported (without importing it)"""
+    return importlib.util.find_spec("sentence_transformers") is not None
+
+
+class LocalEmbedder:
+    """SentenceTransformer in this process, loaded on first use"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    logger.info(f"Loading embedding model {self.model_name}")
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str], batch_size: int = BATCH_SIZE) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return self.model.encode(list(texts), batch_size=batch_size, convert_to_numpy=True,
+                                 normalize_embeddings=True,
+                                 show_progress_bar=len(texts) > 10 * batch_size
+                                 ).astype(np.float32)
+
+
+# ----------------------------------------------------------------------
+# Worker protocol
+# ----------------------------------------------------------------------
+
+def _send(sock: socket.socket, header: Dict, payload: bytes = b""):
+    body = json.dumps(header).encode()
+    sock.sendall(_HEADER.pack(len(body)) + body + payload)
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(min(n - len(buf), 1 << 20))
+        if not chunk:
+            raise ConnectionError("embedding worker closed the connection")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def _recv(sock: socket.socket) -> Dict:
+    (length,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return json.loads(_recv_exact(sock, length))
+
+
+class WorkerEmbedder:
+    """Client for a running embedding worker"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, socket_path: str = SOCKET_PATH,
+                 timeout: float = 300.0):
+        self.model_name = model_name
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._dimension: Optional[int] = None
+
+    def _call(self, request: Dict) -> Union[Dict, np.ndarray]:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            _send(sock, request)
+            reply = _recv(sock)
+            if not reply.get("ok"):
+                raise RuntimeError(f"embedding worker: {reply.get('error')}")
+            if request["op"] != "encode":
+                return reply
+            rows, dim = reply["shape"]
+            data = _recv_exact(sock, rows * dim * 4)
+        return np.frombuffer(data, dtype=np.float32).reshape(rows, dim)
+
+    def ping(self, timeout: float = 1.0) -> bool:
+        saved, self.timeout = self.timeout, timeout
+        try:
+            return bool(self._call({"op": "ping"}))
+        except (OSError, RuntimeError, ValueError):
+            return False
+        finally:
+            self.timeout = saved
+
+    @property
+    def dimension(self) -> int:
+        if self._dimension is None:
+            self._dimension = self._call({"op": "dimension", "model": self.model_name})["dim"]
+        return self._dimension
+
+    def encode(self, texts: List[str], batch_size: int = BATCH_SIZE) -> np.ndarray:
+        return self._call({"op": "encode", "model": self.model_name,
+                           "texts": list(texts), "batch_size": batch_size})
+
+
+class _WorkerHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            request = _recv(self.request)
+            op = request.get("op")
+            if op == "ping":
+                _send(self.request, {"ok": True, "models": sorted(_embedders)})
+                return
+            embedder = _local(request.get("model") or DEFAULT_MODEL)
+            if op == "dimension":
+                _send(self.request, {"ok": True, "dim": embedder.dimension})
+            elif op == "encode":
+                # One encode at a time: the model (and its GPU) is shared
+                with self.server.encode_lock:
+                    vectors = embedder.encode(request["texts"],
+                                              request.get("batch_size", BATCH_SIZE))
+                _send(self.request, {"ok": True, "shape": list(vectors.shape)},
+                      np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            else:
+                _send(self.request, {"ok": False, "error": f"unknown op {op!r}"})
+        except ConnectionError:
+            pass
+        except Exception as e:
+            logger.exception("embedding request failed")
+            try:
+                _send(self.request, {"ok": False, "error": str(e)})
+            except OSError:
+                pass
+
+
+class EmbeddingWorker(socketserver.ThreadingUnixStreamServer):
+    """Unix-socket server holding the embedding model(s) in memory"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str = SOCKET_PATH, preload: List[str] = (DEFAULT_MODEL,)):
+        self.socket_path = socket_path
+        self.encode_lock = threading.Lock()
+        if os.path.exists(socket_path):
+            if WorkerEmbedder(socket_path=socket_path).ping():
+                raise RuntimeError(f"an embedding worker is already serving {socket_path}")
+            os.unlink(socket_path)  # stale socket from a worker that died
+        os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+        super().__init__(socket_path, _WorkerHandler)
+        for model_name in preload:
+            _local(model_name).model
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+
+
+def _local(model_name: str) -> LocalEmbedder:
+    with _embedders_lock:
+        if model_name not in _embedders:
+            _embedders[model_name] = LocalEmbedder(model_name)
+        return _embedders[model_name]
+
+
+def get_embedder(model_name: str = DEFAULT_MODEL,
+                 socket_path: str = SOCKET_PATH) -> Optional[Union[WorkerEmbedder, LocalEmbedder]]:
+    """
+    Worker client if the worker is up, else a shared lazy local model.
+
+    None when neither is available (sentence-transformers missing).
+    """
+    if os.path.exists(socket_path):
+        worker = WorkerEmbedder(model_name, socket_path)
+        if worker.ping():
+            return worker
+    if not sentence_transformers_installed():
+        return None
+    return _local(model_name)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Shared embedding worker")
+    parser.add_argument("command", choices=["serve", "ping"])
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    parser.add_argument("--model", action="append",
+                        help=f"model to preload (repeatable, default {DEFAULT_MODEL})")
+    args = parser.parse_args()
+
+    if args.command == "ping":
+        up = WorkerEmbedder(socket_path=args.socket).ping()
+        print("up" if up else "down")
+        raise SystemExit(0 if up else 1)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    server = EmbeddingWorker(args.socket, args.model or [DEFAULT_MODEL])
+    logger.info(f"Embedding worker listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""
+Factorization Service - Cached, parallel factoring of m[n] and k[n] values
+
+Replaces the per-script factoring loops (GNU factor subprocess per value,
+sympy primepi per prime) with one service:
+
+- results live in db/factorization.db keyed by value, so a value is only
+  ever factored once across scripts and boxes;
+- values are factored in a process pool, each with its own deadline;
+  inside a worker, factoring escalates trial division -> Pollard-Brent rho
+  -> ECM with growing bounds, and stops at the deadline with a partial
+  result (known primes + composite cofactor) instead of hanging;
+- prime indices come from a sieve-backed pi(x) for small primes, a
+  cached table for anything imported or computed before, and 'large'
+  otherwise;
+- the old factorization_*.json files can be imported into the cache.
+
+Result dicts keep the layout of the existing factorization JSON files
+(n, m, bits, is_prime, factors, prime_indices, factor_details, factored).
+
+Usage:
+    from utils.factorization import FactorizationService
+
+    svc = FactorizationService()
+    svc.import_json(glob.glob('factorization_*.json'))
+    results = svc.factor_sequence({n: m_seq[n - 2] for n in range(36, 71)})
+
+    python3 -m utils.factorization 36 70 factorization_36_70.json
+"""
+import bisect
+import glob
+import itertools
+import json
+import math
+import multiprocessing as mp
+import random
+import sqlite3
+import sys
+import time
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    from sympy.ntheory import ecm as _sympy_ecm
+    HAS_ECM = True
+except ImportError:
+    HAS_ECM = False
+
+ROOT = Path(__file__).parent.parent
+DEFAULT_DB_PATH = ROOT / "db" / "factorization.db"
+
+# Primes below this get exact indices from the sieve (~0.5 s, ~2.7 MB once)
+SIEVE_LIMIT = 10_000_000
+TRIAL_DIVISION_LIMIT = 10_000
+DEFAULT_TIMEOUT = 300.0
+
+# Pollard-Brent iterations per attempt before escalating to ECM
+RHO_ITERATIONS = 200_000
+# ECM rounds: (B1, curves); B2 = 100*B1
+ECM_ROUNDS = [(2_000, 25), (11_000, 90), (50_000, 300), (250_000, 700), (1_000_000, 1800)]
+# Curves per sympy ECM call; one curve at B1=1e6 takes ~30 s on a 72-digit
+# value, so the deadline is checked between calls and a call only starts
+# if its estimated cost still fits
+ECM_SLICE = 4
+
+LARGE = 'large'
+
+Factors = Dict[int, int]
+
+
+# ----------------------------------------------------------------------
+# In-process factoring
+# ----------------------------------------------------------------------
+
+_SMALL_PRIMES = [p for p in range(2, TRIAL_DIVISION_LIMIT)
+                 if all(p % q for q in range(2, int(p ** 0.5) + 1))]
+
+
+def is_probable_prime(n: int) -> bool:
+    """Miller-Rabin; deterministic below 3.3e24, 2^-80 error beyond"""
+    if n < 2:
+        return False
+    for p in _SMALL_PRIMES[:25]:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    bases = _SMALL_PRIMES[:13] if n < 3_317_044_064_679_887_385_961_981 else \
+        _SMALL_PRIMES[:13] + [random.randrange(2, n - 1) for _ in range(27)]
+    for a in bases:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _pollard_brent(n: int, max_iterations: int, seed: int,
+                   deadline: float = math.inf) -> Optional[int]:
+    """One Pollard-Brent rho attempt; a non-trivial factor of n or None"""
+    rng = random.Random(seed)
+    y, c, m = rng.randrange(1, n), rng.randrange(1, n), 128
+    g = r = q = 1
+    iterations = 0
+    while g == 1 and iterations < max_iterations:
+        x = y
+        for _ in range(r):
+            y = (y * y + c) % n
+        k = 0
+        while k < r and g == 1:
+            if time.monotonic() > deadline:
+                return None
+            ys = y
+            for _ in range(min(m, r - k)):
+                y = (y * y + c) % n
+                q = q * abs(x - y) % n
+            g = math.gcd(q, n)
+            k += m
+        iterations += r
+        r *= 2
+    if g == n:
+        # Backtrack one step at a time over the last block
+        g = 1
+        while g == 1:
+            ys = (ys * ys + c) % n
+            g = math.gcd(abs(x - ys), n)
+    return g if 1 < g < n else None
+
+
+def _ecm_split(n: int, deadline: float) -> Optional[int]:
+    """ECM_ROUNDS in slices of ECM_SLICE curves, none started past what the deadline allows"""
+    per_curve, last_b1 = 0.0, 1
+    for b1, curves in ECM_ROUNDS:
+        done = 0
+        while done < curves:
+            remaining = deadline - time.monotonic()
+            # Curve cost grows about linearly with B1
+            estimate = per_curve * b1 / last_b1
+            if remaining <= 0 or estimate > remaining:
+                return None
+            batch = min(ECM_SLICE, curves - done, max(1, int(remaining / estimate)) if estimate else 1)
+            t0 = time.monotonic()
+            try:
+                found = _sympy_ecm(n, B1=b1, B2=100 * b1, max_curve=batch, seed=b1 + done)
+            except ValueError:
+                found = ()
+            per_curve, last_b1 = (time.monotonic() - t0) / batch, b1
+            for f in found:
+                if 1 < f < n:
+                    return f
+            done += batch
+    return None
+
+
+def _split(n: int, deadline: float) -> Tuple[Optional[int], str]:
+    """Find a non-trivial factor of composite n before deadline"""
+    root = math.isqrt(n)
+    if root * root == n:
+        return root, 'square'
+    for seed in range(3):
+        if time.monotonic() > deadline:
+            return None, 'timeout'
+        f = _pollard_brent(n, RHO_ITERATIONS, seed, deadline)
+        if f:
+            return f, 'rho'
+    if HAS_ECM:
+        f = _ecm_split(n, deadline)
+        if f:
+            return f, 'ecm'
+    # Last resort: unbounded rho rounds until the deadline
+    seed = 3
+    while time.monotonic() < deadline:
+        f = _pollard_brent(n, RHO_ITERATIONS, seed, deadline)
+        if f:
+            return f, 'rho'
+        seed += 1
+    return None, 'timeout'
+
+
+def factor_value(n: int, timeout: float = DEFAULT_TIMEOUT) -> Tuple[Factors, List[int], str]:
+    """
+    Factor n within timeout seconds.
+
+    Returns (prime factors, unfactored composite cofactors, strongest
+    method used). The factorization is complete iff cofactors is empty.
+    """
+    deadline = time.monotonic() + timeout
+    factors: Factors = {}
+    method = 'trial'
+    if n < 2:
+        return factors, [], method
+
+    for p in _SMALL_PRIMES:
+        if p * p > n:
+            break
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+
+    stack = [n] if n > 1 else []
+    cofactors = []
+    rank = {'trial': 0, 'square': 1, 'rho': 2, 'ecm': 3}
+    while stack:
+        c = stack.pop()
+        if is_probable_prime(c):
+            factors[c] = factors.get(c, 0) + 1
+            continue
+        f, how = _split(c, deadline)
+        if f is None:
+            cofactors.append(c)
+            continue
+        if rank.get(how, 0) > rank[method]:
+            method = how
+        stack.extend((f, c // f))
+
+    return dict(sorted(factors.items())), sorted(cofactors), method
+
+
+def _factor_worker(args: Tuple[int, float]) -> Tuple[int, Factors, List[int], str, float]:
+    """Pool entry point"""
+    value, timeout = args
+    t0 = time.time()
+    factors, cofactors, method = factor_value(value, timeout)
+    return value, factors, cofactors, method, time.time() - t0
+
+
+# ----------------------------------------------------------------------
+# Prime indices
+# ----------------------------------------------------------------------
+
+_PRIMES: Optional[array] = None
+_PRIMES_LIMIT = 0
+
+
+def _sieve_primes(limit: int = SIEVE_LIMIT) -> array:
+    """All primes below limit (built once per process)"""
+    global _PRIMES, _PRIMES_LIMIT
+    if _PRIMES is None or _PRIMES_LIMIT != limit:
+        sieve = bytearray([1]) * limit
+        sieve[0:2] = b'\x00\x00'
+        for i in range(2, math.isqrt(limit - 1) + 1):
+            if sieve[i]:
+                sieve[i * i::i] = bytes(len(range(i * i, limit, i)))
+        _PRIMES = array('Q', itertools.compress(range(limit), sieve))
+        _PRIMES_LIMIT = limit
+    return _PRIMES
+
+
+def sieve_prime_index(p: int, limit: int = SIEVE_LIMIT) -> Optional[int]:
+    """pi(p) for a prime p below limit, else None"""
+    if p >= limit:
+        return None
+    primes = _sieve_primes(limit)
+    i = bisect.bisect_left(primes, p)
+    if i < len(primes) and primes[i] == p:
+        return i + 1
+    return None
+
+
+# ----------------------------------------------------------------------
+# Service
+# ----------------------------------------------------------------------
+
+class FactorizationService:
+    """Persistent factorization cache with a parallel factoring front end"""
+
+    def __init__(self, db_path: Union[str, Path] = DEFAULT_DB_PATH,
+                 workers: Optional[int] = None, timeout: float = DEFAULT_TIMEOUT,
+                 sieve_limit: int = SIEVE_LIMIT):
+        self.db_path = str(db_path)
+        self.workers = workers or max(1, mp.cpu_count() - 1)
+        self.timeout = timeout
+        self.sieve_limit = sieve_limit
+        self._index_cache: Dict[int, Union[int, str]] = {}
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_db(self):
+        """Create cache tables (values stored as decimal text)"""
+        conn = self._connect()
+        conn.execute('''CREATE TABLE IF NOT EXISTS factorizations (
+            value TEXT PRIMARY KEY,
+            factors TEXT,
+            cofactors TEXT,
+            complete INTEGER,
+            method TEXT,
+            seconds REAL,
+            updated_at TEXT
+        )''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS prime_indices (
+            prime TEXT PRIMARY KEY,
+            idx TEXT,
+            source TEXT
+        )''')
+        conn.commit()
+        conn.close()
+
+    # -- cache ----------------------------------------------------------
+
+    def cached(self, value: int) -> Optional[Dict]:
+        """Cached entry for value or None"""
+        conn = self._connect()
+        row = conn.execute("SELECT factors, cofactors, complete, method, seconds "
+                           "FROM factorizations WHERE value = ?", (str(value),)).fetchone()
+        conn.close()
+        if row is None:
+            return None
+        return self._entry(row)
+
+    @staticmethod
+    def _entry(row) -> Dict:
+        factors, cofactors, complete, method, seconds = row
+        return {
+            'factors': {int(p): e for p, e in json.loads(factors).items()},
+            'cofactors': [int(c) for c in json.loads(cofactors)],
+            'complete': bool(complete),
+            'method': method,
+            'seconds': seconds,
+        }
+
+    def _store(self, conn: sqlite3.Connection, value: int, factors: Factors,
+               cofactors: List[int], method: str, seconds: float):
+        """Insert or improve a cache entry (never replace complete with partial)"""
+        row = conn.execute("SELECT complete FROM factorizations WHERE value = ?",
+                           (str(value),)).fetchone()
+        if row is not None and row[0] and cofactors:
+            return
+        conn.execute('''INSERT OR REPLACE INTO factorizations
+            (value, factors, cofactors, complete, method, seconds, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)''', (
+            str(value),
+            json.dumps({str(p): e for p, e in factors.items()}),
+            json.dumps([str(c) for c in cofactors]),
+            0 if cofactors else 1,
+            method,
+            seconds,
+            datetime.now().isoformat()
+        ))
+
+    # -- prime indices --------------------------------------------------
+
+    def prime_index(self, p: int, conn: Optional[sqlite3.Connection] = None) -> Union[int, str]:
+        """pi(p): sieve for small p, cached table otherwise, else 'large'"""
+        if p in self._index_cache:
+            return self._index_cache[p]
+        idx = sieve_prime_index(p, self.sieve_limit)
+        if idx is None:
+            own = conn is None
+            conn = conn or self._connect()
+            row = conn.execute("SELECT idx FROM prime_indices WHERE prime = ?", (str(p),)).fetchone()
+            if own:
+                conn.close()
+            idx = int(row[0]) if row else LARGE
+        self._index_cache[p] = idx
+        return idx
+
+    # -- factoring ------------------------------------------------------
+
+    def factor_many(self, values: Iterable[int], timeout: Optional[float] = None,
+                    retry_partial: bool = False, verbose: bool = False) -> Dict[int, Dict]:
+        """
+        Factor every value, using the cache where possible.
+
+        Uncached values (and, with retry_partial, cached partial results)
+        are spread over the process pool, each with its own deadline.
+        Returns {value: cache entry}.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        values = list(dict.fromkeys(int(v) for v in values))
+        entries: Dict[int, Dict] = {}
+
+        conn = self._connect()
+        for value in values:
+            row = conn.execute("SELECT factors, cofactors, complete, method, seconds "
+                               "FROM factorizations WHERE value = ?", (str(value),)).fetchone()
+            if row is not None:
+                entry = self._entry(row)
+                if entry['complete'] or not retry_partial:
+                    entries[value] = entry
+        todo = [v for v in values if v not in entries]
+
+        if todo:
+            if verbose:
+                print(f"  {len(values) - len(todo)} cached, factoring {len(todo)} "
+                      f"on {min(self.workers, len(todo))} workers (timeout {timeout:.0f}s)")
+            jobs = [(v, timeout) for v in sorted(todo, key=lambda v: -v.bit_length())]
+            if self.workers > 1 and len(jobs) > 1:
+                with mp.Pool(min(self.workers, len(jobs))) as pool:
+                    outcomes = pool.imap_unordered(_factor_worker, jobs)
+                    self._collect(conn, outcomes, entries, verbose)
+            else:
+                self._collect(conn, map(_factor_worker, jobs), entries, verbose)
+
+        conn.close()
+        return entries
+
+    def _collect(self, conn, outcomes, entries, verbose):
+        for value, factors, cofactors, method, seconds in outcomes:
+            self._store(conn, value, factors, cofactors, method, seconds)
+            conn.commit()
+            entries[value] = {'factors': factors, 'cofactors': cofactors,
+                              'complete': not cofactors, 'method': method, 'seconds': seconds}
+            if verbose:
+                state = 'done' if not cofactors else f'partial ({len(cofactors)} cofactor(s) left)'
+                print(f"    {value.bit_length():4d} bits  {method:6s} {seconds:8.3f}s  {state}")
+
+    def factor(self, value: int, timeout: Optional[float] = None) -> Dict:
+        """Cache entry for a single value"""
+        return self.factor_many([value], timeout)[int(value)]
+
+    def describe(self, value: int, entry: Dict, n: Optional[int] = None) -> Dict:
+        """Result dict in the layout of the factorization_*.json files"""
+        factors = entry['factors']
+        conn = self._connect()
+        details = [{'prime': p, 'exponent': e, 'index': self.prime_index(p, conn)}
+                   for p, e in sorted(factors.items())]
+        conn.close()
+        result = {
+            'm': value,
+            'bits': value.bit_length(),
+            'is_prime': entry['complete'] and list(factors.values()) == [1],
+            'factors': {str(p): e for p, e in sorted(factors.items())},
+            'prime_indices': [d['index'] for d in details],
+            'factor_details': details,
+            'factored': entry['complete'],
+            'time_seconds': entry['seconds'],
+        }
+        if n is not None:
+            result = {'n': n, **result}
+        if entry['cofactors']:
+            result['cofactors'] = [str(c) for c in entry['cofactors']]
+        return result
+
+    def factor_sequence(self, values: Dict[int, int], timeout: Optional[float] = None,
+                        verbose: bool = False) -> List[Dict]:
+        """{n: value} -> per-n result dicts, sorted by n"""
+        entries = self.factor_many(values.values(), timeout, verbose=verbose)
+        return [self.describe(v, entries[int(v)], n) for n, v in sorted(values.items())]
+
+    # -- JSON import ----------------------------------------------------
+
+    def import_json(self, paths: Union[str, Iterable[str]], verbose: bool = False) -> int:
+        """
+        Import factorization_*.json result files into the cache.
+
+        Entries are only accepted if the factors multiply back to the value;
+        integer prime indices are kept so they never need recomputing.
+        Unreadable files are skipped. Returns the number of values imported.
+        """
+        if isinstance(paths, (str, Path)):
+            paths = [paths]
+        imported = 0
+        conn = self._connect()
+        for path in paths:
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                if verbose:
+                    print(f"  Skipping {path}: {e}")
+                continue
+            rows = data.get('results', []) if isinstance(data, dict) else data
+            count = 0
+            for r in rows:
+                value = int(r.get('m', 0))
+                factors = {int(p): int(e) for p, e in (r.get('factors') or {}).items()}
+                if value < 2 or not r.get('factored', True) or not factors:
+                    continue
+                if math.prod(p ** e for p, e in factors.items()) != value:
+                    continue
+                if not all(is_probable_prime(p) for p in factors):
+                    continue
+                self._store(conn, value, factors, [], 'import', float(r.get('time_seconds') or 0.0))
+                count += 1
+
+                indices = r.get('prime_indices') or []
+                for p, idx in zip(sorted(factors), indices):
+                    if isinstance(idx, int) and p >= self.sieve_limit:
+                        conn.execute("INSERT OR IGNORE INTO prime_indices (prime, idx, source) "
+                                     "VALUES (?, ?, ?)", (str(p), str(idx), Path(path).name))
+            conn.commit()
+            imported += count
+            if verbose:
+                print(f"  {Path(path).name}: {count} values")
+        conn.close()
+        self._index_cache.clear()
+        return imported
+
+
+def load_m_sequence() -> List[int]:
+    """m-sequence from data_for_csolver.json (m[n] = m_seq[n-2])"""
+    with open(ROOT / 'data_for_csolver.json') as f:
+        return json.load(f)['m_seq']
+
+
+def main():
+    if len(sys.argv) < 4:
+        print("Usage: python3 -m utils.factorization <n_start> <n_end> <output_file> [timeout] [workers]")
+        print("Example: python3 -m utils.factorization 36 70 factorization_36_70.json")
+        sys.exit(1)
+
+    n_start, n_end, output_file = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3]
+    timeout = float(sys.argv[4]) if len(sys.argv) > 4 else DEFAULT_TIMEOUT
+    workers = int(sys.argv[5]) if len(sys.argv) > 5 else None
+
+    print("=" * 70)
+    print(f"FACTORIZATION SERVICE: n={n_start} to n={n_end}")
+    print(f"Output: {output_file}")
+    print("=" * 70)
+
+    svc = FactorizationService(workers=workers, timeout=timeout)
+    imported = svc.import_json(sorted(glob.glob(str(ROOT / 'factorization_*.json'))))
+    print(f"Imported {imported} cached results from existing JSON files")
+
+    m_seq = load_m_sequence()
+    t0 = time.time()
+    results = svc.factor_sequence({n: m_seq[n - 2] for n in range(n_start, n_end + 1)},
+                                  verbose=True)
+
+    for r in results:
+        status = 'PRIME' if r['is_prime'] else ('' if r['factored'] else 'PARTIAL')
+        print(f"n={r['n']:3d} m={r['m']} {status}")
+        print(f"       Factors: {r['factors']}  Indices: {r['prime_indices']}")
+
+    output = {
+        'metadata': {
+            'n_range': [n_start, n_end],
+            'timestamp': datetime.now().isoformat(),
+            'total_values': len(results),
+            'factored_count': sum(1 for r in results if r['factored'])
+        },
+        'results': results
+    }
+    with open(output_file, 'w') as f:
+        json.dump(output, f, indent=2)
+
+    print("\n" + "=" * 70)
+    print(f"COMPLETE: {output['metadata']['factored_count']}/{len(results)} factored "
+          f"in {time.time() - t0:.2f}s")
+    print(f"Results saved to: {output_file}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Formula Search - Meet-in-the-middle search for small-coefficient linear formulas
+
+find_twoterm_formulas.py and find_threeterm_formulas.py look for
+
+    target[n] = a*k[i] + b*k[j] + c*k[m] + d        (|a|, |b|, |c| <= A, |d| <= D)
+
+with nested loops over every index tuple and every coefficient. This
+module splits the terms into two halves instead:
+
+- tables of a*k[i] and a*k[i] + b*k[j] are built once per shard of
+  targets (consecutive n whose index windows overlap), with NumPy;
+- the right half is sorted, and for every left entry of every target in
+  the shard the range [T - L - D, T - L + D] is found with one batched
+  searchsorted (sorted-merge meet-in-the-middle);
+- values are shifted right until they fit int64 for that match, so it
+  stays vectorized for 70+ bit keys; the few candidates are then
+  verified exactly with Python ints;
+- formulas are ranked by complexity = sum(|coefficients|) + |d|/100 (the
+  metric the scripts above use), best `top` per target.
+
+Each formula is found once: the indices of the left half are all below
+those of the right half. A 4-term search with coefficients in +-100 over
+a 12-index window covers ~10^13 combinations per n this way.
+
+Usage:
+    from utils.formula_search import FormulaSearch
+
+    fs = FormulaSearch(k, max_coeff=100, max_remainder=2000, window=12)
+    results = fs.search({n: offsets[n] for n in range(32, 71)}, terms=(1, 2, 3, 4))
+    print(results[32][0])        # -2×k[23] + -7×k[24] + -1×k[29] - 2
+
+    python3 -m utils.formula_search --terms 1 2 3 4 --max-coeff 100 --range 32 70
+"""
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+# Entries in the largest (two-term) table of a shard
+TABLE_LIMIT = 4_000_000
+# Candidate pairs expanded at once after the sorted match
+EXPAND_LIMIT = 2_000_000
+INT64_BITS = 60
+
+
+@dataclass(frozen=True)
+class Formula:
+    """sum(a * k[i] for a, i in terms) + remainder"""
+    terms: Tuple[Tuple[int, int], ...]
+    remainder: int
+    complexity: float
+
+    def evaluate(self, values: Dict[int, int]) -> int:
+        return sum(a * values[i] for a, i in self.terms) + self.remainder
+
+    def __str__(self) -> str:
+        text = ' + '.join(f"{a}×k[{i}]" for a, i in self.terms)
+        if not self.terms:
+            return str(self.remainder)
+        sign = '+' if self.remainder >= 0 else '-'
+        return f"{text} {sign} {abs(self.remainder)}"
+
+
+def complexity(coeffs: Iterable[int], remainder: int) -> float:
+    return sum(abs(a) for a in coeffs) + abs(remainder) / 100
+
+
+class _Table:
+    """All combinations of `size` terms over a set of indices, shifted to int64"""
+
+    def __init__(self, value, coef, idx):
+        self.value = value            # int64, floor(exact / 2^shift) up to rounding
+        self.coef = coef              # (rows, size) int16
+        self.idx = idx                # (rows, size) int16, ascending per row
+        rows = len(value)
+        self.lo = idx[:, 0] if idx.shape[1] else np.full(rows, np.iinfo(np.int16).max, np.int16)
+        self.hi = idx[:, -1] if idx.shape[1] else np.zeros(rows, np.int16)
+
+    def sorted(self) -> '_Table':
+        order = np.argsort(self.value, kind='stable')
+        return _Table(self.value[order], self.coef[order], self.idx[order])
+
+
+class FormulaSearch:
+    """Meet-in-the-middle search for target = sum(a * values[i]) + d"""
+
+    def __init__(self, values: Dict[int, int], max_coeff: int = 30,
+                 max_remainder: int = 2000, window: Optional[int] = 12,
+                 table_limit: int = TABLE_LIMIT):
+        self.values = {int(i): int(v) for i, v in values.items()}
+        self.max_coeff = max_coeff
+        self.max_remainder = max_remainder
+        self.window = window
+        self.table_limit = table_limit
+        self.coeffs = np.array([a for a in range(-max_coeff, max_coeff + 1) if a], np.int64)
+        top = max(self.values) + 1
+        self._exact = np.array([self.values.get(i, 0) for i in range(top)], dtype=object)
+
+    def indices(self, n: int) -> List[int]:
+        """Indices a formula for target n may use"""
+        lo = n - self.window if self.window else 1
+        return [i for i in sorted(self.values) if lo <= i < n]
+
+    # -- tables -----------------------------------------------------------
+
+    def _single(self, indices: Sequence[int], shift: int) -> _Table:
+        if not indices:
+            return _Table(np.zeros(0, np.int64), np.zeros((0, 1), np.int16),
+                          np.zeros((0, 1), np.int16))
+        value = np.array([(int(a) * self.values[i]) >> shift
+                          for i in indices for a in self.coeffs], np.int64)
+        coef = np.tile(self.coeffs, len(indices)).astype(np.int16)[:, None]
+        idx = np.repeat(np.array(indices, np.int16), len(self.coeffs))[:, None]
+        return _Table(value, coef, idx)
+
+    def _table(self, indices: Sequence[int], size: int, shift: int) -> _Table:
+        if size == 0:
+            return _Table(np.zeros(1, np.int64), np.zeros((1, 0), np.int16),
+                          np.zeros((1, 0), np.int16))
+        single = self._single(indices, shift)
+        if size == 1:
+            return single
+        per = len(self.coeffs)
+        parts = []
+        for x in range(len(indices)):
+            for y in range(x + 1, len(indices)):
+                left = single.value[x * per:(x + 1) * per]
+                right = single.value[y * per:(y + 1) * per]
+                parts.append((x, y, (left[:, None] + right[None, :]).ravel()))
+        if not parts:
+            return _Table(np.zeros(0, np.int64), np.zeros((0, 2), np.int16),
+                          np.zeros((0, 2), np.int16))
+        value = np.concatenate([v for _, _, v in parts])
+        a = np.repeat(self.coeffs, per)
+        b = np.tile(self.coeffs, per)
+        coef = np.tile(np.stack([a, b], axis=1).astype(np.int16), (len(parts), 1))
+        idx = np.repeat(np.array([(indices[x], indices[y]) for x, y, _ in parts], np.int16),
+                        per * per, axis=0)
+        return _Table(value, coef, idx)
+
+    def _shards(self, targets: Dict[int, int], max_size: int) -> List[List[int]]:
+        """Consecutive targets sharing one table of at most table_limit entries"""
+        per = len(self.coeffs)
+        shards, current, union = [], [], set()
+        for n in sorted(targets):
+            grown = union | set(self.indices(n))
+            count = len(grown)
+            size = per ** max_size * (count * (count - 1) // 2 if max_size == 2 else count)
+            if current and size > self.table_limit:
+                shards.append(current)
+                current, grown = [], set(self.indices(n))
+            current.append(n)
+            union = grown
+        if current:
+            shards.append(current)
+        return shards
+
+    # -- search -----------------------------------------------------------
+
+    def search(self, targets: Dict[int, int], terms: Iterable[int] = (1, 2, 3),
+               top: int = 3) -> Dict[int, List[Formula]]:
+        """Best `top` formulas per target n, over every requested term count"""
+        terms = sorted(set(terms))
+        if any(t < 1 or t > 4 for t in terms):
+            raise ValueError("term counts must be between 1 and 4")
+        found: Dict[int, List[Formula]] = {n: [] for n in targets}
+        for shard in self._shards(targets, max((t + 1) // 2 for t in terms)):
+            union = sorted({i for n in shard for i in self.indices(n)})
+            bound = max(abs(targets[n]) for n in shard) + self.max_remainder + \
+                max(terms) * self.max_coeff * max((abs(self.values[i]) for i in union), default=0)
+            shift = max(0, bound.bit_length() - INT64_BITS)
+            tables = {}
+            for t in terms:
+                left, right = t // 2, t - t // 2
+                for size in (left, right):
+                    if size not in tables:
+                        tables[size] = self._table(union, size, shift).sorted()
+                self._match(shard, targets, tables[left], tables[right], t, shift, top, found)
+        return {n: sorted(f, key=lambda f: (f.complexity, len(f.terms), f.terms))[:top]
+                for n, f in found.items()}
+
+    def best(self, n: int, target: int, terms: Iterable[int] = (1, 2, 3),
+             top: int = 3) -> List[Formula]:
+        return self.search({n: target}, terms, top)[n]
+
+    def _match(self, shard, targets, L: _Table, R: _Table, nterms: int, shift: int,
+               top: int, found: Dict[int, List[Formula]]):
+        # Each of the nterms + 1 floored values is off by < 1
+        tol = (self.max_remainder >> shift) + nterms + 2
+        q_parts, tid_parts, row_parts = [], [], []
+        for t, n in enumerate(shard):
+            lo = n - self.window if self.window else 1
+            # L is sorted too, so the queries of one target are monotone and
+            # searchsorted walks R in order instead of jumping around it
+            rows = np.nonzero((L.lo >= lo) & (L.hi < n))[0][::-1]
+            q_parts.append((targets[n] >> shift) - L.value[rows])
+            tid_parts.append(np.full(len(rows), t, np.int32))
+            row_parts.append(rows)
+        q = np.concatenate(q_parts)
+        tid = np.concatenate(tid_parts)
+        lrow = np.concatenate(row_parts)
+        if not len(q) or not len(R.value):
+            return
+        start = np.searchsorted(R.value, q - tol, 'left')
+        stop = np.searchsorted(R.value, q + tol, 'right')
+        counts = stop - start
+        hit = np.nonzero(counts)[0]
+        if not len(hit):
+            return
+
+        ns = np.array(shard, np.int64)
+        win_lo = ns - self.window if self.window else np.ones_like(ns)
+        cum = np.cumsum(counts[hit])
+        begin = 0
+        while begin < len(hit):
+            end = int(np.searchsorted(cum, (cum[begin - 1] if begin else 0) + EXPAND_LIMIT,
+                                      'right'))
+            end = max(end, begin + 1)
+            rows = hit[begin:end]
+            c = counts[rows]
+            qi = np.repeat(rows, c)
+            first = np.repeat(start[rows], c)
+            offsets = np.arange(len(qi)) - np.repeat(np.cumsum(c) - c, c)
+            rpos = first + offsets
+            t = tid[qi]
+            li = lrow[qi]
+            ok = (R.lo[rpos] >= win_lo[t]) & (R.hi[rpos] < ns[t]) & (L.hi[li] < R.lo[rpos])
+            if ok.any():
+                self._verify(shard, targets, L, R, t[ok], li[ok], rpos[ok], top, found)
+            begin = end
+
+    def _verify(self, shard, targets, L, R, t, li, rpos, top, found):
+        coef = np.concatenate([L.coef[li], R.coef[rpos]], axis=1)
+        idx = np.concatenate([L.idx[li], R.idx[rpos]], axis=1)
+        exact = (coef.astype(object) * self._exact[idx.astype(np.int64)]).sum(axis=1)
+        goal = np.array([targets[shard[x]] for x in t], dtype=object)
+        remainder = goal - exact
+        small = np.array([abs(int(d)) <= self.max_remainder for d in remainder], bool)
+        if not small.any():
+            return
+        t, coef, idx = t[small], coef[small], idx[small]
+        remainder = remainder[small].astype(np.int64)
+        score = np.abs(coef).sum(axis=1) + np.abs(remainder) / 100
+        order = np.lexsort((score, t))
+        kept = {}
+        for row in order:
+            n = shard[t[row]]
+            if kept.get(n, 0) >= top:
+                continue
+            kept[n] = kept.get(n, 0) + 1
+            terms = tuple((int(a), int(i)) for a, i in zip(coef[row], idx[row]))
+            found[n].append(Formula(terms, int(remainder[row]), float(score[row])))
+        for n in kept:
+            found[n] = sorted(found[n], key=lambda f: (f.complexity, len(f.terms), f.terms))[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search small-coefficient linear formulas "
+                                                 "for offset[n] (or k[n], adj[n])")
+    parser.add_argument('--target', choices=['offset', 'k', 'adj'], default='offset')
+    parser.add_argument('--range', nargs=2, type=int, default=[23, 70], metavar=('N0', 'N1'))
+    parser.add_argument('--terms', nargs='+', type=int, default=[1, 2, 3])
+    parser.add_argument('--max-coeff', type=int, default=30)
+    parser.add_argument('--max-remainder', type=int, default=2000)
+    parser.add_argument('--window', type=int, default=12, help="0 for all earlier indices")
+    parser.add_argument('--top', type=int, default=3)
+    args = parser.parse_args()
+
+    from utils.keystore import get_keystore
+    ks = get_keystore()
+    source = {'offset': ks.offsets, 'k': ks.keys, 'adj': ks.adj}[args.target]
+    targets = {n: v for n, v in source.items() if args.range[0] <= n <= args.range[1]}
+
+    print("=" * 80)
+    print(f"FORMULA SEARCH: {args.target}[n] = sum(a×k[i]) + d, terms {args.terms}, "
+          f"|a| <= {args.max_coeff}, |d| <= {args.max_remainder}, window {args.window or 'all'}")
+    print("=" * 80)
+    fs = FormulaSearch(ks.keys, args.max_coeff, args.max_remainder, args.window or None)
+    t0 = time.time()
+    results = fs.search(targets, args.terms, args.top)
+    for n in sorted(results):
+        formulas = results[n]
+        if not formulas:
+            print(f"{args.target}[{n}]: no formula")
+            continue
+        for rank, f in enumerate(formulas):
+            label = f"{args.target}[{n}] =" if rank == 0 else " " * len(f"{args.target}[{n}] =")
+            check = "✓" if f.evaluate(ks.keys) == targets[n] else "✗"
+            print(f"{label} {f}  (complexity {f.complexity:.2f}) {check}")
+    print(f"\nSearched {len(targets)} targets in {time.time() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
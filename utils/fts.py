@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+FTS - SQLite FTS5 helpers for the log and memory databases
+
+ensure_fts() attaches an external-content FTS5 index to an existing table
+(rowid = the table's INTEGER PRIMARY KEY id) and keeps it in sync with
+AFTER INSERT/UPDATE/DELETE triggers, so the text is stored once and writers
+need no changes. The first call on an existing database backfills the
+index with FTS5's 'rebuild' command.
+
+search() runs a BM25-ranked MATCH joined back to the content table.
+User text goes through match_query(), which quotes every term, so input
+like  k[71] "mod 256" AND  never raises an FTS5 syntax error.
+
+Usage:
+    from utils.fts import ensure_fts, search
+
+    ensure_fts(conn, 'agent_insights', ['insight', 'category', 'tags'])
+    rows = search(conn, 'agent_insights', 'drift lane 7',
+                  ['agent_id', 'insight'], where='t.agent_id = ?', params=['maestro'])
+"""
+import re
+import sqlite3
+from typing import List, Optional, Sequence, Tuple
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts5_available(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp._fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def fts_table(table: str) -> str:
+    return f"{table}_fts"
+
+
+def ensure_fts(conn: sqlite3.Connection, table: str, columns: Sequence[str]) -> bool:
+    """
+    Create <table>_fts over columns plus its sync triggers (idempotent).
+
+    Returns False (and does nothing) if this SQLite build lacks FTS5.
+    """
+    if not fts5_available(conn):
+        return False
+    fts = fts_table(table)
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                          (fts,)).fetchone()
+    cols = ", ".join(columns)
+    new_cols = ", ".join(f"new.{c}" for c in columns)
+    old_cols = ", ".join(f"old.{c}" for c in columns)
+
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts}
+        USING fts5({cols}, content='{table}', content_rowid='id')
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+    """)
+    if not exists:
+        conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    return True
+
+
+def match_query(text: str, any_term: bool = False) -> Optional[str]:
+    """Quoted-term FTS5 query for free text (all terms, or any with any_term)"""
+    terms = _TOKEN_RE.findall(text or "")
+    if not terms:
+        return None
+    return (" OR " if any_term else " ").join(f'"{t}"' for t in terms)
+
+
+def search(conn: sqlite3.Connection, table: str, text: str, columns: Sequence[str],
+           where: str = None, params: Sequence = (), limit: int = 50,
+           any_term: bool = False) -> List[Tuple]:
+    """
+    Rows of table matching text, best BM25 score first.
+
+    columns are selected from the content table, aliased t; where/params
+    add extra filters and must qualify its columns as t.<column>. The
+    BM25 score is appended as the last column.
+    """
+    query = match_query(text, any_term)
+    if query is None:
+        return []
+    fts = fts_table(table)
+    select = ", ".join(f"t.{c}" for c in columns)
+    sql = f"""
+        SELECT {select}, bm25({fts}) AS score
+        FROM {fts} JOIN {table} t ON t.id = {fts}.rowid
+        WHERE {fts} MATCH ?
+    """
+    if where:
+        sql += f" AND ({where})"
+    sql += " ORDER BY score LIMIT ?"
+    return conn.execute(sql, [query, *params, limit]).fetchall()
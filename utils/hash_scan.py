@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Hash Scan - Parallel scanner for k[n] = f(H(seed, n)) hypotheses
+
+verify_hash_formula.py checks hypotheses of the form
+
+    k[n] = 2^(n-1) + (H(seed || n) mod 2^(n-1))
+
+one seed and one formula at a time. This module scans the full product
+
+    seeds x constructions x range rules
+
+against every known key:
+
+- a construction is a hash (sha256, sha256d, sha512, ripemd160,
+  hmac-sha256, hmac-sha512), an encoding of n (str, be32, le64) and a
+  layout (seed||n or n||seed; HMAC is keyed with the seed, message n);
+- a range rule maps the digest H (as a big-endian integer of L bits)
+  into puzzle n's range [2^(n-1), 2^n):
+      low   2^(n-1) + (H mod 2^(n-1))       (verify_hash_formula.py)
+      high  2^(n-1) + (H >> (L - n + 1))    (top bits of the digest)
+      mod   H mod 2^n                       (no forced top bit)
+- every check costs one hash, so the cheapest rejection is the most
+  selective one: a wrong hypothesis survives puzzle n with probability
+  ~2^-(n-1). Known puzzles are therefore tried widest range first, and
+  one hash per construction rejects practically every seed. Hypotheses
+  that pass that screen are checked against all known keys;
+- seed chunks are spread over a process pool with a bounded number of
+  chunks in flight, so a wordlist or generator of any size streams
+  through in constant memory;
+- survivors stream to a JSONL file as they are found, followed by a
+  summary line with the throughput in hypotheses/sec.
+
+Usage:
+    from utils.hash_scan import HashScanner, iter_seeds
+
+    scanner = HashScanner()
+    stats = scanner.scan(iter_seeds(wordlists=['rockyou.txt']), 'hash_scan.jsonl')
+
+    python3 -m utils.hash_scan --wordlist words.txt --numbers 0:10000000
+    python3 -m utils.hash_scan --seeds bitcoin satoshi --variants
+"""
+import argparse
+import hashlib
+import hmac
+import itertools
+import json
+import multiprocessing as mp
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+DEFAULT_OUTPUT = "hash_scan_results.jsonl"
+CHUNK_SIZE = 2_000
+# Chunks queued per worker; bounds memory for arbitrarily long seed streams
+IN_FLIGHT_PER_WORKER = 4
+REPORT_INTERVAL = 10.0
+
+# The seeds verify_hash_formula.py started from
+BUILTIN_SEEDS = ["bitcoin", "puzzle", "satoshi", "1", "2015", "creator", "btc",
+                 "key", "challenge", ""]
+
+ENCODINGS: Dict[str, Callable[[int], bytes]] = {
+    'str': lambda n: str(n).encode(),
+    'be32': lambda n: n.to_bytes(4, 'big'),
+    'le64': lambda n: n.to_bytes(8, 'little'),
+}
+
+HASHES: Dict[str, Callable[[bytes], bytes]] = {
+    'sha256': lambda data: hashlib.sha256(data).digest(),
+    'sha256d': lambda data: hashlib.sha256(hashlib.sha256(data).digest()).digest(),
+    'sha512': lambda data: hashlib.sha512(data).digest(),
+    'ripemd160': lambda data: hashlib.new('ripemd160', data).digest(),
+}
+
+HMACS = {
+    'hmac-sha256': 'sha256',
+    'hmac-sha512': 'sha512',
+}
+
+LAYOUTS = ('seed|n', 'n|seed')
+
+RULES = ('low', 'high', 'mod')
+
+# (hash, encoding, layout); layout is 'key=seed' for HMAC
+Construction = Tuple[str, str, str]
+
+
+def default_constructions() -> List[Construction]:
+    plain = [(h, e, layout) for h in HASHES for e in ENCODINGS for layout in LAYOUTS]
+    keyed = [(h, e, 'key=seed') for h in HMACS for e in ENCODINGS]
+    return plain + keyed
+
+
+def construction_name(construction: Construction) -> str:
+    name, encoding, layout = construction
+    if layout == 'key=seed':
+        return f"{name}(seed, {encoding}(n))"
+    if layout == 'n|seed':
+        return f"{name}({encoding}(n) || seed)"
+    return f"{name}(seed || {encoding}(n))"
+
+
+def digest(construction: Construction, seed: bytes, n: int) -> bytes:
+    """H(seed, n) for one construction"""
+    name, encoding, layout = construction
+    nb = ENCODINGS[encoding](n)
+    if layout == 'key=seed':
+        return hmac.digest(seed, nb, HMACS[name])
+    return HASHES[name](seed + nb if layout == 'seed|n' else nb + seed)
+
+
+def reduce_digest(rule: str, h: bytes, n: int) -> int:
+    """Map digest h into puzzle n's range according to a range rule"""
+    value = int.from_bytes(h, 'big')
+    if rule == 'low':
+        return (1 << (n - 1)) + (value & ((1 << (n - 1)) - 1))
+    if rule == 'high':
+        return (1 << (n - 1)) + (value >> (len(h) * 8 - n + 1))
+    if rule == 'mod':
+        return value & ((1 << n) - 1)
+    raise ValueError(f"unknown range rule {rule!r}")
+
+
+def predict(construction: Construction, rule: str, seed: bytes, n: int) -> int:
+    """k[n] predicted by one hypothesis"""
+    return reduce_digest(rule, digest(construction, seed, n), n)
+
+
+# ----------------------------------------------------------------------
+# Seeds
+# ----------------------------------------------------------------------
+
+def _variants(word: bytes) -> List[bytes]:
+    return list(dict.fromkeys([word, word.lower(), word.upper(), word.capitalize()]))
+
+
+def iter_seeds(words: Sequence[str] = (), wordlists: Sequence[str] = (),
+               numbers: Optional[Tuple[int, int]] = None,
+               variants: bool = False) -> Iterator[bytes]:
+    """
+    Seeds as bytes: inline words, then each wordlist (one seed per line,
+    '-' for stdin), then the decimal strings of range(*numbers). With
+    variants, each word also yields its lower/upper/capitalized forms.
+    """
+    def words_from_files():
+        for path in wordlists:
+            f = sys.stdin.buffer if path == '-' else open(path, 'rb')
+            try:
+                for line in f:
+                    yield line.rstrip(b'\r\n')
+            finally:
+                if f is not sys.stdin.buffer:
+                    f.close()
+
+    for word in itertools.chain((w.encode() for w in words), words_from_files()):
+        if variants:
+            yield from _variants(word)
+        else:
+            yield word
+    if numbers is not None:
+        for i in range(*numbers):
+            yield str(i).encode()
+
+
+def _chunks(seeds: Iterable[bytes], size: int) -> Iterator[List[bytes]]:
+    it = iter(seeds)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ----------------------------------------------------------------------
+# Worker
+# ----------------------------------------------------------------------
+
+_PLAN = None
+
+
+def _build_plan(keys: Dict[int, int], constructions: Sequence[Construction],
+                rules: Sequence[str]):
+    """
+    Per construction: a digest function of the seed for the screen
+    puzzle, and the expected screen value per rule. Comparing reduced
+    digests against these is a mask/shift and an int compare per rule.
+    """
+    screen_n = max(keys)
+    screen_k = keys[screen_n]
+    low_target = screen_k - (1 << (screen_n - 1))
+    plan = []
+    for construction in constructions:
+        name, encoding, layout = construction
+        nb = ENCODINGS[encoding](screen_n)
+        if layout == 'key=seed':
+            algorithm = HMACS[name]
+            fn = (lambda nb, a: lambda seed: hmac.digest(seed, nb, a))(nb, algorithm)
+        elif layout == 'seed|n':
+            fn = (lambda nb, h: lambda seed: h(seed + nb))(nb, HASHES[name])
+        else:
+            fn = (lambda nb, h: lambda seed: h(nb + seed))(nb, HASHES[name])
+        checks = []
+        for rule in rules:
+            if rule == 'low':
+                checks.append((rule, 0, (1 << (screen_n - 1)) - 1, low_target))
+            elif rule == 'high':
+                checks.append((rule, screen_n - 1, None, low_target))
+            elif rule == 'mod':
+                checks.append((rule, 0, (1 << screen_n) - 1, screen_k))
+            else:
+                raise ValueError(f"unknown range rule {rule!r}")
+        plan.append((construction, fn, checks))
+    return screen_n, plan
+
+
+def _init_worker(keys, constructions, rules):
+    global _PLAN
+    _PLAN = (keys, _build_plan(keys, constructions, rules))
+
+
+def _full_check(keys: Dict[int, int], construction: Construction, rule: str,
+                seed: bytes) -> List[int]:
+    return [n for n, k in keys.items() if predict(construction, rule, seed, n) == k]
+
+
+def _scan_chunk(seeds: List[bytes]) -> Tuple[int, List[Dict]]:
+    """Pool entry point: (seeds scanned, survivors of the screen)"""
+    keys, (screen_n, plan) = _PLAN
+    survivors = []
+    for seed in seeds:
+        for construction, fn, checks in plan:
+            h = fn(seed)
+            value = int.from_bytes(h, 'big')
+            for rule, top_bits, mask, target in checks:
+                if mask is None:
+                    got = value >> (len(h) * 8 - top_bits)
+                else:
+                    got = value & mask
+                if got != target:
+                    continue
+                matched = _full_check(keys, construction, rule, seed)
+                survivors.append({
+                    'seed': seed.decode('latin-1'),
+                    'construction': construction_name(construction),
+                    'rule': rule,
+                    'matched': len(matched),
+                    'total': len(keys),
+                    'mismatched': sorted(set(keys) - set(matched)),
+                    'full_match': len(matched) == len(keys),
+                })
+    return len(seeds), survivors
+
+
+# ----------------------------------------------------------------------
+# Scanner
+# ----------------------------------------------------------------------
+
+class HashScanner:
+    """Streams seeds through every (construction, rule) hypothesis"""
+
+    def __init__(self, keys: Optional[Dict[int, int]] = None,
+                 constructions: Optional[Sequence[Construction]] = None,
+                 rules: Sequence[str] = RULES, workers: Optional[int] = None,
+                 chunk_size: int = CHUNK_SIZE):
+        if keys is None:
+            from utils.keystore import load_known_keys
+            keys = load_known_keys()
+        # k[1] = 1 is the whole range of puzzle 1, every hypothesis matches it
+        self.keys = {n: k for n, k in keys.items() if n >= 2}
+        self.constructions = list(constructions or default_constructions())
+        self.rules = list(rules)
+        self.workers = workers or mp.cpu_count()
+        self.chunk_size = chunk_size
+
+    @property
+    def hypotheses_per_seed(self) -> int:
+        return len(self.constructions) * len(self.rules)
+
+    def scan(self, seeds: Iterable[bytes], output: Optional[str] = DEFAULT_OUTPUT,
+             verbose: bool = True, report_interval: float = REPORT_INTERVAL) -> Dict:
+        """
+        Scan every seed; survivors are appended to output (JSONL) as they
+        arrive, followed by a summary line. Returns the summary.
+        """
+        init_args = (self.keys, self.constructions, self.rules)
+        per_seed = self.hypotheses_per_seed
+        out = open(output, 'a') if output else None
+        started = datetime.now().isoformat()
+        t0 = last_report = time.perf_counter()
+        scanned = 0
+        survivors: List[Dict] = []
+
+        def collect(result):
+            nonlocal scanned, last_report
+            count, found = result
+            scanned += count
+            for s in found:
+                survivors.append(s)
+                if out:
+                    out.write(json.dumps({'type': 'survivor', **s}) + '\n')
+                if verbose:
+                    tag = 'FULL MATCH' if s['full_match'] else f"{s['matched']}/{s['total']}"
+                    print(f"  [{tag}] seed={s['seed']!r} {s['construction']} rule={s['rule']}")
+            if out and found:
+                out.flush()
+            now = time.perf_counter()
+            if verbose and now - last_report >= report_interval:
+                last_report = now
+                rate = scanned * per_seed / (now - t0)
+                print(f"  {scanned:,} seeds, {scanned * per_seed:,} hypotheses, "
+                      f"{rate:,.0f} hypotheses/sec")
+
+        if verbose:
+            print(f"Scanning {per_seed} hypotheses per seed against {len(self.keys)} keys "
+                  f"(screen: puzzle {max(self.keys)}) on {self.workers} worker(s)")
+        try:
+            chunks = _chunks(seeds, self.chunk_size)
+            if self.workers > 1:
+                with mp.Pool(self.workers, _init_worker, init_args) as pool:
+                    pending = deque()
+                    limit = self.workers * IN_FLIGHT_PER_WORKER
+                    for chunk in chunks:
+                        pending.append(pool.apply_async(_scan_chunk, (chunk,)))
+                        if len(pending) >= limit:
+                            collect(pending.popleft().get())
+                    while pending:
+                        collect(pending.popleft().get())
+            else:
+                _init_worker(*init_args)
+                for chunk in chunks:
+                    collect(_scan_chunk(chunk))
+
+            elapsed = time.perf_counter() - t0
+            summary = {
+                'type': 'summary',
+                'started': started,
+                'seeds': scanned,
+                'hypotheses': scanned * per_seed,
+                'hypotheses_per_seed': per_seed,
+                'constructions': [construction_name(c) for c in self.constructions],
+                'rules': self.rules,
+                'keys': len(self.keys),
+                'survivors': len(survivors),
+                'full_matches': sum(1 for s in survivors if s['full_match']),
+                'seconds': round(elapsed, 3),
+                'hypotheses_per_sec': round(scanned * per_seed / elapsed) if elapsed else 0,
+                'workers': self.workers,
+            }
+            if out:
+                out.write(json.dumps(summary) + '\n')
+        finally:
+            if out:
+                out.close()
+
+        if verbose:
+            print(f"\n{summary['seeds']:,} seeds x {per_seed} = {summary['hypotheses']:,} "
+                  f"hypotheses in {summary['seconds']:.1f}s "
+                  f"({summary['hypotheses_per_sec']:,} hypotheses/sec)")
+            print(f"Survivors: {summary['survivors']}, full matches: {summary['full_matches']}")
+        return summary
+
+
+def _parse_range(text: str) -> Tuple[int, int]:
+    start, _, end = text.partition(':')
+    return int(start), int(end)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan hash-seed hypotheses against known keys")
+    parser.add_argument('--seeds', nargs='*', default=[], help="inline seed words")
+    parser.add_argument('--wordlist', action='append', default=[],
+                        help="file with one seed per line ('-' for stdin); repeatable")
+    parser.add_argument('--numbers', type=_parse_range, metavar='START:END',
+                        help="decimal integers START..END-1 as seeds")
+    parser.add_argument('--variants', action='store_true',
+                        help="also try lower/upper/capitalized forms of each word")
+    parser.add_argument('--hashes', nargs='*', choices=list(HASHES) + list(HMACS))
+    parser.add_argument('--encodings', nargs='*', choices=list(ENCODINGS))
+    parser.add_argument('--rules', nargs='*', choices=RULES, default=list(RULES))
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    constructions = [c for c in default_constructions()
+                     if (not args.hashes or c[0] in args.hashes)
+                     and (not args.encodings or c[1] in args.encodings)]
+    words = args.seeds
+    if not (words or args.wordlist or args.numbers):
+        words = BUILTIN_SEEDS
+
+    print("=" * 70)
+    print("HASH SEED SCAN")
+    print(f"Output: {args.output}")
+    print("=" * 70)
+    scanner = HashScanner(constructions=constructions, rules=args.rules,
+                          workers=args.workers, chunk_size=args.chunk_size)
+    seeds = iter_seeds(words, args.wordlist, args.numbers, args.variants)
+    scanner.scan(seeds, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+KeyStore - Canonical k-table for every analysis script
+
+Merges the three places solved keys live
+
+    db/kh.db                         keys(puzzle_id, priv_hex), puzzles(id, address)
+    data/btc_puzzle_1_160_full.csv   puzzle, address, key_hex
+    config/puzzle_config.json        known_keys, bridge_keys
+
+into one table, loaded once per process. The merged table is cached in
+db/keystore_cache.json keyed on the (mtime, size) of each source, so a
+script only re-parses the sources after one of them changed.
+
+Derived sequences are computed on first access and memoized:
+
+    adj[n] = k[n] - 2*k[n-1]
+    m[n], d[n]  from k[n] = 2*k[n-1] + 2^n - m[n]*k[d[n]]  (min |m|, m > 0)
+    c[n] = k[n] / 2^n
+    offset[n] = k[n] - 9*k[n-3]
+
+Usage:
+    from utils.keystore import get_keystore
+
+    ks = get_keystore()
+    k70 = ks[70]
+    m, d = ks.m, ks.d
+    K = ks.subset(range(1, 71))
+"""
+import csv
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.recurrence import RecurrenceEngine
+
+ROOT = Path(__file__).parent.parent
+KH_DB_PATH = ROOT / "db" / "kh.db"
+CSV_PATH = ROOT / "data" / "btc_puzzle_1_160_full.csv"
+CONFIG_PATH = ROOT / "config" / "puzzle_config.json"
+CACHE_PATH = ROOT / "db" / "keystore_cache.json"
+
+# Bump when the cache layout changes
+CACHE_VERSION = 1
+
+
+def _fingerprint(paths: Iterable[Path]) -> Dict[str, List[int]]:
+    """(mtime_ns, size) per existing source file"""
+    fp = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        fp[str(path)] = [st.st_mtime_ns, st.st_size]
+    return fp
+
+
+def _load_kh_db(path: Path) -> Tuple[Dict[int, int], Dict[int, str]]:
+    """Keys and addresses from kh.db (either table may be missing)"""
+    keys, addresses = {}, {}
+    if not path.exists():
+        return keys, addresses
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        try:
+            for puzzle_id, priv_hex in conn.execute(
+                    "SELECT puzzle_id, priv_hex FROM keys WHERE puzzle_id IS NOT NULL"):
+                if priv_hex:
+                    keys[int(puzzle_id)] = int(priv_hex, 16)
+        except sqlite3.Error:
+            pass
+        try:
+            for puzzle_id, address in conn.execute(
+                    "SELECT id, address FROM puzzles WHERE address IS NOT NULL"):
+                address = address.split('#')[0].strip()
+                if address:
+                    addresses[int(puzzle_id)] = address
+        except sqlite3.Error:
+            pass
+    finally:
+        conn.close()
+    return keys, addresses
+
+
+def _load_csv(path: Path) -> Tuple[Dict[int, int], Dict[int, str]]:
+    """Keys and addresses from the puzzle CSV ('?' marks unsolved)"""
+    keys, addresses = {}, {}
+    if not path.exists():
+        return keys, addresses
+    with open(path) as f:
+        for row in csv.DictReader(f):
+            n = int(row['puzzle'])
+            address = row.get('address', '').split('#')[0].strip()
+            if address:
+                addresses[n] = address
+            key_hex = row.get('key_hex', '').strip()
+            if key_hex and key_hex != '?':
+                keys[n] = int(key_hex, 16)
+    return keys, addresses
+
+
+def _load_config(path: Path) -> Dict[int, int]:
+    """known_keys and bridge_keys from puzzle_config.json"""
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        config = json.load(f)
+    keys = {int(n): int(v) for n, v in config.get("known_keys", {}).items()}
+    for n, v in config.get("bridge_keys", {}).items():
+        keys.setdefault(int(n), int(v))
+    return keys
+
+
+class KeyStore:
+    """Merged, cached k-table with lazily derived sequences"""
+
+    def __init__(self, kh_db_path: Path = KH_DB_PATH, csv_path: Path = CSV_PATH,
+                 config_path: Path = CONFIG_PATH, cache_path: Optional[Path] = CACHE_PATH):
+        # Source order is merge priority: kh.db is authoritative
+        self.sources = [Path(kh_db_path), Path(csv_path), Path(config_path)]
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.fingerprint = _fingerprint(self.sources)
+        self.keys: Dict[int, int] = {}
+        self.addresses: Dict[int, str] = {}
+        self.origin: Dict[int, str] = {}
+        self.conflicts: List[Tuple[int, str, int, str, int]] = []
+        self._derived: Dict[str, Dict] = {}
+
+        if not self._load_cache():
+            self._merge()
+            self._save_cache()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _merge(self):
+        """Read every source and merge keys in priority order"""
+        kh_db_path, csv_path, config_path = self.sources
+        db_keys, db_addresses = _load_kh_db(kh_db_path)
+        csv_keys, csv_addresses = _load_csv(csv_path)
+        config_keys = _load_config(config_path)
+
+        for name, keys in (("kh.db", db_keys), ("csv", csv_keys), ("config", config_keys)):
+            for n, value in keys.items():
+                if n not in self.keys:
+                    self.keys[n] = value
+                    self.origin[n] = name
+                elif self.keys[n] != value:
+                    self.conflicts.append((n, self.origin[n], self.keys[n], name, value))
+
+        self.addresses = dict(csv_addresses)
+        self.addresses.update(db_addresses)
+        self.keys = dict(sorted(self.keys.items()))
+
+    def _load_cache(self) -> bool:
+        """Use the persistent cache if it matches the current sources"""
+        if self.cache_path is None or not self.cache_path.exists():
+            return False
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if cache.get("version") != CACHE_VERSION or cache.get("fingerprint") != self.fingerprint:
+            return False
+
+        # JSON keys are strings and keys are hex to stay readable
+        self.keys = {int(n): int(v, 16) for n, v in cache["keys"].items()}
+        self.addresses = {int(n): a for n, a in cache["addresses"].items()}
+        self.origin = {int(n): o for n, o in cache["origin"].items()}
+        self.conflicts = [(n, a, int(va, 16), b, int(vb, 16))
+                          for n, a, va, b, vb in cache["conflicts"]]
+        return True
+
+    def _save_cache(self):
+        """Write the merged table next to the other local databases"""
+        if self.cache_path is None:
+            return
+        cache = {
+            "version": CACHE_VERSION,
+            "fingerprint": self.fingerprint,
+            "keys": {str(n): hex(v) for n, v in self.keys.items()},
+            "addresses": {str(n): a for n, a in self.addresses.items()},
+            "origin": {str(n): o for n, o in self.origin.items()},
+            "conflicts": [[n, a, hex(va), b, hex(vb)] for n, a, va, b, vb in self.conflicts],
+        }
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump(cache, f)
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            pass
+
+    def is_stale(self) -> bool:
+        """True if any source changed since this store was loaded"""
+        return _fingerprint(self.sources) != self.fingerprint
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, n: int) -> int:
+        return self.keys[n]
+
+    def __contains__(self, n: int) -> bool:
+        return n in self.keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def get(self, n: int, default: Optional[int] = None) -> Optional[int]:
+        return self.keys.get(n, default)
+
+    def subset(self, ns: Iterable[int]) -> Dict[int, int]:
+        """Plain dict of the known keys among ns (a copy, safe to mutate)"""
+        return {n: self.keys[n] for n in ns if n in self.keys}
+
+    def solved(self) -> List[int]:
+        return list(self.keys)
+
+    # ------------------------------------------------------------------
+    # Derived sequences (memoized)
+    # ------------------------------------------------------------------
+
+    def _memo(self, name: str, compute) -> Dict:
+        if name not in self._derived:
+            self._derived[name] = compute()
+        return self._derived[name]
+
+    @property
+    def adj(self) -> Dict[int, int]:
+        """adj[n] = k[n] - 2*k[n-1]"""
+        k = self.keys
+        return self._memo("adj", lambda: {n: k[n] - 2 * k[n - 1]
+                                          for n in k if (n - 1) in k})
+
+    def _md(self) -> Dict[int, Tuple[int, int]]:
+        return self._memo("md", lambda: RecurrenceEngine(self.keys).analyze(rule='min_abs_m'))
+
+    @property
+    def m(self) -> Dict[int, int]:
+        """m[n] of the d-minimizing decomposition"""
+        return self._memo("m", lambda: {n: m for n, (d, m) in self._md().items()})
+
+    @property
+    def d(self) -> Dict[int, int]:
+        """d[n] of the d-minimizing decomposition"""
+        return self._memo("d", lambda: {n: d for n, (d, m) in self._md().items()})
+
+    @property
+    def c(self) -> Dict[int, float]:
+        """c[n] = k[n] / 2^n"""
+        return self._memo("c", lambda: {n: v / (2 ** n) for n, v in self.keys.items()})
+
+    @property
+    def offsets(self) -> Dict[int, int]:
+        """offset[n] = k[n] - 9*k[n-3]"""
+        k = self.keys
+        return self._memo("offsets", lambda: {n: k[n] - 9 * k[n - 3]
+                                              for n in k if (n - 3) in k})
+
+
+_STORE: Optional[KeyStore] = None
+
+
+def get_keystore(reload: bool = False) -> KeyStore:
+    """Process-wide KeyStore, reloaded when a source file changes"""
+    global _STORE
+    if reload or _STORE is None or _STORE.is_stale():
+        _STORE = KeyStore()
+    return _STORE
+
+
+def load_known_keys() -> Dict[int, int]:
+    """Drop-in for the per-script loaders: {puzzle: key} copy of the merged table"""
+    return dict(get_keystore().keys)
+
+
+# Test
+if __name__ == "__main__":
+    import time
+
+    t0 = time.perf_counter()
+    ks = KeyStore()
+    elapsed = time.perf_counter() - t0
+    print(f"Loaded {len(ks)} keys in {elapsed * 1000:.1f} ms "
+          f"(sources: {', '.join(Path(p).name for p in ks.fingerprint)})")
+    print(f"Puzzles {min(ks.keys)}..{max(ks.keys)}, {len(ks.addresses)} addresses")
+    if ks.conflicts:
+        print(f"{len(ks.conflicts)} conflicting source values:")
+        for n, a, va, b, vb in ks.conflicts[:10]:
+            print(f"  k[{n}]: {a}={va:#x} {b}={vb:#x}")
+
+    t0 = time.perf_counter()
+    derived = {name: len(getattr(ks, name)) for name in ("adj", "m", "d", "c", "offsets")}
+    elapsed = time.perf_counter() - t0
+    print(f"Derived {derived} in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+LLM Cache - Content-addressed response cache for Ollama calls
+
+A request is keyed on sha256 of its canonical JSON
+
+    (model, system, prompt | messages, temperature, options)
+
+and the response body is stored zlib-compressed in db/llm_cache.db.
+Entries expire after ttl seconds and the least recently used entries
+are evicted past max_entries.
+
+With semantic enabled, a miss on the exact key falls back to the closest
+earlier prompt for the same (model, system, temperature, options) by
+cosine similarity of sentence embeddings (the all-MiniLM-L6-v2 model used
+by rag/vector_store.py, from the shared worker in utils/embeddings.py when
+it is running), accepted above the similarity threshold.
+
+The shared transport (utils/llm_transport.py) consults the cache for every
+non-streaming /api/generate and /api/chat call; scripts that shell out to
+the ollama CLI use ollama_run() as a drop-in for subprocess.run. Pass
+cache=False (or set LLM_CACHE=0) to bypass it.
+
+Usage:
+    from utils.llm_cache import get_llm_cache, ollama_run
+
+    result = ollama_run(model, prompt, timeout=3600)   # CompletedProcess
+    print(get_llm_cache().stats())
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import yaml
+
+ROOT = Path(__file__).parent.parent
+DB_PATH = ROOT / "db" / "llm_cache.db"
+CONFIG_PATH = ROOT / "config" / "config.yaml"
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_SIMILARITY = 0.97
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Payload fields that change the answer; everything else (stream, keep_alive) does not
+KEY_FIELDS = ("model", "system", "prompt", "messages", "temperature", "options",
+              "max_tokens", "format")
+
+
+def _cache_config(config_path: Path = CONFIG_PATH) -> Dict:
+    """llm_cache section of config.yaml (empty if missing)"""
+    try:
+        with open(config_path) as f:
+            return (yaml.safe_load(f) or {}).get("llm_cache", {}) or {}
+    except (OSError, yaml.YAMLError):
+        return {}
+
+
+def _canonical(payload: Dict) -> Dict:
+    return {k: payload.get(k) for k in KEY_FIELDS}
+
+
+def request_key(payload: Dict) -> str:
+    """Content address of an Ollama request payload"""
+    blob = json.dumps(_canonical(payload), sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def _context_key(payload: Dict) -> str:
+    """Everything but the user text: near-duplicates must agree on this"""
+    ctx = _canonical(payload)
+    ctx.pop("prompt")
+    messages = ctx.pop("messages") or []
+    # System/history messages are context, the last message is the prompt
+    ctx["history"] = messages[:-1]
+    blob = json.dumps(ctx, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def _prompt_text(payload: Dict) -> str:
+    if payload.get("prompt") is not None:
+        return str(payload["prompt"])
+    messages = payload.get("messages") or []
+    return str(messages[-1].get("content", "")) if messages else ""
+
+
+class LLMCache:
+    """SQLite-backed exact + optional semantic response cache"""
+
+    def __init__(self, db_path: Path = DB_PATH, ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None, semantic: Optional[bool] = None,
+                 similarity: Optional[float] = None, enabled: Optional[bool] = None):
+        config = _cache_config()
+        self.db_path = Path(db_path)
+        self.ttl = ttl if ttl is not None else config.get("ttl", DEFAULT_TTL)
+        self.max_entries = max_entries or config.get("max_entries", DEFAULT_MAX_ENTRIES)
+        self.semantic = semantic if semantic is not None else config.get("semantic", False)
+        self.similarity = similarity or config.get("similarity", DEFAULT_SIMILARITY)
+        if enabled is None:
+            enabled = config.get("enabled", True) and os.getenv("LLM_CACHE", "1") != "0"
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._model = None
+        self.hits = self.semantic_hits = self.misses = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                context TEXT NOT NULL,
+                model TEXT,
+                prompt TEXT,
+                embedding BLOB,
+                response BLOB NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER DEFAULT 0
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_context ON responses(context)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_used ON responses(last_used)")
+        self.conn.commit()
+
+    # ------------------------------------------------------------------
+    # Embeddings (lazy, optional)
+    # ------------------------------------------------------------------
+
+    def _embed(self, text: str):
+        """Normalized float32 embedding, or None if sentence-transformers is missing"""
+        if self._model is None:
+            from utils.embeddings import get_embedder
+            self._model = get_embedder(EMBEDDING_MODEL)
+            if self._model is None:
+                self.semantic = False
+                return None
+        return self._model.encode([text])[0]
+
+    def _nearest(self, context: str, prompt: str) -> Optional[Tuple[str, bytes]]:
+        import numpy as np
+
+        query = self._embed(prompt)
+        if query is None:
+            return None
+        rows = self.conn.execute(
+            "SELECT key, embedding, response FROM responses "
+            "WHERE context = ? AND embedding IS NOT NULL AND created >= ?",
+            (context, time.time() - self.ttl)
+        ).fetchall()
+        if not rows:
+            return None
+        matrix = np.stack([np.frombuffer(r[1], dtype=np.float32) for r in rows])
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity:
+            return None
+        return rows[best][0], rows[best][2]
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def get(self, payload: Dict) -> Optional[str]:
+        """Cached response body for payload, or None"""
+        if not self.enabled:
+            return None
+        key = request_key(payload)
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created >= ?",
+                (key, now - self.ttl)
+            ).fetchone()
+            hit = (key, row[0]) if row else None
+            if hit is None and self.semantic:
+                hit = self._nearest(_context_key(payload), _prompt_text(payload))
+                if hit is not None:
+                    self.semantic_hits += 1
+            if hit is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.conn.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                              (now, hit[0]))
+            self.conn.commit()
+        return zlib.decompress(hit[1]).decode()
+
+    def put(self, payload: Dict, response: str):
+        """Store response body for payload and evict expired / LRU entries"""
+        if not self.enabled:
+            return
+        prompt = _prompt_text(payload)
+        embedding = None
+        if self.semantic:
+            vec = self._embed(prompt)
+            embedding = vec.tobytes() if vec is not None else None
+        now = time.time()
+        with self._lock:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO responses
+                    (key, context, model, prompt, embedding, response, created, last_used, hits)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)
+            """, (request_key(payload), _context_key(payload), payload.get("model"),
+                  prompt[:1000], embedding, zlib.compress(response.encode(), 6), now, now))
+            self.conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            self.conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self.conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        entries, size = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(response)), 0) FROM responses").fetchone()
+        return {"entries": entries, "compressed_bytes": size, "hits": self.hits,
+                "semantic_hits": self.semantic_hits, "misses": self.misses}
+
+
+_CACHE: Optional[LLMCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Process-wide LLMCache"""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = LLMCache()
+        return _CACHE
+
+
+def ollama_run(model: str, prompt: str, timeout: Optional[float] = None,
+               cache: bool = True) -> subprocess.CompletedProcess:
+    """
+    Cached drop-in for subprocess.run(["ollama", "run", model, prompt], ...).
+
+    Only successful runs with output are stored; TimeoutExpired propagates
+    exactly as from subprocess.run.
+    """
+    payload = {"model": model, "prompt": prompt}
+    args = ["ollama", "run", model, prompt]
+    store = get_llm_cache() if cache else None
+    if store is not None:
+        cached = store.get(payload)
+        if cached is not None:
+            return subprocess.CompletedProcess(args, 0, cached, "")
+
+    result = subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+    if store is not None and result.returncode == 0 and result.stdout:
+        store.put(payload, result.stdout)
+    return result
+
+
+# Test
+if __name__ == "__main__":
+    c = get_llm_cache()
+    print(f"{c.db_path}: enabled={c.enabled} semantic={c.semantic} "
+          f"ttl={c.ttl}s max_entries={c.max_entries}")
+    print(c.stats())
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+LLM Transport - Shared, pooled HTTP transport for every Ollama caller
+
+One aiohttp.ClientSession (with a keep-alive TCPConnector) per event loop
+instead of one session per request, and one asyncio.Semaphore per model
+sized to daemon.max_concurrent_agents so a cycle that fans out hundreds of
+calls cannot open hundreds of connections at once.
+
+Transient failures (connection errors, 429/5xx) are retried with
+full-jitter exponential backoff. A request's timeout covers all of its
+attempts, so a timed-out attempt is not retried. Every request records
+its latency and, when Ollama reports them, prompt_eval_count / eval_count
+token counts.
+
+Non-streaming /api/generate and /api/chat responses go through the
+response cache in utils/llm_cache.py; pass cache=False to bypass it.
+
+Sessions are bound to the loop that created them. Code that drives
+coroutines with asyncio.run() should use transport.run(coro), which closes
+that loop's session before the loop goes away.
+
+Usage:
+    from utils.llm_transport import get_transport
+
+    transport = get_transport()
+    response = await transport.post(f"{base_url}/api/chat", payload,
+                                    model=model, api_key=api_key)
+    if response.status == 200:
+        data = response.json()
+    print(transport.stats())
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Deque, Dict, Optional
+
+import yaml
+
+from utils.llm_cache import get_llm_cache
+
+if TYPE_CHECKING:
+    import aiohttp
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).parent.parent
+CONFIG_PATH = ROOT / "config" / "config.yaml"
+
+DEFAULT_CONCURRENCY = 3
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5       # seconds, first retry ceiling
+MAX_BACKOFF = 8.0
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+CACHEABLE_ENDPOINTS = {"generate", "chat"}
+METRICS_HISTORY = 1000
+
+
+def _max_concurrent_agents(config_path: Path = CONFIG_PATH) -> int:
+    """daemon.max_concurrent_agents from config.yaml (default 3)"""
+    try:
+        with open(config_path) as f:
+            config = yaml.safe_load(f) or {}
+        return max(1, int(config.get("daemon", {}).get("max_concurrent_agents",
+                                                        DEFAULT_CONCURRENCY)))
+    except (OSError, ValueError, TypeError, yaml.YAMLError):
+        return DEFAULT_CONCURRENCY
+
+
+@dataclass
+class LLMResponse:
+    """Status and body of a completed request"""
+    status: int
+    text: str
+    latency: float
+    attempts: int
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+@dataclass
+class RequestMetric:
+    """One request as seen by the transport"""
+    timestamp: float
+    model: str
+    endpoint: str
+    status: Optional[int]
+    latency: float
+    attempts: int
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    error: Optional[str] = None
+    cached: bool = False
+
+
+@dataclass
+class _LoopState:
+    session: "aiohttp.ClientSession"
+    semaphores: Dict[str, asyncio.Semaphore] = field(default_factory=dict)
+
+
+class LLMTransport:
+    """Process-wide pooled session, per-model concurrency limit, retries and metrics"""
+
+    def __init__(self, concurrency: Optional[int] = None, retries: int = DEFAULT_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF, pool_size: Optional[int] = None):
+        self.concurrency = concurrency or _max_concurrent_agents()
+        self.retries = retries
+        self.backoff = backoff
+        # Enough sockets for every model's semaphore slots plus a little headroom
+        self.pool_size = pool_size or max(10, self.concurrency * 4)
+        self._loops: Dict[asyncio.AbstractEventLoop, _LoopState] = {}
+        self._lock = threading.Lock()
+        self.history: Deque[RequestMetric] = deque(maxlen=METRICS_HISTORY)
+        self.totals: Dict[str, Dict[str, float]] = defaultdict(lambda: {
+            "requests": 0, "errors": 0, "retries": 0, "latency": 0.0,
+            "prompt_tokens": 0, "completion_tokens": 0, "cache_hits": 0,
+        })
+
+    # ------------------------------------------------------------------
+    # Session / semaphore management
+    # ------------------------------------------------------------------
+
+    def _state(self) -> _LoopState:
+        """Session and semaphores of the running loop (created on first use)"""
+        import aiohttp  # ~0.2 s to import; only pay it when a request is made
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # Drop state of loops that finished without calling close()
+            for old in [l for l in self._loops if l.is_closed()]:
+                del self._loops[old]
+            state = self._loops.get(loop)
+            if state is None or state.session.closed:
+                connector = aiohttp.TCPConnector(limit=self.pool_size,
+                                                 keepalive_timeout=60)
+                state = _LoopState(session=aiohttp.ClientSession(connector=connector))
+                self._loops[loop] = state
+            return state
+
+    def _semaphore(self, state: _LoopState, model: str) -> asyncio.Semaphore:
+        sem = state.semaphores.get(model)
+        if sem is None:
+            sem = state.semaphores[model] = asyncio.Semaphore(self.concurrency)
+        return sem
+
+    async def close(self):
+        """Close the running loop's session"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._loops.pop(loop, None)
+        if state is not None and not state.session.closed:
+            await state.session.close()
+
+    def run(self, coro):
+        """asyncio.run(coro), closing this transport's session before the loop ends"""
+        async def runner():
+            try:
+                return await coro
+            finally:
+                await self.close()
+        return asyncio.run(runner())
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def _delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(MAX_BACKOFF, self.backoff * (2 ** attempt)))
+
+    async def request(self, method: str, url: str, model: str = "", payload: Dict = None,
+                      api_key: Optional[str] = None, timeout: float = 300) -> LLMResponse:
+        """
+        Send one request through the pool, holding model's semaphore slot.
+
+        Retries connection errors and RETRY_STATUSES while the timeout
+        (counted from acquiring the slot, across all attempts) allows; the
+        final non-2xx response is returned, the final exception is re-raised.
+        """
+        import aiohttp
+
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+        state = self._state()
+        endpoint = url.rsplit("/", 1)[-1]
+        start = time.perf_counter()
+        attempt = 0
+
+        async with self._semaphore(state, model):
+            deadline = time.perf_counter() + timeout
+            while True:
+                delay = self._delay(attempt)
+                # Only retry if the backoff still leaves time for another attempt
+                can_retry = attempt < self.retries and time.perf_counter() + delay < deadline
+                try:
+                    async with state.session.request(
+                        method, url, headers=headers, json=payload,
+                        timeout=aiohttp.ClientTimeout(total=max(0.0, deadline - time.perf_counter()))
+                    ) as resp:
+                        status = resp.status
+                        text = await resp.text()
+                    if status in RETRY_STATUSES and can_retry:
+                        logger.warning(f"{endpoint} {model}: HTTP {status}, retrying")
+                    else:
+                        response = LLMResponse(status, text, time.perf_counter() - start,
+                                               attempt + 1)
+                        self._record(model, endpoint, response)
+                        return response
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    # A timeout has used up the whole budget; never retry it
+                    if isinstance(e, asyncio.TimeoutError) or not can_retry:
+                        self._record(model, endpoint, None, attempt + 1,
+                                     time.perf_counter() - start, repr(e))
+                        raise
+                    logger.warning(f"{endpoint} {model}: {e!r}, retrying")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def post(self, url: str, payload: Dict, model: str = "",
+                   api_key: Optional[str] = None, timeout: float = 300,
+                   cache: bool = True) -> LLMResponse:
+        model = model or payload.get("model", "")
+        endpoint = url.rsplit("/", 1)[-1]
+        store = None
+        if cache and endpoint in CACHEABLE_ENDPOINTS and not payload.get("stream"):
+            store = get_llm_cache()
+            start = time.perf_counter()
+            cached = await asyncio.to_thread(store.get, payload)
+            if cached is not None:
+                response = LLMResponse(200, cached, time.perf_counter() - start, 0)
+                self._record(model, endpoint, response, cached=True)
+                return response
+
+        response = await self.request("POST", url, model, payload, api_key, timeout)
+        if store is not None and response.status == 200 and response.text:
+            await asyncio.to_thread(store.put, payload, response.text)
+        return response
+
+    async def get(self, url: str, api_key: Optional[str] = None,
+                  timeout: float = 30) -> LLMResponse:
+        return await self.request("GET", url, "", None, api_key, timeout)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _record(self, model: str, endpoint: str, response: Optional[LLMResponse],
+                attempts: int = 0, latency: float = 0.0, error: Optional[str] = None,
+                cached: bool = False):
+        prompt_tokens = completion_tokens = 0
+        status = None
+        if response is not None:
+            status, attempts, latency = response.status, response.attempts, response.latency
+            if status == 200:
+                try:
+                    data = response.json()
+                    prompt_tokens = int(data.get("prompt_eval_count") or 0)
+                    completion_tokens = int(data.get("eval_count") or 0)
+                except (ValueError, AttributeError, TypeError):
+                    pass
+            else:
+                error = f"HTTP {status}"
+
+        self.history.append(RequestMetric(time.time(), model, endpoint, status, latency,
+                                          attempts, prompt_tokens, completion_tokens, error,
+                                          cached))
+        totals = self.totals[model]
+        totals["requests"] += 1
+        totals["errors"] += error is not None
+        totals["retries"] += max(0, attempts - 1)
+        totals["cache_hits"] += cached
+        totals["latency"] += latency
+        totals["prompt_tokens"] += prompt_tokens
+        totals["completion_tokens"] += completion_tokens
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-model totals with mean latency"""
+        out = {}
+        for model, t in self.totals.items():
+            out[model or "-"] = dict(t, mean_latency=t["latency"] / t["requests"]
+                                     if t["requests"] else 0.0)
+        return out
+
+
+_TRANSPORT: Optional[LLMTransport] = None
+_TRANSPORT_LOCK = threading.Lock()
+
+
+def get_transport() -> LLMTransport:
+    """Process-wide LLMTransport"""
+    global _TRANSPORT
+    with _TRANSPORT_LOCK:
+        if _TRANSPORT is None:
+            _TRANSPORT = LLMTransport()
+        return _TRANSPORT
+
+
+# Test
+if __name__ == "__main__":
+    base_url = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
+    transport = get_transport()
+    print(f"Concurrency per model: {transport.concurrency}, pool: {transport.pool_size}")
+    try:
+        resp = transport.run(transport.get(f"{base_url}/api/tags",
+                                           api_key=os.getenv("OLLAMA_API_KEY")))
+        print(f"/api/tags -> {resp.status} in {resp.latency * 1000:.1f} ms "
+              f"({resp.attempts} attempt(s))")
+    except Exception as e:
+        print(f"Error connecting to Ollama: {e}")
+    print(transport.stats())
@@ -0,0 +1,776 @@
+#!/usr/bin/env python3
+"""
+PRNG Recovery - State and parameter recovery for PRNG hypotheses over k[n]
+
+gap_prng_state_analysis.py, prng_analysis.py and discover_prng.py test
+PRNG hypotheses with float ratios and a few hand-picked parameters. This
+module attacks the generators directly:
+
+- LCG: for each generator in LCG_CATALOG the hidden state bits are
+  recovered from the truncated outputs by lattice reduction (LLL, then
+  Babai's nearest plane). For integer sequences (k, adj, m, ...) taken
+  as full outputs, recover_lcg_parameters finds an unknown modulus,
+  multiplier and increment from the gcd of the difference determinants.
+- LFSR: Berlekamp-Massey over GF(2) on the key bitstreams gives the
+  shortest LFSR generating the first half of the stream; it must then
+  produce the second half.
+- MT19937: 624 consecutive 32-bit outputs are untempered into the full
+  state (recover_mt_state). The known keys give far fewer words than
+  that, so seeded generators are brute-forced instead: init_genrand
+  (C / NumPy RandomState seeding) and init_by_array (Python's
+  random.seed) are run for a block of seeds at once, vectorized over
+  the seeds, and checked against every layout variant.
+
+How a key is built from generator outputs is an OutputLayout: n-1 bits
+(below the forced top bit) or n bits, taken from word_bits-bit outputs
+the way getrandbits does it (least significant word first, the partial
+word from the top bits of its output) or in the other order / from the
+low bits, after skipping `offset` outputs. Output indices of later keys
+follow from the bit counts of the puzzles before them, so k[75], k[80],
+... are usable despite the gap after k[70].
+
+Every (generator, layout) variant runs as an independent job in a
+process pool. A candidate only counts as recovered once it reproduces
+every known key that was not used to fit it.
+
+Usage:
+    from utils.prng_recovery import PRNGRecovery
+
+    results = PRNGRecovery().run(mt_seeds=(0, 2**20))
+
+    python3 -m utils.prng_recovery --mt-seeds 0:4294967296 --workers 32
+"""
+import argparse
+import itertools
+import json
+import math
+import multiprocessing as mp
+import sys
+import time
+from datetime import datetime
+from fractions import Fraction
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from sympy.polys.domains import ZZ
+    from sympy.polys.matrices import DomainMatrix
+    HAS_LLL = True
+except ImportError:
+    HAS_LLL = False
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+DEFAULT_OUTPUT = "prng_recovery.json"
+
+# name: (a, c, m, output bits); the output is the top output-bits of the state
+LCG_CATALOG = {
+    'minstd': (16807, 0, 2**31 - 1, 31),
+    'minstd2': (48271, 0, 2**31 - 1, 31),
+    'glibc': (1103515245, 12345, 2**31, 31),
+    'numerical-recipes': (1664525, 1013904223, 2**32, 32),
+    'java': (0x5DEECE66D, 11, 2**48, 32),
+    'mmix': (6364136223846793005, 1442695040888963407, 2**64, 64),
+}
+
+# Known bits beyond the state size before a lattice solution is unique
+LATTICE_SLACK = 24
+LATTICE_MAX_DIM = 16
+# An LFSR fit must be this many bits shorter than half its input
+LFSR_MARGIN = 32
+
+MT_N, MT_M = 624, 397
+MT_MATRIX_A = 0x9908B0DF
+MT_UPPER, MT_LOWER = 0x80000000, 0x7FFFFFFF
+MT_SEEDINGS = ('init_genrand', 'init_by_array')
+MT_MAX_OFFSET = 8
+# Known output bits a seed must match before it is fully validated
+MT_SCREEN_BITS = 64
+MT_BATCH = 8192
+MT_BLOCK = 1 << 16
+
+
+# ----------------------------------------------------------------------
+# Key <-> generator output layout
+# ----------------------------------------------------------------------
+
+class OutputLayout:
+    """How consecutive word_bits-bit generator outputs become k[1], k[2], ..."""
+
+    def __init__(self, word_bits: int = 32, truncation: str = 'top', order: str = 'le',
+                 top_bit: bool = True, offset: int = 0):
+        if truncation not in ('top', 'low') or order not in ('le', 'be'):
+            raise ValueError(f"bad layout {truncation!r}/{order!r}")
+        self.word_bits = word_bits
+        self.truncation = truncation
+        self.order = order
+        self.top_bit = top_bit
+        self.offset = offset
+        self._starts = [offset, offset]  # output index of k[n], n >= 1
+
+    def describe(self) -> Dict:
+        return {'word_bits': self.word_bits, 'truncation': self.truncation,
+                'order': self.order, 'top_bit': self.top_bit, 'offset': self.offset}
+
+    def chunks(self, n: int) -> List[Tuple[int, int]]:
+        """(bit position in the key, bit count) per output, in consumption order"""
+        bits = n - 1 if self.top_bit else n
+        w = self.word_bits
+        out = [(pos, min(w, bits - pos)) for pos in range(0, bits, w)]
+        return out[::-1] if self.order == 'be' else out
+
+    def start(self, n: int) -> int:
+        while len(self._starts) <= n:
+            m = len(self._starts) - 1
+            self._starts.append(self._starts[m] + len(self.chunks(m)))
+        return self._starts[n]
+
+    def _shift(self, bits: int) -> int:
+        return self.word_bits - bits if self.truncation == 'top' else 0
+
+    def observations(self, keys: Dict[int, int]) -> List[Tuple[int, int, int, int, int]]:
+        """(output index, n, shift, bits, value): output bits [shift, shift+bits) == value"""
+        obs = []
+        for n in sorted(keys):
+            v = keys[n] - (1 << (n - 1)) if self.top_bit else keys[n]
+            if v < 0 or v.bit_length() > (n - 1 if self.top_bit else n):
+                continue
+            index = self.start(n)
+            for j, (pos, bits) in enumerate(self.chunks(n)):
+                obs.append((index + j, n, self._shift(bits), bits, (v >> pos) & ((1 << bits) - 1)))
+        return obs
+
+    def assemble(self, n: int, outputs: Sequence[int]) -> int:
+        v = 0
+        for out, (pos, bits) in zip(outputs, self.chunks(n)):
+            v |= ((out >> self._shift(bits)) & ((1 << bits) - 1)) << pos
+        return v + (1 << (n - 1)) if self.top_bit else v
+
+    def last_index(self, ns: Iterable[int]) -> int:
+        return max(self.start(n) + len(self.chunks(n)) for n in ns)
+
+    def predict(self, outputs: Sequence[int], ns: Iterable[int]) -> Dict[int, int]:
+        """k[n] for each n, given outputs[i] for every index up to last_index(ns)"""
+        return {n: self.assemble(n, outputs[self.start(n):self.start(n) + len(self.chunks(n))])
+                for n in ns}
+
+
+def layout_variants(word_bits: int, offsets: Iterable[int] = (0,)) -> List[OutputLayout]:
+    return [OutputLayout(word_bits, truncation, order, top_bit, offset)
+            for truncation, order, top_bit, offset
+            in itertools.product(('top', 'low'), ('le', 'be'), (True, False), offsets)]
+
+
+def _validate(predicted: Dict[int, int], keys: Dict[int, int], fit: Iterable[int]) -> Dict:
+    fit = set(fit)
+    checked = [n for n in keys if n not in fit]
+    wrong = sorted(n for n in checked if predicted.get(n) != keys[n])
+    return {'fit_keys': sorted(fit), 'predicted_keys': len(checked),
+            'mispredicted': wrong[:10], 'validated': bool(checked) and not wrong}
+
+
+def _unknown_predictions(layout_predict: Callable[[List[int]], Dict[int, int]],
+                         keys: Dict[int, int], count: int = 5) -> Dict[str, str]:
+    missing = [n for n in range(1, max(keys) + 1) if n not in keys][:count]
+    return {str(n): hex(k) for n, k in layout_predict(missing).items()} if missing else {}
+
+
+# ----------------------------------------------------------------------
+# LCG
+# ----------------------------------------------------------------------
+
+def lcg_jump_tables(a: int, c: int, m: int, count: int) -> Tuple[List[int], List[int]]:
+    """A[i], C[i] with x_i = A[i]*x_0 + C[i] (mod m)"""
+    A, C = [1], [0]
+    for _ in range(count - 1):
+        A.append(A[-1] * a % m)
+        C.append((C[-1] * a + c) % m)
+    return A, C
+
+
+def lcg_outputs(a: int, c: int, m: int, out_bits: int, x0: int, count: int,
+                tables: Optional[Tuple[List[int], List[int]]] = None) -> List[int]:
+    """Outputs 0..count-1 from state x_0, jumped ahead with NumPy"""
+    A, C = tables or lcg_jump_tables(a, c, m, count)
+    w = (m - 1).bit_length()
+    if (m & (m - 1) == 0 and m <= 2**64) or m < 2**32:
+        # 2^w moduli wrap in uint64; products with a 32-bit modulus never overflow it
+        states = np.array(A[:count], np.uint64) * np.uint64(x0) + np.array(C[:count], np.uint64)
+        states = states & np.uint64(m - 1) if m & (m - 1) == 0 else states % np.uint64(m)
+        return [int(s) >> (w - out_bits) for s in states]
+    return [((A[i] * x0 + C[i]) % m) >> (w - out_bits) for i in range(count)]
+
+
+def recover_lcg_parameters(xs: Sequence[int]) -> Optional[Tuple[int, int, int]]:
+    """(m, a, c) of x[i+1] = a*x[i] + c mod m from untruncated outputs"""
+    xs = [int(x) for x in xs]
+    if len(xs) < 6:
+        return None
+    t = [y - x for x, y in zip(xs, xs[1:])]
+    m = 0
+    for t0, t1, t2 in zip(t, t[1:], t[2:]):
+        m = math.gcd(m, t2 * t0 - t1 * t1)
+    if m <= max(xs) or m < 2:
+        return None
+    for t0, t1, x0, x1 in zip(t, t[1:], xs, xs[1:]):
+        if math.gcd(t0, m) == 1:
+            a = t1 * pow(t0, -1, m) % m
+            return m, a, (x1 - a * x0) % m
+    return None
+
+
+def _babai(basis: List[List[int]], target: List[int]) -> List[int]:
+    """Lattice vector close to target (nearest plane on an LLL-reduced basis)"""
+    n = len(basis)
+    bstar, norms = [], []
+    for i in range(n):
+        v = [Fraction(x) for x in basis[i]]
+        for j in range(i):
+            if norms[j]:
+                mu = sum(Fraction(x) * y for x, y in zip(basis[i], bstar[j])) / norms[j]
+                v = [vi - mu * bj for vi, bj in zip(v, bstar[j])]
+        bstar.append(v)
+        norms.append(sum(x * x for x in v))
+    t = [Fraction(x) for x in target]
+    close = [0] * len(target)
+    for i in reversed(range(n)):
+        if not norms[i]:
+            continue
+        coeff = round(sum(x * y for x, y in zip(t, bstar[i])) / norms[i])
+        t = [x - coeff * y for x, y in zip(t, basis[i])]
+        close = [x + coeff * y for x, y in zip(close, basis[i])]
+    return close
+
+
+def lcg_lattice_state(a: int, c: int, m: int, out_bits: int,
+                      obs: Sequence[Tuple[int, int, int, int, int]]) -> Optional[int]:
+    """
+    x_0 from partially known outputs. Each observation fixes output bits
+    [shift, shift+bits) of x_i, i.e. state bits from p = w - out_bits +
+    shift upwards. Bits above are removed by scaling with 2^(w-p-bits)
+    (power-of-two moduli only), leaving A'*x_0 + C' = y*2^s + z (mod m)
+    with 0 <= z < 2^s. Coordinates are weighted so every unknown has
+    the same tolerance 2^(w-1), then the closest lattice vector to the
+    interval centres is taken; its first coordinate is x_0.
+    """
+    if not HAS_LLL or not obs:
+        return None
+    w = (m - 1).bit_length()
+    A, C = lcg_jump_tables(a, c, m, max(o[0] for o in obs) + 1)
+    eqs = []
+    for index, _, shift, bits, value in obs:
+        p = w - out_bits + shift
+        top = p + bits
+        if top == w:
+            a_i, c_i, s = A[index], C[index], p
+        elif m & (m - 1) == 0:
+            e = 1 << (w - top)
+            a_i, c_i, s = A[index] * e % m, C[index] * e % m, w - bits
+        else:
+            continue
+        eqs.append((a_i, c_i, value, s))
+    d = len(eqs)
+    rows = [[1] + [a_i << (w - s) for a_i, _, _, s in eqs]]
+    for j, (_, _, _, s) in enumerate(eqs):
+        row = [0] * (d + 1)
+        row[j + 1] = m << (w - s)
+        rows.append(row)
+    target = [1 << (w - 1)]
+    for a_i, c_i, value, s in eqs:
+        centre = (value << s) + ((1 << (s - 1)) if s else 0)
+        target.append(((centre - c_i) % m) << (w - s))
+    reduced = DomainMatrix(rows, (d + 1, d + 1), ZZ).lll().to_Matrix().tolist()
+    close = _babai([[int(x) for x in row] for row in reduced], target)
+    return close[0] % m
+
+
+def _select_lattice_obs(obs, w: int, mask_prime: bool, out_bits: int):
+    """Richest observations until the known bits exceed the state by LATTICE_SLACK"""
+    usable = [o for o in obs if not mask_prime or o[2] + o[3] == out_bits]
+    picked, total = [], 0
+    for o in sorted(usable, key=lambda o: (-o[3], o[0])):
+        picked.append(o)
+        total += o[3]
+        if total >= w + LATTICE_SLACK or len(picked) >= LATTICE_MAX_DIM:
+            break
+    return picked, total
+
+
+def _lcg_job(name: str, layout: OutputLayout) -> Dict:
+    keys = _KEYS
+    a, c, m, out_bits = LCG_CATALOG[name]
+    w = (m - 1).bit_length()
+    result = {'kind': 'lcg', 'generator': name, 'layout': layout.describe(), 'recovered': False}
+    obs = layout.observations(keys)
+    picked, total = _select_lattice_obs(obs, w, m & (m - 1) != 0, out_bits)
+    if total < w + LATTICE_SLACK // 3:
+        result['reason'] = f"{total} known state bits, need more than {w}"
+        return result
+    if not HAS_LLL:
+        result['reason'] = "sympy not installed (needed for LLL)"
+        return result
+    x0 = lcg_lattice_state(a, c, m, out_bits, picked)
+    count = layout.last_index(range(1, max(keys) + 6)) + 1
+    tables = lcg_jump_tables(a, c, m, count)
+    outputs = lcg_outputs(a, c, m, out_bits, x0, count, tables)
+    check = _validate(layout.predict(outputs, keys), keys, {o[1] for o in picked})
+    result.update(check, state_x0=hex(x0), lattice_dim=len(picked) + 1, known_bits=total)
+    if check['validated']:
+        result['recovered'] = True
+        result['predictions'] = _unknown_predictions(
+            lambda ns: layout.predict(outputs, ns), keys)
+    return result
+
+
+def _lcg_sequence_job(label: str, seq: Dict[int, int]) -> Dict:
+    """Unknown (m, a, c) on an integer sequence, fitted on its first half"""
+    ns = sorted(seq)
+    run = [ns[0]]
+    for n in ns[1:]:
+        if n != run[-1] + 1:
+            break
+        run.append(n)
+    half = max(6, len(run) // 2)
+    result = {'kind': 'lcg-parameters', 'sequence': label, 'terms': len(run),
+              'recovered': False}
+    params = recover_lcg_parameters([seq[n] for n in run[:half]])
+    if params is None:
+        result['reason'] = "no modulus consistent with the first half"
+        return result
+    m, a, c = params
+    x, predicted = seq[run[0]], {}
+    for n in run:
+        predicted[n] = x
+        x = (a * x + c) % m
+    check = _validate(predicted, {n: seq[n] for n in run}, run[:half])
+    result.update(check, m=str(m), a=str(a), c=str(c))
+    result['recovered'] = check['validated']
+    if result['recovered']:
+        result['predictions'] = {str(run[-1] + 1): str(x)}
+    return result
+
+
+# ----------------------------------------------------------------------
+# LFSR
+# ----------------------------------------------------------------------
+
+def berlekamp_massey(bits: Sequence[int]) -> Tuple[int, np.ndarray]:
+    """(linear complexity L, connection polynomial c[0..L]) over GF(2)"""
+    s = np.asarray(bits, dtype=np.uint8) & 1
+    n = len(s)
+    c = np.zeros(n + 1, np.uint8)
+    b = np.zeros(n + 1, np.uint8)
+    c[0] = b[0] = 1
+    L, m = 0, -1
+    for i in range(n):
+        d = s[i] ^ (np.count_nonzero(c[1:L + 1] & s[i - L:i][::-1]) & 1)
+        if d:
+            t = c.copy()
+            shift = i - m
+            c[shift:] ^= b[:n + 1 - shift]
+            if 2 * L <= i:
+                L, m, b = i + 1 - L, i, t
+    return L, c[:L + 1].copy()
+
+
+def lfsr_extend(bits: Sequence[int], poly: np.ndarray, count: int) -> np.ndarray:
+    """Continue a bit sequence with the LFSR poly for count more bits"""
+    L = len(poly) - 1
+    out = np.zeros(len(bits) + count, np.uint8)
+    out[:len(bits)] = bits
+    taps = poly[1:]
+    for i in range(len(bits), len(out)):
+        out[i] = np.count_nonzero(taps & out[i - L:i][::-1]) & 1 if L else 0
+    return out
+
+
+def key_bitstream(keys: Dict[int, int], ns: Sequence[int], bit_order: str,
+                  top_bit: bool) -> np.ndarray:
+    """Bits of k[n] for n in ns, concatenated (msb- or lsb-first within a key)"""
+    parts = []
+    for n in ns:
+        width = n - 1 if top_bit else n
+        v = keys[n] & ((1 << width) - 1)
+        bits = [(v >> i) & 1 for i in range(width)]
+        parts.extend(bits[::-1] if bit_order == 'msb' else bits)
+    return np.array(parts, np.uint8)
+
+
+def _bits_to_key(bits: Sequence[int], n: int, bit_order: str, top_bit: bool) -> int:
+    seq = list(bits) if bit_order == 'lsb' else list(bits)[::-1]
+    v = sum(int(bit) << i for i, bit in enumerate(seq))
+    return v + (1 << (n - 1)) if top_bit else v
+
+
+def _lfsr_job(bit_order: str, top_bit: bool, first: int) -> Dict:
+    keys = _KEYS
+    run = [first]
+    while run[-1] + 1 in keys:
+        run.append(run[-1] + 1)
+    widths = {n: n - 1 if top_bit else n for n in run}
+    stream = key_bitstream(keys, run, bit_order, top_bit)
+    result = {'kind': 'lfsr', 'bit_order': bit_order, 'top_bit': top_bit,
+              'keys': [run[0], run[-1]], 'bits': len(stream), 'recovered': False}
+    if len(stream) < 64:
+        result['reason'] = "stream too short"
+        return result
+    L_full, _ = berlekamp_massey(stream)
+    # Fit on whole keys covering the first half of the stream
+    fit, used = [], 0
+    for n in run:
+        if used >= len(stream) // 2:
+            break
+        fit.append(n)
+        used += widths[n]
+    L, poly = berlekamp_massey(stream[:used])
+    result.update(linear_complexity=L_full, fit_complexity=L, random_expectation=len(stream) // 2)
+    if 2 * L + LFSR_MARGIN > used:
+        result['reason'] = "linear complexity of the first half is that of random bits"
+        return result
+    next_n = run[-1] + 1
+    extended = lfsr_extend(stream[:used], poly, len(stream) - used + next_n)
+    predicted, pos = {}, 0
+    for n in run + [next_n]:
+        width = n - 1 if top_bit else n
+        predicted[n] = _bits_to_key(extended[pos:pos + width], n, bit_order, top_bit)
+        pos += width
+    check = _validate({n: predicted[n] for n in run}, {n: keys[n] for n in run}, fit)
+    result.update(check, polynomial=''.join(map(str, poly.tolist())))
+    if check['validated']:
+        result['recovered'] = True
+        result['predictions'] = {str(next_n): hex(predicted[next_n])}
+    return result
+
+
+# ----------------------------------------------------------------------
+# MT19937
+# ----------------------------------------------------------------------
+
+def mt_temper(y):
+    y = y ^ (y >> 11)
+    y = y ^ ((y << 7) & 0x9D2C5680)
+    y = y ^ ((y << 15) & 0xEFC60000)
+    return y ^ (y >> 18)
+
+
+def _undo_right(y, shift):
+    result = y
+    for _ in range(32 // shift):
+        result = y ^ (result >> shift)
+    return result
+
+
+def _undo_left(y, shift, mask):
+    result = y
+    for _ in range(32 // shift):
+        result = y ^ ((result << shift) & mask)
+    return result
+
+
+def mt_untemper(y: np.ndarray) -> np.ndarray:
+    """Inverse of the output tempering, elementwise on uint32 arrays"""
+    y = np.asarray(y, dtype=np.uint32)
+    y = _undo_right(y, 18)
+    y = _undo_left(y, 15, np.uint32(0xEFC60000))
+    y = _undo_left(y, 7, np.uint32(0x9D2C5680))
+    return _undo_right(y, 11)
+
+
+def mt_twist(mt: np.ndarray) -> np.ndarray:
+    """Next state block; slices of <= 227 words keep the in-place dependencies"""
+    mt = mt.copy()
+    for lo in range(0, MT_N, MT_N - MT_M):
+        hi = min(lo + MT_N - MT_M, MT_N)
+        i = np.arange(lo, hi)
+        y = (mt[i] & MT_UPPER) | (mt[(i + 1) % MT_N] & MT_LOWER)
+        mt[i] = mt[(i + MT_M) % MT_N] ^ (y >> 1) ^ ((y & 1) * np.uint32(MT_MATRIX_A))
+    return mt
+
+
+class MT19937:
+    """Vectorized MT19937: full 624-word blocks are twisted/tempered at once"""
+
+    def __init__(self, state: Sequence[int]):
+        self.state = np.array(state, dtype=np.uint32)
+        self.buffer: List[int] = []
+
+    @classmethod
+    def init_genrand(cls, seed: int) -> 'MT19937':
+        mt = [seed & 0xFFFFFFFF]
+        for i in range(1, MT_N):
+            mt.append((1812433253 * (mt[-1] ^ (mt[-1] >> 30)) + i) & 0xFFFFFFFF)
+        return cls(mt)
+
+    @classmethod
+    def init_by_array(cls, seed: int) -> 'MT19937':
+        """Python's random.seed(seed) for 0 <= seed < 2^32"""
+        return cls(_init_by_array(np.array([seed], np.uint32))[:, 0])
+
+    def outputs(self, count: int) -> List[int]:
+        while len(self.buffer) < count:
+            self.state = mt_twist(self.state)
+            self.buffer.extend(int(x) for x in mt_temper(self.state))
+        return self.buffer[:count]
+
+
+def recover_mt_state(words: Sequence[int]) -> MT19937:
+    """Generator positioned after 624 consecutive full 32-bit outputs"""
+    if len(words) < MT_N:
+        raise ValueError(f"need {MT_N} consecutive outputs, got {len(words)}")
+    gen = MT19937(mt_untemper(np.array(words[:MT_N], np.uint32)))
+    return gen
+
+
+def _init_genrand_rows(seeds: np.ndarray, rows: int) -> np.ndarray:
+    """First `rows` state words for a vector of seeds (init_genrand)"""
+    mt = np.empty((rows, len(seeds)), np.uint32)
+    mt[0] = seeds
+    for i in range(1, rows):
+        prev = mt[i - 1]
+        mt[i] = (prev ^ (prev >> 30)) * np.uint32(1812433253) + np.uint32(i)
+    return mt
+
+
+_GENRAND_19650218 = None
+
+
+def _init_by_array(seeds: np.ndarray) -> np.ndarray:
+    """Full states for init_by_array([seed]) over a vector of seeds"""
+    global _GENRAND_19650218
+    if _GENRAND_19650218 is None:
+        _GENRAND_19650218 = _init_genrand_rows(np.array([19650218], np.uint32), MT_N)[:, 0]
+    mt = np.repeat(_GENRAND_19650218[:, None], len(seeds), axis=1)
+    i = 1
+    for _ in range(MT_N):
+        prev = mt[i - 1]
+        mt[i] = (mt[i] ^ ((prev ^ (prev >> 30)) * np.uint32(1664525))) + seeds
+        i += 1
+        if i >= MT_N:
+            mt[0] = mt[MT_N - 1]
+            i = 1
+    for _ in range(MT_N - 1):
+        prev = mt[i - 1]
+        mt[i] = (mt[i] ^ ((prev ^ (prev >> 30)) * np.uint32(1566083941))) - np.uint32(i)
+        i += 1
+        if i >= MT_N:
+            mt[0] = mt[MT_N - 1]
+            i = 1
+    mt[0] = MT_UPPER
+    return mt
+
+
+def mt_first_outputs(seeds: np.ndarray, count: int, seeding: str) -> np.ndarray:
+    """outputs[i, s]: i-th output (i < 227) of the generator seeded with seeds[s]"""
+    if count > MT_N - MT_M:
+        raise ValueError("only the first 227 outputs avoid the in-place twist")
+    if seeding == 'init_genrand':
+        mt = _init_genrand_rows(seeds, MT_M + count)
+        far = mt[MT_M:MT_M + count]
+    else:
+        mt = _init_by_array(seeds)
+        far = mt[MT_M:MT_M + count]
+    y = (mt[:count] & MT_UPPER) | (mt[1:count + 1] & MT_LOWER)
+    return mt_temper(far ^ (y >> 1) ^ ((y & 1) * np.uint32(MT_MATRIX_A)))
+
+
+def _mt_screens(keys: Dict[int, int]) -> List[Tuple[OutputLayout, List[Tuple[int, int, int, int]]]]:
+    """Per layout: the earliest observations worth MT_SCREEN_BITS known bits"""
+    screens = []
+    for layout in layout_variants(32, range(MT_MAX_OFFSET)):
+        screen, total = [], 0
+        for index, _, shift, bits, value in layout.observations(keys):
+            screen.append((index, shift, bits, value))
+            total += bits
+            if total >= MT_SCREEN_BITS:
+                break
+        screens.append((layout, screen))
+    return screens
+
+
+def _mt_job(seeding: str, start: int, end: int) -> List[Dict]:
+    keys = _KEYS
+    screens = _mt_screens(keys)
+    count = max(o[0] for _, screen in screens for o in screen) + 1
+    found = []
+    for lo in range(start, end, MT_BATCH):
+        seeds = np.arange(lo, min(lo + MT_BATCH, end), dtype=np.uint64).astype(np.uint32)
+        outputs = mt_first_outputs(seeds, count, seeding)
+        for layout, screen in screens:
+            alive = np.arange(len(seeds))
+            for index, shift, bits, value in screen:
+                got = (outputs[index, alive] >> np.uint32(shift)) & np.uint32((1 << bits) - 1)
+                alive = alive[got == value]
+                if not len(alive):
+                    break
+            for s in alive:
+                found.append(_mt_validate(seeding, int(seeds[s]), layout, screen))
+    return found
+
+
+def _mt_validate(seeding: str, seed: int, layout: OutputLayout, screen) -> Dict:
+    keys = _KEYS
+    gen = getattr(MT19937, seeding)(seed)
+    outputs = gen.outputs(layout.last_index(range(1, max(keys) + 6)) + 1)
+    screened = {n for index, _, _, _ in screen for n in keys
+                if layout.start(n) <= index < layout.start(n) + len(layout.chunks(n))}
+    check = _validate(layout.predict(outputs, keys), keys, screened)
+    result = {'kind': 'mt', 'seeding': seeding, 'seed': seed, 'layout': layout.describe(),
+              'recovered': check['validated'], **check}
+    if check['validated']:
+        result['predictions'] = _unknown_predictions(lambda ns: layout.predict(outputs, ns), keys)
+    return result
+
+
+def _mt_state_report(keys: Dict[int, int]) -> Dict:
+    """Longest run of full 32-bit outputs any layout gives (state recovery needs 624)"""
+    best = 0
+    for layout in layout_variants(32):
+        full = sorted(o[0] for o in layout.observations(keys) if o[3] == 32)
+        run = 1 if full else 0
+        for a, b in zip(full, full[1:]):
+            run = run + 1 if b == a + 1 else 1
+            best = max(best, run)
+        best = max(best, run)
+    return {'kind': 'mt-state', 'recovered': False, 'longest_full_word_run': best,
+            'reason': f"state reconstruction needs {MT_N} consecutive full words, "
+                      f"the known keys give at most {best}"}
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+
+_KEYS: Dict[int, int] = {}
+
+
+def _init_worker(keys):
+    global _KEYS
+    _KEYS = keys
+
+
+def _run_job(job) -> List[Dict]:
+    """Pool entry point"""
+    kind, args = job
+    if kind == 'lcg':
+        return [_lcg_job(*args)]
+    if kind == 'lcg-parameters':
+        return [_lcg_sequence_job(*args)]
+    if kind == 'lfsr':
+        return [_lfsr_job(*args)]
+    return _mt_job(*args)
+
+
+class PRNGRecovery:
+    """Runs the LCG, LFSR and MT19937 recovery jobs over the known keys"""
+
+    def __init__(self, keys: Optional[Dict[int, int]] = None, workers: Optional[int] = None):
+        if keys is None:
+            from utils.keystore import get_keystore
+            ks = get_keystore()
+            keys = dict(ks.keys)
+            self.sequences = {'k': keys, 'adj': ks.adj, 'm': ks.m, 'offset': ks.offsets}
+        else:
+            self.sequences = {'k': keys}
+        self.keys = keys
+        self.workers = workers or mp.cpu_count()
+
+    def jobs(self, kinds: Sequence[str], mt_seeds: Optional[Tuple[int, int]]) -> List:
+        jobs = []
+        if 'lcg' in kinds:
+            for name, (_, _, _, out_bits) in LCG_CATALOG.items():
+                jobs += [('lcg', (name, layout)) for layout in layout_variants(out_bits)]
+            jobs += [('lcg-parameters', (label, dict(seq)))
+                     for label, seq in self.sequences.items()]
+        if 'lfsr' in kinds:
+            jobs += [('lfsr', (bit_order, top_bit, first))
+                     for bit_order in ('msb', 'lsb') for top_bit in (True, False)
+                     for first in (1, 8, 32)]
+        if 'mt' in kinds and mt_seeds:
+            lo, hi = mt_seeds
+            jobs += [('mt', (seeding, s, min(s + MT_BLOCK, hi)))
+                     for seeding in MT_SEEDINGS for s in range(lo, hi, MT_BLOCK)]
+        return jobs
+
+    def run(self, kinds: Sequence[str] = ('lcg', 'lfsr', 'mt'),
+            mt_seeds: Optional[Tuple[int, int]] = (0, 1 << 16),
+            verbose: bool = False) -> List[Dict]:
+        jobs = self.jobs(kinds, mt_seeds)
+        results: List[Dict] = []
+        if 'mt' in kinds:
+            results.append(_mt_state_report(self.keys))
+        if verbose:
+            print(f"{len(jobs)} jobs on {self.workers} worker(s)")
+        t0 = time.time()
+        if self.workers > 1 and len(jobs) > 1:
+            with mp.Pool(min(self.workers, len(jobs)), _init_worker, (self.keys,)) as pool:
+                self._collect(pool.imap_unordered(_run_job, jobs), results, verbose)
+        else:
+            _init_worker(self.keys)
+            self._collect(map(_run_job, jobs), results, verbose)
+        if verbose:
+            print(f"Done in {time.time() - t0:.1f}s")
+        return results
+
+    @staticmethod
+    def _collect(outcomes, results, verbose):
+        for batch in outcomes:
+            for r in batch:
+                results.append(r)
+                if verbose and r.get('recovered'):
+                    print(f"  RECOVERED {json.dumps(r)}")
+
+
+def _parse_range(text: str) -> Tuple[int, int]:
+    start, _, end = text.partition(':')
+    return int(start), int(end)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recover LCG / LFSR / MT19937 generators from k[n]")
+    parser.add_argument('kinds', nargs='*', metavar='{lcg,lfsr,mt}',
+                        help="recovery kinds to run (default: all)")
+    parser.add_argument('--mt-seeds', type=_parse_range, default=(0, 1 << 16),
+                        metavar='START:END', help="seed range for the MT19937 seed search")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("PRNG STATE RECOVERY")
+    print("=" * 70)
+    recovery = PRNGRecovery(workers=args.workers)
+    kinds = args.kinds or ['lcg', 'lfsr', 'mt']
+    if set(kinds) - {'lcg', 'lfsr', 'mt'}:
+        parser.error(f"unknown kind(s): {', '.join(sorted(set(kinds) - {'lcg', 'lfsr', 'mt'}))}")
+    results = recovery.run(kinds, args.mt_seeds, verbose=True)
+
+    if 'mt' in kinds:
+        lo, hi = args.mt_seeds
+        hits = sum(1 for r in results if r['kind'] == 'mt' and r['recovered'])
+        print(f"  mt seeds {lo}..{hi - 1} x {len(MT_SEEDINGS)} seedings x "
+              f"{len(layout_variants(32, range(MT_MAX_OFFSET)))} layouts, {hits} recovered")
+    for kind in ('lcg', 'lcg-parameters', 'lfsr', 'mt-state'):
+        rows = [r for r in results if r['kind'] == kind]
+        if rows:
+            hits = sum(1 for r in rows if r['recovered'])
+            print(f"  {kind:15s} {len(rows):4d} variants/candidates, {hits} recovered")
+    for r in results:
+        if r['kind'] == 'lfsr':
+            print(f"  lfsr {r['bit_order']} top_bit={r['top_bit']} keys {r['keys']}: "
+                  f"L={r.get('linear_complexity')} of {r['bits']} bits "
+                  f"(random ~{r['bits'] // 2})")
+        elif r['kind'] == 'mt-state':
+            print(f"  {r['reason']}")
+
+    with open(args.output, 'w') as f:
+        json.dump({'timestamp': datetime.now().isoformat(), 'keys': len(recovery.keys),
+                   'mt_seeds': list(args.mt_seeds), 'results': results}, f, indent=2)
+    print(f"Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,8 @@ import os
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+from utils.keystore import get_keystore
+
 CONFIG_PATH = Path(__file__).parent.parent / "config" / "puzzle_config.json"
 
 
@@ -32,6 +34,10 @@ class PuzzleConfig:
         self.bridge_keys = {int(k): int(v) for k, v in self.config.get("bridge_keys", {}).items()}
         self.solved_puzzles = sorted(self.config.get("solved_puzzles", list(range(1, 71))))
 
+        # The merged KeyStore is authoritative for the default config's puzzles
+        if self.config_path == CONFIG_PATH:
+            self.known_keys.update(get_keystore().subset(set(self.known_keys) | set(self.solved_puzzles)))
+
     def _load_config(self) -> Dict:
         """Load configuration from file"""
         if self.config_path.exists():
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Recurrence Engine - Batch solver for the ladder recurrence
+
+    k[n] = 2*k[n-1] + 2^n - m[n]*k[d[n]]
+
+Two questions come up in nearly every analysis script:
+
+    analysis:    k[n-1], k[n] known  ->  which (d, m) reproduce k[n]?
+    generation:  k[n-1] known        ->  which (d, m) keep k[n] in [2^(n-1), 2^n)?
+
+For analysis m*k[d] must equal a fixed numerator, so each d is a single
+divisibility test; RecurrenceEngine caches those tables per n. For
+generation m*k[d] must lie in (base - 2^n, base - 2^(n-1)], which gives
+every d a closed-form interval of m. Selection rules pick straight from
+those intervals instead of enumerating every (d, m, k[n]) tuple.
+
+Usage:
+    from utils.recurrence import RecurrenceEngine, generate
+
+    engine = RecurrenceEngine(keys)
+    table = engine.analyze(range(2, 71))             # {n: (d, m)}
+    keys160 = generate({1: 1, 2: 3, 3: 7}, 160)      # min |m| forward ladder
+    engine.score_rules()                              # {rule: (hits, total)}
+"""
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+# (d, m_lo, m_hi): every m in [m_lo, m_hi] is admissible for this d
+Candidate = Tuple[int, int, int]
+Rule = Callable[[List[Candidate]], Optional[Tuple[int, int]]]
+
+
+def closest_to_zero(lo: int, hi: int) -> int:
+    """The member of [lo, hi] with the smallest absolute value"""
+    if lo > 0:
+        return lo
+    if hi < 0:
+        return hi
+    return 0
+
+
+def _min_abs_m(candidates: List[Candidate]) -> Optional[Tuple[int, int]]:
+    """d-minimization: smallest |m| over all d, lowest d on ties"""
+    best = None
+    for d, lo, hi in candidates:
+        m = closest_to_zero(lo, hi)
+        if best is None or abs(m) < abs(best[1]):
+            best = (d, m)
+    return best
+
+
+def _min_d(candidates: List[Candidate]) -> Optional[Tuple[int, int]]:
+    """Smallest admissible d, smallest |m| for it"""
+    if not candidates:
+        return None
+    d, lo, hi = min(candidates)
+    return (d, closest_to_zero(lo, hi))
+
+
+def _max_d(candidates: List[Candidate]) -> Optional[Tuple[int, int]]:
+    """Largest admissible d, smallest |m| for it"""
+    if not candidates:
+        return None
+    d, lo, hi = max(candidates)
+    return (d, closest_to_zero(lo, hi))
+
+
+RULES: Dict[str, Rule] = {
+    'min_abs_m': _min_abs_m,
+    'min_d': _min_d,
+    'max_d': _max_d,
+}
+
+
+def _rule(rule: Union[str, Rule]) -> Rule:
+    if callable(rule):
+        return rule
+    if rule not in RULES:
+        raise ValueError(f"unknown selection rule {rule!r} (expected one of {sorted(RULES)})")
+    return RULES[rule]
+
+
+def forward_m_interval(n: int, k_prev: int, k_d: int) -> Tuple[int, int]:
+    """
+    Closed-form range of m keeping k[n] = 2*k[n-1] + 2^n - m*k[d] in range.
+
+    2^(n-1) <= base - m*k[d] <= 2^n - 1  <=>  base - 2^n < m*k[d] <= base - 2^(n-1)
+    The interval is empty when lo > hi.
+    """
+    base = 2 * k_prev + (1 << n)
+    return ((base - (1 << n)) // k_d + 1, (base - (1 << (n - 1))) // k_d)
+
+
+def backward_m_interval(n: int, k_next: int, k_d: int) -> Tuple[int, int, int]:
+    """
+    Closed-form (lo, hi, step) of m[n+1] keeping the backward step integral and in range.
+
+    k[n] = (k[n+1] - 2^(n+1) + m*k[d]) / 2 needs 2^n <= numerator < 2^(n+1)
+    and an even numerator. With k[d] odd that fixes the parity of m (step 2);
+    with k[d] even it holds for all m or for none.
+    """
+    base = k_next - (1 << (n + 1))
+    lo = -((base - (1 << n)) // k_d)                # ceil((2^n - base) / k[d])
+    hi = ((1 << (n + 1)) - base - 1) // k_d
+    if k_d & 1:
+        if (lo + base) & 1:
+            lo += 1
+        return (lo, hi, 2)
+    if base & 1:
+        return (lo, lo - 1, 1)
+    return (lo, hi, 1)
+
+
+def interval_candidates(keys: Dict[int, int], n: int, k_prev: Optional[int] = None,
+                        positive_m: bool = True) -> List[Candidate]:
+    """(d, m_lo, m_hi) for every known d < n with a non-empty forward interval"""
+    if k_prev is None:
+        k_prev = keys[n - 1]
+    candidates = []
+    for d in range(1, n):
+        k_d = keys.get(d)
+        if not k_d:
+            continue
+        lo, hi = forward_m_interval(n, k_prev, k_d)
+        if positive_m and lo < 1:
+            lo = 1
+        if lo <= hi:
+            candidates.append((d, lo, hi))
+    return candidates
+
+
+def exact_candidates(keys: Dict[int, int], n: int, k_prev: Optional[int] = None,
+                     k_n: Optional[int] = None, positive_m: bool = True) -> List[Candidate]:
+    """(d, m, m) for every known d < n with m*k[d] == 2*k[n-1] + 2^n - k[n]"""
+    if k_prev is None:
+        k_prev = keys[n - 1]
+    if k_n is None:
+        k_n = keys[n]
+    numerator = 2 * k_prev + (1 << n) - k_n
+    candidates = []
+    for d in range(1, n):
+        k_d = keys.get(d)
+        if not k_d:
+            continue
+        m, rem = divmod(numerator, k_d)
+        if rem == 0 and (m > 0 or not positive_m):
+            candidates.append((d, m, m))
+    return candidates
+
+
+def select(candidates: List[Candidate], rule: Union[str, Rule] = 'min_abs_m') -> Optional[Tuple[int, int]]:
+    """Apply a selection rule (name from RULES or a callable) to candidates"""
+    return _rule(rule)(candidates)
+
+
+def next_key(keys: Dict[int, int], n: int, k_prev: Optional[int] = None,
+             rule: Union[str, Rule] = 'min_abs_m',
+             positive_m: bool = True) -> Optional[Tuple[int, int, int]]:
+    """One forward step: (d, m, k[n]) chosen by rule, or None if nothing fits"""
+    if k_prev is None:
+        k_prev = keys[n - 1]
+    choice = select(interval_candidates(keys, n, k_prev, positive_m), rule)
+    if choice is None:
+        return None
+    d, m = choice
+    return (d, m, 2 * k_prev + (1 << n) - m * keys[d])
+
+
+def generate(k_init: Dict[int, int], n_max: int, rule: Union[str, Rule] = 'min_abs_m',
+             positive_m: bool = True) -> Dict[int, int]:
+    """
+    Extend k_init forward to n_max, one closed-form step per n.
+
+    Stops early at the first n with no admissible candidate.
+    """
+    k = dict(k_init)
+    for n in range(min(k) + 1, n_max + 1):
+        if n in k:
+            continue
+        if (n - 1) not in k:
+            break
+        step = next_key(k, n, rule=rule, positive_m=positive_m)
+        if step is None:
+            break
+        k[n] = step[2]
+    return k
+
+
+class RecurrenceEngine:
+    """Batch (d, m) analysis of a fixed set of known keys"""
+
+    def __init__(self, keys: Dict[int, int]):
+        self.keys = dict(keys)
+        self._exact: Dict[Tuple[int, bool], List[Candidate]] = {}
+
+    def transitions(self) -> List[int]:
+        """Every n with both k[n-1] and k[n] known"""
+        return sorted(n for n in self.keys if n >= 2 and (n - 1) in self.keys)
+
+    def exact(self, n: int, positive_m: bool = True) -> List[Candidate]:
+        """Cached exact (d, m, m) divisibility table for n"""
+        key = (n, positive_m)
+        if key not in self._exact:
+            self._exact[key] = exact_candidates(self.keys, n, positive_m=positive_m)
+        return self._exact[key]
+
+    def analyze(self, ns: Optional[Iterable[int]] = None, rule: Union[str, Rule] = 'min_abs_m',
+                positive_m: bool = True) -> Dict[int, Tuple[int, int]]:
+        """{n: (d, m)} chosen by rule among the exact pairs, for every n in ns"""
+        fn = _rule(rule)
+        ns = self.transitions() if ns is None else ns
+        results = {}
+        for n in ns:
+            if n not in self.keys or (n - 1) not in self.keys:
+                continue
+            choice = fn(self.exact(n, positive_m))
+            if choice is not None:
+                results[n] = choice
+        return results
+
+    def score_rule(self, rule: Union[str, Rule] = 'min_abs_m', ns: Optional[Iterable[int]] = None,
+                   positive_m: bool = True) -> Tuple[int, int]:
+        """
+        (hits, total): how often a forward step by rule from the true k[n-1]
+        lands exactly on the true k[n].
+        """
+        fn = _rule(rule)
+        ns = self.transitions() if ns is None else ns
+        hits = total = 0
+        for n in ns:
+            if n not in self.keys or (n - 1) not in self.keys:
+                continue
+            total += 1
+            step = next_key(self.keys, n, rule=fn, positive_m=positive_m)
+            if step is not None and step[2] == self.keys[n]:
+                hits += 1
+        return hits, total
+
+    def score_rules(self, rules: Optional[Dict[str, Rule]] = None, ns: Optional[Iterable[int]] = None,
+                    positive_m: bool = True) -> Dict[str, Tuple[int, int]]:
+        """score_rule for every rule (RULES by default)"""
+        rules = RULES if rules is None else rules
+        ns = self.transitions() if ns is None else list(ns)
+        return {name: self.score_rule(fn, ns, positive_m) for name, fn in rules.items()}
+
+
+# Test
+if __name__ == "__main__":
+    # keystore builds on this module, so it is only imported here
+    from utils.keystore import load_known_keys
+
+    print("=== Recurrence Engine ===\n")
+
+    keys = load_known_keys()
+    engine = RecurrenceEngine(keys)
+    print(f"Loaded {len(keys)} known keys, {len(engine.transitions())} consecutive transitions")
+
+    t0 = time.perf_counter()
+    table = engine.analyze(positive_m=False)
+    elapsed = time.perf_counter() - t0
+    ok = sum(1 for n, (d, m) in table.items()
+             if 2 * keys[n - 1] + 2**n - m * keys[d] == keys[n])
+    print(f"analyze:   {ok}/{len(table)} recurrences verified in {elapsed * 1000:.1f} ms")
+
+    t0 = time.perf_counter()
+    generated = generate({1: 1, 2: 3, 3: 7}, 160)
+    elapsed = time.perf_counter() - t0
+    in_range = all(2**(n - 1) <= v < 2**n for n, v in generated.items())
+    matches = sum(1 for n, v in generated.items() if keys.get(n) == v)
+    print(f"generate:  k[1..{max(generated)}] in {elapsed * 1000:.1f} ms, "
+          f"all in range: {in_range}, matches known: {matches}")
+
+    t0 = time.perf_counter()
+    scores = engine.score_rules()
+    elapsed = time.perf_counter() - t0
+    print(f"score:     {len(scores)} rules in {elapsed * 1000:.1f} ms")
+    for name, (hits, total) in scores.items():
+        print(f"  {name:10s} {hits}/{total}")
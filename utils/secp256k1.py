@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+secp256k1 - Shared curve arithmetic and Bitcoin key/address helpers
+
+One implementation for every search and verification script instead of a
+copy of point_add/scalar_mult (affine, with a recursive extended-gcd
+inversion per addition) in each of them:
+
+  * Points are affine (x, y) tuples at the API, None is infinity.
+    Internally scalar multiplication runs in Jacobian coordinates, so a
+    whole multiplication costs one field inversion instead of ~256.
+  * k*G uses a fixed-base window table (32 windows of 8 bits, built once
+    on first use): at most 32 mixed additions per key, no doublings.
+  * Many keys at once (scalar_mult_batch) share a single inversion via
+    Montgomery's trick (batch_inverse).
+  * coincurve (libsecp256k1) is used for k*G and k*P when installed.
+
+The hash160 / Base58Check / address / WIF helpers live here as well, so
+key -> address derivation is a single import:
+
+    from utils.secp256k1 import privkey_to_address, address_to_hash160
+
+    privkey_to_address(1)                      # '1BgGZ9tcN4rm9KBzDn7KprQz87SZ26SAMH'
+    privkey_to_hash160(k) == address_to_hash160(target)
+"""
+import hashlib
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import coincurve
+    HAS_COINCURVE = True
+except ImportError:
+    HAS_COINCURVE = False
+
+# secp256k1 parameters (y^2 = x^3 + 7 over F_P)
+P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+Gx = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
+Gy = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
+G = (Gx, Gy)
+
+Point = Tuple[int, int]
+JacobianPoint = Tuple[int, int, int]
+
+WINDOW_BITS = 8
+BASE58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+_B58_INDEX = {c: i for i, c in enumerate(BASE58_ALPHABET)}
+
+
+# ----------------------------------------------------------------------
+# Field helpers
+# ----------------------------------------------------------------------
+
+def inverse(a: int, m: int = P) -> int:
+    """Modular inverse (raises ValueError if a is not invertible)"""
+    return pow(a, -1, m)
+
+
+def batch_inverse(values: Sequence[int], m: int = P) -> List[int]:
+    """Inverses of all values with one pow() (Montgomery's trick); no value may be 0"""
+    prefix = [0] * len(values)
+    acc = 1
+    for i, v in enumerate(values):
+        prefix[i] = acc
+        acc = acc * v % m
+    inv = pow(acc, -1, m)
+    out = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        out[i] = inv * prefix[i] % m
+        inv = inv * values[i] % m
+    return out
+
+
+def is_on_curve(point: Optional[Point]) -> bool:
+    if point is None:
+        return True
+    x, y = point
+    return (y * y - x * x * x - 7) % P == 0
+
+
+# ----------------------------------------------------------------------
+# Affine arithmetic (single additions)
+# ----------------------------------------------------------------------
+
+def point_neg(point: Optional[Point]) -> Optional[Point]:
+    return None if point is None else (point[0], -point[1] % P)
+
+
+def point_add(p1: Optional[Point], p2: Optional[Point]) -> Optional[Point]:
+    """Add two affine points (None is the point at infinity)"""
+    if p1 is None:
+        return p2
+    if p2 is None:
+        return p1
+    x1, y1 = p1
+    x2, y2 = p2
+    if x1 == x2:
+        if (y1 + y2) % P == 0:
+            return None
+        lam = 3 * x1 * x1 * pow(2 * y1, -1, P) % P
+    else:
+        lam = (y2 - y1) * pow(x2 - x1, -1, P) % P
+    x3 = (lam * lam - x1 - x2) % P
+    return (x3, (lam * (x1 - x3) - y1) % P)
+
+
+def point_double(point: Optional[Point]) -> Optional[Point]:
+    return point_add(point, point)
+
+
+def point_sub(p1: Optional[Point], p2: Optional[Point]) -> Optional[Point]:
+    return point_add(p1, point_neg(p2))
+
+
+# ----------------------------------------------------------------------
+# Jacobian arithmetic: (X, Y, Z) represents (X/Z^2, Y/Z^3); None is infinity
+# ----------------------------------------------------------------------
+
+def to_jacobian(point: Optional[Point]) -> Optional[JacobianPoint]:
+    return None if point is None else (point[0], point[1], 1)
+
+
+def to_affine(point: Optional[JacobianPoint]) -> Optional[Point]:
+    if point is None:
+        return None
+    X, Y, Z = point
+    z_inv = pow(Z, -1, P)
+    z_inv2 = z_inv * z_inv % P
+    return (X * z_inv2 % P, Y * z_inv2 * z_inv % P)
+
+
+def batch_to_affine(points: Sequence[Optional[JacobianPoint]]) -> List[Optional[Point]]:
+    """Convert many Jacobian points with a single inversion"""
+    finite = [i for i, p in enumerate(points) if p is not None]
+    out: List[Optional[Point]] = [None] * len(points)
+    if not finite:
+        return out
+    inverses = batch_inverse([points[i][2] for i in finite])
+    for i, z_inv in zip(finite, inverses):
+        X, Y, _ = points[i]
+        z_inv2 = z_inv * z_inv % P
+        out[i] = (X * z_inv2 % P, Y * z_inv2 * z_inv % P)
+    return out
+
+
+def jacobian_double(p: Optional[JacobianPoint]) -> Optional[JacobianPoint]:
+    if p is None:
+        return None
+    X, Y, Z = p
+    if Y == 0:
+        return None
+    YY = Y * Y % P
+    S = 4 * X * YY % P
+    M = 3 * X * X % P
+    X3 = (M * M - 2 * S) % P
+    Y3 = (M * (S - X3) - 8 * YY * YY) % P
+    return (X3, Y3, 2 * Y * Z % P)
+
+
+def jacobian_add_affine(p: Optional[JacobianPoint], q: Optional[Point]) -> Optional[JacobianPoint]:
+    """Mixed addition: Jacobian p + affine q"""
+    if q is None:
+        return p
+    if p is None:
+        return (q[0], q[1], 1)
+    X1, Y1, Z1 = p
+    x2, y2 = q
+    ZZ = Z1 * Z1 % P
+    H = (x2 * ZZ - X1) % P
+    r = (y2 * ZZ * Z1 - Y1) % P
+    if H == 0:
+        return jacobian_double(p) if r == 0 else None
+    HH = H * H % P
+    HHH = H * HH % P
+    V = X1 * HH % P
+    X3 = (r * r - HHH - 2 * V) % P
+    Y3 = (r * (V - X3) - Y1 * HHH) % P
+    return (X3, Y3, Z1 * H % P)
+
+
+def jacobian_add(p: Optional[JacobianPoint], q: Optional[JacobianPoint]) -> Optional[JacobianPoint]:
+    if p is None:
+        return q
+    if q is None:
+        return p
+    X1, Y1, Z1 = p
+    X2, Y2, Z2 = q
+    Z1Z1 = Z1 * Z1 % P
+    Z2Z2 = Z2 * Z2 % P
+    U1 = X1 * Z2Z2 % P
+    U2 = X2 * Z1Z1 % P
+    S1 = Y1 * Z2 * Z2Z2 % P
+    S2 = Y2 * Z1 * Z1Z1 % P
+    H = (U2 - U1) % P
+    r = (S2 - S1) % P
+    if H == 0:
+        return jacobian_double(p) if r == 0 else None
+    HH = H * H % P
+    HHH = H * HH % P
+    V = U1 * HH % P
+    X3 = (r * r - HHH - 2 * V) % P
+    Y3 = (r * (V - X3) - S1 * HHH) % P
+    return (X3, Y3, Z1 * Z2 * H % P)
+
+
+# ----------------------------------------------------------------------
+# Scalar multiplication
+# ----------------------------------------------------------------------
+
+_G_TABLE: Optional[List[List[Point]]] = None
+
+
+def _g_table() -> List[List[Point]]:
+    """table[i][d - 1] = d * 2^(8i) * G for d in 1..255, built once"""
+    global _G_TABLE
+    if _G_TABLE is None:
+        windows = (256 + WINDOW_BITS - 1) // WINDOW_BITS
+        size = (1 << WINDOW_BITS) - 1
+        jac: List[Optional[JacobianPoint]] = []
+        base: Point = G
+        for _ in range(windows):
+            acc = to_jacobian(base)
+            row = [acc]
+            for _ in range(size - 1):
+                acc = jacobian_add_affine(acc, base)
+                row.append(acc)
+            jac.extend(row)
+            # Next window's base is 2^8 times this one's: (255 + 1) * base
+            base = to_affine(jacobian_add_affine(row[-1], base))
+        flat = batch_to_affine(jac)
+        _G_TABLE = [flat[i * size:(i + 1) * size] for i in range(windows)]
+    return _G_TABLE
+
+
+def _scalar_mult_jacobian(k: int) -> Optional[JacobianPoint]:
+    """k*G in Jacobian coordinates from the fixed-base table (k already reduced)"""
+    table = _g_table()
+    acc = None
+    i = 0
+    mask = (1 << WINDOW_BITS) - 1
+    while k:
+        d = k & mask
+        if d:
+            acc = jacobian_add_affine(acc, table[i][d - 1])
+        k >>= WINDOW_BITS
+        i += 1
+    return acc
+
+
+def scalar_mult(k: int) -> Optional[Point]:
+    """Compute k*G as an affine point (coincurve when available)"""
+    k %= N
+    if k == 0:
+        return None
+    if HAS_COINCURVE:
+        raw = coincurve.PrivateKey(k.to_bytes(32, 'big')).public_key.format(compressed=False)
+        return (int.from_bytes(raw[1:33], 'big'), int.from_bytes(raw[33:], 'big'))
+    return to_affine(_scalar_mult_jacobian(k))
+
+
+def scalar_mult_batch(keys: Sequence[int]) -> List[Optional[Point]]:
+    """k*G for many keys; the pure-Python path shares one inversion across all of them"""
+    if HAS_COINCURVE:
+        return [scalar_mult(k) for k in keys]
+    return batch_to_affine([_scalar_mult_jacobian(k % N) for k in keys])
+
+
+def point_mul(k: int, point: Optional[Point] = G) -> Optional[Point]:
+    """k * point for an arbitrary point (k*G goes through scalar_mult's table)"""
+    if point is None:
+        return None
+    if point == G:
+        return scalar_mult(k)
+    k %= N
+    if k == 0:
+        return None
+    if HAS_COINCURVE:
+        pub = coincurve.PublicKey(encode_point(*point, compressed=False))
+        raw = pub.multiply(k.to_bytes(32, 'big')).format(compressed=False)
+        return (int.from_bytes(raw[1:33], 'big'), int.from_bytes(raw[33:], 'big'))
+
+    # Left-to-right double-and-add, 4-bit windows of precomputed affine multiples
+    multiples = [to_jacobian(point)]
+    for _ in range(14):
+        multiples.append(jacobian_add_affine(multiples[-1], point))
+    multiples = batch_to_affine(multiples)
+    acc = None
+    for shift in range((k.bit_length() + 3) // 4 * 4 - 4, -1, -4):
+        for _ in range(4):
+            acc = jacobian_double(acc)
+        d = (k >> shift) & 0xF
+        if d:
+            acc = jacobian_add_affine(acc, multiples[d - 1])
+    return to_affine(acc)
+
+
+# ----------------------------------------------------------------------
+# Encoding, hashing and addresses
+# ----------------------------------------------------------------------
+
+def encode_point(x: int, y: int, compressed: bool = True) -> bytes:
+    """SEC1-encode an affine point"""
+    if compressed:
+        return (b'\x03' if y & 1 else b'\x02') + x.to_bytes(32, 'big')
+    return b'\x04' + x.to_bytes(32, 'big') + y.to_bytes(32, 'big')
+
+
+def decode_point(pubkey: bytes) -> Point:
+    """Parse a SEC1 compressed or uncompressed public key to an affine point"""
+    if len(pubkey) == 33 and pubkey[0] in (2, 3):
+        x = int.from_bytes(pubkey[1:], 'big')
+        y = pow((x * x * x + 7) % P, (P + 1) // 4, P)
+        if (x * x * x + 7 - y * y) % P:
+            raise ValueError("x is not on secp256k1")
+        if y & 1 != pubkey[0] & 1:
+            y = P - y
+        return (x, y)
+    if len(pubkey) == 65 and pubkey[0] == 4:
+        x = int.from_bytes(pubkey[1:33], 'big')
+        y = int.from_bytes(pubkey[33:], 'big')
+        if (x * x * x + 7 - y * y) % P:
+            raise ValueError("point is not on secp256k1")
+        return (x, y)
+    raise ValueError("expected a 33- or 65-byte SEC1 public key")
+
+
+def hash160(data: bytes) -> bytes:
+    """RIPEMD160(SHA256(data))"""
+    return hashlib.new('ripemd160', hashlib.sha256(data).digest()).digest()
+
+
+def privkey_to_pubkey(privkey: int) -> Optional[Point]:
+    return scalar_mult(privkey)
+
+
+def privkey_to_pubkey_bytes(privkey: int, compressed: bool = True) -> bytes:
+    if HAS_COINCURVE:
+        return coincurve.PrivateKey((privkey % N).to_bytes(32, 'big')).public_key.format(
+            compressed=compressed)
+    return encode_point(*scalar_mult(privkey), compressed=compressed)
+
+
+def pubkey_to_hash160(pubkey: Point, compressed: bool = True) -> bytes:
+    return hash160(encode_point(pubkey[0], pubkey[1], compressed))
+
+
+def privkey_to_hash160(privkey: int, compressed: bool = True) -> bytes:
+    return hash160(privkey_to_pubkey_bytes(privkey, compressed))
+
+
+def base58_encode(data: bytes) -> str:
+    n = int.from_bytes(data, 'big')
+    chars = []
+    while n:
+        n, r = divmod(n, 58)
+        chars.append(BASE58_ALPHABET[r])
+    leading = len(data) - len(data.lstrip(b'\x00'))
+    return '1' * leading + ''.join(reversed(chars))
+
+
+def base58_decode(s: str) -> bytes:
+    n = 0
+    for c in s:
+        try:
+            n = n * 58 + _B58_INDEX[c]
+        except KeyError:
+            raise ValueError(f"invalid Base58 character {c!r}") from None
+    leading = len(s) - len(s.lstrip('1'))
+    body = n.to_bytes((n.bit_length() + 7) // 8, 'big') if n else b''
+    return b'\x00' * leading + body
+
+
+def _checksum(payload: bytes) -> bytes:
+    return hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4]
+
+
+def base58check_encode(payload: bytes) -> str:
+    return base58_encode(payload + _checksum(payload))
+
+
+def base58check_decode(s: str) -> bytes:
+    """Payload of a Base58Check string (version byte included), checksum verified"""
+    data = base58_decode(s)
+    if len(data) < 5 or _checksum(data[:-4]) != data[-4:]:
+        raise ValueError(f"bad Base58Check checksum: {s}")
+    return data[:-4]
+
+
+def hash160_to_address(h160: bytes, version: int = 0x00) -> str:
+    return base58check_encode(bytes([version]) + h160)
+
+
+def address_to_hash160(address: str) -> bytes:
+    """Decode a P2PKH address to its 20-byte hash160, verifying the checksum"""
+    payload = base58check_decode(address)
+    if len(payload) != 21 or payload[0] != 0:
+        raise ValueError(f"not a mainnet P2PKH address: {address}")
+    return payload[1:]
+
+
+def pubkey_to_address(pubkey: Point, compressed: bool = True) -> str:
+    return hash160_to_address(pubkey_to_hash160(pubkey, compressed))
+
+
+def privkey_to_address(privkey: int, compressed: bool = True) -> str:
+    return hash160_to_address(privkey_to_hash160(privkey, compressed))
+
+
+def privkey_to_wif(privkey: int, compressed: bool = True) -> str:
+    payload = b'\x80' + privkey.to_bytes(32, 'big') + (b'\x01' if compressed else b'')
+    return base58check_encode(payload)
+
+
+def wif_to_privkey(wif: str) -> Tuple[int, bool]:
+    """(private key, compressed) from a mainnet WIF string"""
+    payload = base58check_decode(wif)
+    if payload[0] != 0x80 or len(payload) not in (33, 34):
+        raise ValueError(f"not a mainnet WIF key: {wif}")
+    return int.from_bytes(payload[1:33], 'big'), len(payload) == 34
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+
+def _legacy_scalar_mult(k: int) -> Optional[Point]:
+    """The copy-pasted per-script version: affine, extended-gcd inversion per step"""
+    def egcd(a, b):
+        if a == 0:
+            return b, 0, 1
+        g, x, y = egcd(b % a, a)
+        return g, y - (b // a) * x, x
+
+    def add(p1, p2):
+        if p1 is None:
+            return p2
+        if p2 is None:
+            return p1
+        if p1[0] == p2[0]:
+            if p1[1] != p2[1]:
+                return None
+            lam = 3 * p1[0] * p1[0] * egcd((2 * p1[1]) % P, P)[1] % P
+        else:
+            lam = (p2[1] - p1[1]) * egcd((p2[0] - p1[0]) % P, P)[1] % P
+        x3 = (lam * lam - p1[0] - p2[0]) % P
+        return (x3, (lam * (p1[0] - x3) - p1[1]) % P)
+
+    result, addend = None, G
+    while k:
+        if k & 1:
+            result = add(result, addend)
+        addend = add(addend, addend)
+        k >>= 1
+    return result
+
+
+def benchmark(count: int = 200, start: int = 2**70 + 12345) -> Dict[str, float]:
+    """Keys/sec of key -> compressed hash160 for each implementation"""
+    global HAS_COINCURVE
+    keys = [start + 7919 * i for i in range(count)]
+    results = {}
+
+    t0 = time.perf_counter()
+    for k in keys[:max(1, count // 10)]:
+        hash160(encode_point(*_legacy_scalar_mult(k)))
+    results['legacy_affine'] = max(1, count // 10) / (time.perf_counter() - t0)
+
+    saved, HAS_COINCURVE = HAS_COINCURVE, False
+    try:
+        _g_table()
+        t0 = time.perf_counter()
+        for k in keys:
+            privkey_to_hash160(k)
+        results['jacobian_table'] = count / (time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        for point in scalar_mult_batch(keys):
+            hash160(encode_point(*point))
+        results['jacobian_batch'] = count / (time.perf_counter() - t0)
+    finally:
+        HAS_COINCURVE = saved
+
+    if HAS_COINCURVE:
+        t0 = time.perf_counter()
+        for k in keys:
+            privkey_to_hash160(k)
+        results['coincurve'] = count / (time.perf_counter() - t0)
+    return results
+
+
+# Test
+if __name__ == "__main__":
+    print("=== secp256k1 ===\n")
+
+    print("--- Correctness ---")
+    checks = [
+        ("1*G compressed", privkey_to_address(1), "1BgGZ9tcN4rm9KBzDn7KprQz87SZ26SAMH"),
+        ("1*G uncompressed", privkey_to_address(1, compressed=False),
+         "1EHNa6Q4Jz2uvNExL497mE43ikXhwF6kZm"),
+        ("WIF(1)", privkey_to_wif(1), "KwDiBf89QgGbjEhKnhXJuH7LrciVrZi3qYjgd9M7rFU73sVHnoWn"),
+        ("(N-1)*G == -G", scalar_mult(N - 1), point_neg(G)),
+        ("k*G == legacy", scalar_mult(2**70 + 12345), _legacy_scalar_mult(2**70 + 12345)),
+        ("3*(5G) == 15G", point_mul(3, scalar_mult(5)), scalar_mult(15)),
+    ]
+    for name, got, want in checks:
+        print(f"{name}: {'PASS' if got == want else 'FAIL'}")
+
+    print(f"\n--- Benchmark (coincurve: {HAS_COINCURVE}) ---")
+    bench = benchmark()
+    base = bench['legacy_affine']
+    for name, kps in bench.items():
+        print(f"{name:16s} {kps:12,.0f} keys/s  ({kps / base:.0f}x)")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Status Snapshot - Compute-once cache for expensive dashboard payloads
+
+A SnapshotCache wraps a compute() function whose result only depends on a
+few files (kh.db and the calibration JSON for /api/status). The result is
+kept together with the (mtime_ns, size) fingerprint of those files (SQLite
+-wal/-journal files included, so uncommitted-checkpoint writes count) and
+an ETag derived from the payload.
+
+get() never recomputes on the caller's thread once a snapshot exists: if
+the files changed it starts one background refresh and keeps serving the
+previous snapshot until the new one is ready. Only the very first call
+(or a call after a failed computation with nothing to fall back on)
+waits for compute().
+
+A failed computation is remembered with the fingerprint it ran against:
+it is retried when the files change again, or after RETRY_SECONDS, not
+on every get().
+
+Usage:
+    from utils.status_snapshot import SnapshotCache
+
+    status = SnapshotCache(compute_status, [DB_PATH, CALIB_PATH])
+    status.refresh_async()                 # warm up at startup
+    payload, etag = status.get()
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+SQLITE_SIDECARS = ("-wal", "-journal")
+# Retry a failed computation on unchanged files after this long
+RETRY_SECONDS = 300.0
+
+
+def _fingerprint(paths: Iterable[str]) -> Tuple:
+    """(path, mtime_ns, size) of every path and SQLite sidecar that exists"""
+    fp = []
+    for path in paths:
+        for p in (path,) + tuple(path + s for s in SQLITE_SIDECARS):
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            fp.append((p, st.st_mtime_ns, st.st_size))
+    return tuple(fp)
+
+
+class SnapshotCache:
+    """Cached compute() result invalidated by file changes, refreshed off-thread"""
+
+    def __init__(self, compute: Callable[[], Dict[str, Any]], paths: Iterable[str],
+                 retry_seconds: float = RETRY_SECONDS):
+        self.compute = compute
+        self.paths = [str(p) for p in paths]
+        self.retry_seconds = retry_seconds
+        self.payload: Optional[Dict[str, Any]] = None
+        self.etag: Optional[str] = None
+        self.fingerprint: Optional[Tuple] = None
+        self.computed_at: Optional[float] = None
+        self.compute_seconds: Optional[float] = None
+        # monotonic time of the last failed computation, None after a success
+        self.failed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refresh: Optional[threading.Thread] = None
+
+    def _run(self):
+        """Compute a snapshot for the current file state and publish it"""
+        fp = _fingerprint(self.paths)
+        start = time.perf_counter()
+        try:
+            payload = self.compute()
+            ok = payload.get('success', True)
+        except Exception as e:
+            import traceback
+            payload = {'success': False, 'error': str(e), 'traceback': traceback.format_exc()}
+            ok = False
+        elapsed = time.perf_counter() - start
+
+        body = json.dumps(payload, sort_keys=True, default=str).encode()
+        with self._lock:
+            # A failed computation keeps the previous good snapshot if there is one
+            if ok or self.payload is None:
+                self.payload = payload
+                self.etag = hashlib.sha1(body).hexdigest()
+                self.computed_at = time.time()
+                self.compute_seconds = elapsed
+            # Failures keep the fingerprint they ran against so unchanged
+            # files are not recomputed on every get()
+            self.fingerprint = fp
+            self.failed_at = None if ok else time.monotonic()
+
+    def _start_refresh(self) -> threading.Thread:
+        """Start one background refresh (call with the lock held)"""
+        if self._refresh is None or not self._refresh.is_alive():
+            self._refresh = threading.Thread(target=self._run, name="status-snapshot",
+                                             daemon=True)
+            self._refresh.start()
+        return self._refresh
+
+    def refresh_async(self) -> threading.Thread:
+        with self._lock:
+            return self._start_refresh()
+
+    def is_stale(self) -> bool:
+        if self.fingerprint is None or _fingerprint(self.paths) != self.fingerprint:
+            return True
+        return self.failed_at is not None and \
+            time.monotonic() - self.failed_at >= self.retry_seconds
+
+    def get(self) -> Tuple[Dict[str, Any], str]:
+        """(payload, etag), starting a background refresh if the sources changed"""
+        with self._lock:
+            if self.payload is not None and not self.is_stale():
+                return self.payload, self.etag
+            refresh = self._start_refresh()
+            if self.payload is not None:
+                return self.payload, self.etag
+        # Nothing cached yet: wait for the first computation
+        refresh.join()
+        with self._lock:
+            return self.payload, self.etag
@@ -6,104 +6,9 @@ Derives BTC address from private key and verifies against puzzle addresses.
 Used to confirm mathematical derivations are correct.
 """
 
-import hashlib
 import sqlite3
+from utils.secp256k1 import privkey_to_address
 
-# secp256k1 curve parameters
-P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
-N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
-G = (0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
-     0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8)
-
-def modinv(a, m):
-    """Modular inverse using extended Euclidean algorithm."""
-    if a < 0:
-        a = a % m
-    g, x, _ = extended_gcd(a, m)
-    if g != 1:
-        raise ValueError("No modular inverse")
-    return x % m
-
-def extended_gcd(a, b):
-    if a == 0:
-        return b, 0, 1
-    g, x, y = extended_gcd(b % a, a)
-    return g, y - (b // a) * x, x
-
-def point_add(p1, p2):
-    """Add two points on secp256k1."""
-    if p1 is None:
-        return p2
-    if p2 is None:
-        return p1
-    x1, y1 = p1
-    x2, y2 = p2
-    if x1 == x2:
-        if y1 != y2:
-            return None  # Point at infinity
-        # Point doubling
-        lam = (3 * x1 * x1) * modinv(2 * y1, P) % P
-    else:
-        lam = (y2 - y1) * modinv(x2 - x1, P) % P
-    x3 = (lam * lam - x1 - x2) % P
-    y3 = (lam * (x1 - x3) - y1) % P
-    return (x3, y3)
-
-def scalar_mult(k, point):
-    """Multiply point by scalar k."""
-    result = None
-    addend = point
-    while k:
-        if k & 1:
-            result = point_add(result, addend)
-        addend = point_add(addend, addend)
-        k >>= 1
-    return result
-
-def privkey_to_pubkey(privkey):
-    """Convert private key to public key point."""
-    return scalar_mult(privkey, G)
-
-def pubkey_to_hash160(pubkey, compressed=True):
-    """Convert public key to HASH160."""
-    x, y = pubkey
-    if compressed:
-        prefix = b'\x02' if y % 2 == 0 else b'\x03'
-        pubkey_bytes = prefix + x.to_bytes(32, 'big')
-    else:
-        pubkey_bytes = b'\x04' + x.to_bytes(32, 'big') + y.to_bytes(32, 'big')
-
-    sha256 = hashlib.sha256(pubkey_bytes).digest()
-    ripemd160 = hashlib.new('ripemd160', sha256).digest()
-    return ripemd160
-
-def hash160_to_address(hash160, version=0x00):
-    """Convert HASH160 to Base58Check address."""
-    versioned = bytes([version]) + hash160
-    checksum = hashlib.sha256(hashlib.sha256(versioned).digest()).digest()[:4]
-    return base58_encode(versioned + checksum)
-
-def base58_encode(data):
-    """Base58 encoding."""
-    alphabet = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
-    n = int.from_bytes(data, 'big')
-    result = ''
-    while n > 0:
-        n, r = divmod(n, 58)
-        result = alphabet[r] + result
-    # Handle leading zeros
-    for byte in data:
-        if byte == 0:
-            result = '1' + result
-        else:
-            break
-    return result
-
-def privkey_to_address(privkey, compressed=True):
-    """Convert private key to Bitcoin address."""
-    pubkey = privkey_to_pubkey(privkey)
-    hash160 = pubkey_to_hash160(pubkey, compressed)
-    return hash160_to_address(hash160)
 
 def verify_puzzle(n, privkey):
     """Verify a puzzle solution."""
@@ -6,6 +6,9 @@ The analysis showed that seed "bitcoin" matched 4/5 early keys.
 Let's verify this rigorously against ALL 74 known keys.
 
 Formula to test: k[n] = 2^(n-1) + (SHA256(seed || n) mod 2^(n-1))
+
+To rule out large seed lists across many hash constructions at once, use
+the parallel scanner: python3 -m utils.hash_scan --wordlist <file>
 """
 
 import sqlite3
@@ -17,6 +17,7 @@ import json
 import os
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.llm_cache import ollama_run
 
 OUTPUT_DIR = "/home/rkh/ladder/swarm_outputs/wave21_collab"
 
@@ -77,12 +78,7 @@ d = [1,1,1,2,2,2,4,1,7,1,2,1,4,1,4,1,1,1,1,2,2,1,4,1,1,2,1,1,4]
 def query_model(model_name: str, prompt: str, timeout: int = 600) -> str:
     """Query a single model."""
     try:
-        result = subprocess.run(
-            ["ollama", "run", model_name, prompt],
-            capture_output=True,
-            text=True,
-            timeout=timeout
-        )
+        result = ollama_run(model_name, prompt, timeout=timeout)
         return result.stdout.strip()
     except subprocess.TimeoutExpired:
         return f"[TIMEOUT after {timeout}s]"
@@ -22,6 +22,7 @@ import time
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
+from utils.llm_cache import ollama_run
 
 # Configuration
 OUTPUT_DIR = Path("swarm_outputs/deep_exploration")
@@ -170,12 +171,7 @@ def query_model(model_name, config, prompt, iteration):
     full_prompt = f"{config['role']}\n\n{prompt}"
 
     try:
-        result = subprocess.run(
-            ["ollama", "run", config['model'], full_prompt],
-            capture_output=True,
-            text=True,
-            timeout=config['timeout']
-        )
+        result = ollama_run(config['model'], full_prompt, timeout=config['timeout'])
         response = result.stdout.strip()
 
         # Save response
@@ -9,6 +9,7 @@ import subprocess
 import json
 import os
 from datetime import datetime
+from utils.llm_cache import ollama_run
 
 OUTPUT_DIR = "/home/rkh/ladder/swarm_outputs/wave21_collab"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -44,8 +45,7 @@ QUESTION: What property selects the ACTUAL k[n]?
 
 def query(model: str, prompt: str, timeout: int = 300) -> str:
     try:
-        r = subprocess.run(["ollama", "run", model, prompt],
-                          capture_output=True, text=True, timeout=timeout)
+        r = ollama_run(model, prompt, timeout=timeout)
         return r.stdout.strip()
     except subprocess.TimeoutExpired:
         return f"[TIMEOUT {timeout}s]"
@@ -18,6 +18,7 @@ import os
 import time
 from datetime import datetime
 from pathlib import Path
+from utils.llm_cache import ollama_run
 
 # Configuration
 OUTPUT_DIR = Path("/home/rkh/ladder/swarm_outputs/autonomous")
@@ -171,12 +172,7 @@ If you have a new hypothesis, prefix with "HYPOTHESIS:"
         self.log(f"Querying {role} ({model}) with {timeout}s timeout...")
 
         try:
-            result = subprocess.run(
-                ["ollama", "run", model, full_prompt],
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
+            result = ollama_run(model, full_prompt, timeout=timeout)
             output = result.stdout
 
             # Save output
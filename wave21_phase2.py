@@ -7,6 +7,7 @@ Models review each other's findings to find consensus.
 import subprocess
 import os
 from datetime import datetime
+from utils.llm_cache import ollama_run
 
 OUTPUT_DIR = "/home/rkh/ladder/swarm_outputs/wave21_collab"
 
@@ -89,8 +90,7 @@ Be specific and mathematical. What is the ACTUAL construction method?
 
 def query(model: str, prompt: str, timeout: int = 900) -> str:
     try:
-        r = subprocess.run(["ollama", "run", model, prompt],
-                          capture_output=True, text=True, timeout=timeout)
+        r = ollama_run(model, prompt, timeout=timeout)
         return r.stdout.strip()
     except subprocess.TimeoutExpired:
         return f"[TIMEOUT {timeout}s]"
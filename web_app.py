@@ -13,6 +13,7 @@ from gpu_monitor import get_gpu_stats, get_system_stats, search_models
 # V3: Tool-based agent - AI explains, Python scripts do the real math
 from agent_v3 import get_conversation_history, get_agent
 from ollama_integration import list_ollama_models_sync, generate_with_ollama_sync
+from utils.status_snapshot import SnapshotCache
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'ladder-quest-2025'
@@ -29,9 +30,8 @@ def index():
     """Main dashboard"""
     return render_template('index.html')
 
-@app.route('/api/status')
-def get_status():
-    """Get current system status with verification and drift statistics"""
+def compute_status():
+    """System status with verification and drift statistics (see STATUS)"""
     try:
         # Check database
         conn = sqlite3.connect(DB_PATH)
@@ -104,7 +104,7 @@ def get_status():
                 'suggested_drift': {str(k): v for k, v in suggested.items()}
             }
 
-        return jsonify({
+        return {
             'success': True,
             'database': {
                 'total_puzzles': puzzle_count,  # Only solved count
@@ -122,10 +122,26 @@ def get_status():
             },
             'verification': verification,
             'drift_stats': drift_stats
-        })
+        }
     except Exception as e:
         import traceback
-        return jsonify({'success': False, 'error': str(e), 'traceback': traceback.format_exc()})
+        return {'success': False, 'error': str(e), 'traceback': traceback.format_exc()}
+
+# Status only changes when kh.db or the calibration changes: compute once,
+# refresh in the background, and let polls revalidate with the ETag
+STATUS = SnapshotCache(compute_status, [DB_PATH, CALIB_PATH])
+
+@app.route('/api/status')
+def get_status():
+    """Get current system status with verification and drift statistics"""
+    payload, etag = STATUS.get()
+    if request.if_none_match.contains(etag):
+        return '', 304, {'ETag': f'"{etag}"'}
+    response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 
 @app.route('/api/puzzles/<int:puzzle_num>')
 def get_puzzle(puzzle_num):
@@ -155,35 +171,22 @@ def get_puzzle(puzzle_num):
 
 @app.route('/api/verify', methods=['POST'])
 def run_verification():
-    """Run verification script"""
+    """Verify the affine model in-process (same checks as verify_affine.py)"""
+    from utils.affine_ladder import AffineLadder, consecutive_range, load_halfblocks
+
     try:
-        os.chdir(KH_ASSIST)
-        result = subprocess.run(
-            [sys.executable, 'verify_affine.py'],
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        low, high = consecutive_range(DB_PATH)
+        ladder = AffineLadder.from_calibration(CALIB_PATH)
+        result = ladder.verify(load_halfblocks(DB_PATH, low, high + 1), low, high)
 
-        output = result.stdout + result.stderr
+        forward_pct = round(100 * result.forward_rate, 3) if result.total else None
+        reverse_pct = round(100 * result.reverse_rate, 3) if result.total else None
+        success = result.total > 0 and result.forward_ok == result.total and result.reverse_ok == result.total
 
-        # Parse output for percentages
-        forward_pct = None
-        reverse_pct = None
-
-        for line in output.split('\n'):
-            if 'Forward test' in line and '%' in line:
-                try:
-                    forward_pct = float(line.split('=')[-1].strip().rstrip('%'))
-                except:
-                    pass
-            if 'Reverse test' in line and '%' in line:
-                try:
-                    reverse_pct = float(line.split('=')[-1].strip().rstrip('%'))
-                except:
-                    pass
-
-        success = forward_pct == 100.0 and reverse_pct == 100.0
+        output = (f"Range {low}-{high}\n"
+                  f"=== Forward test ===\n  {result.forward_ok}/{result.total} = {forward_pct}%\n"
+                  f"=== Reverse test ===\n  {result.reverse_ok}/{result.total} = {reverse_pct}%\n"
+                  f"Mismatches: {len(result.mismatches())}")
 
         return jsonify({
             'success': True,
@@ -858,7 +861,11 @@ def oracle_memory_queries():
 
         agent_id = request.args.get('agent', None)
         limit = request.args.get('limit', 20, type=int)
-        queries = memory.get_oracle_history(agent_id=agent_id, limit=limit)
+        text = request.args.get('q', None)
+        if text:
+            queries = memory.search_oracle_history(text, agent_id=agent_id, limit=limit)
+        else:
+            queries = memory.get_oracle_history(agent_id=agent_id, limit=limit)
 
         return jsonify({
             'success': True,
@@ -877,12 +884,18 @@ def oracle_memory_insights():
         agent_id = request.args.get('agent', None)
         category = request.args.get('category', None)
         min_confidence = request.args.get('min_confidence', 0.0, type=float)
+        text = request.args.get('q', None)
 
-        insights = memory.get_agent_insights(
-            agent_id=agent_id,
-            category=category,
-            min_confidence=min_confidence
-        )
+        if text:
+            insights = memory.search_insights(text, agent_id=agent_id,
+                                              limit=request.args.get('limit', 100, type=int),
+                                              category=category, min_confidence=min_confidence)
+        else:
+            insights = memory.get_agent_insights(
+                agent_id=agent_id,
+                category=category,
+                min_confidence=min_confidence
+            )
 
         return jsonify({
             'success': True,
@@ -891,6 +904,36 @@ def oracle_memory_insights():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/oracle/memory/search')
+def oracle_memory_search():
+    """Full-text search (BM25-ranked) over agent memory"""
+    try:
+        from agent_memory import get_agent_memory
+        memory = get_agent_memory()
+
+        text = request.args.get('q', '')
+        agent_id = request.args.get('agent', None)
+        limit = request.args.get('limit', 20, type=int)
+        kinds = request.args.get('kind', 'insights,oracle,conversations,shared').split(',')
+
+        results = {}
+        if 'insights' in kinds:
+            results['insights'] = memory.search_insights(text, agent_id=agent_id, limit=limit)
+        if 'oracle' in kinds:
+            results['oracle'] = memory.search_oracle_history(text, agent_id=agent_id, limit=limit)
+        if 'conversations' in kinds:
+            results['conversations'] = memory.search_conversations(text, agent_id=agent_id, limit=limit)
+        if 'shared' in kinds:
+            results['shared'] = memory.search_shared_knowledge(text, limit=limit)
+
+        return jsonify({
+            'success': True,
+            'query': text,
+            'results': results
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/api/oracle/memory/shared')
 def oracle_memory_shared():
     """Get shared knowledge base"""
@@ -1041,4 +1084,5 @@ if __name__ == '__main__':
     print("📍 Open your browser to: http://localhost:5050")
     print("📍 Oracle interface at: http://localhost:5050/oracle")
     print("=" * 60)
+    STATUS.refresh_async()  # warm the status snapshot before the first poll
     app.run(debug=True, host='0.0.0.0', port=5050)